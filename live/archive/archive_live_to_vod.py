@@ -0,0 +1,633 @@
+import hashlib
+import hmac
+import http.client
+import math
+import posixpath
+import re
+import struct
+import threading
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from xml.sax.saxutils import quoteattr
+
+# Output bucket of the live encoding (Generic S3 / Linode Object Storage, as in live/srt).
+LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME = '<INSERT_YOUR_OUTPUT_HOST_NAME>'
+# Signing region; None derives it from the host name (e.g. 'jp-osa-1').
+LINODE_OBJECT_STORAGE_OUTPUT_REGION = None
+# Optional endpoint of an S3-compatible stand-in (e.g. 'http://127.0.0.1:9000' for MinIO or a moto server);
+# requests then use path-style addressing against this endpoint.
+LINODE_OBJECT_STORAGE_OUTPUT_ENDPOINT = None
+
+# OUTPUT_BASE_PATH of the live sample and the name of its HLS manifest (the segments of the whole event stay
+# under this path after the live encoding is stopped; the live playlists only list the timeshift window).
+LIVE_OUTPUT_PATH = 'output/live-srt-ingest-h264-vbr-aac-fmp4-hls-dash/'
+LIVE_HLS_MANIFEST = 'stream.m3u8'
+
+# Path of the VOD manifests (and of the copied segments).
+ARCHIVE_OUTPUT_PATH = 'output/live-srt-ingest-h264-vbr-aac-fmp4-hls-dash-vod/'
+ARCHIVE_HLS_MANIFEST = 'stream.m3u8'
+ARCHIVE_DASH_MANIFEST = 'stream.mpd'
+
+# Part of the event to archive, in seconds from the start of the first segment (None: from the start / to the end).
+# The range is widened to whole segments.
+ARCHIVE_START = None
+ARCHIVE_END = None
+
+# 'reference': the VOD manifests reference the live segments in place (nothing is copied);
+# 'copy': the init and selected segments are copied server-side (CopyObject) to ARCHIVE_OUTPUT_PATH first, so the
+# live path can be cleaned up or reused by the next event.
+ARCHIVE_MODE = 'reference'
+
+# Listing, segment inspection, copies and uploads run on WORKERS threads with keep-alive connections.
+WORKERS = 64
+# Bytes read from the start of every segment to find its moof (a larger moof is read in full).
+HEAD_SIZE = 16 * 1024
+
+AUDIO_CODEC_PREFIXES = ('mp4a', 'ac-3', 'ec-3', 'ac-4', 'opus', 'flac')
+CONTENT_TYPES = {".m3u8": 'application/vnd.apple.mpegurl', ".mpd": 'application/dash+xml'}
+
+s3_bucket = {
+    "access_key": LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY,
+    "secret_key": LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY,
+    "bucket_name": LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME,
+    "host": LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME,
+    "region": LINODE_OBJECT_STORAGE_OUTPUT_REGION,
+    "endpoint": LINODE_OBJECT_STORAGE_OUTPUT_ENDPOINT
+}
+
+_connections = threading.local()
+S3_NAMESPACE = '{http://s3.amazonaws.com/doc/2006-03-01/}'
+
+
+def main():
+    """
+    Publish the recorded live event as VOD without re-encoding. Steps:
+      1) Read the live HLS master playlist and media playlists: renditions, init segments and segment naming
+      2) List the segments of every rendition in the bucket (the whole event, not only the timeshift window)
+      3) Read the moof of every segment of the first video rendition for its exact media time and select the
+         segments between ARCHIVE_START and ARCHIVE_END; then read the selected segments of the other renditions
+      4) ARCHIVE_MODE 'copy': copy the init and selected segments server-side; 'reference': keep them in place
+      5) Upload the VOD HLS media / master playlists and a static DASH MPD (SegmentTimeline)
+    """
+    started = time.monotonic()
+    archive_path = ARCHIVE_OUTPUT_PATH.rstrip('/') + '/'
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        # 1) Live manifests
+        master_key = LIVE_OUTPUT_PATH.rstrip('/') + '/' + LIVE_HLS_MANIFEST
+        master_text, renditions = load_renditions(master_key)
+
+        # 2) Segment listing
+        for rendition, segments in zip(renditions, executor.map(list_segments, renditions), strict=True):
+            if not segments:
+                raise Exception(f"No segments of {rendition['uri']} under {rendition['directory']}")
+            rendition["listed"] = segments
+        print(f"Listed {sum(len(rendition['listed']) for rendition in renditions)} segments of {len(renditions)} "
+              f"renditions in {time.monotonic() - started:.1f} s")
+
+        # 3) Media times and selection
+        reference = next(rendition for rendition in renditions if rendition["type"] == 'video')
+        inspect_rendition(reference, sorted(reference["listed"]), executor)
+        event_start = reference["segments"][0]["start"] / reference["timescale"]
+        numbers = select_segments(reference, event_start)
+        for rendition in renditions:
+            missing = [number for number in numbers if number not in rendition["listed"]]
+            if missing:
+                raise Exception(f"{rendition['uri']}: segments {missing[:10]} missing in the bucket")
+            if rendition is reference:
+                selected = set(numbers)
+                rendition["segments"] = [segment for segment in rendition["segments"] if segment["number"] in selected]
+            else:
+                inspect_rendition(rendition, numbers, executor)
+        start_time = reference["segments"][0]["start"] / reference["timescale"]
+        print(f"Selected segments {numbers[0]}-{numbers[-1]} "
+              f"({_duration(reference):.3f} s from {start_time - event_start:.3f} s of the event) "
+              f"in {time.monotonic() - started:.1f} s")
+
+        # 4) Server-side copies
+        if ARCHIVE_MODE == 'copy':
+            sources = {obj["key"]: obj for rendition in renditions for obj in rendition["segments"]}
+            copies = []
+            for rendition in renditions:
+                for obj in [rendition, *rendition["segments"]]:
+                    field = "init_key" if obj is rendition else "key"
+                    destination = archive_path + _live_relative(obj[field])
+                    copies.append((obj[field], destination))
+                    obj[field] = destination
+            existing = {obj["key"]: obj for obj in _list_objects(archive_path)}
+            # Copies left by an earlier run (same ETag and size) are skipped.
+            pending = [(source, destination) for source, destination in copies
+                       if not _is_copied(sources.get(source), existing.get(destination))]
+            list(executor.map(lambda copy: copy_object(*copy), pending))
+            print(f"Copied {len(pending)} objects ({len(copies) - len(pending)} already copied) "
+                  f"in {time.monotonic() - started:.1f} s")
+        elif ARCHIVE_MODE != 'reference':
+            raise Exception(f"Unknown ARCHIVE_MODE {ARCHIVE_MODE!r} (use 'reference' or 'copy')")
+
+        # 5) VOD manifests
+        uploads = {archive_path + rendition["uri"]: media_playlist(rendition, archive_path) for rendition in renditions}
+        uploads[archive_path + ARCHIVE_DASH_MANIFEST] = vod_mpd(renditions, reference, archive_path)
+        # The master playlist is uploaded last, once every media playlist it references exists.
+        list(executor.map(lambda upload: put_object(*upload), uploads.items()))
+        put_object(archive_path + ARCHIVE_HLS_MANIFEST, master_text)
+    print(f"Published {archive_path}{ARCHIVE_HLS_MANIFEST} and {archive_path}{ARCHIVE_DASH_MANIFEST} "
+          f"({len(renditions)} renditions, {len(numbers)} segments each) in {time.monotonic() - started:.1f} s")
+
+
+def load_renditions(master_key):
+    """
+    Text of the live master playlist and its renditions: type, media playlist URI, codecs, resolution / language,
+    init segment key and segment naming (directory, prefix, number width, suffix) of the live media playlist.
+    """
+    master_text = _get_text(master_key)
+    renditions = []
+    audio_codecs = {}
+    pending = None
+    for line in master_text.splitlines():
+        if line.startswith('#EXT-X-MEDIA:') and 'TYPE=AUDIO' in line:
+            attributes = _attributes(line)
+            if 'URI' in attributes:
+                renditions.append({"type": 'audio', "uri": attributes["URI"], "group": attributes.get("GROUP-ID"),
+                                   "language": attributes.get("LANGUAGE")})
+        elif line.startswith('#EXT-X-STREAM-INF:'):
+            pending = _attributes(line)
+        elif pending is not None and line.strip() and not line.startswith('#'):
+            codecs = [codec.strip() for codec in pending.get("CODECS", '').split(',') if codec.strip()]
+            video_codecs = [codec for codec in codecs if not codec.startswith(AUDIO_CODEC_PREFIXES)]
+            for codec in codecs:
+                if codec not in video_codecs and pending.get("AUDIO"):
+                    audio_codecs.setdefault(pending["AUDIO"], codec)
+            if 'RESOLUTION' in pending and video_codecs:
+                width, height = (int(value) for value in pending["RESOLUTION"].split('x'))
+                renditions.append({"type": 'video', "uri": line.strip(), "codecs": video_codecs[0], "width": width,
+                                   "height": height, "frame_rate": pending.get("FRAME-RATE")})
+            pending = None
+
+    seen = set()
+    renditions = [rendition for rendition in renditions if not (rendition["uri"] in seen or seen.add(rendition["uri"]))]
+    if not any(rendition["type"] == 'video' for rendition in renditions):
+        raise Exception(f"{master_key}: no video variants (RESOLUTION and a video codec in CODECS)")
+    for rendition in renditions:
+        if rendition["type"] == 'audio':
+            rendition["codecs"] = audio_codecs.get(rendition["group"], 'mp4a.40.2')
+        rendition["id"] = re.sub(r'[^A-Za-z0-9_.-]+', '_', posixpath.splitext(rendition["uri"])[0])
+        playlist_key = _join(master_key, rendition["uri"])
+        text = _get_text(playlist_key)
+        init_uri = re.search(r'#EXT-X-MAP:URI="([^"]+)"', text)
+        segment_uri = next((line.strip() for line in text.splitlines() if line.strip() and not line.startswith('#')),
+                           None)
+        if not init_uri or segment_uri is None or '#EXT-X-BYTERANGE' in text:
+            raise Exception(f"{playlist_key} is not a segmented fMP4 playlist")
+        # Number before the file extension (segment_12.m4s -> segment_, 12, .m4s).
+        match = re.fullmatch(r'(.*\D|)(\d+)(\.[^./]+|)', _join(playlist_key, segment_uri))
+        if not match:
+            raise Exception(f"{playlist_key}: segment names are not numbered ({segment_uri})")
+        directory, prefix = match.group(1).rsplit('/', 1) if '/' in match.group(1) else ('', match.group(1))
+        rendition.update({
+            "init_key": _join(playlist_key, init_uri.group(1)),
+            "directory": directory + '/' if directory else '',
+            "prefix": prefix,
+            "suffix": match.group(3),
+            # Zero-padded numbers (segment_007.m4s) keep their width.
+            "number_width": len(match.group(2)) if match.group(2).startswith('0') and len(match.group(2)) > 1 else 0
+        })
+    return master_text, renditions
+
+
+def list_segments(rendition):
+    """
+    {number: {"key", "size", "etag", "number"}} of the segments of one rendition in the bucket.
+    """
+    pattern = re.compile(re.escape(rendition["directory"] + rendition["prefix"]) + r'(\d+)' + re.escape(rendition["suffix"]))
+    segments = {}
+    for obj in _list_objects(rendition["directory"] + rendition["prefix"]):
+        match = pattern.fullmatch(obj["key"])
+        if match and (rendition["number_width"] == 0 or len(match.group(1)) == rendition["number_width"]):
+            segments[int(match.group(1))] = {**obj, "number": int(match.group(1))}
+    return segments
+
+
+def inspect_rendition(rendition, numbers, executor):
+    """
+    Read the init segment (timescale, trex defaults) and the moof of the given segments of one rendition; sets
+    "timescale" and "segments" ([{"number", "key", "size", "start", "end"}], media times in timescale units).
+    """
+    status, init = _s3_request("GET", rendition["init_key"])
+    if status != 200:
+        raise Exception(f"GET {rendition['init_key']} failed with HTTP {status}")
+    rendition["timescale"], defaults = _init_track(init)
+    segments = [rendition["listed"][number] for number in numbers]
+    for segment, (start, end) in zip(segments, executor.map(lambda obj: _segment_times(obj, defaults), segments),
+                                     strict=True):
+        segment.update({"start": start, "end": end})
+    rendition["segments"] = segments
+
+
+def select_segments(reference, event_start):
+    """
+    Numbers of the consecutive segments of the reference rendition that overlap ARCHIVE_START - ARCHIVE_END
+    (seconds from event_start).
+    """
+    timescale = reference["timescale"]
+    start = event_start + (ARCHIVE_START or 0)
+    end = event_start + ARCHIVE_END if ARCHIVE_END is not None else math.inf
+    numbers = [segment["number"] for segment in reference["segments"]
+               if segment["end"] / timescale > start and segment["start"] / timescale < end]
+    if not numbers:
+        raise Exception(f"No segments between {ARCHIVE_START} s and {ARCHIVE_END} s")
+    missing = sorted(set(range(numbers[0], numbers[-1] + 1)) - set(numbers))
+    if missing:
+        raise Exception(f"{reference['uri']}: segments {missing[:10]} missing in the bucket")
+    return numbers
+
+
+def copy_object(source, destination):
+    """
+    Server-side copy of one object (CopyObject, public-read like the live outputs).
+    """
+    copy_source = urllib.parse.quote(f"/{s3_bucket['bucket_name']}/{source}", safe='/~')
+    status, body = _s3_request("PUT", destination, headers={"x-amz-copy-source": copy_source,
+                                                            "x-amz-acl": 'public-read'})
+    if status != 200 or b'<Error>' in body:
+        raise Exception(f"CopyObject {source} -> {destination} failed with HTTP {status}: {body[:200]!r}")
+
+
+def put_object(key, text):
+    """
+    Upload one manifest (public-read).
+    """
+    status, body = _s3_request("PUT", key, headers={"Content-Type": CONTENT_TYPES[posixpath.splitext(key)[1]],
+                                                    "x-amz-acl": 'public-read'}, payload=text.encode('utf-8'))
+    if status != 200:
+        raise Exception(f"PUT {key} failed with HTTP {status}: {body[:200]!r}")
+
+
+def media_playlist(rendition, archive_path):
+    """
+    VOD HLS media playlist of one rendition; segment durations are the exact media times of the fragments.
+    """
+    timescale = rendition["timescale"]
+    durations = [(segment["end"] - segment["start"]) / timescale for segment in rendition["segments"]]
+    lines = ["#EXTM3U", "#EXT-X-VERSION:6", f"#EXT-X-TARGETDURATION:{math.ceil(max(durations))}",
+             "#EXT-X-MEDIA-SEQUENCE:0", "#EXT-X-PLAYLIST-TYPE:VOD", "#EXT-X-INDEPENDENT-SEGMENTS",
+             f'#EXT-X-MAP:URI="{_uri(rendition["init_key"], archive_path)}"']
+    for segment, duration in zip(rendition["segments"], durations, strict=True):
+        lines.append(f"#EXTINF:{duration:.6f},")
+        lines.append(_uri(segment["key"], archive_path))
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+def vod_mpd(renditions, reference, archive_path):
+    """
+    Static DASH MPD: one SegmentTemplate per representation whose SegmentTimeline carries the media times of the
+    fragments; presentationTimeOffset is the start of the first selected segment of the reference rendition.
+    """
+    start_time = reference["segments"][0]["start"] / reference["timescale"]
+    duration = max(rendition["segments"][-1]["end"] / rendition["timescale"] for rendition in renditions) - start_time
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" profiles="urn:mpeg:dash:profile:isoff-live:2011" type="static" '
+        f'mediaPresentationDuration="PT{duration:.3f}S" minBufferTime="PT2S">',
+        '  <Period id="0" start="PT0S">'
+    ]
+    adaptation_sets = {}
+    for rendition in renditions:
+        key = ('video',) if rendition["type"] == 'video' else ('audio', rendition["language"] or '')
+        adaptation_sets.setdefault(key, []).append(rendition)
+    for key, members in sorted(adaptation_sets.items(), key=lambda item: (item[0][0] != 'video', item[0][1:])):
+        language = f' lang={quoteattr(key[1])}' if key[0] == 'audio' and key[1] else ''
+        lines.append(f'    <AdaptationSet contentType="{key[0]}" mimeType="{key[0]}/mp4" segmentAlignment="true" '
+                     f'startWithSAP="1"{language}>')
+        for rendition in sorted(members, key=_bandwidth):
+            attributes = f' width="{rendition["width"]}" height="{rendition["height"]}"' \
+                if rendition["type"] == 'video' else ''
+            if rendition["type"] == 'video' and rendition["frame_rate"]:
+                attributes += f' frameRate="{float(rendition["frame_rate"]):g}"'
+            timescale = rendition["timescale"]
+            width = rendition["number_width"]
+            media = _uri(rendition["segments"][0]["key"], archive_path)
+            media = re.sub(r'\d+(\.[^./]+|)$', (f"$Number%0{width}d$" if width else "$Number$") + r'\1', media)
+            lines.extend([
+                f'      <Representation id={quoteattr(rendition["id"])} bandwidth="{_bandwidth(rendition)}" '
+                f'codecs="{rendition["codecs"]}"{attributes}>',
+                f'        <SegmentTemplate timescale="{timescale}" presentationTimeOffset="{round(start_time * timescale)}" '
+                f'initialization={quoteattr(_uri(rendition["init_key"], archive_path))} media={quoteattr(media)} '
+                f'startNumber="{rendition["segments"][0]["number"]}">',
+                f'          <SegmentTimeline>{_timeline(rendition["segments"])}</SegmentTimeline>',
+                '        </SegmentTemplate>',
+                '      </Representation>'
+            ])
+        lines.append('    </AdaptationSet>')
+    lines.extend(['  </Period>', '</MPD>'])
+    return "\n".join(lines) + "\n"
+
+
+def _timeline(segments):
+    """
+    S elements (with repeat counts) of the segments; a new S starts wherever the media time is not contiguous.
+    """
+    elements = []
+    for segment in segments:
+        duration = segment["end"] - segment["start"]
+        if elements and elements[-1][1] == duration and \
+                elements[-1][0] + elements[-1][1] * (elements[-1][2] + 1) == segment["start"]:
+            elements[-1][2] += 1
+        else:
+            elements.append([segment["start"], duration, 0])
+    return "".join(f'<S t="{start}" d="{duration}" r="{repeat}"/>' if repeat else f'<S t="{start}" d="{duration}"/>'
+                   for start, duration, repeat in elements)
+
+
+def _bandwidth(rendition):
+    """
+    Peak bitrate of the selected segments (object size over media duration).
+    """
+    return max(math.ceil(segment["size"] * 8 * rendition["timescale"] / (segment["end"] - segment["start"]))
+               for segment in rendition["segments"] if segment["end"] > segment["start"])
+
+
+def _duration(rendition):
+    """
+    Duration in seconds of the selected segments of a rendition.
+    """
+    return (rendition["segments"][-1]["end"] - rendition["segments"][0]["start"]) / rendition["timescale"]
+
+
+def _segment_times(obj, defaults):
+    """
+    Media time (tfdt) of the first fragment and end time of the last fragment of one segment, from its moof boxes;
+    media data is skipped by its size, never read.
+    """
+    start, end = None, 0
+    offset = 0
+    head_start, head = 0, _read_range(obj["key"], 0, min(HEAD_SIZE, obj["size"]))
+    while offset + 8 <= obj["size"]:
+        if offset + 16 > head_start + len(head):
+            head_start, head = offset, _read_range(obj["key"], offset, min(HEAD_SIZE, obj["size"] - offset))
+        size, box_type = struct.unpack_from('>I4s', head, offset - head_start)
+        if size == 1:
+            size = struct.unpack_from('>Q', head, offset - head_start + 8)[0]
+        if size < 8:
+            break
+        if box_type == b'moof':
+            if offset + size > head_start + len(head):
+                head_start, head = offset, _read_range(obj["key"], offset, size)
+            fragment_start, fragment_end = _moof_times(head, offset - head_start, size, defaults)
+            start = fragment_start if start is None else start
+            end = max(end, fragment_end)
+        offset += size
+    if start is None:
+        raise Exception(f"{obj['key']} has no moof")
+    return start, end
+
+
+def _moof_times(data, start, size, defaults):
+    """
+    Start (tfdt) and end time of the fragment of the moof at start in data.
+    """
+    fragment_start, fragment_end = None, 0
+    for traf_start, traf_end in _iter_children(data, start + 8, start + size, b'traf'):
+        duration = defaults["duration"]
+        for tfhd_start, _ in _iter_children(data, traf_start + 8, traf_end, b'tfhd'):
+            flags = int.from_bytes(data[tfhd_start + 9:tfhd_start + 12], 'big')
+            offset = tfhd_start + 16 + (8 if flags & 0x01 else 0) + (4 if flags & 0x02 else 0)
+            if flags & 0x08:
+                duration = struct.unpack_from('>I', data, offset)[0]
+        time = 0
+        for tfdt_start, _ in _iter_children(data, traf_start + 8, traf_end, b'tfdt'):
+            time = struct.unpack_from('>Q' if data[tfdt_start + 8] == 1 else '>I', data, tfdt_start + 12)[0]
+        fragment_start = time if fragment_start is None else min(fragment_start, time)
+        for trun_start, _ in _iter_children(data, traf_start + 8, traf_end, b'trun'):
+            flags = int.from_bytes(data[trun_start + 9:trun_start + 12], 'big')
+            count = struct.unpack_from('>I', data, trun_start + 12)[0]
+            if not flags & 0x100:
+                time += count * duration
+                continue
+            offset = trun_start + 16 + (4 if flags & 0x001 else 0) + (4 if flags & 0x004 else 0)
+            stride = 4 * sum(1 for bit in (0x100, 0x200, 0x400, 0x800) if flags & bit)
+            time += sum(struct.unpack_from('>I', data, offset + index * stride)[0] for index in range(count))
+        fragment_end = max(fragment_end, time)
+    return fragment_start or 0, fragment_end
+
+
+def _init_track(data):
+    """
+    Timescale (mdhd) and trex sample defaults ({"duration"}) of the first track of an init segment.
+    """
+    moov = _find_box(data, b'moov')
+    if moov is None:
+        raise Exception("init segment has no moov")
+    trak = next(_iter_children(data, moov[0] + 8, moov[1], b'trak'))
+    mdia = next(_iter_children(data, trak[0] + 8, trak[1], b'mdia'))
+    mdhd = next(_iter_children(data, mdia[0] + 8, mdia[1], b'mdhd'))
+    timescale = struct.unpack_from('>I', data, mdhd[0] + (28 if data[mdhd[0] + 8] == 1 else 20))[0]
+    defaults = {"duration": 0}
+    for mvex_start, mvex_end in _iter_children(data, moov[0] + 8, moov[1], b'mvex'):
+        for trex_start, _ in _iter_children(data, mvex_start + 8, mvex_end, b'trex'):
+            defaults = {"duration": struct.unpack_from('>I', data, trex_start + 20)[0]}
+    return timescale, defaults
+
+
+def _find_box(data, box_type):
+    """
+    (start, end) of the first top-level box of the given type; end may exceed the data read so far.
+    """
+    offset = 0
+    while offset + 8 <= len(data):
+        size, current_type = struct.unpack_from('>I4s', data, offset)
+        if size == 1:
+            size = struct.unpack_from('>Q', data, offset + 8)[0]
+        if size < 8:
+            return None
+        if current_type == box_type:
+            return offset, offset + size
+        offset += size
+    return None
+
+
+def _iter_children(data, start, end, box_type):
+    """
+    Yield (start, end) of the child boxes of the given type between start and end.
+    """
+    offset = start
+    while offset + 8 <= min(end, len(data)):
+        size, current_type = struct.unpack_from('>I4s', data, offset)
+        if size < 8:
+            return
+        if current_type == box_type:
+            yield offset, offset + size
+        offset += size
+
+
+def _attributes(line):
+    """
+    Attribute list of an HLS tag line (quoted values unquoted).
+    """
+    return {name: value.strip('"') for name, value in re.findall(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)', line.split(':', 1)[1])}
+
+
+def _join(key, reference):
+    """
+    Key of a playlist reference relative to the key of the playlist.
+    """
+    return posixpath.normpath(posixpath.join(posixpath.dirname(key), urllib.parse.unquote(reference)))
+
+
+def _live_relative(key):
+    """
+    Path of a live object relative to LIVE_OUTPUT_PATH (also its path under ARCHIVE_OUTPUT_PATH when copied).
+    """
+    live_path = LIVE_OUTPUT_PATH.rstrip('/') + '/'
+    if not key.startswith(live_path):
+        raise Exception(f"{key} is outside LIVE_OUTPUT_PATH")
+    return key[len(live_path):]
+
+
+def _uri(key, archive_path):
+    """
+    URI of an object relative to the VOD manifests.
+    """
+    return urllib.parse.quote(posixpath.relpath(key, archive_path.rstrip('/')), safe='/~')
+
+
+def _is_copied(source, destination):
+    """
+    True when the destination is a copy of the source from an earlier run.
+    """
+    return source is not None and destination is not None and \
+        (source["etag"], source["size"]) == (destination["etag"], destination["size"])
+
+
+def _get_text(key):
+    """
+    Text of one object.
+    """
+    status, body = _s3_request("GET", key)
+    if status != 200:
+        raise Exception(f"GET {key} failed with HTTP {status}: {body[:200]!r}")
+    return body.decode('utf-8')
+
+
+def _read_range(key, start, length):
+    """
+    Bytes start to start + length of an object (ranged GET).
+    """
+    status, body = _s3_request("GET", key, headers={"Range": f"bytes={start}-{start + length - 1}"})
+    if status not in (200, 206):
+        raise Exception(f"GET {key} failed with HTTP {status}: {body[:200]!r}")
+    return body if status == 206 else body[start:start + length]
+
+
+def _list_objects(prefix):
+    """
+    ListObjectsV2 of all keys under prefix (no delimiter), following continuation tokens.
+    """
+    objects = []
+    token = None
+    while True:
+        query = {"list-type": "2", "prefix": prefix, "max-keys": "1000"}
+        if token:
+            query["continuation-token"] = token
+        status, body = _s3_request("GET", "", query=query)
+        if status != 200:
+            raise Exception(f"ListObjectsV2 {prefix} failed with HTTP {status}: {body[:200]!r}")
+
+        root = ET.fromstring(body)
+        for content in root.iter(f"{S3_NAMESPACE}Contents"):
+            objects.append({
+                "key": content.findtext(f"{S3_NAMESPACE}Key"),
+                "size": int(content.findtext(f"{S3_NAMESPACE}Size")),
+                "etag": content.findtext(f"{S3_NAMESPACE}ETag").strip('"')
+            })
+        if root.findtext(f"{S3_NAMESPACE}IsTruncated") != 'true':
+            return objects
+        token = root.findtext(f"{S3_NAMESPACE}NextContinuationToken")
+
+
+def _s3_request(method, key, query=None, headers=None, payload=b""):
+    """
+    Send a signed S3 request on a thread-local keep-alive connection; returns (status, body).
+    Without an endpoint, virtual-hosted HTTPS requests are used; with one, path-style requests to the endpoint.
+    """
+    if s3_bucket.get("endpoint"):
+        endpoint = urllib.parse.urlsplit(s3_bucket["endpoint"])
+        scheme, host = endpoint.scheme, endpoint.netloc
+        path = "/" + urllib.parse.quote(f"{s3_bucket['bucket_name']}/{key.lstrip('/')}", safe='/~')
+    else:
+        scheme, host = "https", f"{s3_bucket['bucket_name']}.{s3_bucket['host']}"
+        path = "/" + urllib.parse.quote(key.lstrip('/'), safe='/~')
+
+    canonical_query = "&".join(
+        f"{urllib.parse.quote(name, safe='-_.~')}={urllib.parse.quote(value, safe='-_.~')}"
+        for name, value in sorted((query or {}).items())
+    )
+    headers = dict(headers or {})
+    headers.update(_sign_s3_request(method, host, path, canonical_query, headers, payload))
+    return _send(scheme, host, method, f"{path}?{canonical_query}" if canonical_query else path, headers, payload)
+
+
+def _sign_s3_request(method, host, path, canonical_query, headers, payload):
+    """
+    Return the headers that sign an S3 request with AWS Signature Version 4.
+    """
+    region = s3_bucket.get("region") or s3_bucket["host"].split('.')[0]
+    now = datetime.now(UTC)
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    date_stamp = now.strftime('%Y%m%d')
+    payload_hash = hashlib.sha256(payload).hexdigest()
+
+    signed = {"host": host, "x-amz-content-sha256": payload_hash, "x-amz-date": amz_date}
+    signed.update({name.lower(): value for name, value in headers.items() if name.lower().startswith("x-amz-")})
+    signed_headers = ";".join(sorted(signed))
+    canonical_headers = "".join(f"{name}:{signed[name]}\n" for name in sorted(signed))
+    canonical_request = f"{method}\n{path}\n{canonical_query}\n{canonical_headers}\n{signed_headers}\n{payload_hash}"
+
+    scope = f"{date_stamp}/{region}/s3/aws4_request"
+    string_to_sign = f"AWS4-HMAC-SHA256\n{amz_date}\n{scope}\n{hashlib.sha256(canonical_request.encode()).hexdigest()}"
+
+    signing_key = f"AWS4{s3_bucket['secret_key']}".encode()
+    for part in (date_stamp, region, "s3", "aws4_request"):
+        signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+    signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    return {
+        "x-amz-date": amz_date,
+        "x-amz-content-sha256": payload_hash,
+        "Authorization": f"AWS4-HMAC-SHA256 Credential={s3_bucket['access_key']}/{scope}, "
+                         f"SignedHeaders={signed_headers}, Signature={signature}"
+    }
+
+
+def _send(scheme, host, method, target, headers, payload):
+    """
+    Send a request on the thread-local keep-alive connection to host (reconnecting once if it was closed) and
+    return (status, body).
+    """
+    pool = getattr(_connections, 'pool', None)
+    if pool is None:
+        pool = _connections.pool = {}
+    for attempt in range(2):
+        connection = pool.get(host)
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            connection = pool[host] = connection_class(host, timeout=60)
+        try:
+            connection.request(method, target, body=payload or None, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, ConnectionError):
+            connection.close()
+            pool.pop(host, None)
+            if attempt == 1:
+                raise
+    return None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,644 @@
+import time
+
+from bitmovin_api_sdk import BitmovinApi
+from bitmovin_api_sdk import GenericS3Input, S3AccessStyle, S3SignatureVersion, GenericS3Output
+from bitmovin_api_sdk import Encoding, CloudRegion, EncodingMode
+from bitmovin_api_sdk import EncodingOutput, AclEntry, AclPermission
+from bitmovin_api_sdk import IngestInputStream, StreamSelectionMode, PresetConfiguration
+from bitmovin_api_sdk import Stream, StreamInput, MuxingStream, StreamMode, ColorConfig
+from bitmovin_api_sdk import AacAudioConfiguration, AacChannelLayout
+from bitmovin_api_sdk import H264VideoConfiguration, ProfileH264, LevelH264, WeightedPredictionPFrames
+from bitmovin_api_sdk import H265VideoConfiguration, ProfileH265
+from bitmovin_api_sdk import Av1VideoConfiguration, AutoLevelSetup, Av1PresetConfiguration
+from bitmovin_api_sdk import Vp9VideoConfiguration
+from bitmovin_api_sdk import Fmp4Muxing, WebmMuxing
+from bitmovin_api_sdk import HlsManifest, HlsVersion, AudioMediaInfo, StreamInfo
+from bitmovin_api_sdk import DashManifest, Period, VideoAdaptationSet, AudioAdaptationSet
+from bitmovin_api_sdk import DashFmp4Representation, DashWebmRepresentation, DashRepresentationType, DashRepresentationTypeMode
+from bitmovin_api_sdk import MessageType, StartEncodingRequest
+from bitmovin_api_sdk import Status
+
+TEST_ITEM = "vod-multicodec-aac-fmp4-hls-dash"
+
+API_KEY = '<INSERT YOUR API KEY>'
+ORG_ID = '<INSERT YOUR ORG ID>'
+
+LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_INPUT_HOST_NAME = '<INSERT_YOUR_INPUT_HOST_NAME>'
+
+INPUT_PATH = '/path/to/your/input/file.mp4'
+# e.g. 'inputs/big_buck_bunny_1080p_h264.mov'
+
+LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME = '<INSERT_YOUR_OUTPUT_HOST_NAME>'
+
+OUTPUT_BASE_PATH = f'output/{TEST_ITEM}/'
+
+# Codecs referenced from the HLS manifests (VP9 is muxed as WebM and only referenced from DASH).
+HLS_CODECS = ["H264", "H265", "AV1"]
+# Besides the combined stream.m3u8, write one master playlist per codec (stream_h264.m3u8, ...)
+# for players that do not filter variants by their CODECS attribute.
+HLS_PER_CODEC_MASTER_PLAYLISTS = True
+
+bitmovin_api = BitmovinApi(api_key=API_KEY, tenant_org_id=ORG_ID)
+
+# Ladders per codec (the same as the single-codec samples). Remove a codec to leave it out of the encoding.
+video_encoding_profiles = {
+    "H264": [
+        {"height": 240, "bitrate": 300000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+        {"height": 360, "bitrate": 800000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+        {"height": 480, "bitrate": 1200000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+        {"height": 540, "bitrate": 2000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+        {"height": 720, "bitrate": 4000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+        {"height": 1080, "bitrate": 6000000, "profile": ProfileH264.HIGH, "level": LevelH264.L4, "mode": StreamMode.STANDARD}
+    ],
+    "H265": [
+        {"height": 240, "bitrate": 300000, "profile": ProfileH265.MAIN, "level": None, "mode": StreamMode.STANDARD},
+        {"height": 360, "bitrate": 800000, "profile": ProfileH265.MAIN, "level": None, "mode": StreamMode.STANDARD},
+        {"height": 480, "bitrate": 1200000, "profile": ProfileH265.MAIN, "level": None, "mode": StreamMode.STANDARD},
+        {"height": 540, "bitrate": 2000000, "profile": ProfileH265.MAIN, "level": None, "mode": StreamMode.STANDARD},
+        {"height": 720, "bitrate": 4000000, "profile": ProfileH265.MAIN, "level": None, "mode": StreamMode.STANDARD},
+        {"height": 1080, "bitrate": 6000000, "profile": ProfileH265.MAIN, "level": None, "mode": StreamMode.STANDARD}
+    ],
+    "AV1": [
+        {"height": 240, "bitrate": 195000, "mode": StreamMode.STANDARD},
+        {"height": 360, "bitrate": 385000, "mode": StreamMode.STANDARD},
+        {"height": 480, "bitrate": 578000, "mode": StreamMode.STANDARD},
+        {"height": 540, "bitrate": 920000, "mode": StreamMode.STANDARD},
+        {"height": 720, "bitrate": 1378000, "mode": StreamMode.STANDARD},
+        {"height": 1080, "bitrate": 2728000, "mode": StreamMode.STANDARD}
+    ],
+    "VP9": [
+        {"height": 240, "bitrate": 300000, "mode": StreamMode.STANDARD},
+        {"height": 360, "bitrate": 800000, "mode": StreamMode.STANDARD},
+        {"height": 480, "bitrate": 1200000, "mode": StreamMode.STANDARD},
+        {"height": 540, "bitrate": 2000000, "mode": StreamMode.STANDARD},
+        {"height": 720, "bitrate": 4000000, "mode": StreamMode.STANDARD},
+        {"height": 1080, "bitrate": 6000000, "mode": StreamMode.STANDARD}
+    ]
+}
+
+# Example AAC audio encoding profiles, shared by the ladders of all codecs.
+audio_encoding_profiles = [
+    {"bitrate": 128000, "rate": 48000},
+    {"bitrate": 64000, "rate": 44100}
+]
+
+
+def main():
+    """
+    Encode the H.264, H.265, AV1 and VP9 ladders as streams of a single encoding, so the input is
+    downloaded and decoded once, the encoding is queued once and the AAC renditions are encoded once. Steps:
+      1) Create Generic S3 input/output for Linode Object Storage
+      2) Create an Encoding object
+      3) Define the video/audio input streams (shared by all codecs)
+      4) Create the video streams + muxings of every codec (FMP4, WebM for VP9)
+      5) Create the AAC streams + muxings (shared by all codecs)
+      6) Start the encoding
+      7) Create the HLS manifests (codec-grouped variants) and the DASH manifest (one adaptation set per codec)
+      8) Generate HLS/DASH
+    """
+
+    # 1) Generic S3 Input/Output
+    input = bitmovin_api.encoding.inputs.generic_s3.create(
+        generic_s3_input=GenericS3Input(
+            access_key=LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_INPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Input'))
+    output = bitmovin_api.encoding.outputs.generic_s3.create(
+        generic_s3_output=GenericS3Output(
+            access_key=LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Output'))
+
+    # 2) Encoding instance
+    encoding = bitmovin_api.encoding.encodings.create(
+        encoding=Encoding(
+            name=f"[{TEST_ITEM}] {INPUT_PATH}",
+            cloud_region=CloudRegion.AKAMAI_JP_OSA,
+            encoder_version='STABLE'
+        )
+    )
+
+    # 3) Input Streams (one ingest per track type for all codecs)
+    video_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=INPUT_PATH,
+            selection_mode=StreamSelectionMode.VIDEO_RELATIVE,
+            position=0
+        )
+    )
+    audio_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=INPUT_PATH,
+            selection_mode=StreamSelectionMode.AUDIO_RELATIVE,
+            position=0
+        )
+    )
+    video_input_stream = StreamInput(input_stream_id=video_ingest_input_stream.id)
+    audio_input_stream = StreamInput(input_stream_id=audio_ingest_input_stream.id)
+
+    # 4) Create Video Streams + Muxings of every codec
+    # The created renditions are kept for the manifests, so the muxings do not have to be listed
+    # (and their codec types looked up) again.
+    video_renditions = []
+    for codec, profiles in video_encoding_profiles.items():
+        for video_profile in profiles:
+            codec_config = _create_video_configuration(codec=codec, video_profile=video_profile)
+            video_stream = bitmovin_api.encoding.encodings.streams.create(
+                encoding_id=encoding.id,
+                stream=Stream(
+                    codec_config_id=codec_config.id,
+                    input_streams=[video_input_stream],
+                    name=f"Stream {codec} {video_profile.get('height')}p",
+                    mode=video_profile.get('mode')
+                )
+            )
+            muxing = _create_video_muxing(encoding=encoding, output=output, codec=codec, video_profile=video_profile,
+                                          stream=video_stream)
+            video_renditions.append({"codec": codec, "profile": video_profile, "stream": video_stream, "muxing": muxing})
+
+    # 5) Create Audio Streams + Muxings (encoded once for all codecs)
+    audio_renditions = []
+    for audio_profile in audio_encoding_profiles:
+        aac_codec = bitmovin_api.encoding.configurations.audio.aac.create(
+            aac_audio_configuration=AacAudioConfiguration(
+                bitrate=audio_profile.get("bitrate"),
+                rate=audio_profile.get("rate"),
+                channel_layout=AacChannelLayout.CL_STEREO
+            )
+        )
+
+        aac_stream = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=aac_codec.id,
+                input_streams=[audio_input_stream],
+                name=f"Stream AAC {audio_profile.get('bitrate') / 1000:.0f}kbps",
+                mode=StreamMode.STANDARD
+            )
+        )
+
+        audio_muxing_output = EncodingOutput(
+            output_id=output.id,
+            output_path=f"{OUTPUT_BASE_PATH}audio/{audio_profile.get('bitrate')}",
+            acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+        )
+
+        audio_muxing = bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=6,
+                segment_naming='segment_%number%.m4s',
+                init_segment_name='init.mp4',
+                streams=[MuxingStream(stream_id=aac_stream.id)],
+                outputs=[audio_muxing_output],
+                name=f"Audio FMP4 Muxing {audio_profile.get('bitrate') / 1000:.0f}kbps"
+            )
+        )
+        audio_renditions.append({"profile": audio_profile, "stream": aac_stream, "muxing": audio_muxing})
+
+    # 6) Start Encoding (no manifest in request)
+    start_encoding_request = StartEncodingRequest()
+    _execute_encoding(encoding=encoding, start_encoding_request=start_encoding_request)
+
+    # 7) Create HLS/DASH manifests
+    hls_renditions = [rendition for rendition in video_renditions if rendition["codec"] in HLS_CODECS]
+    hls_manifests = [_create_hls_manifest(encoding_id=encoding.id, output=output, output_path=OUTPUT_BASE_PATH,
+                                          manifest_name='stream.m3u8', video_renditions=hls_renditions,
+                                          audio_renditions=audio_renditions)]
+    if HLS_PER_CODEC_MASTER_PLAYLISTS:
+        for codec in HLS_CODECS:
+            codec_renditions = [rendition for rendition in hls_renditions if rendition["codec"] == codec]
+            if codec_renditions:
+                hls_manifests.append(
+                    _create_hls_manifest(encoding_id=encoding.id, output=output, output_path=OUTPUT_BASE_PATH,
+                                         manifest_name=f'stream_{codec.lower()}.m3u8', video_renditions=codec_renditions,
+                                         audio_renditions=audio_renditions))
+    dash_manifest = _create_dash_manifest(encoding_id=encoding.id, output=output, output_path=OUTPUT_BASE_PATH,
+                                          video_renditions=video_renditions, audio_renditions=audio_renditions)
+
+    # 8) Generate HLS/DASH
+    for hls_manifest in hls_manifests:
+        _execute_hls_manifest_generation(hls_manifest=hls_manifest)
+    _execute_dash_manifest_generation(dash_manifest=dash_manifest)
+
+
+def _create_video_configuration(codec, video_profile):
+    """
+    Create the codec configuration of one rendition with the settings of the single-codec samples.
+    """
+    color_config = ColorConfig(
+        copy_color_primaries_flag=True,
+        copy_color_transfer_flag=True,
+        copy_color_space_flag=True
+    )
+
+    if codec == "H264":
+        # Configure advanced H.264 parameters (ref: https://developer.bitmovin.com/encoding/docs/h264-presets)
+        if video_profile.get("profile") == ProfileH264.HIGH:
+            adaptive_spatial_transform = True
+            use_cabac = True
+            num_refframe = 4
+            num_bframe = 3
+            weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+        elif video_profile.get("profile") == ProfileH264.MAIN:
+            adaptive_spatial_transform = False
+            use_cabac = True
+            num_refframe = 4
+            num_bframe = 3
+            weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+        elif video_profile.get("profile") == ProfileH264.BASELINE:
+            adaptive_spatial_transform = False
+            use_cabac = False
+            num_refframe = 4
+            num_bframe = 0
+            weighted_prediction_p_frames = WeightedPredictionPFrames.DISABLED
+        else:
+            raise Exception("Unknown profile. Valid profiles: HIGH, MAIN, BASELINE.")
+
+        return bitmovin_api.encoding.configurations.video.h264.create(
+            h264_video_configuration=H264VideoConfiguration(
+                name=f"H.264 {video_profile.get('height')}p",
+                height=video_profile.get("height"),
+                bitrate=video_profile.get("bitrate"),
+                max_bitrate=int(video_profile.get("bitrate") * 1.2),
+                bufsize=int(video_profile.get("bitrate") * 1.5),
+                profile=video_profile.get("profile"),
+                level=video_profile.get("level"),
+                min_keyframe_interval=2,
+                max_keyframe_interval=2,
+                color_config=color_config,
+                ref_frames=num_refframe,
+                bframes=num_bframe,
+                cabac=use_cabac,
+                adaptive_spatial_transform=adaptive_spatial_transform,
+                weighted_prediction_p_frames=weighted_prediction_p_frames,
+                preset_configuration=PresetConfiguration.VOD_HIGH_QUALITY
+            )
+        )
+
+    if codec == "H265":
+        return bitmovin_api.encoding.configurations.video.h265.create(
+            h265_video_configuration=H265VideoConfiguration(
+                name=f"H.265 {video_profile.get('height')}p",
+                height=video_profile.get("height"),
+                bitrate=video_profile.get("bitrate"),
+                max_bitrate=int(video_profile.get("bitrate") * 1.2),
+                bufsize=int(video_profile.get("bitrate") * 1.5),
+                profile=video_profile.get("profile"),
+                level=video_profile.get("level"),
+                ref_frames=4,
+                bframes=3,
+                min_keyframe_interval=2,
+                max_keyframe_interval=2,
+                color_config=color_config,
+                preset_configuration=PresetConfiguration.VOD_HIGH_QUALITY
+            )
+        )
+
+    if codec == "AV1":
+        return bitmovin_api.encoding.configurations.video.av1.create(
+            av1_video_configuration=Av1VideoConfiguration(
+                name=f"AV1 {video_profile.get('height')}p",
+                height=video_profile.get("height"),
+                bitrate=video_profile.get("bitrate"),
+                auto_level_setup=AutoLevelSetup.ENABLED,
+                preset_configuration=Av1PresetConfiguration.VOD_QUALITY,
+                encoding_mode=EncodingMode.THREE_PASS,
+                color_config=color_config
+            )
+        )
+
+    if codec == "VP9":
+        # Adjust encoding parameters based on resolution.
+        if video_profile.get("height") <= 240:
+            cpu_used = 1
+            tile_columns = 0
+        elif video_profile.get("height") <= 480:
+            cpu_used = 1
+            tile_columns = 1
+        elif video_profile.get("height") <= 1080:
+            cpu_used = 2
+            tile_columns = 2
+        elif video_profile.get("height") <= 1440:
+            cpu_used = 2
+            tile_columns = 3
+        else:
+            cpu_used = 2
+            tile_columns = 4
+
+        return bitmovin_api.encoding.configurations.video.vp9.create(
+            vp9_video_configuration=Vp9VideoConfiguration(
+                name=f"VP9 {video_profile.get('height')}p",
+                height=video_profile.get("height"),
+                bitrate=video_profile.get("bitrate"),
+                max_keyframe_interval=2,
+                min_keyframe_interval=2,
+                color_config=color_config,
+                tile_columns=tile_columns,
+                cpu_used=cpu_used,
+                preset_configuration=PresetConfiguration.VOD_HIGH_QUALITY
+            )
+        )
+
+    raise Exception(f"Unknown codec {codec}. Valid codecs: H264, H265, AV1, VP9.")
+
+
+def _create_video_muxing(encoding, output, codec, video_profile, stream):
+    """
+    Create the muxing of one video rendition under video/<codec>/<height>p (WebM for VP9, FMP4 otherwise).
+    """
+    video_muxing_output = EncodingOutput(
+        output_id=output.id,
+        output_path=f"{OUTPUT_BASE_PATH}video/{codec.lower()}/{video_profile.get('height')}p",
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    if codec == "VP9":
+        return bitmovin_api.encoding.encodings.muxings.webm.create(
+            encoding_id=encoding.id,
+            webm_muxing=WebmMuxing(
+                segment_length=6,
+                segment_naming='segment_%number%.chk',
+                init_segment_name='init.hdr',
+                streams=[MuxingStream(stream_id=stream.id)],
+                outputs=[video_muxing_output],
+                name=f"Video WebM Muxing {codec} {video_profile.get('height')}p"
+            )
+        )
+
+    return bitmovin_api.encoding.encodings.muxings.fmp4.create(
+        encoding_id=encoding.id,
+        fmp4_muxing=Fmp4Muxing(
+            segment_length=6,
+            segment_naming='segment_%number%.m4s',
+            init_segment_name='init.mp4',
+            streams=[MuxingStream(stream_id=stream.id)],
+            outputs=[video_muxing_output],
+            name=f"Video FMP4 Muxing {codec} {video_profile.get('height')}p"
+        )
+    )
+
+
+def _execute_encoding(encoding, start_encoding_request):
+    """
+    Start the encoding process on Bitmovin and poll until it finishes or fails.
+    """
+    bitmovin_api.encoding.encodings.start(encoding_id=encoding.id, start_encoding_request=start_encoding_request)
+    task = _wait_for_encoding_to_finish(encoding_id=encoding.id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_encoding_to_finish(encoding_id=encoding.id)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("Encoding failed")
+
+    print("Encoding finished successfully")
+
+
+def _create_hls_manifest(encoding_id, output, output_path, manifest_name, video_renditions, audio_renditions):
+    """
+    Create an HLS manifest with the shared audio group and the video variants grouped by codec
+    (all H.264 variants first, then H.265, then AV1); players select the variants by their CODECS attribute.
+    """
+    manifest_output = EncodingOutput(
+        output_id=output.id,
+        output_path=output_path,
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    hls_manifest = bitmovin_api.encoding.manifests.hls.create(
+        hls_manifest=HlsManifest(
+            manifest_name=manifest_name,
+            outputs=[manifest_output],
+            name=f'HLS Manifest {manifest_name}',
+            hls_master_playlist_version=HlsVersion.HLS_V6,
+            hls_media_playlist_version=HlsVersion.HLS_V6
+        )
+    )
+
+    for rendition in audio_renditions:
+        bitmovin_api.encoding.manifests.hls.media.audio.create(
+            manifest_id=hls_manifest.id,
+            audio_media_info=AudioMediaInfo(
+                name='HLS Audio Media',
+                group_id='audio',
+                language='en',
+                segment_path=_remove_output_base_path(rendition["muxing"].outputs[0].output_path),
+                encoding_id=encoding_id,
+                stream_id=rendition["stream"].id,
+                muxing_id=rendition["muxing"].id,
+                uri=f'audio_{rendition["profile"].get("bitrate")}.m3u8'
+            )
+        )
+
+    for rendition in sorted(video_renditions, key=lambda r: HLS_CODECS.index(r["codec"])):
+        bitmovin_api.encoding.manifests.hls.streams.create(
+            manifest_id=hls_manifest.id,
+            stream_info=StreamInfo(
+                audio='audio',
+                closed_captions='NONE',
+                segment_path=_remove_output_base_path(rendition["muxing"].outputs[0].output_path),
+                uri=f'video_{rendition["codec"].lower()}_{rendition["profile"].get("bitrate")}.m3u8',
+                encoding_id=encoding_id,
+                stream_id=rendition["stream"].id,
+                muxing_id=rendition["muxing"].id
+            )
+        )
+
+    return hls_manifest
+
+
+def _create_dash_manifest(encoding_id, output, output_path, video_renditions, audio_renditions):
+    """
+    Create a DASH manifest with one video adaptation set per codec (players use the sets whose codec they support)
+    and one audio adaptation set shared by all codecs.
+    """
+    manifest_output = EncodingOutput(
+        output_id=output.id,
+        output_path=output_path,
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    dash_manifest = bitmovin_api.encoding.manifests.dash.create(
+        dash_manifest=DashManifest(
+            manifest_name='stream.mpd',
+            outputs=[manifest_output],
+            name='DASH Manifest'
+        )
+    )
+
+    period = bitmovin_api.encoding.manifests.dash.periods.create(
+        manifest_id=dash_manifest.id,
+        period=Period()
+    )
+
+    for codec in video_encoding_profiles:
+        codec_renditions = [rendition for rendition in video_renditions if rendition["codec"] == codec]
+        if not codec_renditions:
+            continue
+
+        video_adaptation_set = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.video.create(
+            video_adaptation_set=VideoAdaptationSet(),
+            manifest_id=dash_manifest.id,
+            period_id=period.id
+        )
+        for rendition in codec_renditions:
+            segment_path = _remove_output_base_path(rendition["muxing"].outputs[0].output_path)
+            if codec == "VP9":
+                bitmovin_api.encoding.manifests.dash.periods.adaptationsets.representations.webm.create(
+                    manifest_id=dash_manifest.id,
+                    period_id=period.id,
+                    adaptationset_id=video_adaptation_set.id,
+                    dash_webm_representation=DashWebmRepresentation(
+                        encoding_id=encoding_id,
+                        muxing_id=rendition["muxing"].id,
+                        type_=DashRepresentationType.TEMPLATE,
+                        mode=DashRepresentationTypeMode.TEMPLATE_REPRESENTATION,
+                        segment_path=segment_path
+                    )
+                )
+            else:
+                bitmovin_api.encoding.manifests.dash.periods.adaptationsets.representations.fmp4.create(
+                    manifest_id=dash_manifest.id,
+                    period_id=period.id,
+                    adaptationset_id=video_adaptation_set.id,
+                    dash_fmp4_representation=DashFmp4Representation(
+                        encoding_id=encoding_id,
+                        muxing_id=rendition["muxing"].id,
+                        type_=DashRepresentationType.TEMPLATE,
+                        mode=DashRepresentationTypeMode.TEMPLATE_REPRESENTATION,
+                        segment_path=segment_path
+                    )
+                )
+
+    audio_adaptation_set = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.audio.create(
+        audio_adaptation_set=AudioAdaptationSet(lang='en'),
+        manifest_id=dash_manifest.id,
+        period_id=period.id
+    )
+    for rendition in audio_renditions:
+        bitmovin_api.encoding.manifests.dash.periods.adaptationsets.representations.fmp4.create(
+            manifest_id=dash_manifest.id,
+            period_id=period.id,
+            adaptationset_id=audio_adaptation_set.id,
+            dash_fmp4_representation=DashFmp4Representation(
+                encoding_id=encoding_id,
+                muxing_id=rendition["muxing"].id,
+                type_=DashRepresentationType.TEMPLATE,
+                mode=DashRepresentationTypeMode.TEMPLATE_REPRESENTATION,
+                segment_path=_remove_output_base_path(rendition["muxing"].outputs[0].output_path)
+            )
+        )
+
+    return dash_manifest
+
+
+def _execute_hls_manifest_generation(hls_manifest):
+    """
+    Start HLS manifest generation and poll until completed or fails.
+    """
+    bitmovin_api.encoding.manifests.hls.start(manifest_id=hls_manifest.id)
+    task = _wait_for_hls_manifest_to_finish(manifest_id=hls_manifest.id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_hls_manifest_to_finish(manifest_id=hls_manifest.id)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("HLS Manifest creation failed")
+
+    print(f"HLS Manifest creation finished successfully ({hls_manifest.manifest_name})")
+
+
+def _execute_dash_manifest_generation(dash_manifest):
+    """
+    Start DASH manifest generation and poll until completed or fails.
+    """
+    bitmovin_api.encoding.manifests.dash.start(manifest_id=dash_manifest.id)
+    task = _wait_for_dash_manifest_to_finish(manifest_id=dash_manifest.id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_dash_manifest_to_finish(manifest_id=dash_manifest.id)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("DASH Manifest creation failed")
+
+    print("DASH Manifest creation finished successfully")
+
+
+def _wait_for_encoding_to_finish(encoding_id):
+    """
+    Poll encoding status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.encodings.status(encoding_id=encoding_id)
+    print(f"Encoding status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _wait_for_hls_manifest_to_finish(manifest_id):
+    """
+    Poll HLS manifest creation status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.manifests.hls.status(manifest_id=manifest_id)
+    print(f"HLS manifest status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _wait_for_dash_manifest_to_finish(manifest_id):
+    """
+    Poll DASH manifest creation status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.manifests.dash.status(manifest_id=manifest_id)
+    print(f"DASH manifest status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _remove_output_base_path(text):
+    """
+    Remove the OUTPUT_BASE_PATH prefix from the given path to create a relative segment path.
+    """
+    if text.startswith(OUTPUT_BASE_PATH):
+        return text[len(OUTPUT_BASE_PATH):]
+    return text
+
+
+def _log_task_errors(task):
+    """
+    Print error messages from the given task to the console.
+    """
+    if not task:
+        return
+
+    for message in filter(lambda m: m.type == MessageType.ERROR, task.messages):
+        print(message.text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+import csv
+import heapq
+import itertools
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+# Optional workload trace (JSON Lines). VOD jobs: {"arrival": s, "duration": s, "height": 1080, "ladder": "vod_h264"};
+# live channels: {"live": true, "start": s, "end": s, "ladder": "live_h264"}. None generates a synthetic workload.
+WORKLOAD_TRACE_PATH = None
+SCENARIO_RESULTS_PATH = 'capacity_scenarios.csv'
+SEED = 42
+
+# Ladders (height, bitrate) taken from the profile tables of the samples.
+LADDERS = {
+    # vod/abr/create_vod_h264_aac_fmp4_hls_dash.py
+    "vod_h264": {"codec": "h264", "rungs": [(240, 300000), (360, 800000), (480, 1200000), (540, 2000000), (720, 4000000), (1080, 6000000)]},
+    # vod/abr/create_vod_h265_aac_fmp4_hls_dash.py
+    "vod_h265": {"codec": "h265", "rungs": [(240, 300000), (360, 800000), (480, 1200000), (540, 2000000), (720, 4000000), (1080, 6000000)]},
+    # vod/abr/create_vod_av1_aac_fmp4_hls_dash.py
+    "vod_av1": {"codec": "av1", "rungs": [(240, 195000), (360, 385000), (480, 578000), (540, 920000), (720, 1378000), (1080, 2728000)]},
+    # vod/abr/create_vod_vp9_webm_aac_fmp4_dash.py
+    "vod_vp9": {"codec": "vp9", "rungs": [(240, 300000), (360, 800000), (480, 1200000), (540, 2000000), (720, 4000000), (1080, 6000000)]},
+    # live/rtmp/create_live_rtmp_ingest_h264_vbr_aac_fmp4_hls_dash.py
+    "live_h264": {"codec": "h264", "rungs": [(240, 300000), (360, 800000), (480, 1200000), (540, 2000000), (720, 4000000), (1080, 6000000)]}
+}
+AUDIO_BITRATES = [128000, 64000]
+FRAME_RATE = 24
+
+# Encode speed of one encoding in output megapixels per second (the work is split across many instances).
+# Calibrate with the realtime factors recorded by vod/telemetry.
+ENCODE_SPEED_MPIXELS = {"h264": 400, "h265": 120, "av1": 60, "vp9": 100}
+# Log-normal sigma of the per-job speed (content and instance variability).
+SPEED_VARIATION = 0.25
+# Fixed per-encoding overhead: instance provisioning / input download, and manifest generation.
+STARTUP_SECONDS = 120
+MANIFEST_SECONDS = 10
+MANIFEST_SECONDS_PER_RENDITION = 1
+
+# Billing model (placeholders, adjust to your contract): encoded minutes x multiplier x price.
+PRICE_PER_BILLABLE_MINUTE = 0.02
+LIVE_PRICE_PER_BILLABLE_MINUTE = 0.04
+RESOLUTION_MULTIPLIERS = [(576, 1.0), (1080, 2.0), (2160, 4.0)]
+CODEC_MULTIPLIERS = {"h264": 1.0, "h265": 2.0, "vp9": 2.0, "av1": 4.0}
+AUDIO_MULTIPLIER = 0.25
+# Linode Object Storage price per GB-month of output.
+STORAGE_PRICE_PER_GB_MONTH = 0.02
+
+# Synthetic workload: Poisson arrivals over TRACE_HOURS, log-normal durations, sources and ladders drawn from the mixes.
+TRACE_HOURS = 24
+ARRIVALS_PER_HOUR = 20
+DURATION_MEDIAN_SECONDS = 1800
+DURATION_SIGMA = 0.8
+SOURCE_HEIGHT_MIX = {720: 0.3, 1080: 0.6, 2160: 0.1}
+LADDER_MIX = {"vod_h264": 0.7, "vod_h265": 0.2, "vod_av1": 0.1}
+LIVE_CHANNELS = [
+    {"start": 18 * 3600, "end": 22 * 3600, "ladder": "live_h264"}
+]
+
+# Scenario grid: every combination is simulated against the same workload (common random numbers).
+# "arrival_scale" multiplies the VOD arrival rate (live schedules are unchanged);
+# "ladder": None keeps the ladders of the workload, otherwise every VOD job uses that ladder.
+SWEEP = {
+    "concurrency": [1, 2, 3, 4, 6, 8, 12, 16, 24, 32],
+    "arrival_scale": [0.5, 1.0, 1.5, 2.0, 3.0, 4.0],
+    "ladder": [None, "vod_h264", "vod_h265", "vod_av1"]
+}
+QUEUE_LATENCY_P95_TARGET_SECONDS = 15 * 60
+MAX_WORKERS = os.cpu_count()
+
+
+def main():
+    """
+    Sweep capacity scenarios with a discrete-event simulation of the encoding queue.
+      1) Load the workload trace (or generate a synthetic one)
+      2) Simulate every scenario of SWEEP in a process pool: FIFO queue under the concurrency limit,
+         live channels reserving slots during their schedule, per-codec encode speed, manifest generation
+      3) Write throughput, queue latency percentiles, output volume and cost per scenario to SCENARIO_RESULTS_PATH
+      4) Print the smallest concurrency that meets QUEUE_LATENCY_P95_TARGET_SECONDS for each load
+    """
+
+    # 1) Workload
+    workload = _workload()
+    print(f"Workload: {workload['arrival'].size} VOD jobs, {len(workload['live'])} live channels, "
+          f"{workload['duration'].sum() / 3600:.1f} content hours")
+
+    # 2) Simulation
+    scenarios = [dict(zip(SWEEP.keys(), values, strict=True)) for values in itertools.product(*SWEEP.values())]
+    started = time.monotonic()
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(simulate, scenarios, chunksize=max(len(scenarios) // (4 * (MAX_WORKERS or 1)), 1)))
+    print(f"Simulated {len(scenarios)} scenarios in {time.monotonic() - started:.1f} s")
+
+    # 3) Results
+    with open(SCENARIO_RESULTS_PATH, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"Scenario results written to {SCENARIO_RESULTS_PATH}")
+
+    # 4) Sizing summary
+    for ladder in SWEEP["ladder"]:
+        for arrival_scale in SWEEP["arrival_scale"]:
+            candidates = sorted(
+                (result for result in results
+                 if result["ladder"] == (ladder or "") and result["arrival_scale"] == arrival_scale
+                 and result["queue_latency_p95"] <= QUEUE_LATENCY_P95_TARGET_SECONDS and result["live_rejected"] == 0),
+                key=lambda result: result["concurrency"]
+            )
+            label = f"{ladder or 'workload ladders'} x{arrival_scale}"
+            if not candidates:
+                print(f"{label:>24}: target not met with concurrency <= {max(SWEEP['concurrency'])}")
+                continue
+            best = candidates[0]
+            print(f"{label:>24}: concurrency {best['concurrency']:>3}, p95 wait {best['queue_latency_p95'] / 60:.1f} min, "
+                  f"{best['content_hours_per_hour']:.1f} content h/h, {best['output_gb']:.0f} GB, ${best['total_cost']:.0f}")
+
+
+def simulate(scenario):
+    """
+    Run one scenario and return its metrics. Per-job quantities are computed with NumPy; only the
+    queue itself (one heap operation per event) runs in Python.
+    """
+    workload = _workload()
+    concurrency = scenario["concurrency"]
+    arrival_scale = scenario["arrival_scale"]
+
+    arrivals = workload["arrival"] / arrival_scale
+    durations = workload["duration"]
+    ladder_indexes = workload["ladder"]
+    if scenario["ladder"]:
+        ladder_indexes = np.full_like(ladder_indexes, list(LADDERS).index(scenario["ladder"]))
+
+    # Per-job work, output volume and billing from the (ladder, source height) lookup tables
+    tables = _ladder_tables()
+    pixels_per_second = tables["pixels_per_second"][ladder_indexes, workload["height_index"]]
+    bitrate = tables["bitrate"][ladder_indexes, workload["height_index"]]
+    multiplier = tables["multiplier"][ladder_indexes, workload["height_index"]]
+    renditions = tables["renditions"][ladder_indexes, workload["height_index"]]
+    speed = tables["speed"][ladder_indexes] * workload["speed_noise"]
+
+    services = (STARTUP_SECONDS + durations * pixels_per_second / speed
+                + MANIFEST_SECONDS + MANIFEST_SECONDS_PER_RENDITION * renditions)
+
+    starts, live_accepted = _run_queue(arrivals, services, workload["live"], concurrency)
+    waits = starts - arrivals
+    completions = starts + services
+    # A trace may hold only live channels (no VOD jobs); the span then covers the live schedule
+    begin = min(arrivals.min(initial=np.inf), min((channel["start"] for channel in workload["live"]), default=np.inf))
+    end = max(completions.max(initial=0), max((channel["end"] for channel in workload["live"]), default=0))
+    if end <= begin:
+        raise Exception("The workload has no VOD jobs or live channels")
+    span = float(end - begin)
+
+    # Live channels (accepted only)
+    live_minutes = np.array([(channel["end"] - channel["start"]) / 60 for channel in workload["live"]])
+    live_multiplier = np.array([tables["live_multiplier"][channel["ladder"]] for channel in workload["live"]])
+    live_bitrate = np.array([tables["live_bitrate"][channel["ladder"]] for channel in workload["live"]])
+    accepted = np.array(live_accepted, dtype=bool)
+
+    vod_cost = float((durations / 60 * multiplier).sum() * PRICE_PER_BILLABLE_MINUTE)
+    live_cost = float((live_minutes * live_multiplier)[accepted].sum() * LIVE_PRICE_PER_BILLABLE_MINUTE) if accepted.size else 0.0
+    vod_bytes = float((durations * bitrate).sum() / 8)
+    live_bytes = float((live_minutes * 60 * live_bitrate)[accepted].sum() / 8) if accepted.size else 0.0
+    storage_cost = vod_bytes / 1e9 * STORAGE_PRICE_PER_GB_MONTH
+
+    return {
+        "concurrency": concurrency,
+        "arrival_scale": arrival_scale,
+        "ladder": scenario["ladder"] or "",
+        "jobs": int(arrivals.size),
+        "jobs_per_hour": round(arrivals.size / span * 3600, 3),
+        "content_hours_per_hour": round(float(durations.sum()) / span, 3),
+        "utilization": round(float(services.sum()) / (concurrency * span), 4),
+        "queue_latency_p50": _percentile(waits, 50),
+        "queue_latency_p95": _percentile(waits, 95),
+        "queue_latency_p99": _percentile(waits, 99),
+        "turnaround_p95": _percentile(completions - arrivals, 95),
+        "live_rejected": int((~accepted).sum()),
+        "output_gb": round((vod_bytes + live_bytes) / 1e9, 2),
+        "encoding_cost": round(vod_cost + live_cost, 2),
+        "storage_cost_per_month": round(storage_cost, 2),
+        "total_cost": round(vod_cost + live_cost + storage_cost, 2)
+    }
+
+
+def _run_queue(arrivals, services, live_channels, concurrency):
+    """
+    Discrete-event simulation of a FIFO queue with `concurrency` encoding slots.
+    Live channels take a slot for their whole schedule (they have priority over queued VOD jobs but do not
+    preempt running ones); a channel that finds no free slot at its start is rejected.
+    Returns (start time per job, accepted flag per live channel).
+    """
+    # Event order at equal times: completions / live ends free slots first, then live starts, then arrivals.
+    events = [(float(arrival), 3, index) for index, arrival in enumerate(arrivals)]
+    for index, channel in enumerate(live_channels):
+        events.append((channel["start"], 2, index))
+        events.append((channel["end"], 1, index))
+    heapq.heapify(events)
+
+    starts = np.empty(arrivals.size)
+    live_accepted = [False] * len(live_channels)
+    queue = deque()
+    busy = 0
+    while events:
+        now, kind, index = heapq.heappop(events)
+        if kind == 0:
+            busy -= 1
+        elif kind == 1:
+            busy -= live_accepted[index]
+        elif kind == 2:
+            if busy < concurrency:
+                busy += 1
+                live_accepted[index] = True
+        else:
+            queue.append(index)
+
+        while queue and busy < concurrency:
+            job = queue.popleft()
+            starts[job] = now
+            busy += 1
+            heapq.heappush(events, (now + services[job], 0, job))
+
+    return starts, live_accepted
+
+
+def _percentile(values, q):
+    """
+    Percentile rounded to 0.1 s; 0 for a workload without VOD jobs.
+    """
+    return round(float(np.percentile(values, q)), 1) if values.size else 0.0
+
+
+@lru_cache(maxsize=1)
+def _workload():
+    """
+    The workload shared by all scenarios (loaded or generated once per process), as NumPy arrays.
+    """
+    rng = np.random.default_rng(SEED)
+    ladder_names = list(LADDERS)
+    heights = sorted(SOURCE_HEIGHT_MIX)
+
+    if WORKLOAD_TRACE_PATH:
+        jobs = []
+        live = []
+        with open(WORKLOAD_TRACE_PATH) as f:
+            for line in f:
+                record = json.loads(line)
+                (live if record.get("live") else jobs).append(record)
+        jobs.sort(key=lambda record: record["arrival"])
+        arrival = np.array([record["arrival"] for record in jobs], dtype=float)
+        duration = np.array([record["duration"] for record in jobs], dtype=float)
+        height = np.array([record["height"] for record in jobs])
+        ladder = np.array([ladder_names.index(record["ladder"]) for record in jobs], dtype=int)
+        # Floor bucket: the highest SOURCE_HEIGHT_MIX height not above the source (the lowest for smaller sources),
+        # so a 1000p source is costed with the rungs up to 720p, never with a 1080p rung it does not get
+        height_index = (np.searchsorted(heights, height, side='right') - 1).clip(0, len(heights) - 1)
+    else:
+        count = rng.poisson(ARRIVALS_PER_HOUR * TRACE_HOURS)
+        arrival = np.sort(rng.uniform(0, TRACE_HOURS * 3600, count))
+        duration = DURATION_MEDIAN_SECONDS * rng.lognormal(0, DURATION_SIGMA, count)
+        height_index = rng.choice(len(heights), size=count, p=_normalized([SOURCE_HEIGHT_MIX[h] for h in heights]))
+        ladder = rng.choice([ladder_names.index(name) for name in LADDER_MIX], size=count, p=_normalized(list(LADDER_MIX.values())))
+        live = LIVE_CHANNELS
+
+    return {
+        "arrival": arrival,
+        "duration": duration,
+        "height_index": height_index,
+        "ladder": ladder,
+        "speed_noise": rng.lognormal(0, SPEED_VARIATION, arrival.size),
+        "live": live
+    }
+
+
+@lru_cache(maxsize=1)
+def _ladder_tables():
+    """
+    Lookup tables indexed [ladder, source height]: output pixels per content second, total bitrate, billing
+    multiplier and rendition count. Rungs above the source height are not encoded (see vod/preflight/plan_ladder.py).
+    """
+    heights = sorted(SOURCE_HEIGHT_MIX)
+    shape = (len(LADDERS), len(heights))
+    tables = {key: np.zeros(shape) for key in ("pixels_per_second", "bitrate", "multiplier", "renditions")}
+    for row, ladder in enumerate(LADDERS.values()):
+        for column, source_height in enumerate(heights):
+            rungs = [rung for rung in ladder["rungs"] if rung[0] <= source_height] or ladder["rungs"][:1]
+            tables["pixels_per_second"][row, column] = sum(_width(height) * height * FRAME_RATE for height, _ in rungs)
+            tables["bitrate"][row, column] = sum(bitrate for _, bitrate in rungs) + sum(AUDIO_BITRATES)
+            tables["multiplier"][row, column] = (sum(_billing_multiplier(height, ladder["codec"]) for height, _ in rungs)
+                                                 + AUDIO_MULTIPLIER * len(AUDIO_BITRATES))
+            tables["renditions"][row, column] = len(rungs) + len(AUDIO_BITRATES)
+
+    tables["speed"] = np.array([ENCODE_SPEED_MPIXELS[ladder["codec"]] * 1e6 for ladder in LADDERS.values()])
+    tables["live_multiplier"] = {
+        name: sum(_billing_multiplier(height, ladder["codec"]) for height, _ in ladder["rungs"]) + AUDIO_MULTIPLIER * len(AUDIO_BITRATES)
+        for name, ladder in LADDERS.items()
+    }
+    tables["live_bitrate"] = {
+        name: sum(bitrate for _, bitrate in ladder["rungs"]) + sum(AUDIO_BITRATES)
+        for name, ladder in LADDERS.items()
+    }
+    return tables
+
+
+def _billing_multiplier(height, codec):
+    """
+    Billing multiplier of one video rendition from its resolution class and codec.
+    """
+    resolution = next((multiplier for max_height, multiplier in RESOLUTION_MULTIPLIERS if height <= max_height),
+                      RESOLUTION_MULTIPLIERS[-1][1])
+    return resolution * CODEC_MULTIPLIERS[codec]
+
+
+def _width(height):
+    """
+    16:9 width for a rendition height, rounded to an even number.
+    """
+    return round(height * 16 / 9 / 2) * 2
+
+
+def _normalized(weights):
+    """
+    Normalize weights into probabilities.
+    """
+    total = sum(weights)
+    return [weight / total for weight in weights]
+
+
+if __name__ == '__main__':
+    main()
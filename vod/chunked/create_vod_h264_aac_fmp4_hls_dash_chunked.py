@@ -0,0 +1,959 @@
+import hashlib
+import hmac
+import http.client
+import json
+import math
+import struct
+import threading
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+
+from bitmovin_api_sdk import BitmovinApi
+from bitmovin_api_sdk import GenericS3Input, S3AccessStyle, S3SignatureVersion, GenericS3Output
+from bitmovin_api_sdk import Encoding, CloudRegion
+from bitmovin_api_sdk import EncodingOutput, AclEntry, AclPermission
+from bitmovin_api_sdk import IngestInputStream, StreamSelectionMode, PresetConfiguration, TimeBasedTrimmingInputStream
+from bitmovin_api_sdk import Stream, StreamInput, MuxingStream, StreamMode, ColorConfig
+from bitmovin_api_sdk import AacAudioConfiguration, AacChannelLayout
+from bitmovin_api_sdk import H264VideoConfiguration, ProfileH264, LevelH264, WeightedPredictionPFrames
+from bitmovin_api_sdk import Fmp4Muxing
+from bitmovin_api_sdk import MessageType, StartEncodingRequest
+from bitmovin_api_sdk import Status
+
+TEST_ITEM = "vod-h264-aac-fmp4-hls-dash-chunked"
+
+API_KEY = '<INSERT YOUR API KEY>'
+ORG_ID = '<INSERT YOUR ORG ID>'
+
+LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_INPUT_HOST_NAME = '<INSERT_YOUR_INPUT_HOST_NAME>'
+# Signing region of the input bucket; None derives it from the host name (e.g. 'jp-osa-1').
+LINODE_OBJECT_STORAGE_INPUT_REGION = None
+
+INPUT_PATH = '/path/to/your/input/file.mp4'
+# Duration of the input in seconds, only used to plan the chunks. None reads it from the movie header (mvhd)
+# of the input (MP4 / MOV); set it for other containers (e.g. from vod/preflight/probe_input.py).
+INPUT_DURATION = None
+
+LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME = '<INSERT_YOUR_OUTPUT_HOST_NAME>'
+# Signing region of the output bucket; None derives it from the host name (e.g. 'jp-osa-1').
+LINODE_OBJECT_STORAGE_OUTPUT_REGION = None
+
+OUTPUT_BASE_PATH = f'output/{TEST_ITEM}/'
+
+# The video timeline is split into chunks of CHUNK_DURATION seconds, encoded as parallel encodings.
+# CHUNK_DURATION must be a multiple of SEGMENT_LENGTH (and of KEYFRAME_INTERVAL) so every chunk starts
+# on a keyframe and a segment boundary.
+CHUNK_DURATION = 600
+SEGMENT_LENGTH = 6
+KEYFRAME_INTERVAL = 2
+# Encodings running at the same time (keep within the account concurrency limit).
+MAX_PARALLEL_ENCODINGS = 8
+# Overall limit in seconds for all chunk encodings (queueing included); the run fails when it is exceeded.
+ENCODINGS_TIMEOUT = 12 * 3600
+# Threads used to stitch (download, patch and upload) segments.
+STITCH_WORKERS = 32
+# Delete the chunk outputs (chunks/ under OUTPUT_BASE_PATH) once the stitched renditions and manifests are written.
+DELETE_CHUNK_OUTPUTS = True
+# Measured BANDWIDTH / AVERAGE-BANDWIDTH per variant playlist (corrected_bandwidth.json of vod/conformance).
+# When None, the values are derived from the target bitrates.
+CORRECTED_BANDWIDTH_PATH = None
+
+bitmovin_api = BitmovinApi(api_key=API_KEY, tenant_org_id=ORG_ID)
+
+# Example H.264 encoding profiles, including different resolutions, bitrates, and profiles.
+video_encoding_profiles = [
+    {"height": 240, "bitrate": 300000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 360, "bitrate": 800000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 480, "bitrate": 1200000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 540, "bitrate": 2000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 720, "bitrate": 4000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 1080, "bitrate": 6000000, "profile": ProfileH264.HIGH, "level": LevelH264.L4, "mode": StreamMode.STANDARD}
+]
+
+# Example AAC audio encoding profiles, each with a specified bitrate and sample rate.
+audio_encoding_profiles = [
+    {"bitrate": 128000, "rate": 48000},
+    {"bitrate": 64000, "rate": 44100}
+]
+
+input_bucket = {
+    "access_key": LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY,
+    "secret_key": LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY,
+    "bucket_name": LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME,
+    "host": LINODE_OBJECT_STORAGE_INPUT_HOST_NAME,
+    "region": LINODE_OBJECT_STORAGE_INPUT_REGION
+}
+
+output_bucket = {
+    "access_key": LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY,
+    "secret_key": LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY,
+    "bucket_name": LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME,
+    "host": LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME,
+    "region": LINODE_OBJECT_STORAGE_OUTPUT_REGION
+}
+
+S3_NAMESPACE = '{http://s3.amazonaws.com/doc/2006-03-01/}'
+# Bytes of the moov box read to find the movie header (mvhd, normally its first child).
+MVHD_READ_SIZE = 4096
+
+_connections = threading.local()
+
+
+def main():
+    """
+    Encode a long input as parallel chunk encodings and stitch them into continuous renditions. Steps:
+      1) Create Generic S3 input/output for Linode Object Storage
+      2) Create one encoding per video chunk (time-based trimming of the input, identical ladder and GOP;
+         the last chunk runs to the end of the input) and one encoding for the full-length audio renditions
+      3) Run the encodings in parallel (at most MAX_PARALLEL_ENCODINGS at a time)
+      4) Stitch the segments each chunk wrote for every video rendition into one continuous rendition:
+         renumber the segments and shift their decode timestamps (tfdt) to the position in the title
+      5) Write one HLS (master + media playlists) and one DASH manifest for the stitched renditions
+      6) Delete the chunk outputs (DELETE_CHUNK_OUTPUTS)
+    """
+
+    if CHUNK_DURATION % SEGMENT_LENGTH or SEGMENT_LENGTH % KEYFRAME_INTERVAL:
+        raise Exception("CHUNK_DURATION must be a multiple of SEGMENT_LENGTH, and SEGMENT_LENGTH a multiple of KEYFRAME_INTERVAL")
+
+    # 1) Generic S3 Input/Output
+    input = bitmovin_api.encoding.inputs.generic_s3.create(
+        generic_s3_input=GenericS3Input(
+            access_key=LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_INPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Input'))
+    output = bitmovin_api.encoding.outputs.generic_s3.create(
+        generic_s3_output=GenericS3Output(
+            access_key=LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Output'))
+
+    # 2) Chunk encodings + audio encoding
+    input_duration = INPUT_DURATION or _probe_input_duration()
+    # A remainder below one keyframe interval is left to the last chunk instead of becoming a chunk of its own
+    chunk_count = max(math.ceil((input_duration - KEYFRAME_INTERVAL) / CHUNK_DURATION), 1)
+    chunks = []
+    for index in range(chunk_count):
+        offset = index * CHUNK_DURATION
+        # The last chunk is not limited, so a duration below the real one never drops the end of the title
+        duration = CHUNK_DURATION if index < chunk_count - 1 else None
+        encoding = _create_video_chunk_encoding(index=index, offset=offset, duration=duration, input=input, output=output)
+        chunks.append({"index": index, "offset": offset, "duration": duration, "encoding": encoding})
+    audio_encoding = _create_audio_encoding(input=input, output=output)
+    print(f"Created {chunk_count} chunk encodings of {CHUNK_DURATION} s ({input_duration:.1f} s input) and 1 audio encoding")
+
+    # 3) Parallel encodings
+    started = time.monotonic()
+    runtimes = _execute_encodings([audio_encoding] + [chunk["encoding"] for chunk in chunks])
+    wall_time = time.monotonic() - started
+    print(f"All encodings finished in {wall_time / 60:.1f} min "
+          f"(sum of encoding runtimes {sum(runtimes.values()) / 60:.1f} min)")
+
+    # 4) Stitch video renditions, index audio renditions
+    renditions = []
+    with ThreadPoolExecutor(max_workers=STITCH_WORKERS) as executor:
+        for video_profile in video_encoding_profiles:
+            renditions.append(_stitch_video_rendition(video_profile, chunks, executor))
+        for audio_profile in audio_encoding_profiles:
+            renditions.append(_index_audio_rendition(audio_profile, executor))
+    print(f"Stitched {len(video_encoding_profiles)} video renditions from {chunk_count} chunks")
+
+    # 5) Manifests
+    _put_object(f"{OUTPUT_BASE_PATH}stream.m3u8", _hls_master_playlist(renditions).encode(), 'application/vnd.apple.mpegurl')
+    for rendition in renditions:
+        _put_object(f"{OUTPUT_BASE_PATH}{rendition['playlist']}", _hls_media_playlist(rendition).encode(),
+                    'application/vnd.apple.mpegurl')
+    _put_object(f"{OUTPUT_BASE_PATH}stream.mpd", _dash_manifest(renditions).encode(), 'application/dash+xml')
+    print(f"Manifests written to {OUTPUT_BASE_PATH}stream.m3u8 and {OUTPUT_BASE_PATH}stream.mpd")
+
+    # 6) Intermediate chunk outputs
+    if DELETE_CHUNK_OUTPUTS:
+        keys = _list_keys(f"{OUTPUT_BASE_PATH}chunks/")
+        with ThreadPoolExecutor(max_workers=STITCH_WORKERS) as executor:
+            list(executor.map(_delete_object, keys))
+        print(f"Deleted {len(keys)} chunk output objects under {OUTPUT_BASE_PATH}chunks/")
+
+
+def _create_video_chunk_encoding(index, offset, duration, input, output):
+    """
+    Create the encoding of one video chunk: the input trimmed to [offset, offset + duration) (to the end of
+    the input if duration is None) encoded with the full ladder. Every chunk uses the same codec settings and a fixed GOP, so the chunks can be stitched.
+    """
+    encoding = bitmovin_api.encoding.encodings.create(
+        encoding=Encoding(
+            name=f"[{TEST_ITEM}] {INPUT_PATH} chunk {index}",
+            cloud_region=CloudRegion.AKAMAI_JP_OSA,
+            encoder_version='STABLE'
+        )
+    )
+
+    video_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=INPUT_PATH,
+            selection_mode=StreamSelectionMode.VIDEO_RELATIVE,
+            position=0
+        )
+    )
+    trimmed_input_stream = bitmovin_api.encoding.encodings.input_streams.trimming.time_based.create(
+        encoding_id=encoding.id,
+        time_based_trimming_input_stream=TimeBasedTrimmingInputStream(
+            input_stream_id=video_ingest_input_stream.id,
+            offset=offset,
+            duration=duration
+        )
+    )
+    video_input_stream = StreamInput(input_stream_id=trimmed_input_stream.id)
+
+    for video_profile in video_encoding_profiles:
+        color_config = ColorConfig(
+            copy_color_primaries_flag=True,
+            copy_color_transfer_flag=True,
+            copy_color_space_flag=True
+        )
+
+        # Configure advanced H.264 parameters (ref: https://developer.bitmovin.com/encoding/docs/h264-presets)
+        if video_profile.get("profile") == ProfileH264.HIGH:
+            adaptive_spatial_transform = True
+            use_cabac = True
+            num_refframe = 4
+            num_bframe = 3
+            weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+        elif video_profile.get("profile") == ProfileH264.MAIN:
+            adaptive_spatial_transform = False
+            use_cabac = True
+            num_refframe = 4
+            num_bframe = 3
+            weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+        elif video_profile.get("profile") == ProfileH264.BASELINE:
+            adaptive_spatial_transform = False
+            use_cabac = False
+            num_refframe = 4
+            num_bframe = 0
+            weighted_prediction_p_frames = WeightedPredictionPFrames.DISABLED
+        else:
+            raise Exception("Unknown profile. Valid profiles: HIGH, MAIN, BASELINE.")
+
+        h264_codec = bitmovin_api.encoding.configurations.video.h264.create(
+            h264_video_configuration=H264VideoConfiguration(
+                name='Sample video codec configuration',
+                height=video_profile.get("height"),
+                bitrate=video_profile.get("bitrate"),
+                max_bitrate=int(video_profile.get("bitrate") * 1.2),
+                bufsize=int(video_profile.get("bitrate") * 1.5),
+                profile=video_profile.get("profile"),
+                level=video_profile.get("level"),
+                min_keyframe_interval=KEYFRAME_INTERVAL,
+                max_keyframe_interval=KEYFRAME_INTERVAL,
+                color_config=color_config,
+                ref_frames=num_refframe,
+                bframes=num_bframe,
+                cabac=use_cabac,
+                adaptive_spatial_transform=adaptive_spatial_transform,
+                weighted_prediction_p_frames=weighted_prediction_p_frames,
+                preset_configuration=PresetConfiguration.VOD_HIGH_QUALITY
+            )
+        )
+
+        h264_stream = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=h264_codec.id,
+                input_streams=[video_input_stream],
+                name=f"Stream H264 {video_profile.get('height')}p",
+                mode=video_profile.get('mode')
+            )
+        )
+
+        bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=SEGMENT_LENGTH,
+                segment_naming='segment_%number%.m4s',
+                init_segment_name='init.mp4',
+                streams=[MuxingStream(stream_id=h264_stream.id)],
+                outputs=[EncodingOutput(
+                    output_id=output.id,
+                    output_path=_chunk_path(index, video_profile),
+                    acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+                )],
+                name=f"Video FMP4 Muxing {video_profile.get('height')}p chunk {index}"
+            )
+        )
+
+    return encoding
+
+
+def _create_audio_encoding(input, output):
+    """
+    Create one full-length encoding for the audio renditions. Audio is cheap to encode and is not chunked,
+    which avoids AAC priming gaps at the chunk boundaries.
+    """
+    encoding = bitmovin_api.encoding.encodings.create(
+        encoding=Encoding(
+            name=f"[{TEST_ITEM}] {INPUT_PATH} audio",
+            cloud_region=CloudRegion.AKAMAI_JP_OSA,
+            encoder_version='STABLE'
+        )
+    )
+
+    audio_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=INPUT_PATH,
+            selection_mode=StreamSelectionMode.AUDIO_RELATIVE,
+            position=0
+        )
+    )
+    audio_input_stream = StreamInput(input_stream_id=audio_ingest_input_stream.id)
+
+    for audio_profile in audio_encoding_profiles:
+        aac_codec = bitmovin_api.encoding.configurations.audio.aac.create(
+            aac_audio_configuration=AacAudioConfiguration(
+                bitrate=audio_profile.get("bitrate"),
+                rate=audio_profile.get("rate"),
+                channel_layout=AacChannelLayout.CL_STEREO
+            )
+        )
+
+        aac_stream = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=aac_codec.id,
+                input_streams=[audio_input_stream],
+                name=f"Stream AAC {audio_profile.get('bitrate') / 1000:.0f}kbps",
+                mode=StreamMode.STANDARD
+            )
+        )
+
+        bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=SEGMENT_LENGTH,
+                segment_naming='segment_%number%.m4s',
+                init_segment_name='init.mp4',
+                streams=[MuxingStream(stream_id=aac_stream.id)],
+                outputs=[EncodingOutput(
+                    output_id=output.id,
+                    output_path=f"{OUTPUT_BASE_PATH}audio/{audio_profile.get('bitrate')}",
+                    acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+                )],
+                name=f"Audio FMP4 Muxing {audio_profile.get('bitrate') / 1000:.0f}kbps"
+            )
+        )
+
+    return encoding
+
+
+def _execute_encodings(encodings):
+    """
+    Run the encodings with at most MAX_PARALLEL_ENCODINGS at a time and poll until all have finished.
+    Returns the runtime in seconds per encoding id; raises if any encoding ends with ERROR / CANCELED /
+    TRANSFER_ERROR, or if they do not all finish within ENCODINGS_TIMEOUT seconds.
+    """
+    waiting = list(encodings)
+    running = {}
+    runtimes = {}
+    started = time.monotonic()
+    while waiting or running:
+        if time.monotonic() - started > ENCODINGS_TIMEOUT:
+            raise Exception(f"Encodings did not finish within {ENCODINGS_TIMEOUT} s "
+                            f"({len(runtimes)} finished, {len(running)} running: {', '.join(running)}, "
+                            f"{len(waiting)} waiting)")
+        while waiting and len(running) < MAX_PARALLEL_ENCODINGS:
+            encoding = waiting.pop(0)
+            bitmovin_api.encoding.encodings.start(encoding_id=encoding.id, start_encoding_request=StartEncodingRequest())
+            running[encoding.id] = time.monotonic()
+
+        time.sleep(5)
+        for encoding_id in list(running):
+            task = bitmovin_api.encoding.encodings.status(encoding_id=encoding_id)
+            # Every terminal status other than FINISHED fails the run (polling would otherwise never end).
+            if task.status in (Status.ERROR, Status.CANCELED, Status.TRANSFER_ERROR):
+                _log_task_errors(task)
+                raise Exception(f"Encoding {encoding_id} failed with status {task.status.value}")
+            if task.status == Status.FINISHED:
+                runtimes[encoding_id] = time.monotonic() - running.pop(encoding_id)
+
+        print(f"Encodings: {len(runtimes)} finished, {len(running)} running, {len(waiting)} waiting")
+
+    return runtimes
+
+
+def _stitch_video_rendition(video_profile, chunks, executor):
+    """
+    Copy the segments of all chunks of one rendition into a single continuous rendition.
+      - the init segment of the first chunk is used for the whole rendition (all chunks share the codec settings)
+      - segments are renumbered consecutively and their moof sequence numbers rewritten
+      - tfdt is shifted so every chunk continues where the previous one ended
+    Returns the rendition description used for the manifests.
+    """
+    init_data = _get_object(f"{_chunk_path(0, video_profile)}/init.mp4")
+    init = _parse_init(init_data)
+    target_path = f"{OUTPUT_BASE_PATH}video/{video_profile.get('height')}p"
+    _put_object(f"{target_path}/init.mp4", init_data, 'video/mp4')
+
+    # Segments each chunk actually wrote (listed, not derived from the planned durations)
+    segment_counts = list(executor.map(lambda chunk: _chunk_segment_count(chunk["index"], video_profile), chunks))
+    # Decode time offset of every chunk: only the first and the last segment of each chunk are needed.
+    edges = list(executor.map(
+        lambda item: _chunk_edges(video_profile, item[0], item[1], init),
+        zip(range(len(chunks)), segment_counts, strict=True)
+    ))
+    offsets = []
+    timeline_end = 0
+    for first_decode_time, end_decode_time in edges:
+        offsets.append(timeline_end - first_decode_time)
+        timeline_end += end_decode_time - first_decode_time
+
+    jobs = []
+    number = 0
+    for chunk_index, segment_count in enumerate(segment_counts):
+        for segment_index in range(segment_count):
+            jobs.append((chunk_index, segment_index, number, offsets[chunk_index]))
+            number += 1
+
+    segments = list(executor.map(
+        lambda job: _copy_segment(video_profile, target_path, init, *job),
+        jobs
+    ))
+
+    return {
+        "type": "video",
+        "height": video_profile.get("height"),
+        "width": init["width"],
+        "bitrate": video_profile.get("bitrate"),
+        "codecs": init["codecs"],
+        "timescale": init["timescale"],
+        "path": f"video/{video_profile.get('height')}p",
+        "playlist": f"video_{video_profile.get('bitrate')}.m3u8",
+        "segments": segments
+    }
+
+
+def _index_audio_rendition(audio_profile, executor):
+    """
+    Read the segment timing of a (full-length, not chunked) audio rendition for the manifests.
+    """
+    path = f"audio/{audio_profile.get('bitrate')}"
+    init = _parse_init(_get_object(f"{OUTPUT_BASE_PATH}{path}/init.mp4"))
+
+    segments = []
+    batch = STITCH_WORKERS
+    while True:
+        numbers = range(len(segments), len(segments) + batch)
+        found = list(executor.map(lambda number: _audio_segment_timing(f"{OUTPUT_BASE_PATH}{path}", number, init), numbers))
+        segments.extend(timing for timing in found if timing)
+        if not all(found):
+            break
+
+    return {
+        "type": "audio",
+        "bitrate": audio_profile.get("bitrate"),
+        "rate": audio_profile.get("rate"),
+        "codecs": init["codecs"],
+        "timescale": init["timescale"],
+        "path": path,
+        "playlist": f"audio_{audio_profile.get('bitrate')}.m3u8",
+        "segments": segments
+    }
+
+
+def _audio_segment_timing(path, number, init):
+    """
+    (decode time, duration) of one audio segment, or None if the segment does not exist.
+    """
+    data = _get_object(f"{path}/segment_{number}.m4s", missing_ok=True)
+    if data is None:
+        return None
+    decode_time, duration, _ = _inspect_segment(data, init["default_sample_duration"])
+    return decode_time, duration
+
+
+def _chunk_segment_count(chunk_index, video_profile):
+    """
+    Number of segments one chunk wrote for a rendition; they must be numbered 0 .. count - 1.
+    """
+    path = _chunk_path(chunk_index, video_profile)
+    numbers = sorted(int(key[len(f"{path}/segment_"):-len(".m4s")])
+                     for key in _list_keys(f"{path}/segment_") if key.endswith(".m4s"))
+    if not numbers:
+        raise Exception(f"Chunk {chunk_index} wrote no segments to {path}")
+    if numbers != list(range(len(numbers))):
+        raise Exception(f"Chunk {chunk_index} segments in {path} are not numbered 0 .. {len(numbers) - 1}")
+    return len(numbers)
+
+
+def _chunk_edges(video_profile, chunk_index, segment_count, init):
+    """
+    (first decode time, end decode time) of one chunk of a rendition.
+    """
+    path = _chunk_path(chunk_index, video_profile)
+    first_decode_time, first_duration, _ = _inspect_segment(_get_object(f"{path}/segment_0.m4s"), init["default_sample_duration"])
+    if segment_count == 1:
+        return first_decode_time, first_decode_time + first_duration
+    last_decode_time, last_duration, _ = _inspect_segment(_get_object(f"{path}/segment_{segment_count - 1}.m4s"),
+                                                          init["default_sample_duration"])
+    return first_decode_time, last_decode_time + last_duration
+
+
+def _copy_segment(video_profile, target_path, init, chunk_index, segment_index, number, offset):
+    """
+    Download one chunk segment, shift its decode time and renumber it, and upload it as segment `number`.
+    Returns (decode time, duration) of the stitched segment.
+    """
+    data = bytearray(_get_object(f"{_chunk_path(chunk_index, video_profile)}/segment_{segment_index}.m4s"))
+    decode_time, duration, fields = _inspect_segment(data, init["default_sample_duration"])
+
+    for kind, position, size in fields:
+        if kind == "tfdt":
+            value = int.from_bytes(data[position:position + size], 'big') + offset
+            if value >= 1 << (8 * size):
+                raise Exception("Shifted decode time does not fit into a version 0 tfdt box")
+            data[position:position + size] = value.to_bytes(size, 'big')
+        elif kind == "mfhd":
+            data[position:position + size] = (number + 1).to_bytes(size, 'big')
+
+    _put_object(f"{target_path}/segment_{number}.m4s", bytes(data), 'video/mp4')
+    return decode_time + offset, duration
+
+
+def _chunk_path(index, video_profile):
+    """
+    Output path of one rendition of one chunk encoding.
+    """
+    return f"{OUTPUT_BASE_PATH}chunks/{index}/video/{video_profile.get('height')}p"
+
+
+def _hls_master_playlist(renditions):
+    """
+    HLS master playlist for the stitched video and the audio renditions.
+    """
+    audio = [rendition for rendition in renditions if rendition["type"] == "audio"]
+    video = [rendition for rendition in renditions if rendition["type"] == "video"]
+    lines = ["#EXTM3U", "#EXT-X-VERSION:6", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    for index, rendition in enumerate(audio):
+        lines.append(f'#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="audio",NAME="AAC {rendition["bitrate"] // 1000}kbps",LANGUAGE="en",'
+                     f'DEFAULT={"YES" if index == 0 else "NO"},AUTOSELECT=YES,URI="{rendition["playlist"]}"')
+    audio_bitrate = max((rendition["bitrate"] for rendition in audio), default=0)
+    audio_codecs = audio[0]["codecs"] if audio else None
+    audio_group = ',AUDIO="audio"' if audio else ''
+    corrected = {}
+    if CORRECTED_BANDWIDTH_PATH:
+        with open(CORRECTED_BANDWIDTH_PATH) as f:
+            corrected = json.load(f)
+    for rendition in video:
+        codecs = ",".join(codec for codec in (rendition["codecs"], audio_codecs) if codec)
+        bandwidth = corrected.get(rendition["playlist"], {
+            "BANDWIDTH": int(rendition["bitrate"] * 1.2) + audio_bitrate,
+            "AVERAGE-BANDWIDTH": rendition["bitrate"] + audio_bitrate
+        })
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={bandwidth["BANDWIDTH"]},'
+                     f'AVERAGE-BANDWIDTH={bandwidth["AVERAGE-BANDWIDTH"]},CODECS="{codecs}",'
+                     f'RESOLUTION={rendition["width"]}x{rendition["height"]}{audio_group}')
+        lines.append(rendition["playlist"])
+    return "\n".join(lines) + "\n"
+
+
+def _hls_media_playlist(rendition):
+    """
+    HLS media playlist of one rendition (EXTINF from the actual segment durations).
+    """
+    durations = [duration / rendition["timescale"] for _, duration in rendition["segments"]]
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:6",
+        f"#EXT-X-TARGETDURATION:{math.ceil(max(durations, default=SEGMENT_LENGTH))}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+        "#EXT-X-INDEPENDENT-SEGMENTS",
+        f'#EXT-X-MAP:URI="{rendition["path"]}/init.mp4"'
+    ]
+    for number, duration in enumerate(durations):
+        lines.append(f"#EXTINF:{duration:.6f},")
+        lines.append(f"{rendition['path']}/segment_{number}.m4s")
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+def _dash_manifest(renditions):
+    """
+    Static DASH manifest with one period; every representation uses SegmentTemplate + SegmentTimeline.
+    """
+    video = [rendition for rendition in renditions if rendition["type"] == "video"]
+    audio = [rendition for rendition in renditions if rendition["type"] == "audio"]
+    total = max(sum(duration for _, duration in rendition["segments"]) / rendition["timescale"] for rendition in renditions)
+
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" profiles="urn:mpeg:dash:profile:isoff-live:2011" type="static" '
+        f'mediaPresentationDuration="PT{total:.3f}S" minBufferTime="PT{SEGMENT_LENGTH}S">',
+        '  <Period id="0" start="PT0S">'
+    ]
+    for content_type, group in (("video", video), ("audio", audio)):
+        if not group:
+            continue
+        language = ' lang="en"' if content_type == "audio" else ''
+        lines.append(f'    <AdaptationSet contentType="{content_type}" mimeType="{content_type}/mp4" segmentAlignment="true"{language}>')
+        for rendition in group:
+            attributes = f'id="{content_type}_{rendition["bitrate"]}" bandwidth="{rendition["bitrate"]}" codecs="{rendition["codecs"]}"'
+            if content_type == "video":
+                attributes += f' width="{rendition["width"]}" height="{rendition["height"]}"'
+            else:
+                attributes += f' audioSamplingRate="{rendition["rate"]}"'
+            lines.append(f'      <Representation {attributes}>')
+            lines.append(f'        <SegmentTemplate timescale="{rendition["timescale"]}" startNumber="0" '
+                         f'initialization="{rendition["path"]}/init.mp4" media="{rendition["path"]}/segment_$Number$.m4s">')
+            lines.append('          <SegmentTimeline>')
+            lines.extend(f'            {entry}' for entry in _segment_timeline(rendition["segments"]))
+            lines.append('          </SegmentTimeline>')
+            lines.append('        </SegmentTemplate>')
+            lines.append('      </Representation>')
+        lines.append('    </AdaptationSet>')
+    lines.extend(['  </Period>', '</MPD>'])
+    return "\n".join(lines) + "\n"
+
+
+def _segment_timeline(segments):
+    """
+    Run-length encoded SegmentTimeline <S> entries of (decode time, duration) pairs.
+    """
+    entries = []
+    run_start = None
+    run_duration = None
+    repeat = 0
+    expected = None
+    for decode_time, duration in segments:
+        if duration == run_duration and decode_time == expected:
+            repeat += 1
+        else:
+            if run_duration is not None:
+                entries.append(_timeline_entry(run_start, run_duration, repeat))
+            run_start, run_duration, repeat = decode_time, duration, 0
+        expected = decode_time + duration
+    if run_duration is not None:
+        entries.append(_timeline_entry(run_start, run_duration, repeat))
+    return entries
+
+
+def _timeline_entry(start, duration, repeat):
+    """
+    One <S> element.
+    """
+    repeat_attribute = f' r="{repeat}"' if repeat else ''
+    return f'<S t="{start}" d="{duration}"{repeat_attribute}/>'
+
+
+def _parse_init(data):
+    """
+    Timescale, default sample duration (trex), codec string and width of an fMP4 init segment.
+    """
+    init = {"timescale": None, "default_sample_duration": 0, "codecs": None, "width": None}
+    moov = _find_box(data, 0, len(data), b"moov")
+    trak = _find_box(data, *moov, b"trak")
+    mdia = _find_box(data, *trak, b"mdia")
+    mdhd_start, _ = _find_box(data, *mdia, b"mdhd")
+    init["timescale"] = struct.unpack_from(">I", data, mdhd_start + (20 if data[mdhd_start] == 1 else 12))[0]
+
+    mvex = _find_box(data, *moov, b"mvex", required=False)
+    if mvex:
+        trex_start, _ = _find_box(data, *mvex, b"trex")
+        init["default_sample_duration"] = struct.unpack_from(">I", data, trex_start + 12)[0]
+
+    stbl = _find_box(data, *_find_box(data, *mdia, b"minf"), b"stbl")
+    stsd_start, _ = _find_box(data, *stbl, b"stsd")
+    entry_start = stsd_start + 8
+    entry_size, entry_type = struct.unpack_from(">I4s", data, entry_start)
+    payload = entry_start + 8
+    if entry_type in (b"avc1", b"avc3"):
+        init["width"] = struct.unpack_from(">H", data, payload + 24)[0]
+        avcc_start, _ = _find_box(data, payload + 78, entry_start + entry_size, b"avcC")
+        init["codecs"] = f"{entry_type.decode()}.{data[avcc_start + 1:avcc_start + 4].hex()}"
+    elif entry_type == b"mp4a":
+        init["codecs"] = "mp4a.40.2"
+    else:
+        init["codecs"] = entry_type.decode()
+    return init
+
+
+def _inspect_segment(data, default_sample_duration):
+    """
+    Return (decode time, duration, patchable fields) of an fMP4 media segment. Fields are
+    ("tfdt" | "mfhd", byte position, size) so the caller can rewrite them in place.
+    """
+    decode_time = None
+    duration = 0
+    fields = []
+    for box_type, start, end in _iter_boxes(data, 0, len(data)):
+        if box_type != b"moof":
+            continue
+        for child_type, child_start, child_end in _iter_boxes(data, start, end):
+            if child_type == b"mfhd":
+                fields.append(("mfhd", child_start + 4, 4))
+            elif child_type == b"traf":
+                traf_decode_time, traf_duration, traf_fields = _inspect_traf(data, child_start, child_end, default_sample_duration)
+                decode_time = traf_decode_time if decode_time is None else decode_time
+                duration += traf_duration
+                fields.extend(traf_fields)
+    if decode_time is None:
+        raise Exception("No moof/traf/tfdt found in segment")
+    return decode_time, duration, fields
+
+
+def _inspect_traf(data, start, end, default_sample_duration):
+    """
+    Decode time (tfdt), total sample duration (trun, tfhd or trex defaults) and tfdt field of one traf.
+    """
+    decode_time = None
+    duration = 0
+    fields = []
+    for box_type, box_start, _ in _iter_boxes(data, start, end):
+        if box_type == b"tfhd":
+            flags = int.from_bytes(data[box_start + 1:box_start + 4], 'big')
+            position = box_start + 8 + (8 if flags & 0x01 else 0) + (4 if flags & 0x02 else 0)
+            if flags & 0x08:
+                default_sample_duration = struct.unpack_from(">I", data, position)[0]
+        elif box_type == b"tfdt":
+            size = 8 if data[box_start] == 1 else 4
+            decode_time = int.from_bytes(data[box_start + 4:box_start + 4 + size], 'big')
+            fields.append(("tfdt", box_start + 4, size))
+        elif box_type == b"trun":
+            flags = int.from_bytes(data[box_start + 1:box_start + 4], 'big')
+            sample_count = struct.unpack_from(">I", data, box_start + 4)[0]
+            position = box_start + 8 + (4 if flags & 0x001 else 0) + (4 if flags & 0x004 else 0)
+            if not flags & 0x100:
+                duration += sample_count * default_sample_duration
+                continue
+            sample_size = 4 * sum(bool(flags & flag) for flag in (0x100, 0x200, 0x400, 0x800))
+            for index in range(sample_count):
+                duration += struct.unpack_from(">I", data, position + index * sample_size)[0]
+    return decode_time, duration, fields
+
+
+def _iter_boxes(data, start, end):
+    """
+    Yield (type, payload start, box end) of the boxes between start and end.
+    """
+    position = start
+    while position + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, position)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, position + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header:
+            break
+        yield box_type, position + header, min(position + size, end)
+        position += size
+
+
+def _find_box(data, start, end, box_type, required=True):
+    """
+    (payload start, end) of the first box of the given type between start and end.
+    """
+    for found_type, payload_start, box_end in _iter_boxes(data, start, end):
+        if found_type == box_type:
+            return payload_start, box_end
+    if required:
+        raise Exception(f"Box {box_type.decode()} not found")
+    return None
+
+
+def _probe_input_duration():
+    """
+    Duration in seconds of the input (MP4 / MOV) from its movie header (mvhd). Only the top-level box headers
+    and the start of the moov box are read, so the moov box may be at the start or at the end of the file.
+    """
+    offset = 0
+    while True:
+        header = _get_range(input_bucket, INPUT_PATH, offset, 16)
+        if len(header) < 8:
+            raise Exception(f"No moov box found in {INPUT_PATH}; set INPUT_DURATION")
+        size, box_type = struct.unpack_from(">I4s", header)
+        header_size = 8
+        if size == 1:
+            size, header_size = struct.unpack_from(">Q", header, 8)[0], 16
+        if size == 0 and box_type != b"moov":
+            raise Exception(f"No moov box found in {INPUT_PATH}; set INPUT_DURATION")
+        if box_type == b"moov":
+            length = MVHD_READ_SIZE if size == 0 else min(size - header_size, MVHD_READ_SIZE)
+            data = _get_range(input_bucket, INPUT_PATH, offset + header_size, length)
+            start, _ = _find_box(data, 0, len(data), b"mvhd")
+            if data[start] == 1:
+                timescale, duration = struct.unpack_from(">IQ", data, start + 20)
+            else:
+                timescale, duration = struct.unpack_from(">II", data, start + 12)
+            return duration / timescale
+        if size < header_size:
+            raise Exception(f"Invalid box size at byte {offset} of {INPUT_PATH}")
+        offset += size
+
+
+def _get_range(bucket, key, offset, length):
+    """
+    Bytes [offset, offset + length) of an object (fewer at the end of the object, empty past it).
+    """
+    status, data = _s3_request("GET", key, headers={"Range": f"bytes={offset}-{offset + length - 1}"}, bucket=bucket)
+    if status == 416:
+        return b""
+    if status not in (200, 206):
+        raise Exception(f"GET {key} (bytes {offset}-{offset + length - 1}) failed with HTTP {status}")
+    # A server that ignores Range returns the whole object
+    return data if status == 206 else data[offset:offset + length]
+
+
+def _list_keys(prefix):
+    """
+    Keys of all objects of the output bucket under prefix (ListObjectsV2, following continuation tokens).
+    """
+    keys = []
+    token = None
+    while True:
+        query = {"list-type": "2", "prefix": prefix, "max-keys": "1000"}
+        if token:
+            query["continuation-token"] = token
+        status, body = _s3_request("GET", "", query=query)
+        if status != 200:
+            raise Exception(f"ListObjectsV2 {prefix} failed with HTTP {status}")
+
+        root = ET.fromstring(body)
+        keys.extend(content.findtext(f"{S3_NAMESPACE}Key") for content in root.iter(f"{S3_NAMESPACE}Contents"))
+        if root.findtext(f"{S3_NAMESPACE}IsTruncated") != 'true':
+            return keys
+        token = root.findtext(f"{S3_NAMESPACE}NextContinuationToken")
+
+
+def _delete_object(key):
+    """
+    Delete an object of the output bucket.
+    """
+    status, _ = _s3_request("DELETE", key)
+    if status not in (200, 204):
+        raise Exception(f"DELETE {key} failed with HTTP {status}")
+
+
+def _get_object(key, missing_ok=False):
+    """
+    Download an object of the output bucket (None if missing and missing_ok).
+    """
+    status, data = _s3_request("GET", key)
+    if status == 404 and missing_ok:
+        return None
+    if status != 200:
+        raise Exception(f"GET {key} failed with HTTP {status}")
+    return data
+
+
+def _put_object(key, body, content_type):
+    """
+    Upload an object to the output bucket with a public-read ACL (like the encoding outputs).
+    """
+    status, _ = _s3_request("PUT", key, body=body, headers={"Content-Type": content_type, "x-amz-acl": "public-read"})
+    if status != 200:
+        raise Exception(f"PUT {key} failed with HTTP {status}")
+
+
+def _s3_request(method, key, body=b"", headers=None, query=None, bucket=None):
+    """
+    Signed request to the output bucket (or the given bucket) on a thread-local keep-alive connection;
+    returns (status, body).
+    """
+    bucket = bucket or output_bucket
+    host = f"{bucket['bucket_name']}.{bucket['host']}"
+    path = "/" + urllib.parse.quote(key.lstrip('/'), safe='/~')
+    canonical_query = "&".join(
+        f"{urllib.parse.quote(name, safe='-_.~')}={urllib.parse.quote(value, safe='-_.~')}"
+        for name, value in sorted((query or {}).items())
+    )
+    headers = dict(headers or {})
+    headers.update(_sign_s3_request(bucket, method, host, path, canonical_query, body, headers))
+
+    pool = getattr(_connections, 'pool', None)
+    if pool is None:
+        pool = _connections.pool = {}
+    for attempt in range(2):
+        connection = pool.get(host)
+        if connection is None:
+            connection = pool[host] = http.client.HTTPSConnection(host, timeout=60)
+        try:
+            connection.request(method, f"{path}?{canonical_query}" if canonical_query else path,
+                               body=body or None, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, ConnectionError):
+            connection.close()
+            pool.pop(host, None)
+            if attempt == 1:
+                raise
+    return None, None
+
+
+def _sign_s3_request(bucket, method, host, path, canonical_query, body, headers):
+    """
+    Return the headers that sign an S3 request with AWS Signature Version 4 (x-amz-* headers are signed too).
+    """
+    region = bucket.get("region") or bucket["host"].split('.')[0]
+    now = datetime.now(UTC)
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    date_stamp = now.strftime('%Y%m%d')
+    payload_hash = hashlib.sha256(body).hexdigest()
+
+    signed = {"host": host, "x-amz-content-sha256": payload_hash, "x-amz-date": amz_date}
+    signed.update({name.lower(): value for name, value in headers.items() if name.lower().startswith("x-amz-")})
+    signed_headers = ";".join(sorted(signed))
+    canonical_headers = "".join(f"{name}:{signed[name]}\n" for name in sorted(signed))
+    canonical_request = f"{method}\n{path}\n{canonical_query}\n{canonical_headers}\n{signed_headers}\n{payload_hash}"
+
+    scope = f"{date_stamp}/{region}/s3/aws4_request"
+    string_to_sign = f"AWS4-HMAC-SHA256\n{amz_date}\n{scope}\n{hashlib.sha256(canonical_request.encode()).hexdigest()}"
+
+    signing_key = f"AWS4{bucket['secret_key']}".encode()
+    for part in (date_stamp, region, "s3", "aws4_request"):
+        signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+    signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    return {
+        "x-amz-date": amz_date,
+        "x-amz-content-sha256": payload_hash,
+        "Authorization": f"AWS4-HMAC-SHA256 Credential={bucket['access_key']}/{scope}, "
+                         f"SignedHeaders={signed_headers}, Signature={signature}"
+    }
+
+
+def _log_task_errors(task):
+    """
+    Print error messages from the given task to the console.
+    """
+    if not task:
+        return
+
+    for message in filter(lambda m: m.type == MessageType.ERROR, task.messages):
+        print(message.text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+import hashlib
+import json
+import math
+import os
+import subprocess
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+
+import numpy as np
+
+from bitmovin_api_sdk import ProfileH264, LevelH264, StreamMode
+
+# Source to analyze: a local file or an https:// URL that ffmpeg can open.
+SOURCE_PATH = '/path/to/your/input/file.mp4'
+
+# Complexity analyses are cached by content hash, so re-running for the same source is free.
+COMPLEXITY_CACHE_PATH = 'complexity_cache.json'
+# Bump when the complexity analysis changes, to invalidate cached entries.
+ANALYSIS_VERSION = 1
+
+# SAMPLE_COUNT windows of SAMPLE_DURATION seconds, spread evenly over the source, are decoded
+# as ANALYSIS_WIDTH-wide luma frames at ANALYSIS_FRAME_RATE.
+SAMPLE_COUNT = 8
+SAMPLE_DURATION = 2
+ANALYSIS_WIDTH = 640
+ANALYSIS_FRAME_RATE = 12
+
+# The content hash covers the file size and HASH_BLOCK_COUNT blocks of HASH_BLOCK_SIZE bytes.
+HASH_BLOCK_COUNT = 16
+HASH_BLOCK_SIZE = 1024 * 1024
+
+FFMPEG = 'ffmpeg'
+FFPROBE = 'ffprobe'
+
+# Spatial (SI) / temporal (TI) information of "typical" content at ANALYSIS_WIDTH; the nominal ladders
+# below are sized for it. Complexity factor = (SI / SI_REFERENCE) ** SI_WEIGHT * (TI / TI_REFERENCE) ** TI_WEIGHT.
+SI_REFERENCE = 60.0
+TI_REFERENCE = 12.0
+SI_WEIGHT = 0.4
+TI_WEIGHT = 0.6
+MIN_COMPLEXITY_FACTOR = 0.4
+MAX_COMPLEXITY_FACTOR = 2.0
+
+# CRF moves CRF_STEP_PER_DOUBLING per doubling of complexity around CRF_REFERENCE (lower for harder content).
+CRF_REFERENCE = 22
+CRF_STEP_PER_DOUBLING = 2
+CRF_MIN = 18
+CRF_MAX = 28
+
+# Content whose complexity factor is at least VBR_MIN_COMPLEXITY_FACTOR and whose temporal complexity is
+# steady across the samples (coefficient of variation below VBR_MAX_TI_VARIATION) would run into the CRF caps
+# most of the time; a VBR ladder sized for it is recommended instead.
+VBR_MIN_COMPLEXITY_FACTOR = 1.3
+VBR_MAX_TI_VARIATION = 0.35
+
+# Nominal ladder (same rungs, profiles and levels as live/srt/create_live_srt_ingest_h264_crf_aac_fmp4_hls_dash.py and
+# its VBR counterpart); "bitrate" is the VBR target, or the max_bitrate cap in CRF mode.
+video_encoding_profiles = [
+    {"height": 240, "bitrate": 300000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 360, "bitrate": 800000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 480, "bitrate": 1200000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 540, "bitrate": 2000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 720, "bitrate": 4000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 1080, "bitrate": 6000000, "profile": ProfileH264.HIGH, "level": LevelH264.L4, "mode": StreamMode.STANDARD}
+]
+
+
+def main():
+    """
+    Recommend CRF or VBR and the ladder for a source from its sampled scene complexity.
+      1) Hash the source (size + sampled blocks) and look the complexity up in the cache
+      2) Decode SAMPLE_COUNT short windows as small luma frames and measure spatial / temporal complexity
+         (stored in the cache)
+      3) Map the complexity to a rate control mode, a CRF value and per-rung bitrates
+      4) Print the profiles to paste into an encoding script
+    """
+
+    # 1) Cache lookup
+    content_hash = content_fingerprint(SOURCE_PATH)
+    cache = _load_cache()
+    cache_key = f"{content_hash}:v{ANALYSIS_VERSION}"
+    complexity = cache.get(cache_key)
+    if complexity:
+        print(f"Using cached analysis for {SOURCE_PATH} ({content_hash})")
+    else:
+        # 2) Complexity
+        started = time.monotonic()
+        complexity = analyze_complexity(SOURCE_PATH)
+        print(f"Analyzed {complexity['samples']} samples in {time.monotonic() - started:.1f} s")
+        cache[cache_key] = complexity
+        _save_cache(cache)
+
+    # 3) Recommendation (cheap, so it always reflects the current ladder and model constants)
+    recommendation = recommend(complexity, video_encoding_profiles)
+
+    # 4) Profiles
+    print(f"SI {complexity['si_mean']:.1f} (p90 {complexity['si_p90']:.1f}), "
+          f"TI {complexity['ti_mean']:.1f} (p90 {complexity['ti_p90']:.1f}, variation {complexity['ti_variation']:.2f}) "
+          f"-> complexity factor {recommendation['complexity_factor']:.2f}")
+    print(f"Recommended rate control: {recommendation['mode']} ({recommendation['reason']})")
+    print("video_encoding_profiles = [")
+    print(",\n".join(f"    {_format_profile(profile)}" for profile in recommendation["profiles"]))
+    print("]")
+
+
+def analyze_complexity(source):
+    """
+    Decode SAMPLE_COUNT evenly spaced windows of the source and return its spatial information (SI,
+    standard deviation of the Sobel gradient magnitude) and temporal information (TI, standard deviation
+    of the frame difference) statistics, in the spirit of ITU-T P.910.
+    """
+    probe = _probe(source)
+    height = round(probe["height"] * ANALYSIS_WIDTH / probe["width"] / 2) * 2
+    usable = max(probe["duration"] - SAMPLE_DURATION, 0)
+    starts = [usable * (index + 0.5) / SAMPLE_COUNT for index in range(SAMPLE_COUNT)]
+
+    with ThreadPoolExecutor(max_workers=SAMPLE_COUNT) as executor:
+        samples = list(executor.map(lambda start: _sample_window(source, start, ANALYSIS_WIDTH, height), starts))
+
+    si = np.concatenate([sample[0] for sample in samples])
+    ti = np.concatenate([sample[1] for sample in samples])
+    if si.size == 0:
+        raise Exception(f"No frames could be decoded from {source}")
+
+    window_ti = np.array([sample[1].mean() for sample in samples if sample[1].size])
+    return {
+        "samples": len(samples),
+        "frames": int(si.size),
+        "width": probe["width"],
+        "height": probe["height"],
+        "duration": probe["duration"],
+        "si_mean": float(si.mean()),
+        "si_p90": float(np.percentile(si, 90)),
+        "ti_mean": float(ti.mean()) if ti.size else 0.0,
+        "ti_p90": float(np.percentile(ti, 90)) if ti.size else 0.0,
+        "ti_variation": float(window_ti.std() / window_ti.mean()) if window_ti.size and window_ti.mean() > 0 else 0.0
+    }
+
+
+def recommend(complexity, profiles):
+    """
+    Map a complexity analysis to a rate control mode and an encoding ladder.
+    Bitrates (VBR targets, or max_bitrate caps in CRF mode) scale with the complexity factor, so easy
+    content gets lower caps and hard content gets headroom; the CRF value moves the other way.
+    """
+    si = max(complexity["si_p90"], 1.0)
+    ti = max(complexity["ti_p90"], 1.0)
+    factor = (si / SI_REFERENCE) ** SI_WEIGHT * (ti / TI_REFERENCE) ** TI_WEIGHT
+    factor = min(max(factor, MIN_COMPLEXITY_FACTOR), MAX_COMPLEXITY_FACTOR)
+
+    crf = round(CRF_REFERENCE - CRF_STEP_PER_DOUBLING * math.log2(factor))
+    crf = min(max(crf, CRF_MIN), CRF_MAX)
+
+    if factor >= VBR_MIN_COMPLEXITY_FACTOR and complexity["ti_variation"] < VBR_MAX_TI_VARIATION:
+        mode = "VBR"
+        reason = "uniformly complex content would be capped most of the time in CRF mode"
+    else:
+        mode = "CRF"
+        reason = "CRF spends bits where the content needs them; caps bound the peaks"
+
+    scaled = []
+    for profile in profiles:
+        if profile.get("height") > complexity["height"]:
+            continue
+        rung = dict(profile)
+        rung["bitrate"] = int(round(profile.get("bitrate") * factor, -3))
+        if mode == "CRF":
+            rung = {"height": rung["height"], "crf": crf, **{key: value for key, value in rung.items() if key != "height"}}
+        scaled.append(rung)
+
+    return {
+        "mode": mode,
+        "reason": reason,
+        "complexity_factor": round(factor, 3),
+        "crf": crf if mode == "CRF" else None,
+        "profiles": scaled
+    }
+
+
+def _format_profile(profile):
+    """
+    One rung as it is written in the encoding samples (SDK enums as ProfileH264.HIGH, ...).
+    """
+    def value(item):
+        if isinstance(item, Enum):
+            return f"{type(item).__name__}.{item.name}"
+        return 'None' if item is None else json.dumps(item)
+    return "{" + ", ".join(f'"{key}": {value(item)}' for key, item in profile.items()) + "}"
+
+
+def content_fingerprint(source):
+    """
+    Hash of the source size and HASH_BLOCK_COUNT evenly spaced blocks (BLAKE2b). Only a few MB are read,
+    so large or remote sources are fingerprinted quickly.
+    """
+    size = _source_size(source)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(size).encode())
+    step = max((size - HASH_BLOCK_SIZE) // max(HASH_BLOCK_COUNT - 1, 1), 1)
+    offsets = sorted({min(index * step, max(size - HASH_BLOCK_SIZE, 0)) for index in range(HASH_BLOCK_COUNT)})
+    for offset in offsets:
+        digest.update(_read_range(source, offset, min(HASH_BLOCK_SIZE, size - offset)))
+    return digest.hexdigest()
+
+
+def _sample_window(source, start, width, height):
+    """
+    Decode one window as luma frames and return per-frame (SI, TI) arrays. Frames are processed as they
+    are read, so only the current and the previous frame are kept.
+    """
+    decoder = subprocess.Popen(
+        [
+            FFMPEG, '-v', 'error', '-nostdin',
+            '-ss', f'{start:.3f}', '-t', f'{SAMPLE_DURATION:.3f}', '-i', source,
+            '-map', '0:v:0', '-an', '-sn',
+            '-vf', f'fps={ANALYSIS_FRAME_RATE},scale={width}:{height},format=gray',
+            '-f', 'rawvideo', '-'
+        ],
+        stdout=subprocess.PIPE
+    )
+
+    frame_size = width * height
+    si = []
+    ti = []
+    previous = None
+    try:
+        while True:
+            data = decoder.stdout.read(frame_size)
+            if len(data) < frame_size:
+                break
+            frame = np.frombuffer(data, dtype=np.uint8).reshape(height, width).astype(np.float32)
+            si.append(_spatial_information(frame))
+            if previous is not None:
+                ti.append(float((frame - previous).std()))
+            previous = frame
+    finally:
+        decoder.stdout.close()
+        decoder.kill()
+        decoder.wait()
+
+    return np.array(si, dtype=np.float32), np.array(ti, dtype=np.float32)
+
+
+def _spatial_information(frame):
+    """
+    Standard deviation of the Sobel gradient magnitude, computed with array slicing (no per-pixel loop).
+    """
+    gx = (frame[:-2, 2:] + 2 * frame[1:-1, 2:] + frame[2:, 2:]) - (frame[:-2, :-2] + 2 * frame[1:-1, :-2] + frame[2:, :-2])
+    gy = (frame[2:, :-2] + 2 * frame[2:, 1:-1] + frame[2:, 2:]) - (frame[:-2, :-2] + 2 * frame[:-2, 1:-1] + frame[:-2, 2:])
+    return float(np.sqrt(gx * gx + gy * gy).std())
+
+
+def _probe(source):
+    """
+    Width, height and duration of the first video stream (via ffprobe).
+    """
+    output = subprocess.run(
+        [
+            FFPROBE, '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'stream=width,height:format=duration',
+            '-of', 'json', source
+        ],
+        check=True, capture_output=True, text=True
+    ).stdout
+    probe = json.loads(output)
+    stream = probe["streams"][0]
+    return {
+        "width": int(stream["width"]),
+        "height": int(stream["height"]),
+        "duration": float(probe["format"]["duration"])
+    }
+
+
+def _source_size(source):
+    """
+    Size in bytes of a local file or an https:// object (HEAD request).
+    """
+    if not source.startswith(('http://', 'https://')):
+        return os.path.getsize(source)
+    request = urllib.request.Request(source, method='HEAD')
+    with urllib.request.urlopen(request) as response:
+        return int(response.headers["Content-Length"])
+
+
+def _read_range(source, offset, length):
+    """
+    Read length bytes at offset from a local file or an https:// object (Range request).
+    """
+    if length <= 0:
+        return b''
+    if not source.startswith(('http://', 'https://')):
+        with open(source, 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+    request = urllib.request.Request(source, headers={"Range": f"bytes={offset}-{offset + length - 1}"})
+    with urllib.request.urlopen(request) as response:
+        return response.read()
+
+
+def _load_cache():
+    """
+    Load the analysis cache (content hash -> result).
+    """
+    if not os.path.exists(COMPLEXITY_CACHE_PATH):
+        return {}
+    with open(COMPLEXITY_CACHE_PATH) as f:
+        return json.load(f)
+
+
+def _save_cache(cache):
+    """
+    Write the analysis cache atomically.
+    """
+    temporary_path = f"{COMPLEXITY_CACHE_PATH}.tmp"
+    with open(temporary_path, 'w') as f:
+        json.dump(cache, f)
+    os.replace(temporary_path, COMPLEXITY_CACHE_PATH)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,437 @@
+import json
+import math
+import os
+import re
+import struct
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# HLS master playlist of the title: a local path (e.g. a mirror made with vod/mirror) or an https:// URL.
+MASTER_PLAYLIST = 'mirror/stream.m3u8'
+
+# Target bitrates of the ladder (vod/abr/create_vod_h264_aac_fmp4_hls_dash.py). Renditions are matched by the
+# bitrate in their playlist name (video_<bitrate>.m3u8); max_bitrate / bufsize follow the samples' codec configurations.
+VIDEO_BITRATES = [300000, 800000, 1200000, 2000000, 4000000, 6000000]
+MAX_BITRATE_FACTOR = 1.2
+BUFSIZE_FACTOR = 1.5
+
+# Sliding windows (seconds) for the peak bitrate. A VBV-conformant stream stays below max_bitrate + bufsize / window.
+PEAK_WINDOWS = [1, 2, 6]
+# VBV buffer fullness before the first frame, as a fraction of bufsize.
+VBV_INITIAL_FULLNESS = 0.9
+# Relative tolerance before a peak is flagged.
+TOLERANCE = 0.01
+
+REPORT_PATH = 'conformance_report.json'
+# Corrected BANDWIDTH / AVERAGE-BANDWIDTH per variant playlist URI (consumed by the manifest builder of vod/chunked)
+# and the master playlist with the corrected attributes.
+CORRECTED_BANDWIDTH_PATH = 'corrected_bandwidth.json'
+CORRECTED_MASTER_PLAYLIST_PATH = 'stream.corrected.m3u8'
+
+# Bytes read from the start of every segment to parse its moof (extended automatically for larger moofs).
+HEAD_SIZE = 64 * 1024
+MAX_WORKERS = 32
+
+
+def main():
+    """
+    Check every rendition of an HLS (fMP4) title against its rate-control constraints. Steps:
+      1) Parse the master and media playlists (segment URIs, EXTINF durations, target duration)
+      2) Read the moof of every segment (in parallel) for frame sizes and durations; the segment size is the object size
+      3) Per rendition, with array operations over segments and frames:
+         segment bitrates, average and HLS peak segment bitrate, sliding-window peaks and a VBV buffer simulation
+      4) Flag VBV underflows and window peaks above max_bitrate + bufsize / window
+      5) Write the report, the corrected BANDWIDTH / AVERAGE-BANDWIDTH values and a corrected master playlist
+    """
+
+    # 1) Playlists
+    master_text = _read_text(MASTER_PLAYLIST)
+    variants, audio_groups = parse_master_playlist(master_text)
+    playlists = {variant["uri"] for variant in variants} | {uri for uris in audio_groups.values() for uri in uris}
+    print(f"{len(variants)} variants, {sum(len(uris) for uris in audio_groups.values())} audio renditions")
+
+    # 2) + 3) + 4) Renditions
+    renditions = {}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for uri in sorted(playlists):
+            rendition = _load_rendition(uri, executor)
+            renditions[uri] = analyze_rendition(rendition, _targets(uri))
+            _print_rendition(uri, renditions[uri])
+
+    # 5) Corrected attributes
+    corrected = {}
+    for variant in variants:
+        video = renditions[variant["uri"]]
+        # Audio-only variants reference their own group
+        audio = [renditions[uri] for uri in audio_groups.get(variant["audio"], []) if uri != variant["uri"]]
+        corrected[variant["uri"]] = {
+            "BANDWIDTH": video["hls_peak_bitrate"] + max((a["hls_peak_bitrate"] for a in audio), default=0),
+            "AVERAGE-BANDWIDTH": video["average_bitrate"] + max((a["average_bitrate"] for a in audio), default=0),
+            "declared": {"BANDWIDTH": variant["bandwidth"], "AVERAGE-BANDWIDTH": variant["average_bandwidth"]}
+        }
+        declared = variant["bandwidth"]
+        change = f"{(corrected[variant['uri']]['BANDWIDTH'] / declared - 1) * 100:+.1f} %" if declared else "n/a"
+        print(f"{variant['uri']}: BANDWIDTH {declared} -> {corrected[variant['uri']]['BANDWIDTH']} ({change}), "
+              f"AVERAGE-BANDWIDTH {variant['average_bandwidth']} -> {corrected[variant['uri']]['AVERAGE-BANDWIDTH']}")
+
+    violations = sum(len(rendition["violations"]) for rendition in renditions.values())
+    with open(REPORT_PATH, 'w') as f:
+        json.dump({"master_playlist": MASTER_PLAYLIST, "renditions": renditions, "violations": violations}, f, indent=2)
+    with open(CORRECTED_BANDWIDTH_PATH, 'w') as f:
+        json.dump(corrected, f, indent=2)
+    with open(CORRECTED_MASTER_PLAYLIST_PATH, 'w') as f:
+        f.write(correct_master_playlist(master_text, corrected))
+    print(f"{violations} violations; report written to {REPORT_PATH}, corrected values to {CORRECTED_BANDWIDTH_PATH} "
+          f"and {CORRECTED_MASTER_PLAYLIST_PATH}")
+
+
+def analyze_rendition(rendition, targets):
+    """
+    Bitrate statistics, sliding-window peaks and the VBV simulation of one rendition.
+    targets is {"bitrate", "max_bitrate", "bufsize"} or None (statistics only).
+    """
+    sizes = rendition["segment_sizes"] * 8.0
+    durations = rendition["segment_durations"]
+    segment_bitrates = sizes / durations
+    result = {
+        "segments": int(sizes.size),
+        "duration": round(float(durations.sum()), 3),
+        "average_bitrate": round(sizes.sum() / durations.sum()),
+        "hls_peak_bitrate": math.ceil(hls_peak_bitrate(sizes, durations, rendition["target_duration"])),
+        "segment_bitrate": {
+            "min": int(segment_bitrates.min()),
+            "p50": int(np.percentile(segment_bitrates, 50)),
+            "p95": int(np.percentile(segment_bitrates, 95)),
+            "max": int(segment_bitrates.max())
+        },
+        "targets": targets,
+        "violations": []
+    }
+
+    frame_bits = rendition["frame_sizes"] * 8.0
+    frame_durations = rendition["frame_durations"]
+    if frame_bits.size == 0:
+        return result
+
+    result["window_peaks"] = {}
+    for window in PEAK_WINDOWS:
+        peak = sliding_window_peak(frame_bits, frame_durations, window)
+        result["window_peaks"][str(window)] = int(peak)
+        if targets:
+            limit = targets["max_bitrate"] + targets["bufsize"] / window
+            if peak > limit * (1 + TOLERANCE):
+                result["violations"].append(f"{window} s window peak {peak / 1000:.0f} kbps exceeds "
+                                            f"max_bitrate + bufsize / window = {limit / 1000:.0f} kbps")
+
+    if targets:
+        fullness = vbv_fullness(frame_bits, frame_durations, targets["max_bitrate"], targets["bufsize"])
+        underflows = np.flatnonzero(fullness < 0)
+        result["vbv"] = {
+            "max_bitrate": targets["max_bitrate"],
+            "bufsize": targets["bufsize"],
+            "min_fullness": round(float(fullness.min() / targets["bufsize"]), 4),
+            "underflow_frames": int(underflows.size)
+        }
+        if underflows.size:
+            start = float(np.concatenate(([0.0], np.cumsum(frame_durations)))[underflows[0]])
+            result["violations"].append(f"VBV underflow in {underflows.size} frames (first at {start:.2f} s, "
+                                        f"deficit up to {-fullness.min() / 8000:.0f} kB)")
+    return result
+
+
+def hls_peak_bitrate(sizes, durations, target_duration):
+    """
+    HLS peak segment bitrate (RFC 8216bis): the largest bitrate of any set of contiguous segments whose total
+    duration is between 0.5 and 1.5 times the target duration. sizes in bits, durations in seconds.
+    """
+    size_sums = np.concatenate(([0.0], np.cumsum(sizes)))
+    duration_sums = np.concatenate(([0.0], np.cumsum(durations)))
+    peak = 0.0
+    length = 1
+    while length <= sizes.size:
+        window_sizes = size_sums[length:] - size_sums[:-length]
+        window_durations = duration_sums[length:] - duration_sums[:-length]
+        valid = (window_durations >= 0.5 * target_duration) & (window_durations <= 1.5 * target_duration)
+        if valid.any():
+            peak = max(peak, float((window_sizes[valid] / window_durations[valid]).max()))
+        elif window_durations.min() > 1.5 * target_duration:
+            break
+        length += 1
+    # Renditions shorter than half the target duration
+    return peak or float(sizes.sum() / durations.sum())
+
+
+def sliding_window_peak(frame_bits, frame_durations, window):
+    """
+    Highest bitrate over any window of window seconds starting at a frame (windows at the end are
+    shortened to the remaining content, which can only lower their rate).
+    """
+    starts = np.concatenate(([0.0], np.cumsum(frame_durations)))
+    bit_sums = np.concatenate(([0.0], np.cumsum(frame_bits)))
+    ends = np.minimum(np.searchsorted(starts, starts[:-1] + window, side='left'), frame_bits.size)
+    return float(((bit_sums[ends] - bit_sums[:-1]) / window).max())
+
+
+def vbv_fullness(frame_bits, frame_durations, max_bitrate, bufsize):
+    """
+    VBV buffer fullness (bits) after each frame is removed. The buffer fills at max_bitrate, never beyond bufsize,
+    and frame i is removed after the duration of frame i - 1: x[i] = min(bufsize, x[i-1] + fill[i]) - bits[i].
+    The clamped recursion is unrolled as x[i] = C[i] + min(x0, min_k<=i(bufsize - bits[k] - C[k])) with
+    C = cumsum(fill - bits), so it is computed with cumulative sums and a running minimum.
+    """
+    fill = max_bitrate * np.concatenate(([0.0], frame_durations[:-1]))
+    cumulative = np.cumsum(fill - frame_bits)
+    bound = np.minimum.accumulate(bufsize - frame_bits - cumulative)
+    return cumulative + np.minimum(VBV_INITIAL_FULLNESS * bufsize, bound)
+
+
+def parse_master_playlist(text):
+    """
+    Variants ({"uri", "bandwidth", "average_bandwidth", "audio"}) and audio groups (group ID -> playlist URIs).
+    """
+    variants = []
+    audio_groups = {}
+    pending = None
+    for line in text.splitlines():
+        if line.startswith('#EXT-X-MEDIA:') and 'TYPE=AUDIO' in line:
+            group = re.search(r'GROUP-ID="([^"]+)"', line)
+            uri = re.search(r'URI="([^"]+)"', line)
+            if group and uri:
+                audio_groups.setdefault(group.group(1), []).append(uri.group(1))
+        elif line.startswith('#EXT-X-STREAM-INF:'):
+            pending = {
+                "bandwidth": _int_attribute(line, 'BANDWIDTH'),
+                "average_bandwidth": _int_attribute(line, 'AVERAGE-BANDWIDTH'),
+                "audio": (re.search(r'AUDIO="([^"]+)"', line) or [None, None])[1]
+            }
+        elif pending is not None and line.strip() and not line.startswith('#'):
+            variants.append({"uri": line.strip(), **pending})
+            pending = None
+    return variants, audio_groups
+
+
+def correct_master_playlist(text, corrected):
+    """
+    The master playlist with BANDWIDTH / AVERAGE-BANDWIDTH of every variant replaced by the corrected values.
+    """
+    lines = text.splitlines()
+    for index, line in enumerate(lines):
+        if not line.startswith('#EXT-X-STREAM-INF:') or index + 1 >= len(lines):
+            continue
+        values = corrected.get(lines[index + 1].strip())
+        if not values:
+            continue
+        line = re.sub(r'(?<=[:,])BANDWIDTH=\d+', f'BANDWIDTH={values["BANDWIDTH"]}', line)
+        if 'AVERAGE-BANDWIDTH=' in line:
+            line = re.sub(r'AVERAGE-BANDWIDTH=\d+', f'AVERAGE-BANDWIDTH={values["AVERAGE-BANDWIDTH"]}', line)
+        else:
+            line = line.replace(f'BANDWIDTH={values["BANDWIDTH"]}',
+                                f'BANDWIDTH={values["BANDWIDTH"]},AVERAGE-BANDWIDTH={values["AVERAGE-BANDWIDTH"]}', 1)
+        lines[index] = line
+    return "\n".join(lines) + "\n"
+
+
+def _load_rendition(uri, executor):
+    """
+    Segment sizes / durations (EXTINF) and frame sizes / durations (trun) of one media playlist.
+    """
+    playlist_location = _resolve(MASTER_PLAYLIST, uri)
+    text = _read_text(playlist_location)
+    target_duration = _int_attribute(text, '#EXT-X-TARGETDURATION', separator=':') or 6
+    init_uri = re.search(r'#EXT-X-MAP:URI="([^"]+)"', text)
+    segment_uris, durations = [], []
+    duration = None
+    for line in text.splitlines():
+        if line.startswith('#EXTINF:'):
+            duration = float(line[len('#EXTINF:'):].split(',')[0])
+        elif line.strip() and not line.startswith('#') and duration is not None:
+            segment_uris.append(_resolve(playlist_location, line.strip()))
+            durations.append(duration)
+            duration = None
+    if not segment_uris:
+        raise Exception(f"{uri} has no segments")
+
+    timescale = _init_timescale(_read_head(_resolve(playlist_location, init_uri.group(1)), HEAD_SIZE)[0]) if init_uri else None
+    segments = list(executor.map(lambda location: _inspect_segment(location, timescale), segment_uris))
+    frame_sizes = [segment[1] for segment in segments if segment[1] is not None]
+    frame_durations = [segment[2] for segment in segments if segment[2] is not None]
+    return {
+        "target_duration": target_duration,
+        "segment_sizes": np.array([segment[0] for segment in segments], dtype=np.float64),
+        "segment_durations": np.array(durations, dtype=np.float64),
+        "frame_sizes": np.concatenate(frame_sizes) if frame_sizes else np.empty(0),
+        "frame_durations": np.concatenate(frame_durations) if frame_durations else np.empty(0)
+    }
+
+
+def _inspect_segment(location, timescale):
+    """
+    (segment size, frame sizes, frame durations in seconds) of one fMP4 segment; frames are None
+    if the segment has no moof (e.g. MPEG-TS) or the timescale is unknown.
+    """
+    head, size = _read_head(location, HEAD_SIZE)
+    if timescale is None:
+        return size, None, None
+    moof = _find_box(head, b'moof')
+    if moof is None:
+        return size, None, None
+    if moof[1] > len(head):
+        head, size = _read_head(location, moof[1])
+
+    frame_sizes, frame_durations = [], []
+    for traf_start, traf_end in _iter_children(head, moof[0] + 8, moof[1], b'traf'):
+        default_duration, default_size = _tfhd_defaults(head, traf_start, traf_end)
+        for trun_start, trun_end in _iter_children(head, traf_start + 8, traf_end, b'trun'):
+            sizes, durations = _trun_samples(head, trun_start, trun_end, default_duration, default_size)
+            frame_sizes.extend(sizes)
+            frame_durations.extend(durations)
+    return size, np.array(frame_sizes, dtype=np.float64), np.array(frame_durations, dtype=np.float64) / timescale
+
+
+def _tfhd_defaults(data, start, end):
+    """
+    default_sample_duration and default_sample_size of the tfhd in a traf (0 if not present).
+    """
+    for box_start, _ in _iter_children(data, start + 8, end, b'tfhd'):
+        flags = int.from_bytes(data[box_start + 9:box_start + 12], 'big')
+        offset = box_start + 16
+        offset += 8 if flags & 0x01 else 0
+        offset += 4 if flags & 0x02 else 0
+        default_duration = struct.unpack_from('>I', data, offset)[0] if flags & 0x08 else 0
+        offset += 4 if flags & 0x08 else 0
+        default_size = struct.unpack_from('>I', data, offset)[0] if flags & 0x10 else 0
+        return default_duration, default_size
+    return 0, 0
+
+
+def _trun_samples(data, start, _end, default_duration, default_size):
+    """
+    Sample sizes and durations (timescale units) of a trun.
+    """
+    flags = int.from_bytes(data[start + 9:start + 12], 'big')
+    count = struct.unpack_from('>I', data, start + 12)[0]
+    offset = start + 16
+    offset += 4 if flags & 0x001 else 0
+    offset += 4 if flags & 0x004 else 0
+    fields = [bit for bit in (0x100, 0x200, 0x400, 0x800) if flags & bit]
+    values = np.frombuffer(data, dtype='>u4', count=count * len(fields), offset=offset).reshape(count, len(fields))
+    durations = values[:, fields.index(0x100)] if 0x100 in fields else np.full(count, default_duration)
+    sizes = values[:, fields.index(0x200)] if 0x200 in fields else np.full(count, default_size)
+    return sizes.tolist(), durations.tolist()
+
+
+def _init_timescale(data):
+    """
+    Timescale of the first track (mdhd) of an init segment.
+    """
+    moov = _find_box(data, b'moov')
+    trak = next(_iter_children(data, moov[0] + 8, moov[1], b'trak'))
+    mdia = next(_iter_children(data, trak[0] + 8, trak[1], b'mdia'))
+    mdhd = next(_iter_children(data, mdia[0] + 8, mdia[1], b'mdhd'))
+    version = data[mdhd[0] + 8]
+    return struct.unpack_from('>I', data, mdhd[0] + (28 if version == 1 else 20))[0]
+
+
+def _find_box(data, box_type):
+    """
+    (start, end) of the first top-level box of the given type; end may exceed the data read so far.
+    """
+    offset = 0
+    while offset + 8 <= len(data):
+        size, current_type = struct.unpack_from('>I4s', data, offset)
+        if size == 1:
+            size = struct.unpack_from('>Q', data, offset + 8)[0]
+        if size < 8:
+            return None
+        if current_type == box_type:
+            return offset, offset + size
+        offset += size
+    return None
+
+
+def _iter_children(data, start, end, box_type):
+    """
+    Yield (start, end) of the child boxes of the given type between start and end.
+    """
+    offset = start
+    while offset + 8 <= min(end, len(data)):
+        size, current_type = struct.unpack_from('>I4s', data, offset)
+        if size < 8:
+            return
+        if current_type == box_type:
+            yield offset, offset + size
+        offset += size
+
+
+def _targets(uri):
+    """
+    Rate-control targets of a video playlist (None for audio or unknown renditions).
+    """
+    match = re.search(r'video_(\d+)\.m3u8', uri)
+    if not match or int(match.group(1)) not in VIDEO_BITRATES:
+        return None
+    bitrate = int(match.group(1))
+    return {"bitrate": bitrate, "max_bitrate": int(bitrate * MAX_BITRATE_FACTOR), "bufsize": int(bitrate * BUFSIZE_FACTOR)}
+
+
+def _int_attribute(text, name, separator='='):
+    """
+    Integer value of an attribute (e.g. BANDWIDTH=123 or #EXT-X-TARGETDURATION:6); None if missing.
+    """
+    match = re.search(rf'(?:^|[,:\s]){re.escape(name)}{separator}(\d+)', text, re.MULTILINE)
+    return int(match.group(1)) if match else None
+
+
+def _resolve(base, reference):
+    """
+    Resolve a playlist reference against a local path or URL.
+    """
+    if base.startswith(('http://', 'https://')):
+        return urllib.parse.urljoin(base, reference)
+    return os.path.normpath(os.path.join(os.path.dirname(base), urllib.parse.unquote(reference)))
+
+
+def _read_text(location):
+    """
+    Text of a local file or an https:// object.
+    """
+    if not location.startswith(('http://', 'https://')):
+        with open(location, encoding='utf-8') as f:
+            return f.read()
+    with urllib.request.urlopen(location) as response:
+        return response.read().decode('utf-8')
+
+
+def _read_head(location, length):
+    """
+    The first length bytes of a local file or an https:// object (Range request) and the total size.
+    """
+    if not location.startswith(('http://', 'https://')):
+        with open(location, 'rb') as f:
+            return f.read(length), os.fstat(f.fileno()).st_size
+    request = urllib.request.Request(location, headers={"Range": f"bytes=0-{length - 1}"})
+    with urllib.request.urlopen(request) as response:
+        data = response.read()
+        content_range = response.headers.get("Content-Range")
+    return data, int(content_range.rsplit('/', 1)[1]) if content_range else len(data)
+
+
+def _print_rendition(uri, result):
+    """
+    One-line summary (plus violations) of a rendition.
+    """
+    peaks = ", ".join(f"{window} s {peak / 1000:.0f}" for window, peak in result.get("window_peaks", {}).items())
+    vbv = result.get("vbv")
+    vbv_text = f", VBV min {vbv['min_fullness'] * 100:.0f} % / {vbv['underflow_frames']} underflows" if vbv else ""
+    print(f"{uri}: avg {result['average_bitrate'] / 1000:.0f} kbps, HLS peak {result['hls_peak_bitrate'] / 1000:.0f} kbps, "
+          f"segment max {result['segment_bitrate']['max'] / 1000:.0f} kbps"
+          f"{f', window peaks (kbps) {peaks}' if peaks else ''}{vbv_text}")
+    for violation in result["violations"]:
+        print(f"  VIOLATION: {violation}")
+
+
+if __name__ == '__main__':
+    main()
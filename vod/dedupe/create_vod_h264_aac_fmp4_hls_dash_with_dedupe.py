@@ -0,0 +1,809 @@
+import hashlib
+import hmac
+import http.client
+import json
+import posixpath
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+
+from bitmovin_api_sdk import BitmovinApi
+from bitmovin_api_sdk import GenericS3Input, S3AccessStyle, S3SignatureVersion, GenericS3Output
+from bitmovin_api_sdk import Encoding, CloudRegion
+from bitmovin_api_sdk import EncodingOutput, AclEntry, AclPermission
+from bitmovin_api_sdk import IngestInputStream, StreamSelectionMode, PresetConfiguration
+from bitmovin_api_sdk import Stream, StreamInput, MuxingStream, StreamMode, ColorConfig
+from bitmovin_api_sdk import AacAudioConfiguration, AacChannelLayout
+from bitmovin_api_sdk import H264VideoConfiguration, CodecConfigType, ProfileH264, LevelH264, WeightedPredictionPFrames
+from bitmovin_api_sdk import Fmp4Muxing
+from bitmovin_api_sdk import HlsManifest, HlsVersion, AudioMediaInfo, StreamInfo
+from bitmovin_api_sdk import DashManifest, Period, VideoAdaptationSet, AudioAdaptationSet
+from bitmovin_api_sdk import DashFmp4Representation, DashRepresentationType, DashRepresentationTypeMode
+from bitmovin_api_sdk import MessageType, StartEncodingRequest, ManifestResource, ManifestGenerator
+from bitmovin_api_sdk import Status
+
+TEST_ITEM = "vod-h264-aac-fmp4-hls-dash-dedupe"
+
+API_KEY = '<INSERT YOUR API KEY>'
+ORG_ID = '<INSERT YOUR ORG ID>'
+
+LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_INPUT_HOST_NAME = '<INSERT_YOUR_INPUT_HOST_NAME>'
+# Signing regions of the buckets; None derives them from the host names (e.g. 'jp-osa-1').
+LINODE_OBJECT_STORAGE_INPUT_REGION = None
+
+INPUT_PATH = '/path/to/your/input/file.mp4'
+# e.g. 'inputs/big_buck_bunny_1080p_h264.mov'
+
+LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME = '<INSERT_YOUR_OUTPUT_HOST_NAME>'
+LINODE_OBJECT_STORAGE_OUTPUT_REGION = None
+
+# Every title gets its own output prefix; a duplicate input only gets manifests (aliases) there.
+TITLE_NAME = 'my-title'
+OUTPUT_BASE_PATH = f'output/{TEST_ITEM}/{TITLE_NAME}/'
+
+# Embedded dedupe index (SQLite): input fingerprints and the output prefix of every encoded input / ladder.
+DEDUPE_INDEX_PATH = 'dedupe_index.sqlite3'
+
+# Sampled fingerprint: input size + HASH_BLOCK_COUNT evenly spaced blocks of HASH_BLOCK_SIZE bytes (ranged reads).
+HASH_BLOCK_COUNT = 16
+HASH_BLOCK_SIZE = 1024 * 1024
+# Full hash (only when a sampled fingerprint matches an indexed input): ranged reads of FULL_HASH_PART_SIZE bytes.
+FULL_HASH_PART_SIZE = 16 * 1024 * 1024
+HASH_WORKERS = 8
+
+SEGMENT_LENGTH = 6
+KEYFRAME_INTERVAL = 2
+
+bitmovin_api = BitmovinApi(api_key=API_KEY, tenant_org_id=ORG_ID)
+
+# Example H.264 encoding profiles, including different resolutions, bitrates, and profiles.
+video_encoding_profiles = [
+    {"height": 240, "bitrate": 300000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 360, "bitrate": 800000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 480, "bitrate": 1200000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 540, "bitrate": 2000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 720, "bitrate": 4000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 1080, "bitrate": 6000000, "profile": ProfileH264.HIGH, "level": LevelH264.L4, "mode": StreamMode.STANDARD}
+]
+
+# Example AAC audio encoding profiles, each with a specified bitrate and sample rate.
+audio_encoding_profiles = [
+    {"bitrate": 128000, "rate": 48000},
+    {"bitrate": 64000, "rate": 44100}
+]
+
+input_bucket = {
+    "access_key": LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY,
+    "secret_key": LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY,
+    "bucket_name": LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME,
+    "host": LINODE_OBJECT_STORAGE_INPUT_HOST_NAME,
+    "region": LINODE_OBJECT_STORAGE_INPUT_REGION
+}
+output_bucket = {
+    "access_key": LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY,
+    "secret_key": LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY,
+    "bucket_name": LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME,
+    "host": LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME,
+    "region": LINODE_OBJECT_STORAGE_OUTPUT_REGION
+}
+
+_connections = threading.local()
+
+
+def main():
+    """
+    Encode an input only if the same content has not been encoded with the same ladder before. Steps:
+      1) Fingerprint the input: size + sampled blocks (BLAKE2b) via ranged reads; reused from the index
+         while the object's size and ETag are unchanged
+      2) Hash the ladder specification (codec, muxing and segmenting settings)
+      3) Look up indexed outputs with the same sampled fingerprint and ladder; candidates are confirmed
+         with a full-content hash of both inputs, so a sampling collision never reuses a wrong output
+      4) Hit: skip the encoding and write alias manifests under OUTPUT_BASE_PATH that reference the existing output
+      5) Miss: run the encoding (HLS/DASH manifests generated with it) and add its output prefix to the index
+    """
+    index = open_index(DEDUPE_INDEX_PATH)
+    input_key = f"{input_bucket['bucket_name']}/{INPUT_PATH.lstrip('/')}"
+
+    # 1) Input fingerprint
+    started = time.monotonic()
+    size, etag = _head_object(input_bucket, INPUT_PATH)
+    known = index.execute(
+        "SELECT sample_hash, full_hash FROM inputs WHERE input_key = ? AND size = ? AND etag = ?",
+        (input_key, size, etag)
+    ).fetchone()
+    sample_hash, full_hash = known if known else (sampled_fingerprint(input_bucket, INPUT_PATH, size), None)
+    print(f"Input {input_key}: {size} bytes, sampled fingerprint {sample_hash} "
+          f"({'indexed' if known else f'{time.monotonic() - started:.1f} s'})")
+
+    # 2) Ladder specification
+    ladder_hash = ladder_fingerprint()
+
+    # 3) Candidates with the same sampled fingerprint and ladder
+    match = None
+    for output_prefix, source_key, candidate_hash in index.execute(
+            "SELECT output_prefix, source_key, full_hash FROM outputs WHERE sample_hash = ? AND ladder_hash = ?",
+            (sample_hash, ladder_hash)).fetchall():
+        if full_hash is None:
+            full_hash = full_content_hash(input_bucket, INPUT_PATH, size)
+        if candidate_hash is None:
+            candidate_hash = _indexed_full_hash(index, source_key)
+            if candidate_hash is None:
+                print(f"Candidate {output_prefix}: source {source_key} changed or was removed; skipped")
+                continue
+            index.execute("UPDATE outputs SET full_hash = ? WHERE output_prefix = ?", (candidate_hash, output_prefix))
+        if candidate_hash == full_hash:
+            match = output_prefix
+            break
+        print(f"Candidate {output_prefix}: sampled fingerprint collision (full hashes differ)")
+
+    _record_input(index, input_key, size, etag, sample_hash, full_hash)
+
+    if match == OUTPUT_BASE_PATH:
+        print(f"{OUTPUT_BASE_PATH} already holds this input with the same ladder; nothing to do")
+    elif match:
+        # 4) Duplicate: alias manifests only
+        _write_alias_manifests(target_prefix=match, alias_prefix=OUTPUT_BASE_PATH)
+        index.execute(
+            "INSERT OR REPLACE INTO aliases (alias_prefix, output_prefix, source_key, created_at) VALUES (?, ?, ?, ?)",
+            (OUTPUT_BASE_PATH, match, input_key, datetime.now(UTC).isoformat())
+        )
+        print(f"Duplicate of {match}: encoding skipped, alias manifests written to {OUTPUT_BASE_PATH}")
+    else:
+        # 5) New content: encode and index
+        _encode_input()
+        index.execute(
+            "INSERT OR REPLACE INTO outputs (output_prefix, sample_hash, ladder_hash, full_hash, source_key, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (OUTPUT_BASE_PATH, sample_hash, ladder_hash, full_hash, input_key, datetime.now(UTC).isoformat())
+        )
+        print(f"Indexed {OUTPUT_BASE_PATH} (ladder {ladder_hash[:12]})")
+
+    index.commit()
+    index.close()
+
+
+def open_index(path):
+    """
+    Open (and create) the dedupe index. Lookups use the primary keys and the (sample_hash, ladder_hash) index,
+    so they stay fast for millions of entries.
+    """
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.executescript("""
+        CREATE TABLE IF NOT EXISTS inputs (
+            input_key TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            etag TEXT,
+            sample_hash TEXT NOT NULL,
+            full_hash TEXT,
+            checked_at TEXT NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS outputs (
+            output_prefix TEXT PRIMARY KEY,
+            sample_hash TEXT NOT NULL,
+            ladder_hash TEXT NOT NULL,
+            full_hash TEXT,
+            source_key TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS outputs_by_content ON outputs (sample_hash, ladder_hash);
+        CREATE TABLE IF NOT EXISTS aliases (
+            alias_prefix TEXT PRIMARY KEY,
+            output_prefix TEXT NOT NULL,
+            source_key TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        ) WITHOUT ROWID;
+    """)
+    return connection
+
+
+def sampled_fingerprint(bucket, key, size):
+    """
+    BLAKE2b of the object size and HASH_BLOCK_COUNT evenly spaced blocks (first and last block included),
+    read in parallel with ranged GETs.
+    """
+    step = max((size - HASH_BLOCK_SIZE) // max(HASH_BLOCK_COUNT - 1, 1), 1)
+    offsets = sorted({min(index * step, max(size - HASH_BLOCK_SIZE, 0)) for index in range(HASH_BLOCK_COUNT)})
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(size).encode())
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+        for block in executor.map(lambda offset: _read_range(bucket, key, offset, min(HASH_BLOCK_SIZE, size - offset)),
+                                  offsets):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def full_content_hash(bucket, key, size):
+    """
+    BLAKE2b of the whole object, read as parallel ranged GETs of FULL_HASH_PART_SIZE bytes.
+    At most 2 * HASH_WORKERS parts are held in memory at a time.
+    """
+    started = time.monotonic()
+    digest = hashlib.blake2b(digest_size=32)
+    offsets = list(range(0, size, FULL_HASH_PART_SIZE))
+    window = 2 * HASH_WORKERS
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+        for first in range(0, len(offsets), window):
+            parts = offsets[first:first + window]
+            for part in executor.map(
+                    lambda offset: _read_range(bucket, key, offset, min(FULL_HASH_PART_SIZE, size - offset)), parts):
+                digest.update(part)
+    print(f"Full hash of {key} ({size / 1e9:.2f} GB) in {time.monotonic() - started:.1f} s")
+    return digest.hexdigest()
+
+
+def ladder_fingerprint():
+    """
+    SHA-256 of the ladder specification; outputs are only reused for an identical ladder.
+    """
+    spec = {
+        "video": [
+            {**profile, "profile": profile["profile"].value, "level": profile["level"].value if profile["level"] else None,
+             "mode": profile["mode"].value}
+            for profile in video_encoding_profiles
+        ],
+        "audio": audio_encoding_profiles,
+        "segment_length": SEGMENT_LENGTH,
+        "keyframe_interval": KEYFRAME_INTERVAL,
+        "codec": "h264",
+        "preset": PresetConfiguration.VOD_HIGH_QUALITY.value
+    }
+    canonical = json.dumps(spec, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _indexed_full_hash(index, source_key):
+    """
+    Full hash of an indexed input, computed on first use; None if the object changed since it was indexed.
+    """
+    row = index.execute("SELECT size, etag, full_hash FROM inputs WHERE input_key = ?", (source_key,)).fetchone()
+    if row is None:
+        return None
+    size, etag, full_hash = row
+    if full_hash:
+        return full_hash
+
+    bucket_name, key = source_key.split('/', 1)
+    bucket = {**input_bucket, "bucket_name": bucket_name}
+    try:
+        current_size, current_etag = _head_object(bucket, key)
+    except Exception:
+        return None
+    if (current_size, current_etag) != (size, etag):
+        return None
+    full_hash = full_content_hash(bucket, key, size)
+    index.execute("UPDATE inputs SET full_hash = ? WHERE input_key = ?", (full_hash, source_key))
+    return full_hash
+
+
+def _record_input(index, input_key, size, etag, sample_hash, full_hash):
+    """
+    Insert or refresh the fingerprints of an input object.
+    """
+    index.execute(
+        "INSERT OR REPLACE INTO inputs (input_key, size, etag, sample_hash, full_hash, checked_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (input_key, size, etag, sample_hash, full_hash, datetime.now(UTC).isoformat())
+    )
+
+
+def _write_alias_manifests(target_prefix, alias_prefix):
+    """
+    Copy the HLS master playlist and the DASH MPD of the existing output to the alias prefix, with every
+    reference rewritten relative to the existing output (media playlists and segments are not copied).
+    """
+    relative = posixpath.relpath(target_prefix.rstrip('/'), alias_prefix.rstrip('/')) + '/'
+    master_playlist = _get_object(output_bucket, f"{target_prefix}stream.m3u8").decode('utf-8')
+    _put_object(output_bucket, f"{alias_prefix}stream.m3u8", alias_hls_master_playlist(master_playlist, relative).encode('utf-8'),
+                'application/vnd.apple.mpegurl')
+    mpd = _get_object(output_bucket, f"{target_prefix}stream.mpd").decode('utf-8')
+    _put_object(output_bucket, f"{alias_prefix}stream.mpd", alias_dash_manifest(mpd, relative).encode('utf-8'),
+                'application/dash+xml')
+
+
+def alias_hls_master_playlist(text, relative):
+    """
+    Prefix every relative URI of an HLS master playlist (variant lines and URI attributes) with relative.
+    """
+    lines = []
+    for line in text.splitlines():
+        if line.startswith('#'):
+            line = re.sub(r'URI="([^"]+)"', lambda m: f'URI="{_prefix_uri(m.group(1), relative)}"', line)
+        elif line.strip():
+            line = _prefix_uri(line.strip(), relative)
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def alias_dash_manifest(text, relative):
+    """
+    Point a DASH MPD at the existing output: prefix the MPD-level BaseURL elements (those before the first
+    Period), or add one (after ProgramInformation, as the schema orders them) when the MPD has none.
+    BaseURL elements of Periods, AdaptationSets and Representations are kept, as they resolve against the MPD-level one.
+    """
+    period = re.search(r'<Period\b', text)
+    head, body = (text[:period.start()], text[period.start():]) if period else (text, "")
+    pattern = r'(<BaseURL\b[^>]*>)([^<]*)(</BaseURL>)'
+    if re.search(pattern, head):
+        return re.sub(pattern, lambda m: f'{m.group(1)}{_prefix_uri(m.group(2), relative)}{m.group(3)}', head) + body
+
+    anchor = re.search(r'</ProgramInformation>|<ProgramInformation\b[^>]*/>', head) or re.search(r'<MPD\b[^>]*>', head)
+    if anchor is None:
+        raise Exception("MPD element not found")
+    return f"{text[:anchor.end()]}\n  <BaseURL>{relative}</BaseURL>{text[anchor.end():]}"
+
+
+def _prefix_uri(uri, relative):
+    """
+    Prefix a relative URI; absolute URIs and absolute paths are kept.
+    """
+    if re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*:', uri) or uri.startswith('/'):
+        return uri
+    return relative + uri
+
+
+def _encode_input():
+    """
+    Create and run the encoding of INPUT_PATH (H.264 + AAC fMP4, HLS/DASH manifests generated with the encoding).
+    """
+    input = bitmovin_api.encoding.inputs.generic_s3.create(
+        generic_s3_input=GenericS3Input(
+            access_key=LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_INPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Input'))
+    output = bitmovin_api.encoding.outputs.generic_s3.create(
+        generic_s3_output=GenericS3Output(
+            access_key=LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Output'))
+
+    encoding = bitmovin_api.encoding.encodings.create(
+        encoding=Encoding(
+            name=f"[{TEST_ITEM}] {INPUT_PATH}",
+            cloud_region=CloudRegion.AKAMAI_JP_OSA,
+            encoder_version='STABLE'
+        )
+    )
+
+    video_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=INPUT_PATH,
+            selection_mode=StreamSelectionMode.VIDEO_RELATIVE,
+            position=0
+        )
+    )
+    audio_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=INPUT_PATH,
+            selection_mode=StreamSelectionMode.AUDIO_RELATIVE,
+            position=0
+        )
+    )
+    video_input_stream = StreamInput(input_stream_id=video_ingest_input_stream.id)
+    audio_input_stream = StreamInput(input_stream_id=audio_ingest_input_stream.id)
+
+    for video_profile in video_encoding_profiles:
+        color_config = ColorConfig(
+            copy_color_primaries_flag=True,
+            copy_color_transfer_flag=True,
+            copy_color_space_flag=True
+        )
+
+        # Configure advanced H.264 parameters (ref: https://developer.bitmovin.com/encoding/docs/h264-presets)
+        if video_profile.get("profile") == ProfileH264.HIGH:
+            adaptive_spatial_transform = True
+            use_cabac = True
+            num_refframe = 4
+            num_bframe = 3
+            weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+        elif video_profile.get("profile") == ProfileH264.MAIN:
+            adaptive_spatial_transform = False
+            use_cabac = True
+            num_refframe = 4
+            num_bframe = 3
+            weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+        elif video_profile.get("profile") == ProfileH264.BASELINE:
+            adaptive_spatial_transform = False
+            use_cabac = False
+            num_refframe = 4
+            num_bframe = 0
+            weighted_prediction_p_frames = WeightedPredictionPFrames.DISABLED
+        else:
+            raise Exception("Unknown profile. Valid profiles: HIGH, MAIN, BASELINE.")
+
+        h264_codec = bitmovin_api.encoding.configurations.video.h264.create(
+            h264_video_configuration=H264VideoConfiguration(
+                name='Sample video codec configuration',
+                height=video_profile.get("height"),
+                bitrate=video_profile.get("bitrate"),
+                max_bitrate=int(video_profile.get("bitrate") * 1.2),
+                bufsize=int(video_profile.get("bitrate") * 1.5),
+                profile=video_profile.get("profile"),
+                level=video_profile.get("level"),
+                min_keyframe_interval=KEYFRAME_INTERVAL,
+                max_keyframe_interval=KEYFRAME_INTERVAL,
+                color_config=color_config,
+                ref_frames=num_refframe,
+                bframes=num_bframe,
+                cabac=use_cabac,
+                adaptive_spatial_transform=adaptive_spatial_transform,
+                weighted_prediction_p_frames=weighted_prediction_p_frames,
+                preset_configuration=PresetConfiguration.VOD_HIGH_QUALITY
+            )
+        )
+
+        h264_stream = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=h264_codec.id,
+                input_streams=[video_input_stream],
+                name=f"Stream H264 {video_profile.get('height')}p",
+                mode=video_profile.get('mode')
+            )
+        )
+
+        bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=SEGMENT_LENGTH,
+                segment_naming='segment_%number%.m4s',
+                init_segment_name='init.mp4',
+                streams=[MuxingStream(stream_id=h264_stream.id)],
+                outputs=[EncodingOutput(
+                    output_id=output.id,
+                    output_path=f"{OUTPUT_BASE_PATH}video/{video_profile.get('height')}p",
+                    acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+                )],
+                name=f"Video FMP4 Muxing {video_profile.get('height')}p"
+            )
+        )
+
+    for audio_profile in audio_encoding_profiles:
+        aac_codec = bitmovin_api.encoding.configurations.audio.aac.create(
+            aac_audio_configuration=AacAudioConfiguration(
+                bitrate=audio_profile.get("bitrate"),
+                rate=audio_profile.get("rate"),
+                channel_layout=AacChannelLayout.CL_STEREO
+            )
+        )
+
+        aac_stream = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=aac_codec.id,
+                input_streams=[audio_input_stream],
+                name=f"Stream AAC {audio_profile.get('bitrate') / 1000:.0f}kbps",
+                mode=StreamMode.STANDARD
+            )
+        )
+
+        bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=SEGMENT_LENGTH,
+                segment_naming='segment_%number%.m4s',
+                init_segment_name='init.mp4',
+                streams=[MuxingStream(stream_id=aac_stream.id)],
+                outputs=[EncodingOutput(
+                    output_id=output.id,
+                    output_path=f"{OUTPUT_BASE_PATH}audio/{audio_profile.get('bitrate')}",
+                    acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+                )],
+                name=f"Audio FMP4 Muxing {audio_profile.get('bitrate') / 1000:.0f}kbps"
+            )
+        )
+
+    hls_manifest = _create_hls_manifest(encoding_id=encoding.id, output=output, output_path=OUTPUT_BASE_PATH)
+    dash_manifest = _create_dash_manifest(encoding_id=encoding.id, output=output, output_path=OUTPUT_BASE_PATH)
+    start_encoding_request = StartEncodingRequest(
+        vod_hls_manifests=[ManifestResource(manifest_id=hls_manifest.id)],
+        vod_dash_manifests=[ManifestResource(manifest_id=dash_manifest.id)],
+        manifest_generator=ManifestGenerator.V2
+    )
+    _execute_encoding(encoding=encoding, start_encoding_request=start_encoding_request)
+
+
+def _execute_encoding(encoding, start_encoding_request):
+    """
+    Start the encoding process on Bitmovin and poll until it finishes or fails.
+    """
+    bitmovin_api.encoding.encodings.start(encoding_id=encoding.id, start_encoding_request=start_encoding_request)
+    task = _wait_for_encoding_to_finish(encoding_id=encoding.id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_encoding_to_finish(encoding_id=encoding.id)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("Encoding failed")
+
+    print("Encoding finished successfully")
+
+
+def _wait_for_encoding_to_finish(encoding_id):
+    """
+    Poll encoding status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.encodings.status(encoding_id=encoding_id)
+    print(f"Encoding status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _create_hls_manifest(encoding_id, output, output_path):
+    """
+    Create an HLS manifest from the generated FMP4 muxings.
+    Loop through all FMP4 muxings and add audio or video entries to the HLS manifest.
+    """
+    manifest_output = EncodingOutput(
+        output_id=output.id,
+        output_path=output_path,
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    hls_manifest = bitmovin_api.encoding.manifests.hls.create(
+        hls_manifest=HlsManifest(
+            manifest_name='stream.m3u8',
+            outputs=[manifest_output],
+            name='HLS Manifest',
+            hls_master_playlist_version=HlsVersion.HLS_V6,
+            hls_media_playlist_version=HlsVersion.HLS_V6
+        )
+    )
+
+    fmp4_muxings = bitmovin_api.encoding.encodings.muxings.fmp4.list(encoding_id=encoding_id)
+    for muxing in fmp4_muxings.items:
+        stream = bitmovin_api.encoding.encodings.streams.get(encoding_id=encoding_id, stream_id=muxing.streams[0].stream_id)
+        codec = bitmovin_api.encoding.configurations.type.get(configuration_id=stream.codec_config_id)
+        segment_path = _remove_output_base_path(muxing.outputs[0].output_path)
+
+        if codec.type == CodecConfigType.AAC:
+            # HLS audio
+            audio_codec = bitmovin_api.encoding.configurations.audio.aac.get(configuration_id=stream.codec_config_id)
+            bitmovin_api.encoding.manifests.hls.media.audio.create(
+                manifest_id=hls_manifest.id,
+                audio_media_info=AudioMediaInfo(
+                    name='HLS Audio Media',
+                    group_id='audio',
+                    language='en',
+                    segment_path=segment_path,
+                    encoding_id=encoding_id,
+                    stream_id=stream.id,
+                    muxing_id=muxing.id,
+                    uri=f'audio_{audio_codec.bitrate}.m3u8'
+                )
+            )
+        elif codec.type == CodecConfigType.H264:
+            # HLS video
+            video_codec = bitmovin_api.encoding.configurations.video.h264.get(configuration_id=stream.codec_config_id)
+            bitmovin_api.encoding.manifests.hls.streams.create(
+                manifest_id=hls_manifest.id,
+                stream_info=StreamInfo(
+                    audio='audio',
+                    closed_captions='NONE',
+                    segment_path=segment_path,
+                    uri=f'video_{video_codec.bitrate}.m3u8',
+                    encoding_id=encoding_id,
+                    stream_id=stream.id,
+                    muxing_id=muxing.id
+                )
+            )
+
+    return hls_manifest
+
+
+def _create_dash_manifest(encoding_id, output, output_path):
+    """
+    Create a DASH manifest by creating a Period, adding Video/Audio Adaptation Sets,
+    and attaching each FMP4 representation.
+    """
+    manifest_output = EncodingOutput(
+        output_id=output.id,
+        output_path=output_path,
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    dash_manifest = bitmovin_api.encoding.manifests.dash.create(
+        dash_manifest=DashManifest(
+            manifest_name='stream.mpd',
+            outputs=[manifest_output],
+            name='DASH Manifest'
+        )
+    )
+
+    period = bitmovin_api.encoding.manifests.dash.periods.create(
+        manifest_id=dash_manifest.id,
+        period=Period()
+    )
+
+    video_adaptation_set = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.video.create(
+        video_adaptation_set=VideoAdaptationSet(),
+        manifest_id=dash_manifest.id,
+        period_id=period.id
+    )
+    audio_adaptation_set = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.audio.create(
+        audio_adaptation_set=AudioAdaptationSet(lang='en'),
+        manifest_id=dash_manifest.id,
+        period_id=period.id
+    )
+
+    fmp4_muxings = bitmovin_api.encoding.encodings.muxings.fmp4.list(encoding_id=encoding_id)
+    for muxing in fmp4_muxings.items:
+        stream = bitmovin_api.encoding.encodings.streams.get(encoding_id=encoding_id, stream_id=muxing.streams[0].stream_id)
+        codec = bitmovin_api.encoding.configurations.type.get(configuration_id=stream.codec_config_id)
+        segment_path = _remove_output_base_path(muxing.outputs[0].output_path)
+
+        if codec.type == CodecConfigType.AAC:
+            adaptation_set_id = audio_adaptation_set.id
+        elif codec.type == CodecConfigType.H264:
+            adaptation_set_id = video_adaptation_set.id
+        else:
+            continue
+
+        bitmovin_api.encoding.manifests.dash.periods.adaptationsets.representations.fmp4.create(
+            manifest_id=dash_manifest.id,
+            period_id=period.id,
+            adaptationset_id=adaptation_set_id,
+            dash_fmp4_representation=DashFmp4Representation(
+                encoding_id=encoding_id,
+                muxing_id=muxing.id,
+                type_=DashRepresentationType.TEMPLATE,
+                mode=DashRepresentationTypeMode.TEMPLATE_REPRESENTATION,
+                segment_path=segment_path
+            )
+        )
+
+    return dash_manifest
+
+
+def _remove_output_base_path(text):
+    """
+    Remove the OUTPUT_BASE_PATH prefix from the given path to create a relative segment path.
+    """
+    if text.startswith(OUTPUT_BASE_PATH):
+        return text[len(OUTPUT_BASE_PATH):]
+    return text
+
+
+def _head_object(bucket, key):
+    """
+    Size and ETag of an object.
+    """
+    status, headers, _ = _s3_request(bucket, "HEAD", key)
+    if status != 200:
+        raise Exception(f"HEAD {key} failed with HTTP {status}")
+    return int(headers["content-length"]), headers.get("etag", "").strip('"')
+
+
+def _read_range(bucket, key, offset, length):
+    """
+    Read length bytes at offset of an object (ranged GET).
+    """
+    if length <= 0:
+        return b''
+    status, _, data = _s3_request(bucket, "GET", key, headers={"Range": f"bytes={offset}-{offset + length - 1}"})
+    if status not in (200, 206):
+        raise Exception(f"GET {key} (bytes {offset}-{offset + length - 1}) failed with HTTP {status}")
+    return data
+
+
+def _get_object(bucket, key):
+    """
+    Download an object.
+    """
+    status, _, data = _s3_request(bucket, "GET", key)
+    if status != 200:
+        raise Exception(f"GET {key} failed with HTTP {status}")
+    return data
+
+
+def _put_object(bucket, key, body, content_type):
+    """
+    Upload an object with a public-read ACL (like the encoding outputs).
+    """
+    status, _, _ = _s3_request(bucket, "PUT", key, body=body,
+                               headers={"Content-Type": content_type, "x-amz-acl": "public-read"})
+    if status != 200:
+        raise Exception(f"PUT {key} failed with HTTP {status}")
+
+
+def _s3_request(bucket, method, key, body=b"", headers=None):
+    """
+    Signed request to a bucket on a thread-local keep-alive connection; returns (status, headers, body).
+    Header names are lower-cased.
+    """
+    host = f"{bucket['bucket_name']}.{bucket['host']}"
+    path = "/" + urllib.parse.quote(key.lstrip('/'), safe='/~')
+    headers = dict(headers or {})
+    headers.update(_sign_s3_request(bucket, method, host, path, body, headers))
+
+    pool = getattr(_connections, 'pool', None)
+    if pool is None:
+        pool = _connections.pool = {}
+    for attempt in range(2):
+        connection = pool.get(host)
+        if connection is None:
+            connection = pool[host] = http.client.HTTPSConnection(host, timeout=60)
+        try:
+            connection.request(method, path, body=body or None, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+            return response.status, {name.lower(): value for name, value in response.getheaders()}, data
+        except (http.client.HTTPException, ConnectionError):
+            connection.close()
+            pool.pop(host, None)
+            if attempt == 1:
+                raise
+    return None, None, None
+
+
+def _sign_s3_request(bucket, method, host, path, body, headers):
+    """
+    Return the headers that sign an S3 request with AWS Signature Version 4 (x-amz-* headers are signed too).
+    """
+    region = bucket.get("region") or bucket["host"].split('.')[0]
+    now = datetime.now(UTC)
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    date_stamp = now.strftime('%Y%m%d')
+    payload_hash = hashlib.sha256(body).hexdigest()
+
+    signed = {"host": host, "x-amz-content-sha256": payload_hash, "x-amz-date": amz_date}
+    signed.update({name.lower(): value for name, value in headers.items() if name.lower().startswith("x-amz-")})
+    signed_headers = ";".join(sorted(signed))
+    canonical_headers = "".join(f"{name}:{signed[name]}\n" for name in sorted(signed))
+    canonical_request = f"{method}\n{path}\n\n{canonical_headers}\n{signed_headers}\n{payload_hash}"
+
+    scope = f"{date_stamp}/{region}/s3/aws4_request"
+    string_to_sign = f"AWS4-HMAC-SHA256\n{amz_date}\n{scope}\n{hashlib.sha256(canonical_request.encode()).hexdigest()}"
+
+    signing_key = f"AWS4{bucket['secret_key']}".encode()
+    for part in (date_stamp, region, "s3", "aws4_request"):
+        signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+    signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    return {
+        "x-amz-date": amz_date,
+        "x-amz-content-sha256": payload_hash,
+        "Authorization": f"AWS4-HMAC-SHA256 Credential={bucket['access_key']}/{scope}, "
+                         f"SignedHeaders={signed_headers}, Signature={signature}"
+    }
+
+
+def _log_task_errors(task):
+    """
+    Print error messages from the given task to the console.
+    """
+    if not task:
+        return
+
+    for message in filter(lambda m: m.type == MessageType.ERROR, task.messages):
+        print(message.text)
+
+
+if __name__ == '__main__':
+    main()
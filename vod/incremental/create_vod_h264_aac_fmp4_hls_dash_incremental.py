@@ -0,0 +1,684 @@
+import hashlib
+import json
+import os
+import time
+from datetime import UTC, datetime
+
+from bitmovin_api_sdk import BitmovinApi, BitmovinError
+from bitmovin_api_sdk import GenericS3Input, S3AccessStyle, S3SignatureVersion, GenericS3Output
+from bitmovin_api_sdk import Encoding, CloudRegion
+from bitmovin_api_sdk import EncodingOutput, AclEntry, AclPermission
+from bitmovin_api_sdk import IngestInputStream, StreamSelectionMode, PresetConfiguration
+from bitmovin_api_sdk import Stream, StreamInput, MuxingStream, StreamMode, ColorConfig
+from bitmovin_api_sdk import AacAudioConfiguration, AacChannelLayout
+from bitmovin_api_sdk import H264VideoConfiguration, ProfileH264, LevelH264, WeightedPredictionPFrames
+from bitmovin_api_sdk import Fmp4Muxing
+from bitmovin_api_sdk import CencDrm, CencWidevine, CencPlayReady, CencFairPlay
+from bitmovin_api_sdk import HlsManifest, HlsVersion, AudioMediaInfo, StreamInfo
+from bitmovin_api_sdk import DashManifest, Period, VideoAdaptationSet, AudioAdaptationSet, ContentProtection
+from bitmovin_api_sdk import DashFmp4Representation, DashRepresentationType, DashRepresentationTypeMode
+from bitmovin_api_sdk import MessageType, StartEncodingRequest
+from bitmovin_api_sdk import Status
+
+TEST_ITEM = "vod-h264-aac-fmp4-hls-dash-incremental"
+
+API_KEY = '<INSERT YOUR API KEY>'
+ORG_ID = '<INSERT YOUR ORG ID>'
+
+LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_INPUT_HOST_NAME = '<INSERT_YOUR_INPUT_HOST_NAME>'
+
+INPUT_PATH = '/path/to/your/input/file.mp4'
+# e.g. 'inputs/big_buck_bunny_1080p_h264.mov'
+
+# Bump when the file at INPUT_PATH is replaced with different content: every rendition is re-encoded.
+INPUT_REVISION = 1
+
+LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME = '<INSERT_YOUR_OUTPUT_HOST_NAME>'
+
+OUTPUT_BASE_PATH = f'output/{TEST_ITEM}/'
+
+# Renditions of the last successful run per input / output location (fingerprint, encoding, muxing, output path).
+STATE_PATH = 'incremental_state.json'
+
+# Shared by all renditions so that segments of renditions encoded in different runs stay aligned.
+# Both are part of every fingerprint: changing them re-encodes the whole ladder.
+SEGMENT_LENGTH = 6
+KEYFRAME_INTERVAL = 2
+
+# Optional CENC CBC encryption of every rendition (see vod/drm). The DRM settings are part of the fingerprints.
+ENABLE_DRM = False
+CENC_KEY = '12341234123412341234123412341234'
+CENC_KID = '43214321432143214321432143214321'
+CENC_WIDEVINE_PSSH = 'CAESEAABAgMEBQYHCAkKCwwNDg8aCmludGVydHJ1c3QiASo='
+CENC_PLAYREADY_LA_URL = 'http://pr.test.expressplay.com/playready/RightsManager.asmx'
+CENC_FAIRPLAY_IV = '00000000000000000000000000000000'
+CENC_FAIRPLAY_URI = 'skd://expressplay_token'
+
+bitmovin_api = BitmovinApi(api_key=API_KEY, tenant_org_id=ORG_ID)
+
+# Example H.264 encoding profiles, including different resolutions, bitrates, and profiles.
+video_encoding_profiles = [
+    {"height": 240, "bitrate": 300000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 360, "bitrate": 800000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 480, "bitrate": 1200000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 540, "bitrate": 2000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 720, "bitrate": 4000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 1080, "bitrate": 6000000, "profile": ProfileH264.HIGH, "level": LevelH264.L4, "mode": StreamMode.STANDARD}
+]
+
+# Example AAC audio encoding profiles, each with a specified bitrate and sample rate.
+audio_encoding_profiles = [
+    {"bitrate": 128000, "rate": 48000},
+    {"bitrate": 64000, "rate": 44100}
+]
+
+
+def main():
+    """
+    Encode only the renditions whose specification changed since the last successful run for the same input.
+      1) Build the specification of every rendition (codec configuration, stream, muxing, DRM) and fingerprint it
+      2) Compare the fingerprints with the last successful run (STATE_PATH); renditions whose encoding
+         no longer exists or did not finish are treated as changed
+      3) Encode the changed and new renditions in one encoding; each fingerprint gets its own output path,
+         so the segments of unchanged renditions (and of the published manifests) are left untouched
+      4) Generate HLS and DASH manifests referencing the mixed set of renditions (current and earlier encodings)
+      5) Record the renditions of this run in STATE_PATH
+    """
+
+    # 1) Rendition specifications
+    renditions = _rendition_specs()
+
+    # 2) Diff against the last successful run
+    state = _load_state()
+    state_key = _state_key()
+    previous = state.get(state_key, {}).get("renditions", {})
+    finished_encodings = _finished_encodings({entry["encoding_id"] for entry in previous.values()})
+
+    unchanged, changed = [], []
+    for rendition in renditions:
+        entry = previous.get(rendition["key"])
+        if entry and entry["fingerprint"] == rendition["fingerprint"] and entry["encoding_id"] in finished_encodings:
+            unchanged.append(rendition)
+        else:
+            changed.append(rendition)
+    removed = [entry for key, entry in previous.items() if key not in {rendition["key"] for rendition in renditions}]
+
+    for rendition in renditions:
+        entry = previous.get(rendition["key"])
+        if rendition in unchanged:
+            action = "keep"
+        elif entry is None:
+            action = "new"
+        elif entry["fingerprint"] != rendition["fingerprint"]:
+            action = "changed"
+        else:
+            action = "re-encode (previous encoding not finished)"
+        print(f"{rendition['key']:>12} {rendition['fingerprint'][:12]}: {action}")
+    for entry in removed:
+        print(f"{entry['key']:>12} {entry['fingerprint'][:12]}: removed (objects remain at {entry['output_path']})")
+
+    if not changed and not removed and state.get(state_key, {}).get("manifests"):
+        print("All renditions are up to date; nothing to do")
+        return
+
+    output = bitmovin_api.encoding.outputs.generic_s3.create(
+        generic_s3_output=GenericS3Output(
+            access_key=LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Output'))
+
+    # 3) Encode the changed and new renditions only
+    entries = {rendition["key"]: previous[rendition["key"]] for rendition in unchanged}
+    if changed:
+        entries.update(_encode_renditions(changed, output))
+    print(f"Encoded {len(changed)} of {len(renditions)} renditions; reused {len(unchanged)}")
+
+    # 4) Manifests over the mixed set
+    ordered_entries = sorted(entries.values(), key=lambda entry: (entry["type"], entry["bitrate"]))
+    hls_manifest = _create_hls_manifest(entries=ordered_entries, output=output, output_path=OUTPUT_BASE_PATH)
+    dash_manifest = _create_dash_manifest(entries=ordered_entries, output=output, output_path=OUTPUT_BASE_PATH)
+    _execute_hls_manifest_generation(hls_manifest=hls_manifest)
+    _execute_dash_manifest_generation(dash_manifest=dash_manifest)
+
+    # 5) State of this run
+    state[state_key] = {
+        "renditions": entries,
+        "manifests": {"hls": hls_manifest.id, "dash": dash_manifest.id},
+        "updated_at": datetime.now(UTC).isoformat()
+    }
+    _save_state(state)
+    print(f"State written to {STATE_PATH}")
+
+
+def _rendition_specs():
+    """
+    Build the SDK models of every rendition and its fingerprint over everything that affects the output:
+    the input selection, the codec configuration, the stream, the muxing and the DRM configuration.
+    Object names and per-encoding IDs (streams, outputs) are excluded.
+    """
+    renditions = []
+    for video_profile in video_encoding_profiles:
+        renditions.append({
+            "key": f"video/{video_profile.get('height')}p",
+            "type": "video",
+            "bitrate": video_profile.get("bitrate"),
+            "selection_mode": StreamSelectionMode.VIDEO_RELATIVE,
+            "codec_config": _h264_configuration(video_profile),
+            "stream": Stream(name=f"Stream H264 {video_profile.get('height')}p", mode=video_profile.get('mode')),
+            "muxing": _fmp4_muxing(name=f"Video FMP4 Muxing {video_profile.get('height')}p"),
+            "drm": _cenc_drm(name="Video FMP4 CENC") if ENABLE_DRM else None
+        })
+
+    for audio_profile in audio_encoding_profiles:
+        renditions.append({
+            "key": f"audio/{audio_profile.get('bitrate')}",
+            "type": "audio",
+            "bitrate": audio_profile.get("bitrate"),
+            "selection_mode": StreamSelectionMode.AUDIO_RELATIVE,
+            "codec_config": AacAudioConfiguration(
+                name='Sample audio codec configuration',
+                bitrate=audio_profile.get("bitrate"),
+                rate=audio_profile.get("rate"),
+                channel_layout=AacChannelLayout.CL_STEREO
+            ),
+            "stream": Stream(name=f"Stream AAC {audio_profile.get('bitrate') / 1000:.0f}kbps", mode=StreamMode.STANDARD),
+            "muxing": _fmp4_muxing(name=f"Audio FMP4 Muxing {audio_profile.get('bitrate') / 1000:.0f}kbps"),
+            "drm": _cenc_drm(name="Audio FMP4 CENC") if ENABLE_DRM else None
+        })
+
+    for rendition in renditions:
+        rendition["fingerprint"] = rendition_fingerprint({
+            "input": {
+                "bucket": LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME,
+                "path": INPUT_PATH,
+                "revision": INPUT_REVISION,
+                "selection_mode": rendition["selection_mode"].value
+            },
+            "codec_config": _model_spec(rendition["codec_config"]),
+            "stream": _model_spec(rendition["stream"]),
+            "muxing": _model_spec(rendition["muxing"]),
+            "drm": _model_spec(rendition["drm"]) if rendition["drm"] else None
+        })
+        rendition["output_path"] = f"{OUTPUT_BASE_PATH}{rendition['key']}/{rendition['fingerprint'][:12]}"
+    return renditions
+
+
+def rendition_fingerprint(spec):
+    """
+    SHA-256 of the canonical JSON form of a rendition specification.
+    """
+    canonical = json.dumps(spec, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _model_spec(model):
+    """
+    Serialized SDK model without its display name.
+    """
+    spec = model.to_dict()
+    spec.pop("name", None)
+    return spec
+
+
+def _h264_configuration(video_profile):
+    """
+    H.264 codec configuration of one ladder rung (same parameters as vod/abr).
+    """
+    # Configure advanced H.264 parameters (ref: https://developer.bitmovin.com/encoding/docs/h264-presets)
+    if video_profile.get("profile") == ProfileH264.HIGH:
+        adaptive_spatial_transform = True
+        use_cabac = True
+        num_refframe = 4
+        num_bframe = 3
+        weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+    elif video_profile.get("profile") == ProfileH264.MAIN:
+        adaptive_spatial_transform = False
+        use_cabac = True
+        num_refframe = 4
+        num_bframe = 3
+        weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+    elif video_profile.get("profile") == ProfileH264.BASELINE:
+        adaptive_spatial_transform = False
+        use_cabac = False
+        num_refframe = 4
+        num_bframe = 0
+        weighted_prediction_p_frames = WeightedPredictionPFrames.DISABLED
+    else:
+        raise Exception("Unknown profile. Valid profiles: HIGH, MAIN, BASELINE.")
+
+    return H264VideoConfiguration(
+        name='Sample video codec configuration',
+        height=video_profile.get("height"),
+        bitrate=video_profile.get("bitrate"),
+        max_bitrate=int(video_profile.get("bitrate") * 1.2),
+        bufsize=int(video_profile.get("bitrate") * 1.5),
+        profile=video_profile.get("profile"),
+        level=video_profile.get("level"),
+        min_keyframe_interval=KEYFRAME_INTERVAL,
+        max_keyframe_interval=KEYFRAME_INTERVAL,
+        color_config=ColorConfig(
+            copy_color_primaries_flag=True,
+            copy_color_transfer_flag=True,
+            copy_color_space_flag=True
+        ),
+        ref_frames=num_refframe,
+        bframes=num_bframe,
+        cabac=use_cabac,
+        adaptive_spatial_transform=adaptive_spatial_transform,
+        weighted_prediction_p_frames=weighted_prediction_p_frames,
+        preset_configuration=PresetConfiguration.VOD_HIGH_QUALITY
+    )
+
+
+def _fmp4_muxing(name):
+    """
+    FMP4 muxing settings shared by all renditions; streams and outputs are set when the muxing is created.
+    """
+    return Fmp4Muxing(
+        segment_length=SEGMENT_LENGTH,
+        segment_naming='segment_%number%.m4s',
+        init_segment_name='init.mp4',
+        name=name
+    )
+
+
+def _cenc_drm(name):
+    """
+    CENC CBC DRM settings (Widevine, PlayReady, FairPlay); outputs are set when the DRM is created.
+    """
+    return CencDrm(
+        key=CENC_KEY,
+        kid=CENC_KID,
+        widevine=CencWidevine(pssh=CENC_WIDEVINE_PSSH),
+        play_ready=CencPlayReady(la_url=CENC_PLAYREADY_LA_URL),
+        fair_play=CencFairPlay(
+            iv=CENC_FAIRPLAY_IV,
+            uri=CENC_FAIRPLAY_URI
+        ),
+        name=name
+    )
+
+
+def _encode_renditions(renditions, output):
+    """
+    Create one encoding with the given renditions, run it and return their state entries.
+    """
+    input = bitmovin_api.encoding.inputs.generic_s3.create(
+        generic_s3_input=GenericS3Input(
+            access_key=LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_INPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Input'))
+
+    encoding = bitmovin_api.encoding.encodings.create(
+        encoding=Encoding(
+            name=f"[{TEST_ITEM}] {INPUT_PATH} ({len(renditions)} renditions)",
+            cloud_region=CloudRegion.AKAMAI_JP_OSA,
+            encoder_version='STABLE'
+        )
+    )
+
+    input_streams = {}
+    entries = {}
+    for rendition in renditions:
+        selection_mode = rendition["selection_mode"]
+        if selection_mode not in input_streams:
+            ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+                encoding_id=encoding.id,
+                ingest_input_stream=IngestInputStream(
+                    input_id=input.id,
+                    input_path=INPUT_PATH,
+                    selection_mode=selection_mode,
+                    position=0
+                )
+            )
+            input_streams[selection_mode] = StreamInput(input_stream_id=ingest_input_stream.id)
+
+        entries[rendition["key"]] = _create_rendition(
+            encoding_id=encoding.id,
+            rendition=rendition,
+            input_stream=input_streams[selection_mode],
+            output=output
+        )
+
+    _execute_encoding(encoding=encoding, start_encoding_request=StartEncodingRequest())
+    return entries
+
+
+def _create_rendition(encoding_id, rendition, input_stream, output):
+    """
+    Create the codec configuration, stream, FMP4 muxing and (optionally) DRM of one rendition
+    and return its state entry.
+    """
+    muxing_output = EncodingOutput(
+        output_id=output.id,
+        output_path=rendition["output_path"],
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    if rendition["type"] == "video":
+        codec = bitmovin_api.encoding.configurations.video.h264.create(h264_video_configuration=rendition["codec_config"])
+    else:
+        codec = bitmovin_api.encoding.configurations.audio.aac.create(aac_audio_configuration=rendition["codec_config"])
+
+    stream = rendition["stream"]
+    stream.codec_config_id = codec.id
+    stream.input_streams = [input_stream]
+    stream = bitmovin_api.encoding.encodings.streams.create(encoding_id=encoding_id, stream=stream)
+
+    # With DRM, the muxing has no output of its own; the DRM adds the output configuration.
+    muxing = rendition["muxing"]
+    muxing.streams = [MuxingStream(stream_id=stream.id)]
+    muxing.outputs = None if rendition["drm"] else [muxing_output]
+    muxing = bitmovin_api.encoding.encodings.muxings.fmp4.create(encoding_id=encoding_id, fmp4_muxing=muxing)
+
+    drm_id = None
+    if rendition["drm"]:
+        drm = rendition["drm"]
+        drm.outputs = [muxing_output]
+        drm_id = bitmovin_api.encoding.encodings.muxings.fmp4.drm.cenc.create(
+            encoding_id=encoding_id,
+            muxing_id=muxing.id,
+            cenc_drm=drm
+        ).id
+
+    return {
+        "key": rendition["key"],
+        "type": rendition["type"],
+        "bitrate": rendition["bitrate"],
+        "fingerprint": rendition["fingerprint"],
+        "output_path": rendition["output_path"],
+        "encoding_id": encoding_id,
+        "stream_id": stream.id,
+        "muxing_id": muxing.id,
+        "drm_id": drm_id,
+        "encoded_at": datetime.now(UTC).isoformat()
+    }
+
+
+def _finished_encodings(encoding_ids):
+    """
+    IDs of the given encodings that still exist and finished successfully.
+    """
+    finished = set()
+    for encoding_id in encoding_ids:
+        try:
+            task = bitmovin_api.encoding.encodings.status(encoding_id=encoding_id)
+        except BitmovinError as e:
+            print(f"Previous encoding {encoding_id} is not available ({e}); its renditions are re-encoded")
+            continue
+        if task.status == Status.FINISHED:
+            finished.add(encoding_id)
+    return finished
+
+
+def _execute_encoding(encoding, start_encoding_request):
+    """
+    Start the encoding process on Bitmovin and poll until it finishes or fails.
+    """
+    bitmovin_api.encoding.encodings.start(encoding_id=encoding.id, start_encoding_request=start_encoding_request)
+    task = _wait_for_encoding_to_finish(encoding_id=encoding.id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_encoding_to_finish(encoding_id=encoding.id)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("Encoding failed")
+
+    print("Encoding finished successfully")
+
+
+def _create_hls_manifest(entries, output, output_path):
+    """
+    Create an HLS manifest over the given renditions; each entry references the encoding that produced it.
+    """
+    manifest_output = EncodingOutput(
+        output_id=output.id,
+        output_path=output_path,
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    hls_manifest = bitmovin_api.encoding.manifests.hls.create(
+        hls_manifest=HlsManifest(
+            manifest_name='stream.m3u8',
+            outputs=[manifest_output],
+            name='HLS Manifest',
+            hls_master_playlist_version=HlsVersion.HLS_V6,
+            hls_media_playlist_version=HlsVersion.HLS_V6
+        )
+    )
+
+    for entry in entries:
+        segment_path = _remove_output_base_path(entry["output_path"])
+        if entry["type"] == "audio":
+            # HLS audio
+            bitmovin_api.encoding.manifests.hls.media.audio.create(
+                manifest_id=hls_manifest.id,
+                audio_media_info=AudioMediaInfo(
+                    name='HLS Audio Media',
+                    group_id='audio',
+                    language='en',
+                    segment_path=segment_path,
+                    encoding_id=entry["encoding_id"],
+                    stream_id=entry["stream_id"],
+                    muxing_id=entry["muxing_id"],
+                    drm_id=entry["drm_id"],
+                    uri=f'audio_{entry["bitrate"]}.m3u8'
+                )
+            )
+        else:
+            # HLS video
+            bitmovin_api.encoding.manifests.hls.streams.create(
+                manifest_id=hls_manifest.id,
+                stream_info=StreamInfo(
+                    audio='audio',
+                    closed_captions='NONE',
+                    segment_path=segment_path,
+                    uri=f'video_{entry["bitrate"]}.m3u8',
+                    encoding_id=entry["encoding_id"],
+                    stream_id=entry["stream_id"],
+                    muxing_id=entry["muxing_id"],
+                    drm_id=entry["drm_id"]
+                )
+            )
+
+    return hls_manifest
+
+
+def _create_dash_manifest(entries, output, output_path):
+    """
+    Create a DASH manifest with one Period and Video/Audio Adaptation Sets over the given renditions;
+    each representation references the encoding that produced it.
+    """
+    manifest_output = EncodingOutput(
+        output_id=output.id,
+        output_path=output_path,
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    dash_manifest = bitmovin_api.encoding.manifests.dash.create(
+        dash_manifest=DashManifest(
+            manifest_name='stream.mpd',
+            outputs=[manifest_output],
+            name='DASH Manifest'
+        )
+    )
+
+    period = bitmovin_api.encoding.manifests.dash.periods.create(
+        manifest_id=dash_manifest.id,
+        period=Period()
+    )
+
+    video_adaptation_set = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.video.create(
+        video_adaptation_set=VideoAdaptationSet(),
+        manifest_id=dash_manifest.id,
+        period_id=period.id
+    )
+    audio_adaptation_set = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.audio.create(
+        audio_adaptation_set=AudioAdaptationSet(lang='en'),
+        manifest_id=dash_manifest.id,
+        period_id=period.id
+    )
+
+    for entry in entries:
+        adaptation_set = audio_adaptation_set if entry["type"] == "audio" else video_adaptation_set
+        representation = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.representations.fmp4.create(
+            manifest_id=dash_manifest.id,
+            period_id=period.id,
+            adaptationset_id=adaptation_set.id,
+            dash_fmp4_representation=DashFmp4Representation(
+                encoding_id=entry["encoding_id"],
+                muxing_id=entry["muxing_id"],
+                type_=DashRepresentationType.TEMPLATE,
+                mode=DashRepresentationTypeMode.TEMPLATE_REPRESENTATION,
+                segment_path=_remove_output_base_path(entry["output_path"])
+            )
+        )
+        if entry["drm_id"]:
+            bitmovin_api.encoding.manifests.dash.periods.adaptationsets.representations.fmp4.contentprotection.create(
+                manifest_id=dash_manifest.id,
+                period_id=period.id,
+                adaptationset_id=adaptation_set.id,
+                representation_id=representation.id,
+                content_protection=ContentProtection(
+                    encoding_id=entry["encoding_id"],
+                    muxing_id=entry["muxing_id"],
+                    drm_id=entry["drm_id"]
+                )
+            )
+
+    return dash_manifest
+
+
+def _execute_hls_manifest_generation(hls_manifest):
+    """
+    Start HLS manifest generation and poll until completed or fails.
+    """
+    bitmovin_api.encoding.manifests.hls.start(manifest_id=hls_manifest.id)
+    task = _wait_for_hls_manifest_to_finish(manifest_id=hls_manifest.id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_hls_manifest_to_finish(manifest_id=hls_manifest.id)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("HLS Manifest creation failed")
+
+    print("HLS Manifest creation finished successfully")
+
+
+def _execute_dash_manifest_generation(dash_manifest):
+    """
+    Start DASH manifest generation and poll until completed or fails.
+    """
+    bitmovin_api.encoding.manifests.dash.start(manifest_id=dash_manifest.id)
+    task = _wait_for_dash_manifest_to_finish(manifest_id=dash_manifest.id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_dash_manifest_to_finish(manifest_id=dash_manifest.id)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("DASH Manifest creation failed")
+
+    print("DASH Manifest creation finished successfully")
+
+
+def _wait_for_encoding_to_finish(encoding_id):
+    """
+    Poll encoding status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.encodings.status(encoding_id=encoding_id)
+    print(f"Encoding status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _wait_for_hls_manifest_to_finish(manifest_id):
+    """
+    Poll HLS manifest creation status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.manifests.hls.status(manifest_id=manifest_id)
+    print(f"HLS manifest status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _wait_for_dash_manifest_to_finish(manifest_id):
+    """
+    Poll DASH manifest creation status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.manifests.dash.status(manifest_id=manifest_id)
+    print(f"DASH manifest status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _state_key():
+    """
+    Key of this input / output location in the state file.
+    """
+    return (f"{LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME}/{INPUT_PATH} -> "
+            f"{LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME}/{OUTPUT_BASE_PATH}")
+
+
+def _load_state():
+    """
+    Load the state of previous runs (state key -> renditions and manifests).
+    """
+    if not os.path.exists(STATE_PATH):
+        return {}
+    with open(STATE_PATH) as f:
+        return json.load(f)
+
+
+def _save_state(state):
+    """
+    Write the state atomically.
+    """
+    temporary_path = f"{STATE_PATH}.tmp"
+    with open(temporary_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(temporary_path, STATE_PATH)
+
+
+def _remove_output_base_path(text):
+    """
+    Remove the OUTPUT_BASE_PATH prefix from the given path to create a relative segment path.
+    """
+    if text.startswith(OUTPUT_BASE_PATH):
+        return text[len(OUTPUT_BASE_PATH):]
+    return text
+
+
+def _log_task_errors(task):
+    """
+    Print error messages from the given task to the console.
+    """
+    if not task:
+        return
+
+    for message in filter(lambda m: m.type == MessageType.ERROR, task.messages):
+        print(message.text)
+
+
+if __name__ == '__main__':
+    main()
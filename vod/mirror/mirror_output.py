@@ -0,0 +1,560 @@
+import base64
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+import uuid
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import UTC, datetime
+
+# Source of the mirror: 's3' (Generic S3 / Linode Object Storage output) or 'netstorage' (Akamai NetStorage output).
+SOURCE = 's3'
+
+LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME = '<INSERT_YOUR_OUTPUT_HOST_NAME>'
+# Signing region; None derives it from the host name (e.g. 'jp-osa-1').
+LINODE_OBJECT_STORAGE_OUTPUT_REGION = None
+# Optional endpoint of an S3-compatible stand-in (e.g. 'http://127.0.0.1:9000' for MinIO or a moto server);
+# requests then use path-style addressing against this endpoint.
+LINODE_OBJECT_STORAGE_OUTPUT_ENDPOINT = None
+
+AKAMAI_NETSTORAGE_HOSTNAME_OUTPUT = '<INSERT_HOSTNAME>'    # xxxx-nsu.akamaihd.net
+AKAMAI_NETSTORAGE_USERNAME_OUTPUT = '<INSERT_USERNAME>'    # HTTP API key name
+AKAMAI_NETSTORAGE_PASSWORD_OUTPUT = '<INSERT_PASSWORD>'    # HTTP API key
+
+# Prefix to mirror (OUTPUT_BASE_PATH of a sample, e.g. 'output/vod-h264-aac-fmp4-hls-dash/';
+# for NetStorage including the upload directory / CP code, e.g. '123456/output/vod-.../').
+MIRROR_PREFIX = 'output/vod-h264-aac-fmp4-hls-dash/'
+LOCAL_DIRECTORY = 'mirror/'
+# Remove local files whose objects no longer exist under MIRROR_PREFIX.
+DELETE_EXTRANEOUS = False
+
+LIST_WORKERS = 16
+DOWNLOAD_WORKERS = 64
+# Objects larger than PART_SIZE are downloaded as parallel ranged parts; every worker streams its part
+# through a READ_BUFFER_SIZE buffer, so memory stays at DOWNLOAD_WORKERS * READ_BUFFER_SIZE.
+PART_SIZE = 16 * 1024 * 1024
+READ_BUFFER_SIZE = 1024 * 1024
+# The state (ETag and size of every mirrored object) is saved after this many completed objects.
+STATE_SAVE_INTERVAL = 1000
+
+STATE_FILE = '.mirror_state.json'
+PART_SUFFIX = '.part'
+
+s3_bucket = {
+    "access_key": LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY,
+    "secret_key": LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY,
+    "bucket_name": LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME,
+    "host": LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME,
+    "region": LINODE_OBJECT_STORAGE_OUTPUT_REGION,
+    "endpoint": LINODE_OBJECT_STORAGE_OUTPUT_ENDPOINT
+}
+netstorage = {
+    "host": AKAMAI_NETSTORAGE_HOSTNAME_OUTPUT,
+    "key_name": AKAMAI_NETSTORAGE_USERNAME_OUTPUT,
+    "key": AKAMAI_NETSTORAGE_PASSWORD_OUTPUT
+}
+
+_connections = threading.local()
+S3_NAMESPACE = '{http://s3.amazonaws.com/doc/2006-03-01/}'
+
+
+def main():
+    """
+    Mirror every object under MIRROR_PREFIX of the output storage to LOCAL_DIRECTORY. Steps:
+      1) List the objects: every "directory" (common prefix) is listed concurrently, pages in sequence
+      2) Skip objects whose ETag and size match the last mirrored version and the local file
+      3) Download the rest with a pool of keep-alive connections; large objects are split into ranged parts
+         written in place, and partial downloads resume from the completed parts
+      4) Optionally delete local files of removed objects
+      5) Save the state (ETag / size per object) and print the throughput
+    """
+    started = time.monotonic()
+
+    # 1) Listing
+    objects = list_objects(MIRROR_PREFIX)
+    total_bytes = sum(obj["size"] for obj in objects.values())
+    print(f"Listed {len(objects)} objects ({total_bytes / 1e9:.2f} GB) under {MIRROR_PREFIX} in {time.monotonic() - started:.1f} s")
+
+    # 2) ETag-based skip
+    state = _load_state()
+    pending = [obj for key, obj in objects.items() if not _is_current(obj, state.get(key))]
+    pending_bytes = sum(obj["size"] for obj in pending)
+    print(f"{len(objects) - len(pending)} objects unchanged; downloading {len(pending)} objects ({pending_bytes / 1e9:.2f} GB)")
+
+    # 3) Parallel download
+    transfer_started = time.monotonic()
+    transferred, failures = download_objects(pending, state)
+    transfer_seconds = max(time.monotonic() - transfer_started, 1e-9)
+
+    # 4) Extraneous local files
+    if DELETE_EXTRANEOUS:
+        for key in set(state) - set(objects):
+            path = _local_path(key)
+            if os.path.exists(path):
+                os.remove(path)
+            del state[key]
+            print(f"Removed {path}")
+
+    # 5) State and throughput
+    _save_state(state)
+    print(f"Downloaded {transferred / 1e9:.2f} GB in {transfer_seconds:.1f} s "
+          f"({transferred * 8 / transfer_seconds / 1e9:.2f} Gbit/s); total {time.monotonic() - started:.1f} s")
+    if failures:
+        for key, error in sorted(failures.items()):
+            print(f"FAILED {key}: {error}")
+        raise Exception(f"{len(failures)} of {len(pending)} objects failed; run the mirror again to retry them")
+
+
+def list_objects(prefix):
+    """
+    Return {key: {"key", "size", "etag"}} of all objects under prefix. Directories are listed concurrently
+    with LIST_WORKERS threads; the pages of one directory are requested in sequence (continuation tokens).
+    """
+    list_directory = _list_s3_directory if SOURCE == 's3' else _list_netstorage_directory
+    objects = {}
+    with ThreadPoolExecutor(max_workers=LIST_WORKERS) as executor:
+        running = {executor.submit(list_directory, prefix)}
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                directory_objects, subdirectories = future.result()
+                for obj in directory_objects:
+                    # Zero-byte "directory" markers have no local counterpart
+                    if not obj["key"].endswith('/'):
+                        objects[obj["key"]] = obj
+                running |= {executor.submit(list_directory, subdirectory) for subdirectory in subdirectories}
+    return objects
+
+
+def download_objects(objects, state):
+    """
+    Download the objects with DOWNLOAD_WORKERS threads and record each completed object in state.
+    A failed object does not stop the others; returns the number of bytes transferred and {key: error} of the
+    objects that failed.
+    """
+    transfers = []
+    tasks = []
+    failures = {}
+    for obj in objects:
+        try:
+            transfer = _prepare_transfer(obj)
+        except Exception as error:
+            failures[obj["key"]] = str(error)
+            continue
+        transfers.append(transfer)
+        tasks.extend((transfer, part) for part in transfer["pending_parts"])
+        if not transfer["pending_parts"]:
+            _finish_transfer(transfer, state)
+
+    lock = threading.Lock()
+    progress = {"bytes": 0, "objects": 0, "reported": time.monotonic()}
+
+    def run(task):
+        transfer, part = task
+        key = transfer["object"]["key"]
+        if key in failures:
+            return
+        try:
+            received = _download_part(transfer, part)
+        except Exception as error:
+            with lock:
+                failures.setdefault(key, str(error))
+            return
+        with lock:
+            progress["bytes"] += received
+            transfer["pending_parts"].discard(part)
+            transfer["done_parts"].add(part)
+            if transfer["pending_parts"]:
+                _save_resume_info(transfer)
+                return
+            _finish_transfer(transfer, state)
+            progress["objects"] += 1
+            if progress["objects"] % STATE_SAVE_INTERVAL == 0:
+                _save_state(state)
+            if time.monotonic() - progress["reported"] >= 10:
+                progress["reported"] = time.monotonic()
+                print(f"{progress['objects']} / {len(transfers)} objects, {progress['bytes'] / 1e9:.2f} GB")
+
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        for _ in executor.map(run, tasks):
+            pass
+    return progress["bytes"], failures
+
+
+def _prepare_transfer(obj):
+    """
+    Create (or resume) the partial file of an object. Ranged parts are only used for S3 objects larger than
+    PART_SIZE; a partial download is resumed if its ETag, size and part size match the resume file.
+    """
+    path = _local_path(obj["key"])
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    part_path = path + PART_SUFFIX
+    part_size = PART_SIZE if SOURCE == 's3' and obj["size"] > PART_SIZE else max(obj["size"], 1)
+    part_count = max((obj["size"] + part_size - 1) // part_size, 1)
+
+    done_parts = set()
+    resume = _load_resume_info(part_path)
+    if (resume and os.path.exists(part_path) and resume["etag"] == obj["etag"]
+            and resume["size"] == obj["size"] and resume["part_size"] == part_size):
+        done_parts = set(resume["done"])
+    else:
+        with open(part_path, 'wb') as f:
+            f.truncate(obj["size"])
+
+    return {
+        "object": obj,
+        "path": path,
+        "part_path": part_path,
+        "part_size": part_size,
+        "done_parts": done_parts,
+        "pending_parts": set(range(part_count)) - done_parts
+    }
+
+
+def _download_part(transfer, part):
+    """
+    Stream one part (or the whole object) into its place in the partial file; returns the bytes received.
+    """
+    obj = transfer["object"]
+    offset = part * transfer["part_size"]
+    length = min(transfer["part_size"], obj["size"] - offset)
+    if length <= 0:
+        return 0
+
+    ranged = length < obj["size"]
+    buffer = bytearray(READ_BUFFER_SIZE)
+    view = memoryview(buffer)
+    for attempt in range(3):
+        received = 0
+        try:
+            with open(transfer["part_path"], 'r+b') as f:
+                f.seek(offset)
+                with _open_object(obj, offset if ranged else None, length if ranged else None) as response:
+                    while received < length:
+                        read = response.readinto(view[:min(READ_BUFFER_SIZE, length - received)])
+                        if not read:
+                            raise ConnectionError(f"Connection closed after {received} of {length} bytes")
+                        f.write(view[:read])
+                        received += read
+            return received
+        except (http.client.HTTPException, ConnectionError, TimeoutError):
+            _drop_connection()
+            if attempt == 2:
+                raise
+    return 0
+
+
+def _finish_transfer(transfer, state):
+    """
+    Move a complete partial file into place and record the object in state.
+    """
+    os.replace(transfer["part_path"], transfer["path"])
+    resume_path = transfer["part_path"] + '.json'
+    if os.path.exists(resume_path):
+        os.remove(resume_path)
+    state[transfer["object"]["key"]] = {"etag": transfer["object"]["etag"], "size": transfer["object"]["size"]}
+
+
+def _is_current(obj, entry):
+    """
+    True if the object was mirrored with the same ETag and size and the local file is still there.
+    """
+    if not entry or entry["etag"] != obj["etag"] or entry["size"] != obj["size"]:
+        return False
+    path = _local_path(obj["key"])
+    return os.path.exists(path) and os.path.getsize(path) == obj["size"]
+
+
+def _local_path(key):
+    """
+    Local path of an object key (relative to MIRROR_PREFIX). Keys that resolve outside LOCAL_DIRECTORY
+    (e.g. containing '..') are rejected.
+    """
+    relative = key[len(MIRROR_PREFIX):] if key.startswith(MIRROR_PREFIX) else key
+    root = os.path.realpath(LOCAL_DIRECTORY)
+    path = os.path.realpath(os.path.join(root, *relative.lstrip('/').split('/')))
+    if path == root or os.path.commonpath([root, path]) != root:
+        raise Exception(f"Object key {key!r} resolves outside {LOCAL_DIRECTORY}")
+    return path
+
+
+def _load_state():
+    """
+    Load the mirror state (key -> ETag and size).
+    """
+    path = os.path.join(LOCAL_DIRECTORY, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_state(state):
+    """
+    Write the mirror state atomically.
+    """
+    os.makedirs(LOCAL_DIRECTORY, exist_ok=True)
+    path = os.path.join(LOCAL_DIRECTORY, STATE_FILE)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(state, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _load_resume_info(part_path):
+    """
+    Completed parts of a partial download (None if there is none).
+    """
+    if not os.path.exists(part_path + '.json'):
+        return None
+    with open(part_path + '.json') as f:
+        return json.load(f)
+
+
+def _save_resume_info(transfer):
+    """
+    Record the completed parts of a partial download atomically.
+    """
+    path = transfer["part_path"] + '.json'
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump({
+            "etag": transfer["object"]["etag"],
+            "size": transfer["object"]["size"],
+            "part_size": transfer["part_size"],
+            "done": sorted(transfer["done_parts"])
+        }, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _list_s3_directory(prefix):
+    """
+    ListObjectsV2 of one prefix with '/' as delimiter, following continuation tokens.
+    Returns (objects, common prefixes).
+    """
+    objects, subdirectories = [], []
+    token = None
+    while True:
+        query = {"list-type": "2", "prefix": prefix, "delimiter": "/", "max-keys": "1000"}
+        if token:
+            query["continuation-token"] = token
+        status, body = _s3_request("GET", "", query=query)
+        if status != 200:
+            raise Exception(f"ListObjectsV2 {prefix} failed with HTTP {status}: {body[:200]!r}")
+
+        root = ET.fromstring(body)
+        for content in root.iter(f"{S3_NAMESPACE}Contents"):
+            objects.append({
+                "key": content.findtext(f"{S3_NAMESPACE}Key"),
+                "size": int(content.findtext(f"{S3_NAMESPACE}Size")),
+                "etag": content.findtext(f"{S3_NAMESPACE}ETag").strip('"')
+            })
+        subdirectories.extend(
+            common_prefix.findtext(f"{S3_NAMESPACE}Prefix") for common_prefix in root.iter(f"{S3_NAMESPACE}CommonPrefixes")
+        )
+        if root.findtext(f"{S3_NAMESPACE}IsTruncated") != 'true':
+            return objects, subdirectories
+        token = root.findtext(f"{S3_NAMESPACE}NextContinuationToken")
+
+
+def _list_netstorage_directory(prefix):
+    """
+    NetStorage 'dir' action of one directory. Returns (objects, subdirectories); the MD5 of a file
+    (or its size and mtime, if no MD5 is stored) is used as its ETag.
+    """
+    path = '/' + prefix.strip('/')
+    status, body = _netstorage_request("GET", path, "version=1&action=dir&format=xml")
+    if status != 200:
+        raise Exception(f"NetStorage dir {path} failed with HTTP {status}: {body[:200]!r}")
+
+    objects, subdirectories = [], []
+    root = ET.fromstring(body)
+    for entry in root.iter('file'):
+        key = f"{prefix.strip('/')}/{entry.get('name')}"
+        if entry.get('type') == 'dir':
+            subdirectories.append(key + '/')
+        elif entry.get('type') == 'file':
+            objects.append({
+                "key": key,
+                "size": int(entry.get('size', 0)),
+                "etag": entry.get('md5') or f"{entry.get('size')}-{entry.get('mtime')}"
+            })
+    return objects, subdirectories
+
+
+class _Response:
+    """
+    Streaming response of a keep-alive connection; the remaining body is drained when the block is left,
+    so the connection can be reused.
+    """
+
+    def __init__(self, response):
+        self.response = response
+
+    def __enter__(self):
+        return self.response
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.response.read()
+        return False
+
+
+def _open_object(obj, offset, length):
+    """
+    Start a GET of an object (a byte range if offset is given) and return the streaming response.
+    Ranged requests carry If-Match, so a part of a newer version of the object is never mixed in.
+    """
+    headers = {}
+    if offset is not None:
+        headers["Range"] = f"bytes={offset}-{offset + length - 1}"
+        headers["If-Match"] = f'"{obj["etag"]}"'
+
+    response = (_s3_send("GET", obj["key"], headers=headers) if SOURCE == 's3'
+                else _netstorage_send("GET", '/' + obj["key"].lstrip('/'), "version=1&action=download", headers=headers))
+
+    if response.status == 412:
+        response.read()
+        raise Exception(f"{obj['key']} changed during the mirror (ETag mismatch); run the mirror again")
+    if response.status not in (200, 206):
+        body = response.read()
+        raise Exception(f"GET {obj['key']} failed with HTTP {response.status}: {body[:200]!r}")
+    if offset is not None and response.status != 206:
+        # The server ignored Range and sent the whole object; writing it at the part offset would corrupt the file
+        response.read()
+        raise Exception(f"GET {obj['key']} ignored the byte range (HTTP {response.status}); set PART_SIZE above the "
+                        f"largest object to download whole objects")
+    return _Response(response)
+
+
+def _s3_request(method, key, query=None, headers=None):
+    """
+    Signed S3 request; returns (status, body).
+    """
+    response = _s3_send(method, key, query=query, headers=headers)
+    return response.status, response.read()
+
+
+def _s3_send(method, key, query=None, headers=None):
+    """
+    Send a signed S3 request on a thread-local keep-alive connection and return the response (body not read).
+    Without an endpoint, virtual-hosted HTTPS requests are used; with one, path-style requests to the endpoint.
+    """
+    if s3_bucket.get("endpoint"):
+        endpoint = urllib.parse.urlsplit(s3_bucket["endpoint"])
+        scheme, host = endpoint.scheme, endpoint.netloc
+        path = "/" + urllib.parse.quote(f"{s3_bucket['bucket_name']}/{key.lstrip('/')}", safe='/~')
+    else:
+        scheme, host = "https", f"{s3_bucket['bucket_name']}.{s3_bucket['host']}"
+        path = "/" + urllib.parse.quote(key.lstrip('/'), safe='/~')
+
+    canonical_query = "&".join(
+        f"{urllib.parse.quote(name, safe='-_.~')}={urllib.parse.quote(value, safe='-_.~')}"
+        for name, value in sorted((query or {}).items())
+    )
+    headers = dict(headers or {})
+    headers.update(_sign_s3_request(method, host, path, canonical_query, headers))
+    return _send(scheme, host, method, f"{path}?{canonical_query}" if canonical_query else path, headers)
+
+
+def _sign_s3_request(method, host, path, canonical_query, headers):
+    """
+    Return the headers that sign an S3 request (empty payload) with AWS Signature Version 4.
+    """
+    region = s3_bucket.get("region") or s3_bucket["host"].split('.')[0]
+    now = datetime.now(UTC)
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    date_stamp = now.strftime('%Y%m%d')
+    payload_hash = hashlib.sha256(b"").hexdigest()
+
+    signed = {"host": host, "x-amz-content-sha256": payload_hash, "x-amz-date": amz_date}
+    signed.update({name.lower(): value for name, value in headers.items() if name.lower().startswith("x-amz-")})
+    signed_headers = ";".join(sorted(signed))
+    canonical_headers = "".join(f"{name}:{signed[name]}\n" for name in sorted(signed))
+    canonical_request = f"{method}\n{path}\n{canonical_query}\n{canonical_headers}\n{signed_headers}\n{payload_hash}"
+
+    scope = f"{date_stamp}/{region}/s3/aws4_request"
+    string_to_sign = f"AWS4-HMAC-SHA256\n{amz_date}\n{scope}\n{hashlib.sha256(canonical_request.encode()).hexdigest()}"
+
+    signing_key = f"AWS4{s3_bucket['secret_key']}".encode()
+    for part in (date_stamp, region, "s3", "aws4_request"):
+        signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+    signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    return {
+        "x-amz-date": amz_date,
+        "x-amz-content-sha256": payload_hash,
+        "Authorization": f"AWS4-HMAC-SHA256 Credential={s3_bucket['access_key']}/{scope}, "
+                         f"SignedHeaders={signed_headers}, Signature={signature}"
+    }
+
+
+def _netstorage_request(method, path, action):
+    """
+    Signed NetStorage HTTP API request; returns (status, body).
+    """
+    response = _netstorage_send(method, path, action)
+    return response.status, response.read()
+
+
+def _netstorage_send(method, path, action, headers=None):
+    """
+    Send a NetStorage HTTP API request (X-Akamai-ACS-* authentication, version 5 / HMAC-SHA256)
+    and return the response (body not read).
+    """
+    quoted_path = urllib.parse.quote(path, safe='/~')
+    auth_data = f"5, 0.0.0.0, 0.0.0.0, {int(time.time())}, {uuid.uuid4().int % 10 ** 9}, {netstorage['key_name']}"
+    sign_string = f"{quoted_path}\nx-akamai-acs-action:{action}\n"
+    signature = base64.b64encode(
+        hmac.new(netstorage["key"].encode(), (auth_data + sign_string).encode(), hashlib.sha256).digest()
+    ).decode()
+
+    headers = dict(headers or {})
+    headers.update({
+        "X-Akamai-ACS-Action": action,
+        "X-Akamai-ACS-Auth-Data": auth_data,
+        "X-Akamai-ACS-Auth-Sign": signature
+    })
+    return _send("https", netstorage["host"], method, quoted_path, headers)
+
+
+def _send(scheme, host, method, target, headers):
+    """
+    Send a request on the thread-local keep-alive connection to host (reconnecting once if it was closed).
+    """
+    pool = getattr(_connections, 'pool', None)
+    if pool is None:
+        pool = _connections.pool = {}
+    for attempt in range(2):
+        connection = pool.get(host)
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            connection = pool[host] = connection_class(host, timeout=60)
+        try:
+            connection.request(method, target, headers=headers)
+            return connection.getresponse()
+        except (http.client.HTTPException, ConnectionError):
+            connection.close()
+            pool.pop(host, None)
+            if attempt == 1:
+                raise
+    return None
+
+
+def _drop_connection():
+    """
+    Close the connections of the current thread (after a failed transfer).
+    """
+    for connection in getattr(_connections, 'pool', {}).values():
+        connection.close()
+    _connections.pool = {}
+
+
+if __name__ == '__main__':
+    main()
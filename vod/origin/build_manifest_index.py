@@ -0,0 +1,188 @@
+import json
+import math
+import os
+import re
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Titles of the origin (title ID -> HLS master playlist of the encoding output): local paths (e.g. mirrors made with
+# vod/mirror) or https:// URLs.
+TITLES = {
+    'sample-title': 'mirror/stream.m3u8'
+}
+
+# One resource index per title (<title ID>.json), read by manifest_origin.py.
+INDEX_DIRECTORY = 'manifest_index'
+
+# Segment sizes (local file size or HEAD Content-Length) are read MAX_WORKERS at a time for the bandwidth attributes.
+MAX_WORKERS = 32
+
+AUDIO_CODEC_PREFIXES = ('mp4a', 'ac-3', 'ec-3', 'ac-4', 'opus', 'flac')
+
+
+def main():
+    """
+    Build the resource index of every title in TITLES. Steps:
+      1) Parse the master playlist: video variants (RESOLUTION, CODECS, FRAME-RATE) and audio renditions (EXT-X-MEDIA)
+      2) Parse every media playlist: init segment and segments with their durations
+      3) Measure peak / average bandwidth of every rendition from its segment sizes
+      4) Write INDEX_DIRECTORY/<title ID>.json
+    """
+    os.makedirs(INDEX_DIRECTORY, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for title, master_location in TITLES.items():
+            index = build_index(title, master_location, executor)
+            path = os.path.join(INDEX_DIRECTORY, f"{title}.json")
+            with open(f"{path}.tmp", 'w') as f:
+                json.dump(index, f, indent=2)
+            os.replace(f"{path}.tmp", path)
+            print(f"{title}: {len(index['renditions'])} renditions, {index['duration']:.3f} s -> {path}")
+
+
+def build_index(title, master_location, executor):
+    """
+    Resource index of one title: its renditions with the attributes needed to render HLS / DASH manifests.
+    Segment / init URIs are relative to the directory of the master playlist (base_url for https:// titles).
+    """
+    text = _read_text(master_location)
+    renditions = []
+    audio_codecs = {}
+    pending = None
+    for line in text.splitlines():
+        if line.startswith('#EXT-X-MEDIA:') and 'TYPE=AUDIO' in line:
+            attributes = _attributes(line)
+            if 'URI' not in attributes:
+                continue
+            renditions.append({
+                "type": 'audio',
+                "uri": attributes["URI"],
+                "group": attributes.get("GROUP-ID"),
+                "language": attributes.get("LANGUAGE"),
+                "name": attributes.get("NAME"),
+                "channels": attributes.get("CHANNELS"),
+                "default": attributes.get("DEFAULT") == 'YES'
+            })
+        elif line.startswith('#EXT-X-STREAM-INF:'):
+            pending = _attributes(line)
+        elif pending is not None and line.strip() and not line.startswith('#'):
+            codecs = [codec.strip() for codec in pending.get("CODECS", '').split(',') if codec.strip()]
+            video_codecs = [codec for codec in codecs if not codec.startswith(AUDIO_CODEC_PREFIXES)]
+            for codec in codecs:
+                if codec not in video_codecs and pending.get("AUDIO"):
+                    audio_codecs.setdefault(pending["AUDIO"], codec)
+            if 'RESOLUTION' in pending and video_codecs:
+                width, height = (int(value) for value in pending["RESOLUTION"].split('x'))
+                renditions.append({
+                    "type": 'video',
+                    "uri": line.strip(),
+                    "group": pending.get("AUDIO"),
+                    "codecs": video_codecs[0],
+                    "width": width,
+                    "height": height,
+                    "frame_rate": float(pending["FRAME-RATE"]) if 'FRAME-RATE' in pending else None
+                })
+            pending = None
+
+    seen = set()
+    renditions = [rendition for rendition in renditions if not (rendition["uri"] in seen or seen.add(rendition["uri"]))]
+    for rendition in renditions:
+        if rendition["type"] == 'audio':
+            rendition["codecs"] = audio_codecs.get(rendition["group"], 'mp4a.40.2')
+        rendition.update(_load_rendition(master_location, rendition["uri"], executor))
+        rendition["id"] = re.sub(r'[^A-Za-z0-9_.-]+', '_', os.path.splitext(urllib.parse.urlparse(rendition["uri"]).path)[0])
+        match = re.search(r'_(\d+)$', rendition["id"])
+        # Nominal bitrate from the samples' playlist names (video_<bitrate>.m3u8 / audio_<bitrate>.m3u8).
+        rendition["bitrate"] = int(match.group(1)) if match else rendition["average_bandwidth"]
+
+    if not any(rendition["type"] == 'video' for rendition in renditions):
+        raise Exception(f"{master_location}: no video variants (RESOLUTION and a video codec in CODECS)")
+    return {
+        "title": title,
+        "base_url": master_location.rsplit('/', 1)[0] + '/' if master_location.startswith(('http://', 'https://'))
+        else None,
+        "duration": max(rendition["duration"] for rendition in renditions),
+        "renditions": renditions
+    }
+
+
+def _load_rendition(master_location, uri, executor):
+    """
+    Init segment, segments ([URI, duration]), target duration and peak / average bandwidth of one media playlist.
+    """
+    playlist_location = _resolve(master_location, uri)
+    text = _read_text(playlist_location)
+    init_uri = re.search(r'#EXT-X-MAP:URI="([^"]+)"', text)
+    if not init_uri or '#EXT-X-BYTERANGE' in text:
+        raise Exception(f"{playlist_location} is not a segmented fMP4 playlist")
+    segments = []
+    duration = None
+    for line in text.splitlines():
+        if line.startswith('#EXTINF:'):
+            duration = float(line[len('#EXTINF:'):].split(',')[0])
+        elif line.strip() and not line.startswith('#') and duration is not None:
+            segments.append([_relative(master_location, _resolve(playlist_location, line.strip())), duration])
+            duration = None
+
+    sizes = list(executor.map(_size, [_resolve(master_location, segment[0]) for segment in segments]))
+    total_duration = sum(segment[1] for segment in segments)
+    return {
+        "init": _relative(master_location, _resolve(playlist_location, init_uri.group(1))),
+        "target_duration": max(math.ceil(segment[1]) for segment in segments),
+        "duration": total_duration,
+        "bandwidth": max(math.ceil(size * 8 / segment[1]) for size, segment in zip(sizes, segments, strict=True)
+                         if segment[1] > 0),
+        "average_bandwidth": math.ceil(sum(sizes) * 8 / total_duration),
+        "segments": segments
+    }
+
+
+def _attributes(line):
+    """
+    Attribute list of an HLS tag line (quoted values unquoted).
+    """
+    return {name: value.strip('"') for name, value in re.findall(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)', line.split(':', 1)[1])}
+
+
+def _relative(master_location, location):
+    """
+    Location of a segment / playlist relative to the directory of the master playlist.
+    """
+    if master_location.startswith(('http://', 'https://')):
+        base = master_location.rsplit('/', 1)[0] + '/'
+        return location[len(base):] if location.startswith(base) else location
+    return os.path.relpath(location, os.path.dirname(master_location) or '.').replace(os.sep, '/')
+
+
+def _resolve(base, reference):
+    """
+    Resolve a playlist reference against a local path or URL.
+    """
+    if base.startswith(('http://', 'https://')):
+        return urllib.parse.urljoin(base, reference)
+    return os.path.normpath(os.path.join(os.path.dirname(base), urllib.parse.unquote(reference)))
+
+
+def _read_text(location):
+    """
+    Text of a local file or an https:// object.
+    """
+    if not location.startswith(('http://', 'https://')):
+        with open(location, encoding='utf-8') as f:
+            return f.read()
+    with urllib.request.urlopen(location) as response:
+        return response.read().decode('utf-8')
+
+
+def _size(location):
+    """
+    Size in bytes of a local file or an https:// object (HEAD request).
+    """
+    if not location.startswith(('http://', 'https://')):
+        return os.path.getsize(location)
+    with urllib.request.urlopen(urllib.request.Request(location, method='HEAD')) as response:
+        return int(response.headers["Content-Length"])
+
+
+if __name__ == '__main__':
+    main()
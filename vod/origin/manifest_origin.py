@@ -0,0 +1,459 @@
+import asyncio
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import re
+import time
+import urllib.parse
+from collections import OrderedDict
+from xml.sax.saxutils import escape, quoteattr
+
+# Address the origin listens on (put it behind the CDN; manifests are requested as /<title ID>/<resource>).
+LISTEN_HOST = '0.0.0.0'
+LISTEN_PORT = 8081
+
+# Resource indexes written by build_manifest_index.py (<title ID>.json). Changed files are reloaded within
+# INDEX_CHECK_INTERVAL seconds and the cached manifests of that title are dropped.
+INDEX_DIRECTORY = 'manifest_index'
+INDEX_CHECK_INTERVAL = 5.0
+
+# Base URL of the segments of a title ({title} is replaced) for indexes built from a local mirror; indexes built from
+# an https:// master playlist use its directory.
+SEGMENT_BASE_URL = 'https://<INSERT_YOUR_BUCKET_NAME>.<INSERT_YOUR_OUTPUT_HOST_NAME>/output/{title}/'
+
+# Rendered responses kept in memory (LRU by title, resource and filter).
+CACHE_SIZE = 10000
+# Cache-Control of the manifests (VOD titles: the index changes only when a title is re-encoded).
+CACHE_CONTROL = 'public, max-age=300, stale-while-revalidate=60'
+
+# Rendition filters. Query parameters (e.g. ?max_height=720&max_audio_bitrate=64000) select the renditions explicitly;
+# without them, the filter of the first USER_AGENT_RULES entry whose pattern matches the User-Agent is used and the
+# response varies by User-Agent. If a filter removes every video (or audio) rendition, the lowest one is kept.
+FILTER_PARAMETERS = {
+    "max_height": int,
+    "min_height": int,
+    "max_video_bitrate": int,
+    "max_audio_bitrate": int,
+    "video_codecs": lambda value: tuple(sorted(value.split(','))),
+    "audio_codecs": lambda value: tuple(sorted(value.split(','))),
+    "renditions": lambda value: tuple(sorted(value.split(',')))
+}
+USER_AGENT_RULES = [
+    # Older set-top boxes / TVs: no 1080p.
+    {"name": "legacy-stb", "pattern": r"(?i)\b(SMART-TV|SmartTV|Tizen [23]\.|Web0S|HbbTV/1\.[1-4]|STB)\b",
+     "filter": {"max_height": 720}},
+    # Phones: up to 720p and only the 64 kbps AAC rendition.
+    {"name": "mobile", "pattern": r"(?i)\b(iPhone|Android.*Mobile|Mobile Safari)\b",
+     "filter": {"max_height": 720, "max_audio_bitrate": 64000}}
+]
+USER_AGENT_CACHE_SIZE = 10000
+
+# Request statistics (hits, misses, handling time percentiles) are printed every STATS_INTERVAL seconds.
+STATS_INTERVAL = 60.0
+
+MAX_HEADER_SIZE = 16 * 1024
+FILTERED_RESOURCES = ('master.m3u8', 'manifest.mpd')
+CONTENT_TYPES = {"m3u8": 'application/vnd.apple.mpegurl', "mpd": 'application/dash+xml'}
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def main():
+    """
+    Run the just-in-time manifest origin. Steps:
+      1) Load the resource indexes of INDEX_DIRECTORY on first request (and reload changed ones)
+      2) For every request, choose the rendition filter from the query or the USER_AGENT_RULES
+      3) Serve the rendered manifest from the LRU cache, or render it (HLS master / media playlist, DASH MPD)
+         and cache it, with Cache-Control / ETag / Vary headers and If-None-Match support
+    """
+    origin = ManifestOrigin()
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(origin.serve_forever())
+
+
+class ManifestOrigin:
+    """
+    Asyncio HTTP/1.1 origin that renders HLS / DASH manifests on request from the resource indexes.
+    Routes: /<title>/master.m3u8, /<title>/<rendition ID>.m3u8, /<title>/manifest.mpd (GET / HEAD).
+    """
+
+    def __init__(self, index_directory=INDEX_DIRECTORY, host=LISTEN_HOST, port=LISTEN_PORT, cache_size=CACHE_SIZE):
+        self.index_directory = index_directory
+        self.host = host
+        self.port = port
+        self.cache_size = cache_size
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "not_modified": 0, "errors": 0}
+        self._latencies = []
+        self._cache = OrderedDict()
+        self._user_agents = OrderedDict()
+        self._indexes = {}
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEADER_SIZE)
+        self.port = self._server.sockets[0].getsockname()[1]
+        asyncio.get_running_loop().create_task(self._watch_indexes())
+        return self
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Manifest origin listening on {self.host}:{self.port} (indexes: {self.index_directory}/)")
+        asyncio.get_running_loop().create_task(self._print_stats())
+        async with self._server:
+            await self._server.serve_forever()
+
+    def respond(self, method, target, headers):
+        """
+        Complete HTTP response (bytes) for one request. Cache hits are a dictionary lookup of the rendered response.
+        """
+        path, _, query = target.partition('?')
+        parts = path.strip('/').split('/')
+        if method not in ('GET', 'HEAD'):
+            return _response(405, b'')
+        if len(parts) != 2 or '.' not in parts[1]:
+            return _response(404, b'')
+        title, resource = parts
+        if resource in FILTERED_RESOURCES:
+            manifest_filter, vary = self._filter(query, headers.get('user-agent', ''))
+            if manifest_filter is None:
+                return _response(400, b'')
+        else:
+            # Media playlists do not depend on the filter.
+            manifest_filter, vary = (), False
+        key = (title, resource, manifest_filter, vary)
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            entry = self._render(title, resource, dict(manifest_filter), vary)
+            if entry is None:
+                return _response(404, b'')
+            self._cache[key] = entry
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        if headers.get('if-none-match') == entry["etag"]:
+            self.stats["not_modified"] += 1
+            return entry["not_modified"]
+        return entry["head"] if method == 'HEAD' else entry["response"]
+
+    def invalidate(self, title):
+        """
+        Drop the index and the cached manifests of a title.
+        """
+        self._indexes.pop(title, None)
+        for key in [key for key in self._cache if key[0] == title]:
+            del self._cache[key]
+
+    def _filter(self, query, user_agent):
+        """
+        (filter as a sorted tuple of items, varies by User-Agent) of a request; (None, False) for invalid parameters.
+        """
+        if query:
+            try:
+                parameters = urllib.parse.parse_qs(query)
+                manifest_filter = {name: FILTER_PARAMETERS[name](values[-1]) for name, values in parameters.items()
+                                   if name in FILTER_PARAMETERS}
+            except ValueError:
+                return None, False
+            if manifest_filter:
+                return tuple(sorted(manifest_filter.items())), False
+        if not USER_AGENT_RULES:
+            return (), False
+
+        manifest_filter = self._user_agents.get(user_agent)
+        if manifest_filter is None:
+            rule = next((rule for rule in USER_AGENT_RULES if re.search(rule["pattern"], user_agent)), None)
+            manifest_filter = tuple(sorted(rule["filter"].items())) if rule else ()
+            self._user_agents[user_agent] = manifest_filter
+            while len(self._user_agents) > USER_AGENT_CACHE_SIZE:
+                self._user_agents.popitem(last=False)
+        return manifest_filter, True
+
+    def _render(self, title, resource, manifest_filter, vary):
+        """
+        Rendered response of a resource ({"response", "head", "not_modified", "etag"}), or None if it does not exist.
+        """
+        index = self._index(title)
+        if index is None:
+            return None
+        base_url = index.get("base_url") or SEGMENT_BASE_URL.format(title=title)
+        if resource == 'master.m3u8':
+            body = render_master_playlist(select_renditions(index["renditions"], manifest_filter))
+        elif resource == 'manifest.mpd':
+            body = render_mpd(index, select_renditions(index["renditions"], manifest_filter), base_url)
+        elif resource.endswith('.m3u8'):
+            rendition = next((rendition for rendition in index["renditions"]
+                              if f"{rendition['id']}.m3u8" == resource), None)
+            if rendition is None:
+                return None
+            body = render_media_playlist(rendition, base_url)
+        else:
+            return None
+
+        body = body.encode('utf-8')
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        headers = [f"Content-Type: {CONTENT_TYPES[resource.rsplit('.', 1)[1]]}", f"Cache-Control: {CACHE_CONTROL}",
+                   f"ETag: {etag}", "Access-Control-Allow-Origin: *"]
+        if vary:
+            headers.append("Vary: User-Agent")
+        return {
+            "etag": etag,
+            "response": _response(200, body, headers),
+            "head": _response(200, b'', headers, content_length=len(body)),
+            "not_modified": _response(304, b'', [header for header in headers if not header.startswith('Content-Type')],
+                                      content_length=None)
+        }
+
+    def _index(self, title):
+        """
+        Parsed resource index of a title (loaded on first use), or None.
+        """
+        loaded = self._indexes.get(title)
+        if loaded is not None:
+            return loaded[1]
+        if not re.fullmatch(r'[A-Za-z0-9_.-]+', title) or title.startswith('.'):
+            return None
+        path = os.path.join(self.index_directory, f"{title}.json")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            with open(path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._indexes[title] = (mtime, index)
+        return index
+
+    async def _watch_indexes(self):
+        while True:
+            await asyncio.sleep(INDEX_CHECK_INTERVAL)
+            for title, (mtime, _) in list(self._indexes.items()):
+                try:
+                    current = os.stat(os.path.join(self.index_directory, f"{title}.json")).st_mtime_ns
+                except OSError:
+                    current = None
+                if current != mtime:
+                    self.invalidate(title)
+                    print(f"Index of {title} changed, cached manifests dropped")
+
+    async def _print_stats(self):
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            latencies, self._latencies = sorted(self._latencies), []
+            if not latencies:
+                continue
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            print(f"{len(latencies)} requests, hits: {self.stats['hits']}, misses: {self.stats['misses']}, "
+                  f"cached: {len(self._cache)}, handling p50: {p50:.3f} ms, p99: {p99:.3f} ms")
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                started = time.perf_counter()
+                self.stats["requests"] += 1
+                try:
+                    request_line, *header_lines = head.decode('latin-1').split("\r\n")
+                    method, target, version = request_line.split(" ", 2)
+                    headers = {name.strip().lower(): value.strip()
+                               for name, _, value in (line.partition(":") for line in header_lines if line)}
+                    response = self.respond(method, target, headers)
+                except ValueError:
+                    self.stats["errors"] += 1
+                    writer.write(_response(400, b'', close=True))
+                    break
+                writer.write(response)
+                self._latencies.append(time.perf_counter() - started)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close' or version == 'HTTP/1.0':
+                    break
+        finally:
+            writer.close()
+
+
+def select_renditions(renditions, manifest_filter):
+    """
+    Renditions that pass the filter; the lowest video / audio rendition is kept if none of its type passes.
+    """
+    def allowed(rendition):
+        if "renditions" in manifest_filter and rendition["id"] not in manifest_filter["renditions"]:
+            return False
+        if rendition["type"] == 'video':
+            return (rendition["height"] <= manifest_filter.get("max_height", rendition["height"])
+                    and rendition["height"] >= manifest_filter.get("min_height", 0)
+                    and rendition["bitrate"] <= manifest_filter.get("max_video_bitrate", rendition["bitrate"])
+                    and rendition["codecs"].startswith(manifest_filter.get("video_codecs", ('',))))
+        return (rendition["bitrate"] <= manifest_filter.get("max_audio_bitrate", rendition["bitrate"])
+                and rendition["codecs"].startswith(manifest_filter.get("audio_codecs", ('',))))
+
+    selected = [rendition for rendition in renditions if allowed(rendition)]
+    for rendition_type in ('video', 'audio'):
+        candidates = [rendition for rendition in renditions if rendition["type"] == rendition_type]
+        if candidates and not any(rendition["type"] == rendition_type for rendition in selected):
+            selected.append(min(candidates, key=lambda rendition: rendition["bitrate"]))
+    return selected
+
+
+def render_master_playlist(renditions):
+    """
+    HLS master playlist of the selected renditions. BANDWIDTH of a variant is its video bandwidth plus the highest
+    bandwidth of its (selected) audio group.
+    """
+    lines = ["#EXTM3U", "#EXT-X-VERSION:6", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    audio_groups = {}
+    for rendition in renditions:
+        if rendition["type"] == 'audio':
+            audio_groups.setdefault(rendition["group"], []).append(rendition)
+    for group, members in audio_groups.items():
+        default = next((member for member in members if member["default"]), members[0])
+        for member in members:
+            flag = 'YES' if member is default else 'NO'
+            attributes = [f'TYPE=AUDIO,GROUP-ID="{group}"']
+            if member["language"]:
+                attributes.append(f'LANGUAGE="{member["language"]}"')
+            attributes.append(f'NAME="{member["name"] or member["id"]}",DEFAULT={flag},AUTOSELECT={flag}')
+            if member["channels"]:
+                attributes.append(f'CHANNELS="{member["channels"]}"')
+            attributes.append(f'URI="{member["id"]}.m3u8"')
+            lines.append(f"#EXT-X-MEDIA:{','.join(attributes)}")
+
+    for video in sorted((rendition for rendition in renditions if rendition["type"] == 'video'),
+                        key=lambda rendition: rendition["bandwidth"]):
+        audios = audio_groups.get(video["group"], [])
+        bandwidth = video["bandwidth"] + max((audio["bandwidth"] for audio in audios), default=0)
+        average_bandwidth = video["average_bandwidth"] + max((audio["average_bandwidth"] for audio in audios), default=0)
+        codecs = ",".join(dict.fromkeys([video["codecs"], *(audio["codecs"] for audio in audios)]))
+        attributes = [f"BANDWIDTH={bandwidth}", f"AVERAGE-BANDWIDTH={average_bandwidth}", f'CODECS="{codecs}"',
+                      f"RESOLUTION={video['width']}x{video['height']}"]
+        if video["frame_rate"]:
+            attributes.append(f"FRAME-RATE={video['frame_rate']:.3f}")
+        if audios:
+            attributes.append(f'AUDIO="{video["group"]}"')
+        lines.append(f"#EXT-X-STREAM-INF:{','.join(attributes)}")
+        lines.append(f"{video['id']}.m3u8")
+    return "\n".join(lines) + "\n"
+
+
+def render_media_playlist(rendition, base_url):
+    """
+    HLS media playlist of one rendition with absolute segment URLs.
+    """
+    lines = ["#EXTM3U", "#EXT-X-VERSION:6", f"#EXT-X-TARGETDURATION:{rendition['target_duration']}",
+             "#EXT-X-MEDIA-SEQUENCE:0", "#EXT-X-PLAYLIST-TYPE:VOD", "#EXT-X-INDEPENDENT-SEGMENTS",
+             f'#EXT-X-MAP:URI="{urllib.parse.urljoin(base_url, rendition["init"])}"']
+    for uri, duration in rendition["segments"]:
+        lines.append(f"#EXTINF:{duration:.6f},")
+        lines.append(urllib.parse.urljoin(base_url, uri))
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+def render_mpd(index, renditions, base_url):
+    """
+    Static DASH MPD of the selected renditions: SegmentTemplate with a SegmentTimeline when the segment names are
+    numbered consecutively, otherwise a SegmentList.
+    """
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" profiles="urn:mpeg:dash:profile:isoff-live:2011" type="static" '
+        f'mediaPresentationDuration="PT{index["duration"]:.3f}S" minBufferTime="PT2S">',
+        f'  <BaseURL>{escape(base_url)}</BaseURL>',
+        '  <Period id="0" start="PT0S">'
+    ]
+    adaptation_sets = {}
+    for rendition in renditions:
+        key = ('video',) if rendition["type"] == 'video' else ('audio', rendition["language"])
+        adaptation_sets.setdefault(key, []).append(rendition)
+    for key, members in sorted(adaptation_sets.items(), key=lambda item: (item[0][0] != 'video', item[0][1:])):
+        language = f' lang={quoteattr(key[1])}' if key[0] == 'audio' and key[1] else ''
+        lines.append(f'    <AdaptationSet contentType="{key[0]}" mimeType="{key[0]}/mp4" segmentAlignment="true" '
+                     f'startWithSAP="1"{language}>')
+        for rendition in sorted(members, key=lambda member: member["bandwidth"]):
+            attributes = (f'width="{rendition["width"]}" height="{rendition["height"]}"'
+                          if rendition["type"] == 'video' else '')
+            if rendition["type"] == 'video' and rendition["frame_rate"]:
+                attributes += f' frameRate="{rendition["frame_rate"]:g}"'
+            lines.append(f'      <Representation id={quoteattr(rendition["id"])} bandwidth="{rendition["bandwidth"]}" '
+                         f'codecs="{rendition["codecs"]}" {attributes}>'.replace(' >', '>'))
+            lines.extend(_segment_lines(rendition))
+            lines.append('      </Representation>')
+        lines.append('    </AdaptationSet>')
+    lines.extend(['  </Period>', '</MPD>'])
+    return "\n".join(lines) + "\n"
+
+
+def _segment_lines(rendition, timescale=1000):
+    """
+    SegmentTemplate / SegmentTimeline (or SegmentList) lines of a representation; times in milliseconds.
+    """
+    uris = [uri for uri, _ in rendition["segments"]]
+    times = [0]
+    for _, duration in rendition["segments"]:
+        times.append(times[-1] + duration)
+    times = [round(value * timescale) for value in times]
+
+    # Number before the file extension (segment_12.m4s -> segment_, 12, .m4s).
+    numbers = [re.fullmatch(r'(.*\D|)(\d+)(\.[^./]+|)', uri) for uri in uris]
+    template = None
+    if all(numbers) and len({(match.group(1), match.group(3)) for match in numbers}) == 1:
+        sequence = [int(match.group(2)) for match in numbers]
+        # Zero-padded numbers (segment_007.m4s) use the $Number%0<width>d$ format.
+        width = len(numbers[0].group(2)) if numbers[0].group(2).startswith('0') and len(numbers[0].group(2)) > 1 else 0
+        number_format = f"$Number%0{width}d$" if width else "$Number$"
+        if sequence == list(range(sequence[0], sequence[0] + len(sequence))) and \
+                all(match.group(2) == f"{number:0{width}d}" for match, number in zip(numbers, sequence, strict=True)):
+            template = (f"{numbers[0].group(1)}{number_format}{numbers[0].group(3)}", sequence[0])
+
+    if template is None:
+        return [
+            f'        <SegmentList timescale="{timescale}">',
+            f'          <Initialization sourceURL={quoteattr(rendition["init"])}/>',
+            f'          <SegmentTimeline>{_timeline(times)}</SegmentTimeline>',
+            *(f'          <SegmentURL media={quoteattr(uri)}/>' for uri in uris),
+            '        </SegmentList>'
+        ]
+    return [
+        f'        <SegmentTemplate timescale="{timescale}" initialization={quoteattr(rendition["init"])} '
+        f'media={quoteattr(template[0])} startNumber="{template[1]}">',
+        f'          <SegmentTimeline>{_timeline(times)}</SegmentTimeline>',
+        '        </SegmentTemplate>'
+    ]
+
+
+def _timeline(times):
+    """
+    S elements (with repeat counts) for the segment start times.
+    """
+    elements = []
+    for start, end in itertools.pairwise(times):
+        duration = end - start
+        if elements and elements[-1][1] == duration:
+            elements[-1][2] += 1
+        else:
+            elements.append([start, duration, 0])
+    return "".join(f'<S t="{start}" d="{duration}" r="{repeat}"/>' if repeat else f'<S t="{start}" d="{duration}"/>'
+                   for start, duration, repeat in elements)
+
+
+def _response(status, body, headers=(), content_length=-1, close=False):
+    """
+    Encoded HTTP/1.1 response; content_length -1 uses the body length, None omits the header.
+    """
+    lines = [f"HTTP/1.1 {status} {REASONS[status]}", *headers]
+    if content_length is not None:
+        lines.append(f"Content-Length: {len(body) if content_length == -1 else content_length}")
+    if close:
+        lines.append("Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,411 @@
+import json
+import time
+
+import numpy as np
+
+from bitmovin_api_sdk import BitmovinApi
+from bitmovin_api_sdk import GenericS3Input, S3AccessStyle, S3SignatureVersion, GenericS3Output
+from bitmovin_api_sdk import Encoding, CloudRegion
+from bitmovin_api_sdk import EncodingOutput, AclEntry, AclPermission
+from bitmovin_api_sdk import IngestInputStream, StreamSelectionMode, PresetConfiguration
+from bitmovin_api_sdk import TimeBasedTrimmingInputStream, ConcatenationInputStream, ConcatenationInputConfiguration
+from bitmovin_api_sdk import Stream, StreamInput, MuxingStream, StreamMode, ColorConfig
+from bitmovin_api_sdk import H264VideoConfiguration, ProfileH264, WeightedPredictionPFrames
+from bitmovin_api_sdk import Fmp4Muxing
+from bitmovin_api_sdk import MessageType, StartEncodingRequest, PsnrQualityMetricListQueryParams
+from bitmovin_api_sdk import Status
+
+TEST_ITEM = "vod-pertitle-local-convex-hull-h264"
+
+API_KEY = '<INSERT YOUR API KEY>'
+ORG_ID = '<INSERT YOUR ORG ID>'
+
+LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_INPUT_HOST_NAME = '<INSERT_YOUR_INPUT_HOST_NAME>'
+
+INPUT_PATH = '/path/to/your/input/file.mp4'
+# e.g. 'inputs/big_buck_bunny_1080p_h264.mov'
+
+# Input duration in seconds (e.g. from vod/preflight/probe_input.py), used to place the sampled scenes.
+INPUT_DURATION = 600
+
+LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME = '<INSERT_YOUR_OUTPUT_HOST_NAME>'
+
+OUTPUT_BASE_PATH = f'output/{TEST_ITEM}/'
+
+# Local file receiving the trial points, the convex hull and the resulting per-title ladder.
+LADDER_OUTPUT_PATH = 'pertitle_ladder.json'
+
+# Trial encodes: SCENE_SAMPLE_COUNT windows of SCENE_SAMPLE_DURATION seconds, evenly spread over the input.
+SCENE_SAMPLE_COUNT = 4
+SCENE_SAMPLE_DURATION = 8
+
+# Trial grid. Bitrates outside [MIN_BITS_PER_PIXEL, MAX_BITS_PER_PIXEL] for a height are not encoded.
+CANDIDATE_HEIGHTS = [240, 360, 480, 540, 720, 1080]
+CANDIDATE_BITRATES = [int(x) for x in np.geomspace(200_000, 8_000_000, num=12)]
+MIN_BITS_PER_PIXEL = 0.02
+MAX_BITS_PER_PIXEL = 0.30
+ASSUMED_FRAME_RATE = 30
+ASSUMED_ASPECT_RATIO = 16 / 9
+
+# Ladder selection from the convex hull.
+LADDER_SIZE = 6
+MIN_BITRATE_STEP = 1.5
+# Renditions above this PSNR (dB) add bitrate without visible gain.
+QUALITY_CEILING = 45.0
+
+bitmovin_api = BitmovinApi(api_key=API_KEY, tenant_org_id=ORG_ID)
+
+
+def main():
+    """
+    Local per-title optimizer for fixed-ladder H.264 workflows. Steps:
+      1) Create Generic S3 input/output for Linode Object Storage
+      2) Create a trial Encoding whose input is a concatenation of sampled scenes
+      3) Create one H.264 stream per (height, bitrate) candidate with PSNR quality metrics enabled
+      4) Run the trial encoding
+      5) Collect (bitrate, height, PSNR) points from the encoding statistics and stream QC
+      6) Compute the Pareto convex hull and select the per-title ladder
+      7) Write the ladder as a video_encoding_profiles list for the fixed-ladder scripts
+    """
+
+    # 1) Generic S3 Input/Output
+    input = bitmovin_api.encoding.inputs.generic_s3.create(
+        generic_s3_input=GenericS3Input(
+            access_key=LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_INPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Input'))
+    output = bitmovin_api.encoding.outputs.generic_s3.create(
+        generic_s3_output=GenericS3Output(
+            access_key=LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Output'))
+
+    # 2) Trial encoding on sampled scenes
+    encoding = bitmovin_api.encoding.encodings.create(
+        encoding=Encoding(
+            name=f"[{TEST_ITEM}] {INPUT_PATH}",
+            cloud_region=CloudRegion.AKAMAI_JP_OSA,
+            encoder_version='STABLE'
+        )
+    )
+
+    video_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=INPUT_PATH,
+            selection_mode=StreamSelectionMode.VIDEO_RELATIVE,
+            position=0
+        )
+    )
+    sampled_scenes_input_stream = _create_sampled_scenes_input_stream(
+        encoding_id=encoding.id,
+        input_stream_id=video_ingest_input_stream.id
+    )
+    video_input_stream = StreamInput(input_stream_id=sampled_scenes_input_stream.id)
+
+    # 3) One stream per trial point
+    trials = []
+    for height, bitrate in _trial_grid():
+        h264_codec = bitmovin_api.encoding.configurations.video.h264.create(
+            h264_video_configuration=H264VideoConfiguration(
+                name=f'Trial {height}p {bitrate}',
+                height=height,
+                bitrate=bitrate,
+                max_bitrate=int(bitrate * 1.2),
+                bufsize=int(bitrate * 1.5),
+                profile=ProfileH264.HIGH,
+                min_keyframe_interval=2,
+                max_keyframe_interval=2,
+                color_config=ColorConfig(
+                    copy_color_primaries_flag=True,
+                    copy_color_transfer_flag=True,
+                    copy_color_space_flag=True
+                ),
+                ref_frames=4,
+                bframes=3,
+                cabac=True,
+                adaptive_spatial_transform=True,
+                weighted_prediction_p_frames=WeightedPredictionPFrames.SMART,
+                preset_configuration=PresetConfiguration.VOD_HIGH_QUALITY
+            )
+        )
+
+        h264_stream = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=h264_codec.id,
+                input_streams=[video_input_stream],
+                name=f"Trial Stream H264 {height}p {bitrate}",
+                mode=StreamMode.STANDARD
+            )
+        )
+        bitmovin_api.encoding.encodings.streams.qc.psnr.create(encoding_id=encoding.id, stream_id=h264_stream.id)
+
+        bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=6,
+                segment_naming='segment_%number%.m4s',
+                init_segment_name='init.mp4',
+                streams=[MuxingStream(stream_id=h264_stream.id)],
+                outputs=[EncodingOutput(
+                    output_id=output.id,
+                    output_path=f"{OUTPUT_BASE_PATH}trials/{height}p_{bitrate}",
+                    acl=[AclEntry(permission=AclPermission.PRIVATE)]
+                )],
+                name=f"Trial FMP4 Muxing {height}p {bitrate}"
+            )
+        )
+        trials.append({"height": height, "target_bitrate": bitrate, "stream_id": h264_stream.id})
+
+    print(f"Created {len(trials)} trial streams on {SCENE_SAMPLE_COUNT} x {SCENE_SAMPLE_DURATION} s of sampled scenes")
+
+    # 4) Run trial encodes
+    _execute_encoding(encoding=encoding, start_encoding_request=StartEncodingRequest())
+
+    # 5) Measured points
+    points = _collect_trial_points(encoding_id=encoding.id, trials=trials)
+
+    # 6) Convex hull + ladder selection
+    bitrates = np.array([point["bitrate"] for point in points], dtype=np.float64)
+    qualities = np.array([point["psnr"] for point in points], dtype=np.float64)
+    hull = convex_hull_indices(bitrates, qualities)
+    ladder = select_ladder([points[i] for i in hull])
+
+    # 7) Per-title ladder
+    video_encoding_profiles = [
+        {"height": point["height"], "bitrate": _round_bitrate(point["bitrate"]), "profile": ProfileH264.HIGH.value, "level": None, "mode": StreamMode.STANDARD.value}
+        for point in ladder
+    ]
+    with open(LADDER_OUTPUT_PATH, 'w') as f:
+        json.dump({
+            "input_path": INPUT_PATH,
+            "encoding_id": encoding.id,
+            "points": points,
+            "convex_hull": [points[i] for i in hull],
+            "video_encoding_profiles": video_encoding_profiles
+        }, f, indent=2)
+
+    print(f"Per-title ladder written to {LADDER_OUTPUT_PATH}:")
+    print("video_encoding_profiles = [")
+    for point in ladder:
+        print(f'    {{"height": {point["height"]}, "bitrate": {_round_bitrate(point["bitrate"])}, "profile": ProfileH264.HIGH, '
+              f'"level": None, "mode": StreamMode.STANDARD}},  # PSNR {point["psnr"]:.2f} dB')
+    print("]")
+
+
+def _create_sampled_scenes_input_stream(encoding_id, input_stream_id):
+    """
+    Trim SCENE_SAMPLE_COUNT windows evenly spread over the input and concatenate them into one input stream.
+    """
+    step = INPUT_DURATION / (SCENE_SAMPLE_COUNT + 1)
+    concatenation = []
+    for index in range(SCENE_SAMPLE_COUNT):
+        offset = max(step * (index + 1) - SCENE_SAMPLE_DURATION / 2, 0)
+        trimmed_input_stream = bitmovin_api.encoding.encodings.input_streams.trimming.time_based.create(
+            encoding_id=encoding_id,
+            time_based_trimming_input_stream=TimeBasedTrimmingInputStream(
+                input_stream_id=input_stream_id,
+                offset=offset,
+                duration=SCENE_SAMPLE_DURATION
+            )
+        )
+        concatenation.append(ConcatenationInputConfiguration(
+            input_stream_id=trimmed_input_stream.id,
+            is_main=index == 0,
+            position=index
+        ))
+
+    return bitmovin_api.encoding.encodings.input_streams.concatenation.create(
+        encoding_id=encoding_id,
+        concatenation_input_stream=ConcatenationInputStream(concatenation=concatenation)
+    )
+
+
+def _trial_grid():
+    """
+    (height, bitrate) candidates whose bits per pixel fall inside [MIN_BITS_PER_PIXEL, MAX_BITS_PER_PIXEL].
+    """
+    heights = np.array(CANDIDATE_HEIGHTS, dtype=np.float64)[:, None]
+    bitrates = np.array(CANDIDATE_BITRATES, dtype=np.float64)[None, :]
+    bits_per_pixel = bitrates / (heights * heights * ASSUMED_ASPECT_RATIO * ASSUMED_FRAME_RATE)
+    height_index, bitrate_index = np.nonzero((bits_per_pixel >= MIN_BITS_PER_PIXEL) & (bits_per_pixel <= MAX_BITS_PER_PIXEL))
+    return [(CANDIDATE_HEIGHTS[h], CANDIDATE_BITRATES[b]) for h, b in zip(height_index, bitrate_index, strict=True)]
+
+
+def _collect_trial_points(encoding_id, trials):
+    """
+    Measured bitrate (from the encoding statistics) and mean PSNR (from stream QC) of every trial stream.
+    """
+    stats = bitmovin_api.encoding.statistics.encodings.get(encoding_id=encoding_id)
+    stream_stats = {stream.stream_id: stream for stream in stats.streams or []}
+
+    points = []
+    for trial in trials:
+        psnr = _mean_psnr(encoding_id=encoding_id, stream_id=trial["stream_id"])
+        stream = stream_stats.get(trial["stream_id"])
+        if psnr is None:
+            print(f"No PSNR for {trial['height']}p {trial['target_bitrate']}, skipping")
+            continue
+
+        bitrate = trial["target_bitrate"]
+        if stream and stream.encoded_bytes and stream.encoded_seconds:
+            bitrate = stream.encoded_bytes * 8 / stream.encoded_seconds
+        points.append({**trial, "bitrate": bitrate, "psnr": psnr})
+
+    if not points:
+        raise Exception("No trial points with quality metrics")
+    return points
+
+
+def _mean_psnr(encoding_id, stream_id):
+    """
+    Duration-weighted mean of the PSNR values reported for a stream.
+    """
+    values = []
+    weights = []
+    offset = 0
+    while True:
+        page = bitmovin_api.encoding.encodings.streams.qc.psnr.list(
+            encoding_id=encoding_id,
+            stream_id=stream_id,
+            query_params=PsnrQualityMetricListQueryParams(offset=offset, limit=100)
+        )
+        for metric in page.items:
+            values.append(metric.psnr)
+            time_span = metric.time_span
+            weights.append((time_span.to - time_span.from_) if time_span and time_span.to is not None else 1)
+        if len(page.items) < 100:
+            break
+        offset += 100
+
+    if not values:
+        return None
+    return float(np.average(np.array(values, dtype=np.float64), weights=np.maximum(np.array(weights, dtype=np.float64), 1e-9)))
+
+
+def convex_hull_indices(bitrates, qualities):
+    """
+    Indices (sorted by bitrate) of the points on the upper convex hull of quality over log2(bitrate).
+    Dominated points are removed first (Pareto front); then every pass drops, in one vectorized step,
+    all interior points that lie on or below the chord of their neighbours, until the curve is concave.
+    """
+    order = np.lexsort((-qualities, bitrates))
+    x = np.log2(bitrates[order])
+    y = qualities[order]
+
+    # Pareto front: keep points whose quality beats every cheaper point.
+    best_before = np.concatenate(([-np.inf], np.maximum.accumulate(y)[:-1]))
+    keep = y > best_before
+    order, x, y = order[keep], x[keep], y[keep]
+
+    while len(x) > 2:
+        slopes = np.diff(y) / np.maximum(np.diff(x), 1e-12)
+        concave = slopes[:-1] > slopes[1:]
+        if concave.all():
+            break
+        keep = np.concatenate(([True], concave, [True]))
+        order, x, y = order[keep], x[keep], y[keep]
+
+    return order.tolist()
+
+
+def select_ladder(hull_points):
+    """
+    Pick up to LADDER_SIZE hull points spread evenly in log-bitrate, with at most one point per height,
+    heights increasing with bitrate, at least MIN_BITRATE_STEP between rungs and nothing above QUALITY_CEILING
+    (the cheapest point reaching the ceiling becomes the top rung).
+    """
+    ceiling = next((i for i, point in enumerate(hull_points) if point["psnr"] >= QUALITY_CEILING), None)
+    if ceiling is not None:
+        hull_points = hull_points[:ceiling + 1]
+
+    log_bitrates = np.log2([point["bitrate"] for point in hull_points])
+    targets = np.linspace(log_bitrates[0], log_bitrates[-1], num=min(LADDER_SIZE, len(hull_points)))
+    nearest = np.abs(log_bitrates[None, :] - targets[:, None]).argmin(axis=1)
+
+    ladder = []
+    top = len(hull_points) - 1
+    for index in np.unique(nearest):
+        point = hull_points[index]
+        if not ladder or _fits_above(point, ladder[-1]):
+            ladder.append(point)
+        elif index == top and len(ladder) > 1 and _fits_above(point, ladder[-2]):
+            # The top point replaces the last rung only if it keeps the steps to the rung below
+            ladder[-1] = point
+    return ladder
+
+
+def _fits_above(point, rung):
+    """
+    Whether the point can follow the rung in the ladder: a greater height and at least MIN_BITRATE_STEP more bitrate.
+    """
+    return point["height"] > rung["height"] and point["bitrate"] / rung["bitrate"] >= MIN_BITRATE_STEP
+
+
+def _round_bitrate(bitrate):
+    """
+    Round a bitrate to 10 kbps for a readable ladder.
+    """
+    return int(round(bitrate / 10_000) * 10_000)
+
+
+def _execute_encoding(encoding, start_encoding_request):
+    """
+    Start the encoding process on Bitmovin and poll until it finishes or fails.
+    """
+    bitmovin_api.encoding.encodings.start(encoding_id=encoding.id, start_encoding_request=start_encoding_request)
+    task = _wait_for_encoding_to_finish(encoding_id=encoding.id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_encoding_to_finish(encoding_id=encoding.id)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("Encoding failed")
+
+    print("Encoding finished successfully")
+
+
+def _wait_for_encoding_to_finish(encoding_id):
+    """
+    Poll encoding status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.encodings.status(encoding_id=encoding_id)
+    print(f"Encoding status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _log_task_errors(task):
+    """
+    Print error messages from the given task to the console.
+    """
+    if not task:
+        return
+
+    for message in filter(lambda m: m.type == MessageType.ERROR, task.messages):
+        print(message.text)
+
+
+if __name__ == '__main__':
+    main()
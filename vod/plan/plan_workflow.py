@@ -0,0 +1,394 @@
+import atexit
+import builtins
+import contextlib
+import glob
+import importlib.util
+import inspect
+import io
+import json
+import os
+import re
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from bitmovin_api_sdk import BitmovinApi
+from bitmovin_api_sdk import CodecConfigType, Status
+from bitmovin_api_sdk.common import BitmovinApiLoggerBase
+
+# The recording stub is shared with vod/templates/submit_encoding_template.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'templates'))
+from api_recorder import ApiRecorder, RecordedTask, Unknown
+
+# Workflows to plan (paths or glob patterns relative to the repository root).
+WORKFLOWS = ['vod/abr/create_vod_h264_aac_fmp4_hls_dash.py']
+
+# Titles in the batch and how many of them are set up at the same time.
+PLAN_TITLES = 5000
+SETUP_CONCURRENCY = 8
+
+# Per-endpoint latencies recorded with EndpointTimingLogger (see README). Endpoints without a recording
+# use the default latency of their HTTP method (seconds).
+ENDPOINT_TIMINGS_PATH = 'endpoint_timings.json'
+DEFAULT_LATENCY = {"POST": 0.35, "GET": 0.15, "PUT": 0.35, "PATCH": 0.35, "DELETE": 0.2}
+
+# Billable minutes = output duration x resolution x codec x encoding mode multipliers (video) or the audio multiplier.
+# The defaults are examples; use the multipliers of your contract.
+PLAN_INPUT_DURATION = 600
+PLAN_LIVE_DURATION = 3600
+RESOLUTION_MULTIPLIERS = [(576, 1.0), (1080, 2.0), (2160, 4.0)]
+CODEC_MULTIPLIERS = {"H264": 1.0, "H265": 2.0, "VP9": 2.0, "AV1": 4.0}
+ENCODING_MODE_MULTIPLIERS = {"TWO_PASS": 1.5, "THREE_PASS": 2.0}
+AUDIO_MULTIPLIER = 0.25
+# Renditions assumed for a Per-Title template stream (decided by the encoder at run time).
+PER_TITLE_RENDITIONS = 6
+
+PLAN_PATH = 'plan.json'
+PLAN_GRAPH_PATH = 'plan.dot'
+
+
+def main():
+    """
+    Compute the API call plan of sample workflows without any network access. Steps:
+      1) Load each workflow script and run its main() against a recording stub instead of bitmovin_api
+         (network access is blocked, waits and prompts are skipped)
+      2) Map every call to its REST endpoint and classify it (setup before the start, polling, calls after the start)
+      3) Estimate the setup latency from the recorded per-endpoint timings
+      4) Estimate the billable minutes from the created streams and their codec configurations
+      5) Write the resource graph and the ordered call list (JSON and Graphviz), and the batch totals
+    """
+
+    timings = _load_timings()
+    plans = {}
+    for pattern in WORKFLOWS:
+        for workflow in sorted(glob.glob(pattern)) or [pattern]:
+            try:
+                recorder = plan_workflow(workflow)
+            except Exception as e:
+                print(f"{workflow}: cannot be planned offline ({e})")
+                continue
+            plans[workflow] = summarize(recorder, timings)
+            _print_plan(workflow, plans[workflow])
+
+    with open(PLAN_PATH, 'w') as f:
+        json.dump(plans, f, indent=2)
+    with open(PLAN_GRAPH_PATH, 'w') as f:
+        f.write(resource_graph_dot(plans))
+    print(f"Plans written to {PLAN_PATH} and {PLAN_GRAPH_PATH}")
+
+
+def plan_workflow(path):
+    """
+    Run the workflow's main() against the recording stub and return the recorder.
+    """
+    path = os.path.abspath(path)
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    recorder = _Recorder()
+    original_input = builtins.input
+    builtins.input = lambda prompt='': ''
+    # Workflows import helpers from their own directory
+    sys.path.insert(0, os.path.dirname(path))
+    try:
+        # Local state files of the workflow (incremental state, telemetry databases) go to a scratch directory
+        with _network_blocked(), contextlib.redirect_stdout(io.StringIO()), \
+                tempfile.TemporaryDirectory() as scratch, contextlib.chdir(scratch):
+            spec.loader.exec_module(module)
+            module.bitmovin_api = recorder
+            if hasattr(module, 'time'):
+                module.time = SimpleNamespace(sleep=lambda seconds: None, time=time.time, monotonic=time.monotonic)
+            if hasattr(module, 'sleep'):
+                module.sleep = lambda seconds: None
+            module.main()
+    finally:
+        builtins.input = original_input
+        sys.path.pop(0)
+    recorder.live = any(call["endpoint"].endswith("/live/start") for call in recorder.calls)
+    return recorder
+
+
+def summarize(recorder, timings):
+    """
+    Resource graph, ordered calls, setup latency and billable minutes of one recorded workflow.
+    """
+    calls = []
+    for index, call in enumerate(recorder.calls):
+        endpoint = _canonical(call["endpoint"])
+        latency = timings.get(endpoint, DEFAULT_LATENCY[endpoint.split(" ")[0]])
+        calls.append({"index": index, **call, "latency": round(latency, 3), "recorded": endpoint in timings})
+
+    phases = {}
+    for call in calls:
+        phase = phases.setdefault(call["phase"], {"calls": 0, "latency": 0.0})
+        phase["calls"] += 1
+        phase["latency"] = round(phase["latency"] + call["latency"], 3)
+
+    setup = phases.get("setup", {"calls": 0, "latency": 0.0})
+    after_start = phases.get("after_start", {"calls": 0, "latency": 0.0})
+    # Polling is waiting for the encoder, not setup work
+    title_calls = setup["calls"] + after_start["calls"]
+    title_latency = setup["latency"] + after_start["latency"]
+    minutes = billable_minutes(recorder)
+    return {
+        "type": "LIVE" if recorder.live else "VOD",
+        "resources": recorder.resources,
+        "calls": calls,
+        "phases": phases,
+        "setup_latency": round(setup["latency"], 3),
+        "timing_coverage": round(sum(call["recorded"] for call in calls) / len(calls), 3) if calls else 0.0,
+        "billable_minutes": minutes,
+        "batch": {
+            "titles": PLAN_TITLES,
+            "calls": title_calls * PLAN_TITLES,
+            "resources": len(recorder.resources) * PLAN_TITLES,
+            "setup_hours": round(title_latency * PLAN_TITLES / SETUP_CONCURRENCY / 3600, 2),
+            "billable_minutes": round(minutes["total"] * PLAN_TITLES, 1)
+        }
+    }
+
+
+def billable_minutes(recorder):
+    """
+    Estimated billable minutes of the streams created by the workflow.
+    """
+    duration = (PLAN_LIVE_DURATION if recorder.live else PLAN_INPUT_DURATION) / 60
+    streams = []
+    for resource in recorder.resources:
+        if not resource["endpoint"].endswith("/encoding/encodings/{encoding_id}/streams"):
+            continue
+        stream = recorder.models[resource["id"]]
+        config = recorder.resources_by_id.get(getattr(stream, 'codec_config_id', None))
+        if config is None:
+            continue
+        codec = config["codec"]
+        model = recorder.models[config["id"]]
+        renditions = PER_TITLE_RENDITIONS if 'PER_TITLE_TEMPLATE' in str(getattr(stream, 'mode', '')) else 1
+        if config["kind"] == 'audio':
+            multiplier = AUDIO_MULTIPLIER
+        else:
+            height = getattr(model, 'height', None) or 1080
+            resolution = next((value for limit, value in RESOLUTION_MULTIPLIERS if height <= limit),
+                              RESOLUTION_MULTIPLIERS[-1][1])
+            mode = getattr(getattr(model, 'encoding_mode', None), 'value', None)
+            multiplier = resolution * CODEC_MULTIPLIERS.get(codec, 1.0) * ENCODING_MODE_MULTIPLIERS.get(mode, 1.0)
+        streams.append({"stream": resource["id"], "codec": codec, "renditions": renditions,
+                        "minutes": round(duration * multiplier * renditions, 2)})
+    return {"duration_minutes": round(duration, 2), "streams": streams,
+            "total": round(sum(stream["minutes"] for stream in streams), 2)}
+
+
+def resource_graph_dot(plans):
+    """
+    Graphviz document of the resource graphs (parent and reference edges).
+    """
+    lines = ["digraph plan {", "  rankdir=LR;", "  node [shape=box, fontsize=10];"]
+    for index, (workflow, plan) in enumerate(plans.items()):
+        lines.append(f'  subgraph cluster_{index} {{ label="{os.path.basename(workflow)}";')
+        for resource in plan["resources"]:
+            label = resource["endpoint"].rsplit("/", 1)[-1] + (f"\\n{resource['name']}" if resource["name"] else "")
+            lines.append(f'    "{index}:{resource["id"]}" [label="{label}"];')
+            for parent in resource["parents"]:
+                lines.append(f'    "{index}:{parent}" -> "{index}:{resource["id"]}";')
+            for reference in resource["references"]:
+                lines.append(f'    "{index}:{resource["id"]}" -> "{index}:{reference}" [style=dashed];')
+        lines.append("  }")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+class EndpointTimingLogger(BitmovinApiLoggerBase):
+    """
+    SDK logger that records the latency of every request per endpoint into ENDPOINT_TIMINGS_PATH.
+    Use it in any workflow: BitmovinApi(api_key=API_KEY, tenant_org_id=ORG_ID, logger=EndpointTimingLogger()).
+    """
+
+    def __init__(self, path=ENDPOINT_TIMINGS_PATH, max_samples=200):
+        self.path = path
+        self.max_samples = max_samples
+        self.samples = {}
+        self._pending = None
+        if os.path.exists(path):
+            with open(path) as f:
+                self.samples = {endpoint: entry["samples"] for endpoint, entry in json.load(f).items()}
+        atexit.register(self.save)
+
+    def log(self, message, data=None):
+        if message.startswith('REQUEST: '):
+            method, url = message[len('REQUEST: '):].split('  --> ')[0].split(' ', 1)
+            self._pending = (f"{method} {_normalize_url(url)}", time.perf_counter())
+        elif message.startswith('RESPONSE: ') and self._pending:
+            endpoint, started = self._pending
+            samples = self.samples.setdefault(endpoint, [])
+            samples.append(round(time.perf_counter() - started, 4))
+            del samples[:-self.max_samples]
+            self._pending = None
+
+    def error(self, message, data=None):
+        self._pending = None
+
+    def save(self):
+        """
+        Write the samples and their medians.
+        """
+        timings = {endpoint: {"median": statistics.median(samples), "count": len(samples), "samples": samples}
+                   for endpoint, samples in sorted(self.samples.items()) if samples}
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(timings, f, indent=2)
+        os.replace(self.path + '.tmp', self.path)
+
+
+class _Recorder(ApiRecorder):
+    """
+    Recording stub that keeps every call with its REST endpoint and returns plausible responses:
+    created models (with a generated ID), recorded models for get / list, and finished (or running) statuses.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.resources = []
+        self.resources_by_id = {}
+        self.models = {}
+        self.live = False
+        self._started = False
+        self._state = Status.FINISHED
+        self._counters = {}
+        self._sdk = BitmovinApi(api_key='plan')
+
+    def on_call(self, path, kwargs):
+        phase = "poll" if path[-1] == 'status' else "after_start" if self._started else "setup"
+        self.calls.append({"endpoint": self._endpoint(path), "phase": phase})
+
+    def record_list(self, resource_path, kwargs):
+        items = [self.models[resource["id"]] for resource in self.resources
+                 if resource["path"] == list(resource_path)
+                 and all(value in resource["parents"] for key, value in kwargs.items() if key.endswith('_id'))]
+        return SimpleNamespace(items=items or ([] if kwargs else [SimpleNamespace(id=f"existing-{resource_path[-1]}")]),
+                               total_count=len(items))
+
+    def record_status(self, resource_path, kwargs):
+        return RecordedTask(status=self._state, progress=100, messages=[])
+
+    def record_start(self, resource_path, kwargs):
+        if resource_path[:2] == ("encoding", "encodings"):
+            self._started = True
+            self._state = Status.RUNNING if resource_path[-1] == 'live' else Status.FINISHED
+        return SimpleNamespace(id=kwargs.get("encoding_id") or kwargs.get("manifest_id"))
+
+    def record_stop(self, resource_path, kwargs):
+        self._state = Status.FINISHED
+        return Unknown()
+
+    def record_create(self, resource_path, kwargs):
+        parents = [value for key, value in kwargs.items() if key.endswith('_id')]
+        model = next((value for key, value in kwargs.items() if not key.endswith('_id')), None)
+        self._counters[resource_path[-1]] = self._counters.get(resource_path[-1], 0) + 1
+        resource_id = f"{resource_path[-1]}-{self._counters[resource_path[-1]]}"
+        if model is None or not hasattr(model, 'to_dict'):
+            model = SimpleNamespace()
+        model.id = resource_id
+        properties = model.to_dict() if hasattr(model, 'to_dict') else {}
+        resource = {
+            "id": resource_id,
+            "endpoint": self.calls[-1]["endpoint"],
+            "path": list(resource_path),
+            "name": getattr(model, 'name', None),
+            "parents": parents,
+            "references": sorted(set(_references(properties, self.resources_by_id)) - set(parents)),
+        }
+        if resource_path[1] == 'configurations' and len(resource_path) >= 4:
+            resource["kind"], resource["codec"] = resource_path[2], resource_path[-1].upper()
+        self.resources.append(resource)
+        self.resources_by_id[resource_id] = resource
+        self.models[resource_id] = model
+        return model
+
+    def record_get(self, resource_path, kwargs):
+        if resource_path[-1] == 'type':
+            resource = self.resources_by_id.get(kwargs.get("configuration_id"))
+            return SimpleNamespace(type=CodecConfigType[resource["codec"]] if resource else None)
+        for value in reversed(list(kwargs.values())):
+            if value in self.models and self.resources_by_id[value]["path"] == list(resource_path):
+                return self.models[value]
+        return Unknown()
+
+    def _endpoint(self, path):
+        """
+        HTTP method and URL template of an SDK call, read from the SDK source (e.g. POST /encoding/encodings/{encoding_id}/streams).
+        """
+        api = self._sdk
+        for segment in path:
+            api = getattr(api, segment)
+        match = re.search(r"self\.api_client\.(\w+)\(\s*'([^']+)'", inspect.getsource(api))
+        return f"{match.group(1).upper()} {match.group(2)}"
+
+
+@contextlib.contextmanager
+def _network_blocked():
+    """
+    Fail any connection attempt while a workflow is planned.
+    """
+    def blocked(*args, **kwargs):
+        raise Exception("network access is not possible in a plan")
+
+    original_connect, original_create_connection = socket.socket.connect, socket.create_connection
+    socket.socket.connect, socket.create_connection = blocked, blocked
+    try:
+        yield
+    finally:
+        socket.socket.connect, socket.create_connection = original_connect, original_create_connection
+
+
+def _references(value, resources_by_id):
+    """
+    IDs of recorded resources referenced anywhere in a model dict.
+    """
+    if isinstance(value, dict):
+        return [reference for item in value.values() for reference in _references(item, resources_by_id)]
+    if isinstance(value, list):
+        return [reference for item in value for reference in _references(item, resources_by_id)]
+    return [value] if isinstance(value, str) and value in resources_by_id else []
+
+
+def _normalize_url(url):
+    """
+    Endpoint of a request URL: path below the API version with IDs replaced by {id}.
+    """
+    path = re.sub(r'^https?://[^/]+/v\d+', '', url.split('?')[0])
+    return '/'.join('{id}' if re.fullmatch(r'[0-9a-fA-F-]{20,}', segment) else segment for segment in path.split('/'))
+
+
+def _load_timings():
+    """
+    Median latency per endpoint recorded by EndpointTimingLogger (URL parameters normalized).
+    """
+    if not os.path.exists(ENDPOINT_TIMINGS_PATH):
+        return {}
+    with open(ENDPOINT_TIMINGS_PATH) as f:
+        return {_canonical(endpoint): entry["median"] for endpoint, entry in json.load(f).items()}
+
+
+def _canonical(endpoint):
+    """
+    Endpoint with every URL parameter written as {id}.
+    """
+    return re.sub(r'\{[a-z_]+\}', '{id}', endpoint)
+
+
+def _print_plan(workflow, plan):
+    """
+    Summary of one plan.
+    """
+    phases = ", ".join(f"{phase} {values['calls']} ({values['latency']:.1f} s)" for phase, values in plan["phases"].items())
+    print(f"{workflow} [{plan['type']}]: {len(plan['resources'])} resources, {len(plan['calls'])} calls: {phases}")
+    print(f"  setup latency {plan['setup_latency']:.1f} s ({plan['timing_coverage'] * 100:.0f} % of calls with recorded timings), "
+          f"billable {plan['billable_minutes']['total']:.1f} min for {plan['billable_minutes']['duration_minutes']:.0f} min of content")
+    batch = plan["batch"]
+    print(f"  batch of {batch['titles']}: {batch['calls']} calls, {batch['resources']} resources, "
+          f"{batch['setup_hours']:.1f} h of setup at {SETUP_CONCURRENCY} concurrent, {batch['billable_minutes']:.0f} billable min")
+
+
+if __name__ == '__main__':
+    main()
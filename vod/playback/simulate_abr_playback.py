@@ -0,0 +1,369 @@
+import csv
+import itertools
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+# Ladders to compare (height, bitrate). "vod_h264" is the profile table of vod/abr/create_vod_h264_aac_fmp4_hls_dash.py;
+# the others are candidates for tuning.
+LADDERS = {
+    "vod_h264": [(240, 300000), (360, 800000), (480, 1200000), (540, 2000000), (720, 4000000), (1080, 6000000)],
+    "vod_h264_dense_low": [(240, 300000), (360, 550000), (360, 800000), (480, 1200000), (540, 2000000), (720, 3000000),
+                           (1080, 4500000), (1080, 6000000)],
+    "vod_h264_4_rungs": [(360, 600000), (540, 1500000), (720, 3000000), (1080, 6000000)]
+}
+# Actual encodings instead of / in addition to LADDERS: name -> local master playlist of a finished encoding
+# (e.g. mirrored with vod/mirror). Segment sizes come from the segment files (or EXT-X-BYTERANGE lengths).
+MASTER_PLAYLISTS = {}
+# e.g. {"encoded_h264": 'mirror/stream.m3u8'}
+
+# Bandwidth traces (JSON Lines): {"name": "...", "interval": 1.0, "throughput": [bits per second, ...]}.
+# None generates synthetic traces from NETWORK_PROFILES.
+TRACES_PATH = None
+SYNTHETIC_TRACES = 2000
+TRACE_SECONDS = 900
+TRACE_INTERVAL = 1.0
+# Synthetic network profiles: log-normal throughput around the median with an AR(1) process (correlation per
+# interval) and occasional outages (probability per interval, length in intervals).
+NETWORK_PROFILES = {
+    "cellular_3g": {"weight": 0.15, "median": 1.2e6, "sigma": 0.7, "correlation": 0.9, "outage": 0.005, "outage_length": 4},
+    "cellular_4g": {"weight": 0.45, "median": 6e6, "sigma": 0.6, "correlation": 0.95, "outage": 0.002, "outage_length": 3},
+    "wifi": {"weight": 0.3, "median": 15e6, "sigma": 0.5, "correlation": 0.97, "outage": 0.001, "outage_length": 2},
+    "fixed": {"weight": 0.1, "median": 40e6, "sigma": 0.3, "correlation": 0.98, "outage": 0.0, "outage_length": 0}
+}
+SEED = 42
+
+# Content: SEGMENT_DURATION matches segment_length of the samples' muxings. Synthetic segment sizes vary per segment
+# with a log-normal complexity factor shared by all rungs (VBR); audio is downloaded with every segment.
+CONTENT_SECONDS = 600
+SEGMENT_DURATION = 6
+SEGMENT_SIZE_SIGMA = 0.25
+AUDIO_BITRATE = 128000
+REQUEST_LATENCY = 0.05
+
+# Player algorithms.
+# throughput: highest rung below safety x harmonic mean of the last "window" segment throughputs.
+# buffer: BBA-0, lowest rung up to "reservoir" seconds of buffer, highest from reservoir + cushion, linear in between.
+PLAYERS = {
+    "throughput": {"algorithm": "throughput", "window": 5, "safety": 0.85},
+    "buffer": {"algorithm": "buffer", "reservoir": 8, "cushion": 16}
+}
+MAX_BUFFER = 30
+STARTUP_BUFFER = 6
+
+# QoE = average bitrate (Mbps) - REBUFFER_PENALTY x rebuffer seconds per minute - SWITCH_PENALTY x bitrate change (Mbps)
+# per minute. The weights are examples for ranking ladders.
+REBUFFER_PENALTY = 4.0
+SWITCH_PENALTY = 1.0
+
+RESULTS_PATH = 'abr_playback_results.csv'
+
+
+def main():
+    """
+    Trace-driven ABR playback simulation for comparing ladders. Steps:
+      1) Load the bandwidth traces (or generate synthetic ones) and the ladders' segment sizes
+      2) Simulate every trace x ladder x player combination at once (vectorized over sessions, one step per segment)
+      3) Write rebuffer ratio, average bitrate, switches, startup delay and QoE per ladder and player to RESULTS_PATH
+    """
+
+    # 1) Inputs
+    traces, interval = _traces()
+    ladders = {name: _synthetic_segments(rungs) for name, rungs in LADDERS.items()}
+    ladders.update({name: _encoded_segments(path) for name, path in MASTER_PLAYLISTS.items()})
+    print(f"{traces.shape[0]} traces of {traces.shape[1] * interval:.0f} s, {len(ladders)} ladders, {len(PLAYERS)} players")
+
+    # 2) Simulation
+    started = time.monotonic()
+    sessions = simulate(traces, interval, ladders, PLAYERS)
+    print(f"Simulated {sessions['ladder'].size} sessions in {time.monotonic() - started:.1f} s")
+
+    # 3) Results
+    results = []
+    for (ladder_index, ladder), (player_index, player) in itertools.product(enumerate(ladders), enumerate(PLAYERS)):
+        selected = (sessions["ladder"] == ladder_index) & (sessions["player"] == player_index)
+        results.append({"ladder": ladder, "player": player, **_summary({key: value[selected] for key, value in sessions.items()})})
+
+    with open(RESULTS_PATH, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+
+    for result in sorted(results, key=lambda result: -result["qoe"]):
+        print(f"{result['ladder']:>20} / {result['player']:<10}: avg {result['avg_bitrate'] / 1e6:.2f} Mbps, "
+              f"rebuffer {result['rebuffer_ratio'] * 100:.2f} % (sessions with stalls {result['sessions_with_rebuffer'] * 100:.0f} %), "
+              f"{result['switches']:.1f} switches, startup {result['startup_delay']:.2f} s, QoE {result['qoe']:.2f}")
+    print(f"Results written to {RESULTS_PATH}")
+
+
+def simulate(traces, interval, ladders, players):
+    """
+    Simulate one session per trace x ladder x player. Returns per-session arrays (rebuffer time, average bitrate,
+    switch count, ...). All sessions advance together one segment at a time; each step is a handful of array operations.
+    """
+    names = list(ladders)
+    sessions = len(traces) * len(ladders) * len(players)
+    trace_index, ladder_index, player_index = (
+        index.ravel() for index in np.meshgrid(np.arange(len(traces)), np.arange(len(ladders)), np.arange(len(players)), indexing='ij'))
+
+    # Ladders padded to the same number of rungs / segments: padded rungs are never selectable
+    rungs = max(ladders[name]["bitrates"].size for name in names)
+    segments = min(ladders[name]["sizes"].shape[1] for name in names)
+    bitrates = np.full((len(ladders), rungs), np.inf)
+    sizes = np.zeros((len(ladders), rungs, segments))
+    for index, name in enumerate(names):
+        count = ladders[name]["bitrates"].size
+        bitrates[index, :count] = ladders[name]["bitrates"]
+        sizes[index, :count] = ladders[name]["sizes"][:, :segments]
+    durations = np.array([ladders[name]["durations"][:segments] for name in names])
+    top_rung = np.array([ladders[name]["bitrates"].size - 1 for name in names])[ladder_index]
+    session_bitrates = bitrates[ladder_index]
+
+    # Player parameters per session
+    parameters = [players[name] for name in players]
+    algorithm = np.array([player["algorithm"] for player in parameters])[player_index]
+    safety = np.array([player.get("safety", 1.0) for player in parameters])[player_index]
+    session_window = np.array([player.get("window", 1) for player in parameters])[player_index]
+    window = session_window.max()
+    in_window = np.arange(window)[None, :] >= window - session_window[:, None]
+    reservoir = np.array([player.get("reservoir", 0.0) for player in parameters])[player_index]
+    cushion = np.array([player.get("cushion", 1.0) for player in parameters])[player_index]
+
+    curves = _trace_curves(traces, interval)
+    clock = np.zeros(sessions)
+    buffer = np.zeros(sessions)
+    playing = np.zeros(sessions, dtype=bool)
+    startup = np.zeros(sessions)
+    rebuffer = np.zeros(sessions)
+    history = np.full((sessions, window), np.nan)
+    rung = np.zeros(sessions, dtype=np.int64)
+    bitrate_sum = np.zeros(sessions)
+    switches = np.zeros(sessions)
+    switch_magnitude = np.zeros(sessions)
+    rows = np.arange(sessions)
+
+    for segment in range(segments):
+        # Rung selection
+        recent = np.where(in_window, history, np.nan)
+        samples = np.count_nonzero(~np.isnan(recent), axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            estimate = np.where(samples > 0, samples / np.nansum(1.0 / recent, axis=1), 0.0)
+        throughput_rung = _highest_rung_below(session_bitrates, safety * estimate)
+        position = np.clip((buffer - reservoir) / cushion, 0.0, 1.0)
+        lowest, highest = session_bitrates[:, 0], session_bitrates[rows, top_rung]
+        buffer_rung = np.where(position >= 1.0, top_rung,
+                               _highest_rung_below(session_bitrates, lowest + position * (highest - lowest)))
+        selected = np.where(algorithm == "buffer", buffer_rung, throughput_rung)
+
+        # Wait while the buffer is full, then download the segment
+        duration = durations[ladder_index, segment]
+        idle = np.maximum(buffer + duration - MAX_BUFFER, 0.0)
+        clock += idle
+        buffer -= idle
+        bits = sizes[ladder_index, selected, segment] + AUDIO_BITRATE * duration
+        finished = _download_end(curves, trace_index, clock + REQUEST_LATENCY, bits)
+        download = finished - clock
+        clock = finished
+
+        # Playback: stalls while playing, startup delay before
+        rebuffer += np.where(playing, np.maximum(download - buffer, 0.0), 0.0)
+        startup += np.where(playing, 0.0, download)
+        buffer = np.where(playing, np.maximum(buffer - download, 0.0), buffer) + duration
+        playing |= buffer >= STARTUP_BUFFER
+
+        history = np.concatenate([history[:, 1:], (bits / download)[:, None]], axis=1)
+        selected_bitrates = session_bitrates[rows, selected]
+        if segment:
+            changed = selected != rung
+            switches += changed
+            switch_magnitude += np.abs(selected_bitrates - session_bitrates[rows, rung])
+        rung = selected
+        bitrate_sum += selected_bitrates * duration
+
+    content = durations[ladder_index].sum(axis=1)
+    return {
+        "ladder": ladder_index,
+        "player": player_index,
+        "trace": trace_index,
+        "content": content,
+        "rebuffer": rebuffer,
+        "startup": startup,
+        "avg_bitrate": bitrate_sum / content,
+        "switches": switches,
+        "switch_magnitude": switch_magnitude
+    }
+
+
+def _summary(sessions):
+    """
+    Aggregate metrics of a group of sessions.
+    """
+    minutes = sessions["content"] / 60
+    qoe = (sessions["avg_bitrate"] / 1e6 - REBUFFER_PENALTY * sessions["rebuffer"] / minutes
+           - SWITCH_PENALTY * sessions["switch_magnitude"] / 1e6 / minutes)
+    return {
+        "sessions": int(sessions["content"].size),
+        "avg_bitrate": round(float(sessions["avg_bitrate"].mean())),
+        "avg_bitrate_p10": round(float(np.percentile(sessions["avg_bitrate"], 10))),
+        "rebuffer_ratio": round(float(sessions["rebuffer"].sum() / (sessions["content"] + sessions["rebuffer"]).sum()), 5),
+        "sessions_with_rebuffer": round(float((sessions["rebuffer"] > 0).mean()), 4),
+        "rebuffer_p95": round(float(np.percentile(sessions["rebuffer"], 95)), 2),
+        "switches": round(float(sessions["switches"].mean()), 2),
+        "startup_delay": round(float(sessions["startup"].mean()), 3),
+        "qoe": round(float(qoe.mean()), 3)
+    }
+
+
+def _highest_rung_below(bitrates, limit):
+    """
+    Index of the highest rung whose bitrate does not exceed the limit (the lowest rung if none does).
+    """
+    return np.maximum((bitrates <= limit[:, None]).sum(axis=1) - 1, 0)
+
+
+def _trace_curves(traces, interval):
+    """
+    Cumulative bits deliverable from the start of each trace to the start of every interval, with the curves
+    flattened into one sorted array (each trace offset above the previous one) for a single searchsorted.
+    """
+    cumulative = np.concatenate([np.zeros((len(traces), 1)), np.cumsum(traces * interval, axis=1)], axis=1)
+    period_bits = cumulative[:, -1]
+    row_offset = np.arange(len(traces)) * (period_bits.max() + 1.0)
+    return {
+        "cumulative": cumulative,
+        "rates": traces,
+        "interval": interval,
+        "period_bits": period_bits,
+        "row_offset": row_offset,
+        "flat": (cumulative[:, :-1] + row_offset[:, None]).ravel()
+    }
+
+
+def _download_end(curves, trace_index, start, bits):
+    """
+    Time at which each download of `bits` that starts at `start` completes. Traces repeat when a session outlasts them.
+    The cumulative curve is evaluated at the start, the target is found with one searchsorted over all sessions
+    and interpolated inside its interval.
+    """
+    cumulative, rates, interval = curves["cumulative"], curves["rates"], curves["interval"]
+    length = rates.shape[1]
+    period_bits = curves["period_bits"][trace_index]
+    period_seconds = length * interval
+
+    cycles, offset = np.divmod(start, period_seconds)
+    slot = np.minimum((offset // interval).astype(np.int64), length - 1)
+    delivered = cycles * period_bits + cumulative[trace_index, slot] + rates[trace_index, slot] * (offset - slot * interval)
+
+    target_cycles, remainder = np.divmod(delivered + bits, period_bits)
+    slot = np.searchsorted(curves["flat"], remainder + curves["row_offset"][trace_index], side='right') - 1
+    slot = np.clip(slot - trace_index * length, 0, length - 1)
+    return (target_cycles * period_seconds + slot * interval
+            + (remainder - cumulative[trace_index, slot]) / rates[trace_index, slot])
+
+
+def _traces():
+    """
+    Bandwidth traces (bits per second per interval) as a 2-D array, truncated to the shortest trace.
+    """
+    if TRACES_PATH:
+        with open(TRACES_PATH) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        intervals = {record.get("interval", TRACE_INTERVAL) for record in records}
+        if len(intervals) > 1:
+            raise Exception(f"Traces with different intervals: {sorted(intervals)}")
+        length = min(len(record["throughput"]) for record in records)
+        traces = np.array([record["throughput"][:length] for record in records], dtype=np.float64)
+        return np.maximum(traces, 1000.0), intervals.pop()
+
+    rng = np.random.default_rng(SEED)
+    names = list(NETWORK_PROFILES)
+    weights = np.array([NETWORK_PROFILES[name]["weight"] for name in names])
+    profile = rng.choice(len(names), size=SYNTHETIC_TRACES, p=weights / weights.sum())
+    steps = int(TRACE_SECONDS / TRACE_INTERVAL)
+    median, sigma, correlation, outage, outage_length = (
+        np.array([NETWORK_PROFILES[name][key] for name in names])[profile][:, None]
+        for key in ("median", "sigma", "correlation", "outage", "outage_length"))
+
+    # AR(1) in log space with stationary standard deviation sigma
+    noise = rng.standard_normal((SYNTHETIC_TRACES, steps)) * sigma * np.sqrt(1 - correlation ** 2)
+    level = np.empty((SYNTHETIC_TRACES, steps))
+    level[:, 0] = rng.standard_normal(SYNTHETIC_TRACES) * sigma[:, 0]
+    for step in range(1, steps):
+        level[:, step] = correlation[:, 0] * level[:, step - 1] + noise[:, step]
+    traces = median * np.exp(level)
+
+    # Outages: every interval after an outage start stays down for outage_length intervals
+    starts = rng.random((SYNTHETIC_TRACES, steps)) < outage
+    since_start = np.arange(steps) - np.maximum.accumulate(np.where(starts, np.arange(steps), -10 ** 9), axis=1)
+    traces[since_start < outage_length] *= 0.02
+    return np.maximum(traces, 1000.0), TRACE_INTERVAL
+
+
+def _synthetic_segments(rungs):
+    """
+    Per-segment sizes (bits) of a ladder: bitrate x duration x a complexity factor shared by all rungs.
+    """
+    rng = np.random.default_rng(SEED)
+    segments = int(np.ceil(CONTENT_SECONDS / SEGMENT_DURATION))
+    complexity = rng.lognormal(-SEGMENT_SIZE_SIGMA ** 2 / 2, SEGMENT_SIZE_SIGMA, segments)
+    bitrates = np.array([bitrate for _, bitrate in rungs], dtype=np.float64)
+    return {
+        "bitrates": bitrates,
+        "sizes": bitrates[:, None] * SEGMENT_DURATION * complexity[None, :],
+        "durations": np.full(segments, float(SEGMENT_DURATION))
+    }
+
+
+def _encoded_segments(master_playlist):
+    """
+    Per-segment sizes (bits) of the video variants of a finished encoding (local HLS output), sorted by bitrate.
+    The rung bitrate is the average bitrate of the variant; the audio is modelled with AUDIO_BITRATE.
+    """
+    with open(master_playlist) as f:
+        text = f.read()
+    base = os.path.dirname(master_playlist)
+    # Audio-only variants (no RESOLUTION) are not rungs
+    uris = sorted({uri for attributes, uri in re.findall(r'#EXT-X-STREAM-INF:([^\n]*)\n([^\n#]+)', text)
+                   if 'RESOLUTION=' in attributes})
+    renditions = []
+    for uri in uris:
+        path = os.path.join(base, uri.strip())
+        sizes, durations = _media_playlist_segments(path)
+        renditions.append((sizes.sum() / durations.sum(), sizes, durations))
+    if not renditions:
+        raise Exception(f"No variants in {master_playlist}")
+
+    renditions.sort(key=lambda rendition: rendition[0])
+    segments = min(rendition[1].size for rendition in renditions)
+    return {
+        "bitrates": np.array([rendition[0] for rendition in renditions]),
+        "sizes": np.array([rendition[1][:segments] for rendition in renditions]),
+        "durations": renditions[-1][2][:segments]
+    }
+
+
+def _media_playlist_segments(path):
+    """
+    (sizes in bits, durations in seconds) of the segments of a media playlist.
+    """
+    with open(path) as f:
+        lines = [line.strip() for line in f if line.strip()]
+    base = os.path.dirname(path)
+    sizes, durations, duration, byterange = [], [], None, None
+    for line in lines:
+        if line.startswith('#EXTINF:'):
+            duration = float(line[len('#EXTINF:'):].split(',')[0])
+        elif line.startswith('#EXT-X-BYTERANGE:'):
+            byterange = int(line[len('#EXT-X-BYTERANGE:'):].split('@')[0])
+        elif not line.startswith('#') and duration is not None:
+            sizes.append(8.0 * (byterange if byterange is not None else os.path.getsize(os.path.join(base, line))))
+            durations.append(duration)
+            duration, byterange = None, None
+    return np.array(sizes), np.array(durations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import json
+
+# Probe results (see probe_input.py) to plan ladders for in batch mode, and where to write the plans.
+PROBE_RESULTS_PATH = 'probe_results.jsonl'
+LADDER_PLANS_PATH = 'ladder_plans.jsonl'
+
+# Adjacent rungs must differ by at least this bitrate factor, otherwise they are merged.
+MIN_BITRATE_STEP = 1.4
+
+# Bitrate of a clamped rung scales with (pixel ratio) ** BITRATE_SCALING_EXPONENT.
+BITRATE_SCALING_EXPONENT = 0.75
+
+# Reference ladder used in batch mode (same rungs as vod/abr/create_vod_h264_aac_fmp4_hls_dash.py).
+video_encoding_profiles = [
+    {"height": 240, "bitrate": 300000},
+    {"height": 360, "bitrate": 800000},
+    {"height": 480, "bitrate": 1200000},
+    {"height": 540, "bitrate": 2000000},
+    {"height": 720, "bitrate": 4000000},
+    {"height": 1080, "bitrate": 6000000}
+]
+
+
+def main():
+    """
+    Plan the effective ladder of every probed input in PROBE_RESULTS_PATH and write one plan per line.
+    """
+    plans = 0
+    with open(PROBE_RESULTS_PATH) as results, open(LADDER_PLANS_PATH, 'w') as f:
+        for line in results:
+            source = json.loads(line)
+            if source.get("error") or not source.get("video"):
+                continue
+
+            ladder, decisions = plan_ladder(video_encoding_profiles, source_video=source["video"][0])
+            f.write(json.dumps({
+                "source": source["source"],
+                "ladder": ladder_audit_record(ladder),
+                "decisions": decisions
+            }) + "\n")
+            plans += 1
+
+    print(f"Planned {plans} ladders -> {LADDER_PLANS_PATH}")
+
+
+def plan_ladder(profiles, source_video, min_bitrate_step=MIN_BITRATE_STEP):
+    """
+    Derive the effective ladder for a source from the nominal video encoding profiles:
+      1) drop rungs above the source height; the lowest dropped rung is clamped to the source height
+         (with a pixel-scaled bitrate) so the top rendition still matches the source resolution
+      2) clamp a rung's "rate" (frame rate) to the source frame rate
+      3) merge adjacent rungs whose bitrates are closer than min_bitrate_step
+    Returns (effective_profiles, decisions); decisions is a human-readable audit trail.
+    """
+    source_height = source_video["height"]
+    source_frame_rate = source_video.get("frame_rate")
+    decisions = []
+
+    ladder = sorted(profiles, key=lambda profile: (profile.get("height"), profile.get("bitrate")))
+
+    # 1) Resolution
+    kept = [dict(profile) for profile in ladder if profile.get("height") <= source_height]
+    dropped = [profile for profile in ladder if profile.get("height") > source_height]
+    for profile in dropped:
+        decisions.append(f"drop {profile.get('height')}p@{profile.get('bitrate')}: above source height {source_height}p")
+
+    if dropped and (not kept or kept[-1].get("height") < source_height):
+        clamped = dict(dropped[0])
+        clamped["bitrate"] = _scaled_bitrate(clamped.get("bitrate"), clamped.get("height"), source_height)
+        clamped["height"] = source_height
+        kept.append(clamped)
+        decisions.append(f"clamp {dropped[0].get('height')}p@{dropped[0].get('bitrate')} to {source_height}p@{clamped['bitrate']}")
+
+    # 2) Frame rate
+    if source_frame_rate:
+        for profile in kept:
+            if profile.get("rate") and profile.get("rate") > source_frame_rate:
+                decisions.append(f"clamp {profile.get('height')}p frame rate {profile.get('rate')} to source {source_frame_rate}")
+                profile["rate"] = source_frame_rate
+
+    # 3) Bitrate spacing (top-down; the top and bottom rungs are always kept)
+    merged = [kept[-1]]
+    for profile in reversed(kept[:-1]):
+        if merged[-1].get("bitrate") / profile.get("bitrate") >= min_bitrate_step:
+            merged.append(profile)
+            continue
+
+        is_bottom = profile is kept[0]
+        if is_bottom and len(merged) > 1:
+            removed = merged.pop()
+            merged.append(profile)
+        else:
+            removed = profile
+        decisions.append(f"merge {removed.get('height')}p@{removed.get('bitrate')}: "
+                         f"within {min_bitrate_step}x of a neighbouring rung")
+
+    return list(reversed(merged)), decisions
+
+
+def ladder_audit_record(profiles):
+    """
+    JSON-serialisable view of an effective ladder (SDK enums are stored by value).
+    """
+    return [{key: getattr(value, 'value', value) for key, value in profile.items()} for profile in profiles]
+
+
+def _scaled_bitrate(bitrate, height, target_height):
+    """
+    Scale a rung bitrate to another height, assuming the same aspect ratio.
+    """
+    pixel_ratio = (target_height / height) ** 2
+    return int(bitrate * pixel_ratio ** BITRATE_SCALING_EXPONENT)
+
+
+if __name__ == '__main__':
+    main()
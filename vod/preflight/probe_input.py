@@ -0,0 +1,461 @@
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import struct
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+
+LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_INPUT_HOST_NAME = '<INSERT_YOUR_INPUT_HOST_NAME>'
+# SigV4 signing region. None derives it from the host name (e.g. 'jp-osa-1' for jp-osa-1.linodeobjects.com).
+LINODE_OBJECT_STORAGE_INPUT_REGION = None
+
+# Batch mode: one input per line. Entries are object keys in the input bucket, https:// URLs or local files.
+INPUT_LIST_PATH = 'inputs.txt'
+PROBE_RESULTS_PATH = 'probe_results.jsonl'
+MAX_WORKERS = 64
+
+# Bytes fetched per ranged read. The first read usually covers ftyp + moov of faststart files.
+HEADER_READ_SIZE = 256 * 1024
+MAX_MOOV_SIZE = 64 * 1024 * 1024
+
+# Transfer characteristics (ISO/IEC 23091-2) signalling HDR in the nclx colour box.
+HDR_TRANSFER_CHARACTERISTICS = {16: "HDR10", 18: "HLG"}
+
+CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl", b"mvex", b"edts", b"dinf"}
+DOLBY_VISION_SAMPLE_ENTRIES = {b"dvh1", b"dvhe", b"dva1", b"dvav", b"dav1"}
+
+_connections = threading.local()
+
+input_bucket = {
+    "access_key": LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY,
+    "secret_key": LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY,
+    "bucket_name": LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME,
+    "host": LINODE_OBJECT_STORAGE_INPUT_HOST_NAME,
+    "region": LINODE_OBJECT_STORAGE_INPUT_REGION
+}
+
+
+def main():
+    """
+    Probe every input listed in INPUT_LIST_PATH in parallel and write one JSON result per line.
+    Only the container header (ftyp / moov) is read from each input with HTTP range requests.
+    """
+    with open(INPUT_LIST_PATH) as f:
+        sources = [line.strip() for line in f if line.strip()]
+
+    started = time.monotonic()
+    results = probe_inputs(sources, bucket=input_bucket, max_workers=MAX_WORKERS)
+
+    with open(PROBE_RESULTS_PATH, 'w') as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+
+    failed = sum(1 for result in results if result.get("error"))
+    bytes_read = sum(result.get("bytes_read", 0) for result in results)
+    print(f"Probed {len(results)} inputs in {time.monotonic() - started:.1f} s "
+          f"({failed} failed, {bytes_read / 1024 / 1024:.1f} MiB read) -> {PROBE_RESULTS_PATH}")
+
+
+def probe_inputs(sources, bucket=None, max_workers=MAX_WORKERS):
+    """
+    Probe many inputs concurrently. Failures are reported per input instead of aborting the batch.
+    """
+    def probe_or_error(source):
+        try:
+            return probe_input(source, bucket=bucket)
+        except Exception as e:
+            return {"source": source, "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(probe_or_error, sources))
+
+
+def probe_input(source, bucket=None):
+    """
+    Read the ISO BMFF (MP4 / MOV) header of the source and return its tracks and properties:
+    duration (seconds), video tracks (codec, resolution, frame rate, HDR format) and audio tracks.
+    Object keys are resolved against the given Generic S3 bucket (defaults to the input bucket above).
+    """
+    reader = _open_reader(source, bucket or input_bucket)
+    moov = _read_moov(reader)
+
+    result = {
+        "source": source,
+        "container": "mp4",
+        "size": reader.size,
+        "duration": None,
+        "video": [],
+        "audio": [],
+        "bytes_read": 0
+    }
+
+    movie_timescale = None
+    fragment_duration = None
+    default_sample_durations = {}
+    tracks = []
+    for box_type, body in _iter_boxes(moov):
+        if box_type == b"mvhd":
+            movie_timescale, movie_duration = _parse_mvhd(body)
+            if movie_timescale:
+                result["duration"] = movie_duration / movie_timescale
+        elif box_type == b"trak":
+            tracks.append(_parse_trak(body))
+        elif box_type == b"mvex":
+            for child_type, child in _iter_boxes(body):
+                if child_type == b"mehd":
+                    fragment_duration = _read_versioned_uint(child, 4)
+                elif child_type == b"trex":
+                    track_id, default_sample_duration = struct.unpack(">I4xI", child[4:16])
+                    default_sample_durations[track_id] = default_sample_duration
+
+    if fragment_duration and movie_timescale and not result["duration"]:
+        result["duration"] = fragment_duration / movie_timescale
+
+    for track in tracks:
+        if track["frame_rate"] is None and default_sample_durations.get(track["track_id"]):
+            track["frame_rate"] = round(track["timescale"] / default_sample_durations[track["track_id"]], 3)
+        handler = track.pop("handler")
+        for key in ("track_id", "timescale"):
+            track.pop(key)
+        if handler == "vide":
+            for key in ("channels", "sample_rate"):
+                track.pop(key)
+            result["video"].append(track)
+        elif handler == "soun":
+            for key in ("width", "height", "frame_rate", "hdr", "color_primaries", "transfer_characteristics", "matrix_coefficients"):
+                track.pop(key)
+            result["audio"].append(track)
+
+    result["bytes_read"] = reader.bytes_read
+    return result
+
+
+def _read_moov(reader):
+    """
+    Walk the top-level boxes with ranged reads until the moov box is found and return its payload.
+    Media data (mdat) is skipped by offset, so files without faststart cost one extra small read.
+    """
+    offset = 0
+    buffer_offset = 0
+    buffer = reader.read(0, min(HEADER_READ_SIZE, reader.size))
+
+    while offset + 8 <= reader.size:
+        if offset + 16 > buffer_offset + len(buffer):
+            buffer_offset = offset
+            buffer = reader.read(offset, min(HEADER_READ_SIZE, reader.size - offset))
+
+        header = buffer[offset - buffer_offset:offset - buffer_offset + 16]
+        size, box_type = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = reader.size - offset
+        if size < header_size:
+            raise Exception(f"Invalid box '{box_type!r}' at offset {offset}")
+
+        if offset == 0 and box_type not in (b"ftyp", b"moov", b"wide", b"free", b"mdat", b"skip"):
+            raise Exception("Unsupported container (not ISO BMFF / QuickTime)")
+
+        if box_type == b"moov":
+            if size > MAX_MOOV_SIZE:
+                raise Exception(f"moov box too large ({size} bytes)")
+            end = offset + size
+            if end <= buffer_offset + len(buffer):
+                return buffer[offset - buffer_offset + header_size:end - buffer_offset]
+            return reader.read(offset + header_size, size - header_size)
+
+        offset += size
+
+    raise Exception("moov box not found")
+
+
+def _iter_boxes(data):
+    """
+    Yield (type, payload) for each box contained in the given bytes.
+    """
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box_type = struct.unpack(">I4s", data[offset:offset + 8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[offset + 8:offset + 16])[0]
+            header_size = 16
+        elif size == 0:
+            size = len(data) - offset
+        if size < header_size:
+            return
+        yield box_type, data[offset + header_size:offset + size]
+        offset += size
+
+
+def _read_versioned_uint(body, offset):
+    """
+    Read a 32-bit (version 0) or 64-bit (version 1) field of a full box at the given offset.
+    """
+    if body[0] == 1:
+        return struct.unpack(">Q", body[offset:offset + 8])[0]
+    return struct.unpack(">I", body[offset:offset + 4])[0]
+
+
+def _parse_mvhd(body):
+    """
+    Return (timescale, duration) of the movie header.
+    """
+    if body[0] == 1:
+        return struct.unpack(">IQ", body[20:32])
+    return struct.unpack(">II", body[12:20])
+
+
+def _parse_trak(body):
+    """
+    Collect handler, timescale, duration, codec and sample-entry properties of one track.
+    """
+    track = {
+        "track_id": None,
+        "handler": None,
+        "codec": None,
+        "timescale": None,
+        "duration": None,
+        "language": None,
+        "width": None,
+        "height": None,
+        "frame_rate": None,
+        "hdr": None,
+        "color_primaries": None,
+        "transfer_characteristics": None,
+        "matrix_coefficients": None,
+        "channels": None,
+        "sample_rate": None
+    }
+
+    for box_type, payload in _walk(body):
+        if box_type == b"tkhd":
+            track["track_id"] = struct.unpack(">I", payload[20:24] if payload[0] == 1 else payload[12:16])[0]
+            width, height = struct.unpack(">II", payload[-8:])
+            track["width"] = (width >> 16) or None
+            track["height"] = (height >> 16) or None
+        elif box_type == b"mdhd":
+            if payload[0] == 1:
+                timescale, duration = struct.unpack(">IQ", payload[20:32])
+                language = struct.unpack(">H", payload[32:34])[0]
+            else:
+                timescale, duration = struct.unpack(">II", payload[12:20])
+                language = struct.unpack(">H", payload[20:22])[0]
+            track["timescale"] = timescale
+            track["duration"] = duration / timescale if timescale else None
+            track["language"] = "".join(chr(((language >> shift) & 0x1F) + 0x60) for shift in (10, 5, 0))
+        elif box_type == b"hdlr":
+            track["handler"] = payload[8:12].decode("latin-1")
+        elif box_type == b"stsd":
+            _parse_stsd(payload, track)
+        elif box_type == b"stts":
+            _parse_stts(payload, track)
+
+    return track
+
+
+def _walk(body):
+    """
+    Depth-first iteration over the boxes of a trak, descending into container boxes.
+    """
+    for box_type, payload in _iter_boxes(body):
+        yield box_type, payload
+        if box_type in CONTAINER_BOXES:
+            yield from _walk(payload)
+
+
+def _parse_stsd(payload, track):
+    """
+    Read codec, coded size / audio format and colour metadata from the first sample entry.
+    """
+    entries = list(_iter_boxes(payload[8:]))
+    if not entries:
+        return
+    entry_type, entry = entries[0]
+    track["codec"] = entry_type.decode("latin-1")
+
+    if track["handler"] == "vide":
+        coded_width, coded_height = struct.unpack(">HH", entry[24:28])
+        track["width"] = track["width"] or coded_width
+        track["height"] = track["height"] or coded_height
+        if entry_type in DOLBY_VISION_SAMPLE_ENTRIES:
+            track["hdr"] = "DOLBY_VISION"
+        for child_type, child in _iter_boxes(entry[78:]):
+            if child_type == b"colr" and child[:4] == b"nclx":
+                primaries, transfer, matrix = struct.unpack(">HHH", child[4:10])
+                track["color_primaries"] = primaries
+                track["transfer_characteristics"] = transfer
+                track["matrix_coefficients"] = matrix
+                track["hdr"] = track["hdr"] or HDR_TRANSFER_CHARACTERISTICS.get(transfer)
+            elif child_type in (b"dvcC", b"dvvC", b"dvwC"):
+                track["hdr"] = "DOLBY_VISION"
+            elif child_type in (b"mdcv", b"clli") and track["hdr"] is None:
+                track["hdr"] = "HDR10"
+
+    elif track["handler"] == "soun":
+        version = struct.unpack(">H", entry[8:10])[0]
+        channels, _, _, _, sample_rate = struct.unpack(">HHHHI", entry[16:28])
+        track["channels"] = channels
+        track["sample_rate"] = sample_rate >> 16
+        if version == 2:
+            track["sample_rate"] = round(struct.unpack(">d", entry[32:40])[0])
+            track["channels"] = struct.unpack(">I", entry[40:44])[0]
+
+
+def _parse_stts(payload, track):
+    """
+    Derive the average frame rate from the decoding time-to-sample table (empty for fragmented MP4).
+    """
+    entry_count = struct.unpack(">I", payload[4:8])[0]
+    sample_count = 0
+    total_duration = 0
+    for index in range(entry_count):
+        count, delta = struct.unpack(">II", payload[8 + index * 8:16 + index * 8])
+        sample_count += count
+        total_duration += count * delta
+    if track["handler"] == "vide" and sample_count and total_duration and track["timescale"]:
+        track["frame_rate"] = round(sample_count * track["timescale"] / total_duration, 3)
+
+
+def _open_reader(source, bucket):
+    """
+    Return a ranged reader for a local file, an https:// URL or an object key in the bucket.
+    """
+    if source.startswith(("https://", "http://")):
+        return _HttpRangeReader(source)
+    if os.path.exists(source):
+        return _FileRangeReader(source)
+    return _HttpRangeReader(_object_url(source, bucket), bucket=bucket)
+
+
+class _FileRangeReader:
+    """
+    Ranged reads from a local file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.bytes_read = 0
+
+    def read(self, offset, length):
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+        self.bytes_read += len(data)
+        return data
+
+
+class _HttpRangeReader:
+    """
+    Ranged reads over HTTP(S). Connections are kept alive per thread and per host,
+    and requests to the input bucket are signed with AWS Signature Version 4.
+    """
+
+    def __init__(self, url, bucket=None):
+        self.url = urllib.parse.urlsplit(url)
+        self.bucket = bucket
+        self.bytes_read = 0
+        self.size = None
+        data = self.read(0, HEADER_READ_SIZE)
+        self._first_read = data
+
+    def read(self, offset, length):
+        if offset == 0 and getattr(self, '_first_read', None) is not None and length <= len(self._first_read):
+            return self._first_read[:length]
+
+        headers = {"Range": f"bytes={offset}-{offset + length - 1}"}
+        if self.bucket:
+            headers.update(_sign_s3_request("GET", self.url.netloc, self.url.path, self.bucket))
+
+        response = _request(self.url, headers)
+        data = response.read()
+        if response.status not in (200, 206):
+            raise Exception(f"GET {self.url.geturl()} failed with HTTP {response.status}")
+
+        if self.size is None:
+            content_range = response.getheader("Content-Range")
+            self.size = int(content_range.rsplit("/", 1)[1]) if content_range else len(data)
+        if response.status == 200:
+            data = data[offset:offset + length]
+
+        self.bytes_read += len(data)
+        return data
+
+
+def _request(url, headers):
+    """
+    Issue a GET on a thread-local keep-alive connection, reconnecting once if the server closed it.
+    """
+    pool = getattr(_connections, 'pool', None)
+    if pool is None:
+        pool = _connections.pool = {}
+
+    key = (url.scheme, url.netloc)
+    path = url.path + (f"?{url.query}" if url.query else "")
+    for attempt in range(2):
+        connection = pool.get(key)
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+            connection = pool[key] = connection_class(url.netloc, timeout=30)
+        try:
+            connection.request("GET", path, headers=headers)
+            return connection.getresponse()
+        except (http.client.HTTPException, ConnectionError):
+            connection.close()
+            pool.pop(key, None)
+            if attempt == 1:
+                raise
+    return None
+
+
+def _object_url(key, bucket):
+    """
+    Virtual-hosted-style URL of an object key in the bucket.
+    """
+    quoted_key = urllib.parse.quote(key.lstrip('/'), safe='/~')
+    return f"https://{bucket['bucket_name']}.{bucket['host']}/{quoted_key}"
+
+
+def _sign_s3_request(method, host, path, bucket):
+    """
+    Return the headers that sign an unpayloaded S3 request with AWS Signature Version 4.
+    """
+    region = bucket.get("region") or bucket["host"].split('.')[0]
+    now = datetime.now(UTC)
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    date_stamp = now.strftime('%Y%m%d')
+    payload_hash = hashlib.sha256(b"").hexdigest()
+
+    canonical_headers = f"host:{host}\nx-amz-content-sha256:{payload_hash}\nx-amz-date:{amz_date}\n"
+    signed_headers = "host;x-amz-content-sha256;x-amz-date"
+    canonical_request = f"{method}\n{path}\n\n{canonical_headers}\n{signed_headers}\n{payload_hash}"
+
+    scope = f"{date_stamp}/{region}/s3/aws4_request"
+    string_to_sign = f"AWS4-HMAC-SHA256\n{amz_date}\n{scope}\n{hashlib.sha256(canonical_request.encode()).hexdigest()}"
+
+    signing_key = f"AWS4{bucket['secret_key']}".encode()
+    for part in (date_stamp, region, "s3", "aws4_request"):
+        signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+    signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    return {
+        "x-amz-date": amz_date,
+        "x-amz-content-sha256": payload_hash,
+        "Authorization": f"AWS4-HMAC-SHA256 Credential={bucket['access_key']}/{scope}, "
+                         f"SignedHeaders={signed_headers}, Signature={signature}"
+    }
+
+
+if __name__ == '__main__':
+    main()
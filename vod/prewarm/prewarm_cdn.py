@@ -0,0 +1,378 @@
+import http.client
+import json
+import re
+import threading
+import time
+import urllib.parse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+# Base URL of the title on the CDN edge (or the origin) that is warmed: the directory of stream.m3u8 / stream.mpd
+# (OUTPUT_BASE_PATH of the sample), e.g. 'https://vod.example.com/output/vod-h264-aac-fmp4-hls-dash/'.
+# A local stand-in works too, e.g. 'http://127.0.0.1:8000/' with `python -m http.server` in a mirrored output.
+PREWARM_BASE_URL = 'https://<INSERT_YOUR_EDGE_HOSTNAME>/output/vod-h264-aac-fmp4-hls-dash/'
+MANIFESTS = ['stream.m3u8', 'stream.mpd']
+
+# Init segment plus the first SEGMENT_COUNT media segments of every rendition are requested.
+SEGMENT_COUNT = 5
+# Requests in flight and requests per second (requests are spaced evenly across all workers).
+CONCURRENCY = 16
+RATE_LIMIT = 50
+# Passes over the same URLs; the second pass shows whether the first one filled the cache.
+PASSES = 2
+# Request Akamai debug headers (X-Cache) in the response.
+SEND_AKAMAI_PRAGMA = True
+EXTRA_HEADERS = {"User-Agent": "bm-akamai-encoding-samples-prewarm"}
+
+REPORT_PATH = 'prewarm_report.json'
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+READ_CHUNK_SIZE = 256 * 1024
+
+DASH_NAMESPACE = '{urn:mpeg:dash:schema:mpd:2011}'
+
+_connections = threading.local()
+_rate_limiter = {"lock": threading.Lock(), "next": 0.0}
+
+
+def main():
+    """
+    Warm the CDN (or origin) cache of a title after its manifests were generated. Steps:
+      1) Fetch the HLS master / media playlists and the DASH MPD from PREWARM_BASE_URL
+      2) Collect the init segment and the first SEGMENT_COUNT segments of every rendition (deduplicated,
+         HLS and DASH usually share the same segments)
+      3) Request them with CONCURRENCY workers limited to RATE_LIMIT requests per second, PASSES times
+      4) Report the cache status (HIT / MISS / ...) and latency histograms per pass and write REPORT_PATH
+    """
+    started = time.monotonic()
+
+    # 1) + 2) Manifests and the URLs to warm
+    manifest_results = []
+    urls = []
+    for manifest in MANIFESTS:
+        manifest_url = urllib.parse.urljoin(PREWARM_BASE_URL, manifest)
+        if manifest.endswith('.m3u8'):
+            manifest_urls, segment_urls = _collect_hls(manifest_url, manifest_results)
+        else:
+            manifest_urls, segment_urls = _collect_dash(manifest_url, manifest_results)
+        print(f"{manifest}: {len(manifest_urls)} manifests, {len(segment_urls)} segments")
+        urls.extend(segment_urls)
+    urls = list(dict.fromkeys(urls))
+    print(f"Warming {len(urls)} segment URLs ({PASSES} passes, {CONCURRENCY} concurrent, {RATE_LIMIT} req/s)")
+
+    # 3) Warm
+    passes = []
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        for number in range(1, PASSES + 1):
+            pass_started = time.monotonic()
+            results = list(executor.map(lambda url: fetch(url, rate_limited=True), urls))
+            passes.append({"pass": number, "seconds": time.monotonic() - pass_started, "results": results})
+
+    # 4) Report
+    report = {
+        "base_url": PREWARM_BASE_URL,
+        "segment_count": SEGMENT_COUNT,
+        "manifests": summarize(manifest_results),
+        "passes": [{"pass": p["pass"], "seconds": round(p["seconds"], 2), **summarize(p["results"])} for p in passes]
+    }
+    _print_summary("Manifests", report["manifests"])
+    for p in report["passes"]:
+        _print_summary(f"Pass {p['pass']} ({p['seconds']:.1f} s)", p)
+    with open(REPORT_PATH, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {REPORT_PATH} (total {time.monotonic() - started:.1f} s)")
+
+
+def fetch(url, rate_limited=False):
+    """
+    GET url (reading and discarding the body) on a keep-alive connection and return
+    {"url", "status", "cache_status", "ttfb_ms", "total_ms", "bytes", "body" (manifests only)}.
+    """
+    if rate_limited:
+        _acquire_token()
+
+    parts = urllib.parse.urlsplit(url)
+    target = parts.path + (f"?{parts.query}" if parts.query else "")
+    headers = dict(EXTRA_HEADERS)
+    if SEND_AKAMAI_PRAGMA:
+        headers["Pragma"] = "akamai-x-cache-on, akamai-x-get-cache-key"
+
+    is_manifest = parts.path.endswith(('.m3u8', '.mpd'))
+    for attempt in range(2):
+        connection = _connection(parts.scheme, parts.netloc)
+        try:
+            sent = time.perf_counter()
+            connection.request("GET", target, headers=headers)
+            response = connection.getresponse()
+            first_byte = time.perf_counter()
+            body = bytearray() if is_manifest else None
+            size = 0
+            while chunk := response.read(READ_CHUNK_SIZE):
+                size += len(chunk)
+                if body is not None:
+                    body += chunk
+            finished = time.perf_counter()
+            break
+        except (http.client.HTTPException, ConnectionError, TimeoutError) as e:
+            _drop_connection(parts.scheme, parts.netloc)
+            if attempt == 1:
+                return {"url": url, "status": None, "cache_status": "ERROR", "error": str(e),
+                        "ttfb_ms": None, "total_ms": None, "bytes": 0}
+
+    return {
+        "url": url,
+        "status": response.status,
+        "cache_status": cache_status(response.headers),
+        "ttfb_ms": (first_byte - sent) * 1000,
+        "total_ms": (finished - sent) * 1000,
+        "bytes": size,
+        "body": bytes(body) if body is not None else None
+    }
+
+
+def cache_status(headers):
+    """
+    Normalize the cache status of a response to HIT / MISS / REFRESH / OTHER, or NONE without cache headers.
+    Understands Akamai X-Cache (TCP_HIT, TCP_MEM_HIT, TCP_MISS, TCP_REFRESH_HIT, ...), RFC 9211 Cache-Status
+    and the X-Cache-Status / CF-Cache-Status headers of other caches.
+    """
+    value = headers.get("X-Cache") or headers.get("X-Cache-Status") or headers.get("CF-Cache-Status")
+    if value is None and headers.get("Cache-Status"):
+        value = "HIT" if re.search(r';\s*hit\b', headers["Cache-Status"], re.IGNORECASE) else "MISS"
+    if value is None:
+        return "NONE"
+
+    value = value.upper()
+    if "REFRESH" in value:
+        return "REFRESH"
+    if "HIT" in value:
+        return "HIT"
+    if "MISS" in value or "EXPIRED" in value:
+        return "MISS"
+    return "OTHER"
+
+
+def summarize(results):
+    """
+    Cache status counts and latency histograms (time to first byte, per cache status) of a set of requests.
+    """
+    statuses = {}
+    histograms = {}
+    for result in results:
+        statuses[result["cache_status"]] = statuses.get(result["cache_status"], 0) + 1
+        if result["ttfb_ms"] is None:
+            continue
+        histogram = histograms.setdefault(result["cache_status"], [0] * (len(LATENCY_BUCKETS_MS) + 1))
+        histogram[_bucket(result["ttfb_ms"])] += 1
+
+    ttfb = sorted(result["ttfb_ms"] for result in results if result["ttfb_ms"] is not None)
+    return {
+        "requests": len(results),
+        "errors": sum(1 for result in results if result["status"] is None or result["status"] >= 400),
+        "bytes": sum(result["bytes"] for result in results),
+        "cache_status": statuses,
+        "ttfb_ms": {
+            "p50": _percentile(ttfb, 0.5),
+            "p95": _percentile(ttfb, 0.95),
+            "max": round(ttfb[-1], 1) if ttfb else None
+        },
+        "ttfb_histogram_ms": {
+            "buckets": [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"],
+            "counts": histograms
+        }
+    }
+
+
+def _collect_hls(master_url, manifest_results):
+    """
+    Fetch an HLS master playlist and its media playlists; returns (playlist URLs, segment URLs)
+    with the EXT-X-MAP init segment and the first SEGMENT_COUNT segments of every media playlist.
+    """
+    master = _fetch_manifest(master_url, manifest_results)
+    media_urls = []
+    for line in master.splitlines():
+        if line.startswith(('#EXT-X-MEDIA', '#EXT-X-I-FRAME-STREAM-INF')):
+            uri = re.search(r'URI="([^"]+)"', line)
+            if uri:
+                media_urls.append(urllib.parse.urljoin(master_url, uri.group(1)))
+        elif line.strip() and not line.startswith('#'):
+            media_urls.append(urllib.parse.urljoin(master_url, line.strip()))
+    media_urls = list(dict.fromkeys(media_urls))
+
+    segment_urls = []
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        playlists = list(executor.map(lambda url: _fetch_manifest(url, manifest_results), media_urls))
+    for media_url, playlist in zip(media_urls, playlists, strict=True):
+        segments = []
+        for line in playlist.splitlines():
+            if line.startswith('#EXT-X-MAP'):
+                uri = re.search(r'URI="([^"]+)"', line)
+                if uri:
+                    segment_urls.append(urllib.parse.urljoin(media_url, uri.group(1)))
+            elif line.strip() and not line.startswith('#') and len(segments) < SEGMENT_COUNT:
+                segments.append(urllib.parse.urljoin(media_url, line.strip()))
+        segment_urls.extend(segments)
+    return [master_url, *media_urls], segment_urls
+
+
+def _collect_dash(mpd_url, manifest_results):
+    """
+    Fetch a DASH MPD; returns ([MPD URL], segment URLs) with the initialization and the first SEGMENT_COUNT
+    media segments of every Representation (SegmentTemplate with $Number$ or SegmentTimeline with $Time$,
+    or SegmentBase / single-file Representations with their BaseURL).
+    """
+    root = ET.fromstring(_fetch_manifest(mpd_url, manifest_results))
+    segment_urls = []
+    for period in root.iter(f"{DASH_NAMESPACE}Period"):
+        period_base = _base_url(_base_url(mpd_url, root), period)
+        for adaptation_set in period.iter(f"{DASH_NAMESPACE}AdaptationSet"):
+            adaptation_base = _base_url(period_base, adaptation_set)
+            for representation in adaptation_set.iter(f"{DASH_NAMESPACE}Representation"):
+                base = _base_url(adaptation_base, representation)
+                template = representation.find(f"{DASH_NAMESPACE}SegmentTemplate")
+                if template is None:
+                    template = adaptation_set.find(f"{DASH_NAMESPACE}SegmentTemplate")
+                if template is None:
+                    segment_urls.append(base)
+                    continue
+                segment_urls.extend(_template_urls(base, template, representation))
+    return [mpd_url], segment_urls
+
+
+def _template_urls(base, template, representation):
+    """
+    Initialization URL and the first SEGMENT_COUNT media URLs of a SegmentTemplate.
+    """
+    values = {"RepresentationID": representation.get('id', ''), "Bandwidth": representation.get('bandwidth', '')}
+    urls = []
+    if template.get('initialization'):
+        urls.append(urllib.parse.urljoin(base, _expand_template(template.get('initialization'), values)))
+
+    start_number = int(template.get('startNumber', 1))
+    timeline = template.find(f"{DASH_NAMESPACE}SegmentTimeline")
+    times = []
+    if timeline is not None:
+        current = 0
+        for entry in timeline.findall(f"{DASH_NAMESPACE}S"):
+            current = int(entry.get('t', current))
+            for _ in range(int(entry.get('r', 0)) + 1):
+                times.append(current)
+                current += int(entry.get('d'))
+                if len(times) >= SEGMENT_COUNT:
+                    break
+            if len(times) >= SEGMENT_COUNT:
+                break
+
+    for index in range(SEGMENT_COUNT if timeline is None else len(times)):
+        segment_values = {**values, "Number": start_number + index}
+        if times:
+            segment_values["Time"] = times[index]
+        urls.append(urllib.parse.urljoin(base, _expand_template(template.get('media'), segment_values)))
+    return urls
+
+
+def _expand_template(template, values):
+    """
+    Substitute $Identifier$ and $Identifier%0Nd$ placeholders of a SegmentTemplate ($$ is a literal $).
+    """
+    def replace(match):
+        if match.group(0) == '$$':
+            return '$'
+        value = values.get(match.group(1), '')
+        return match.group(2) % int(value) if match.group(2) else str(value)
+
+    return re.sub(r'\$\$|\$(\w+)(%0\d+[dxX])?\$', replace, template)
+
+
+def _base_url(parent, element):
+    """
+    Resolve the first BaseURL child of an MPD element against its parent URL.
+    """
+    base = element.find(f"{DASH_NAMESPACE}BaseURL")
+    return urllib.parse.urljoin(parent, base.text.strip()) if base is not None and base.text else parent
+
+
+def _fetch_manifest(url, manifest_results):
+    """
+    Fetch a manifest (counted in the manifest statistics) and return its text.
+    """
+    result = fetch(url)
+    manifest_results.append(result)
+    if result["status"] != 200:
+        raise Exception(f"GET {url} failed with HTTP {result['status']}")
+    return result["body"].decode('utf-8')
+
+
+def _acquire_token():
+    """
+    Block until the next request may be sent: requests are spaced 1 / RATE_LIMIT seconds apart across all workers.
+    """
+    with _rate_limiter["lock"]:
+        now = time.monotonic()
+        slot = max(now, _rate_limiter["next"])
+        _rate_limiter["next"] = slot + 1 / RATE_LIMIT
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def _connection(scheme, netloc):
+    """
+    Thread-local keep-alive connection to scheme://netloc.
+    """
+    pool = getattr(_connections, 'pool', None)
+    if pool is None:
+        pool = _connections.pool = {}
+    connection = pool.get((scheme, netloc))
+    if connection is None:
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        connection = pool[scheme, netloc] = connection_class(netloc, timeout=30)
+    return connection
+
+
+def _drop_connection(scheme, netloc):
+    """
+    Close and forget the thread-local connection to scheme://netloc.
+    """
+    connection = getattr(_connections, 'pool', {}).pop((scheme, netloc), None)
+    if connection is not None:
+        connection.close()
+
+
+def _bucket(latency_ms):
+    """
+    Index of the latency histogram bucket.
+    """
+    for index, bound in enumerate(LATENCY_BUCKETS_MS):
+        if latency_ms <= bound:
+            return index
+    return len(LATENCY_BUCKETS_MS)
+
+
+def _percentile(sorted_values, quantile):
+    """
+    Nearest-rank percentile of sorted values (None if empty).
+    """
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(int(quantile * len(sorted_values)), len(sorted_values) - 1)], 1)
+
+
+def _print_summary(title, summary):
+    """
+    Print cache status counts and TTFB histograms.
+    """
+    statuses = ", ".join(f"{status} {count}" for status, count in sorted(summary["cache_status"].items()))
+    print(f"{title}: {summary['requests']} requests, {summary['errors']} errors, {summary['bytes'] / 1e6:.1f} MB; {statuses}; "
+          f"TTFB p50 {summary['ttfb_ms']['p50']} ms / p95 {summary['ttfb_ms']['p95']} ms")
+    buckets = summary["ttfb_histogram_ms"]["buckets"]
+    for status, counts in sorted(summary["ttfb_histogram_ms"]["counts"].items()):
+        peak = max(counts) or 1
+        print(f"  {status}")
+        for bucket, count in zip(buckets, counts, strict=True):
+            if count:
+                print(f"    {bucket:>8} ms {'#' * max(round(count / peak * 40), 1)} {count}")
+
+
+if __name__ == '__main__':
+    main()
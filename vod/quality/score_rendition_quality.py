@@ -0,0 +1,256 @@
+import json
+import math
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Reference (source) and renditions to score. Anything ffmpeg can open works: local files,
+# https:// URLs of public renditions (e.g. the per-rendition HLS playlists) or mirrored outputs.
+REFERENCE_PATH = '/path/to/your/input/file.mp4'
+RENDITIONS = [
+    {"name": "240p", "bitrate": 300000, "path": 'https://<BUCKET>.<HOST>/output/vod-h264-aac-fmp4-hls-dash/video_300000.m3u8'},
+    {"name": "360p", "bitrate": 800000, "path": 'https://<BUCKET>.<HOST>/output/vod-h264-aac-fmp4-hls-dash/video_800000.m3u8'},
+    {"name": "480p", "bitrate": 1200000, "path": 'https://<BUCKET>.<HOST>/output/vod-h264-aac-fmp4-hls-dash/video_1200000.m3u8'},
+    {"name": "540p", "bitrate": 2000000, "path": 'https://<BUCKET>.<HOST>/output/vod-h264-aac-fmp4-hls-dash/video_2000000.m3u8'},
+    {"name": "720p", "bitrate": 4000000, "path": 'https://<BUCKET>.<HOST>/output/vod-h264-aac-fmp4-hls-dash/video_4000000.m3u8'},
+    {"name": "1080p", "bitrate": 6000000, "path": 'https://<BUCKET>.<HOST>/output/vod-h264-aac-fmp4-hls-dash/video_6000000.m3u8'}
+]
+
+RESULTS_PATH = 'quality_results.json'
+
+# Both reference and renditions are scaled to this luma resolution before scoring.
+# None keeps the reference height (renditions are upscaled, as a player would display them).
+EVAL_HEIGHT = None
+# Frames per second compared. None uses the reference frame rate; lower values score a subset of frames.
+EVAL_FRAME_RATE = None
+
+# The timeline is split into chunks of CHUNK_DURATION seconds, each decoded and scored by one worker.
+CHUNK_DURATION = 60
+MAX_WORKERS = os.cpu_count()
+
+FFMPEG = 'ffmpeg'
+FFPROBE = 'ffprobe'
+
+SSIM_BLOCK_SIZE = 8
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+PSNR_MAX = 100.0
+
+
+def main():
+    """
+    Score every rendition against the reference with per-frame PSNR / SSIM on luma planes.
+      1) Probe the reference (resolution, frame rate, duration) with ffprobe
+      2) Split the timeline of every rendition into chunks and score the chunks in a process pool;
+         each worker streams raw luma frames from two ffmpeg decoders, so memory stays bounded
+      3) Aggregate per-rendition quality curves (per-second series and summary statistics)
+      4) Write the bitrate / quality curve of all renditions to RESULTS_PATH
+    """
+
+    # 1) Reference properties
+    reference = _probe(REFERENCE_PATH)
+    eval_height = EVAL_HEIGHT or reference["height"]
+    eval_width = round(reference["width"] * eval_height / reference["height"] / 2) * 2
+    eval_frame_rate = EVAL_FRAME_RATE or reference["frame_rate"]
+    print(f"Reference {reference['width']}x{reference['height']} @ {reference['frame_rate']:.3f} fps, {reference['duration']:.1f} s; "
+          f"scoring at {eval_width}x{eval_height} @ {eval_frame_rate:.3f} fps")
+
+    # 2) Chunked scoring
+    chunk_starts = np.arange(0, reference["duration"], CHUNK_DURATION)
+    tasks = [
+        (rendition["name"], rendition["path"], float(start), eval_width, eval_height, eval_frame_rate)
+        for rendition in RENDITIONS
+        for start in chunk_starts
+    ]
+
+    started = time.monotonic()
+    chunks = {rendition["name"]: [] for rendition in RENDITIONS}
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for name, start, psnr, ssim in executor.map(_score_chunk, tasks):
+            chunks[name].append((start, psnr, ssim))
+    print(f"Scored {len(tasks)} chunks in {time.monotonic() - started:.1f} s")
+
+    # 3) + 4) Quality curves
+    results = []
+    for rendition in sorted(RENDITIONS, key=lambda r: r["bitrate"]):
+        ordered = sorted(chunks[rendition["name"]], key=lambda chunk: chunk[0])
+        psnr = np.concatenate([chunk[1] for chunk in ordered]) if ordered else np.empty(0)
+        ssim = np.concatenate([chunk[2] for chunk in ordered]) if ordered else np.empty(0)
+        if psnr.size == 0:
+            # A rendition without scored frames has no quality point; it is left out of the curves.
+            print(f"Warning: no frames of {rendition['name']} ({rendition['path']}) could be scored; skipped")
+            continue
+        result = {
+            "name": rendition["name"],
+            "bitrate": rendition["bitrate"],
+            "frames": int(psnr.size),
+            **_summary("psnr", psnr),
+            **_summary("ssim", ssim),
+            "per_second": {
+                "psnr": _per_second(psnr, eval_frame_rate),
+                "ssim": _per_second(ssim, eval_frame_rate)
+            }
+        }
+        results.append(result)
+        print(f"{rendition['name']:>6} @ {rendition['bitrate'] / 1000:.0f} kbps: "
+              f"PSNR {result['psnr_mean']:.2f} dB (p5 {result['psnr_p5']:.2f}), SSIM {result['ssim_mean']:.4f} (p5 {result['ssim_p5']:.4f})")
+
+    with open(RESULTS_PATH, 'w') as f:
+        json.dump({
+            "reference": REFERENCE_PATH,
+            "eval_resolution": [eval_width, eval_height],
+            "eval_frame_rate": eval_frame_rate,
+            "renditions": results
+        }, f, allow_nan=False)
+    print(f"Quality curves written to {RESULTS_PATH}")
+
+
+def _score_chunk(task):
+    """
+    Worker: decode one chunk of the reference and the rendition as raw 8-bit luma frames and
+    return (name, start, per-frame PSNR, per-frame SSIM). Only two frames are held in memory at a time.
+    """
+    name, path, start, width, height, frame_rate = task
+    frame_size = width * height
+    reference_decoder = _open_decoder(REFERENCE_PATH, start, width, height, frame_rate)
+    rendition_decoder = _open_decoder(path, start, width, height, frame_rate)
+
+    reference_frame = bytearray(frame_size)
+    rendition_frame = bytearray(frame_size)
+    psnr = []
+    ssim = []
+    try:
+        while (_read_frame(reference_decoder, reference_frame) and _read_frame(rendition_decoder, rendition_frame)):
+            reference_luma = np.frombuffer(reference_frame, dtype=np.uint8).reshape(height, width)
+            rendition_luma = np.frombuffer(rendition_frame, dtype=np.uint8).reshape(height, width)
+            psnr.append(frame_psnr(reference_luma, rendition_luma))
+            ssim.append(frame_ssim(reference_luma, rendition_luma))
+    finally:
+        for decoder in (reference_decoder, rendition_decoder):
+            decoder.stdout.close()
+            decoder.kill()
+            decoder.wait()
+
+    return name, start, np.array(psnr, dtype=np.float32), np.array(ssim, dtype=np.float32)
+
+
+def frame_psnr(reference, distorted):
+    """
+    PSNR (dB) of two 8-bit luma planes.
+    """
+    mse = np.mean(np.square(reference.astype(np.float32) - distorted.astype(np.float32)))
+    if mse == 0:
+        return PSNR_MAX
+    return min(10 * math.log10(255 * 255 / mse), PSNR_MAX)
+
+
+def frame_ssim(reference, distorted):
+    """
+    Mean SSIM of two 8-bit luma planes over non-overlapping SSIM_BLOCK_SIZE x SSIM_BLOCK_SIZE blocks,
+    computed for all blocks at once by reshaping the planes into (rows, block, cols, block).
+    """
+    block = SSIM_BLOCK_SIZE
+    rows = reference.shape[0] // block
+    cols = reference.shape[1] // block
+    x = reference[:rows * block, :cols * block].astype(np.float32).reshape(rows, block, cols, block)
+    y = distorted[:rows * block, :cols * block].astype(np.float32).reshape(rows, block, cols, block)
+
+    mean_x = x.mean(axis=(1, 3), keepdims=True)
+    mean_y = y.mean(axis=(1, 3), keepdims=True)
+    dx = x - mean_x
+    dy = y - mean_y
+    var_x = np.mean(dx * dx, axis=(1, 3))
+    var_y = np.mean(dy * dy, axis=(1, 3))
+    cov_xy = np.mean(dx * dy, axis=(1, 3))
+    mean_x = mean_x[:, 0, :, 0]
+    mean_y = mean_y[:, 0, :, 0]
+
+    ssim_map = ((2 * mean_x * mean_y + SSIM_C1) * (2 * cov_xy + SSIM_C2)) / \
+               ((mean_x * mean_x + mean_y * mean_y + SSIM_C1) * (var_x + var_y + SSIM_C2))
+    return float(ssim_map.mean())
+
+
+def _open_decoder(path, start, width, height, frame_rate):
+    """
+    Start ffmpeg decoding CHUNK_DURATION seconds from start as raw gray frames of the given size and rate.
+    """
+    return subprocess.Popen(
+        [
+            FFMPEG, '-v', 'error', '-nostdin',
+            '-ss', f'{start:.3f}', '-t', f'{CHUNK_DURATION:.3f}', '-i', path,
+            '-map', '0:v:0', '-an', '-sn',
+            '-vf', f'fps={frame_rate},scale={width}:{height}:flags=bicubic,format=gray',
+            '-f', 'rawvideo', '-'
+        ],
+        stdout=subprocess.PIPE,
+        bufsize=width * height * 2
+    )
+
+
+def _read_frame(decoder, buffer):
+    """
+    Fill the buffer with the next frame; returns False at the end of the stream.
+    """
+    view = memoryview(buffer)
+    filled = 0
+    while filled < len(buffer):
+        read = decoder.stdout.readinto(view[filled:])
+        if not read:
+            return False
+        filled += read
+    return True
+
+
+def _probe(path):
+    """
+    Width, height, frame rate and duration of the first video stream (via ffprobe).
+    """
+    output = subprocess.run(
+        [
+            FFPROBE, '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'stream=width,height,avg_frame_rate:format=duration',
+            '-of', 'json', path
+        ],
+        check=True, capture_output=True, text=True
+    ).stdout
+    probe = json.loads(output)
+    stream = probe["streams"][0]
+    numerator, denominator = stream["avg_frame_rate"].split('/')
+    return {
+        "width": int(stream["width"]),
+        "height": int(stream["height"]),
+        "frame_rate": int(numerator) / int(denominator),
+        "duration": float(probe["format"]["duration"])
+    }
+
+
+def _summary(metric, values):
+    """
+    Mean, 5th percentile and minimum of a per-frame metric.
+    """
+    if values.size == 0:
+        return {f"{metric}_mean": None, f"{metric}_p5": None, f"{metric}_min": None}
+    return {
+        f"{metric}_mean": float(values.mean()),
+        f"{metric}_p5": float(np.percentile(values, 5)),
+        f"{metric}_min": float(values.min())
+    }
+
+
+def _per_second(values, frame_rate):
+    """
+    Average a per-frame series into one value per second of content.
+    """
+    frames_per_second = max(round(frame_rate), 1)
+    seconds = values.size // frames_per_second
+    if seconds == 0:
+        return [float(values.mean())] if values.size else []
+    per_second = values[:seconds * frames_per_second].reshape(seconds, frames_per_second).mean(axis=1)
+    return [round(float(value), 4) for value in per_second]
+
+
+if __name__ == '__main__':
+    main()
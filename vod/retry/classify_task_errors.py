@@ -0,0 +1,108 @@
+import json
+import re
+
+# Recorded task errors with their expected classification (one JSON object per line, see README).
+RECORDED_ERRORS_PATH = 'vod/retry/recorded_task_errors.jsonl'
+
+# Rule table: the first rule with a pattern that matches any error text of a task decides the category.
+# Order matters: transient infrastructure errors (timeouts, 5xx) are checked before the input / output rules,
+# so "timed out while reading the input" is retried instead of being reported as an unreachable input.
+ERROR_RULES = [
+    {"category": "transient_infra", "transient": True, "patterns": [
+        r"timed? ?out",
+        r"connection (was )?(reset|refused|closed|aborted)",
+        # 5xx only in an HTTP / status context ("Video bitrate 500 kbps ..." is a configuration error).
+        r"(HTTP|status( code)?)\s*:?\s*(500|502|503|504)\b",
+        r"internal (server )?error|bad gateway|gateway time-?out",
+        r"service (temporarily )?unavailable",
+        r"slow ?down|throttl|rate limit",
+        r"(instance|node|worker|machine)s? (was |were )?(terminated|preempted|lost|unavailable|unreachable)",
+        r"insufficient capacity|no capacity",
+        r"(please )?(try again|retry) later"
+    ]},
+    {"category": "output_permission", "transient": False, "patterns": [
+        r"output.*(access denied|forbidden|\b403\b|permission|not authori[sz]ed|invalid.*(key|credential))",
+        r"(access denied|forbidden|\b403\b|permission|not authori[sz]ed).*output",
+        r"(write|upload|put)\w* .*(denied|forbidden|not permitted|permission)"
+    ]},
+    {"category": "input_unreachable", "transient": False, "patterns": [
+        r"input.*(not found|does not exist|no such|\b404\b|unreachable|access denied|forbidden|\b403\b)",
+        r"(unable|failed|could not|cannot) (to )?(access|download|open|read|fetch|probe).*(input|file|source)",
+        r"no such (key|file|bucket)",
+        r"no (video|audio) (stream|track)s? (found|available)"
+    ]},
+    {"category": "codec_config_invalid", "transient": False, "patterns": [
+        r"(invalid|unsupported|not supported|incompatible).*(codec|profile|level|bitrate|resolution|configuration|preset|parameter)",
+        r"(codec|profile|level|bitrate|configuration|parameter).*(invalid|unsupported|not supported|incompatible|out of range|exceed)"
+    ]}
+]
+
+UNKNOWN_CATEGORY = {"category": "unknown", "transient": False}
+
+_compiled_rules = [(rule, [re.compile(pattern, re.IGNORECASE) for pattern in rule["patterns"]]) for rule in ERROR_RULES]
+
+
+def main():
+    """
+    Check the rule table against the recorded task errors in RECORDED_ERRORS_PATH. Steps:
+      1) Classify the messages (and retry hint) of every recorded error
+      2) Print the errors whose category or transient flag differs from the expected one
+      3) Print the number of recorded errors per category, and fail if any error is misclassified
+    """
+    with open(RECORDED_ERRORS_PATH) as f:
+        recorded = [json.loads(line) for line in f if line.strip()]
+
+    mismatches = 0
+    counts = {}
+    for error in recorded:
+        result = classify_messages(messages=error["messages"], retry_hint=error.get("retry_hint"))
+        counts[error["category"]] = counts.get(error["category"], 0) + 1
+        if (result["category"], result["transient"]) != (error["category"], error["transient"]):
+            mismatches += 1
+            print(f"MISMATCH: {error['messages']} -> {result['category']} (transient: {result['transient']}), "
+                  f"expected {error['category']} (transient: {error['transient']})")
+
+    print(", ".join(f"{category}: {count}" for category, count in sorted(counts.items())))
+    if mismatches:
+        raise Exception(f"{mismatches} of {len(recorded)} recorded errors misclassified")
+    print(f"All {len(recorded)} recorded errors classified as expected")
+
+
+def classify_task(task):
+    """
+    Classify a failed encoding task from its ERROR messages and error details.
+    """
+    messages = [message.text for message in task.messages or []
+                if message.text and getattr(message.type, 'value', message.type) == "ERROR"]
+    retry_hint = None
+    if task.error is not None:
+        if task.error.text:
+            messages.append(task.error.text)
+        if task.error.retry_hint is not None:
+            retry_hint = task.error.retry_hint.value
+    return classify_messages(messages=messages, retry_hint=retry_hint)
+
+
+def classify_messages(messages, retry_hint=None):
+    """
+    Category, transient flag and matching rule of the given error texts.
+    A RETRY / RETRY_IN_DIFFERENT_REGION hint makes any failure transient, NO_RETRY makes it permanent.
+    """
+    result = {**UNKNOWN_CATEGORY, "pattern": None, "text": messages[0] if messages else None}
+    for rule, patterns in _compiled_rules:
+        match = next(((pattern, text) for pattern in patterns for text in messages if pattern.search(text)), None)
+        if match:
+            result = {"category": rule["category"], "transient": rule["transient"], "pattern": match[0].pattern,
+                      "text": match[1]}
+            break
+
+    if retry_hint in ("RETRY", "RETRY_IN_DIFFERENT_REGION"):
+        result["transient"] = True
+    elif retry_hint == "NO_RETRY":
+        result["transient"] = False
+    result["retry_hint"] = retry_hint
+    return result
+
+
+if __name__ == '__main__':
+    main()
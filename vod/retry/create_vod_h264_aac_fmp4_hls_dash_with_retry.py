@@ -0,0 +1,655 @@
+import json
+import re
+import time
+from datetime import UTC, datetime
+
+from bitmovin_api_sdk import BitmovinApi
+from bitmovin_api_sdk import GenericS3Input, S3AccessStyle, S3SignatureVersion, GenericS3Output
+from bitmovin_api_sdk import Encoding, CloudRegion
+from bitmovin_api_sdk import EncodingOutput, AclEntry, AclPermission
+from bitmovin_api_sdk import IngestInputStream, StreamSelectionMode, PresetConfiguration
+from bitmovin_api_sdk import Stream, StreamInput, MuxingStream, StreamMode, ColorConfig
+from bitmovin_api_sdk import AacAudioConfiguration, AacChannelLayout
+from bitmovin_api_sdk import H264VideoConfiguration, CodecConfigType, ProfileH264, LevelH264, WeightedPredictionPFrames
+from bitmovin_api_sdk import Fmp4Muxing
+from bitmovin_api_sdk import HlsManifest, HlsVersion, AudioMediaInfo, StreamInfo
+from bitmovin_api_sdk import DashManifest, Period, VideoAdaptationSet, AudioAdaptationSet
+from bitmovin_api_sdk import DashFmp4Representation, DashRepresentationType, DashRepresentationTypeMode
+from bitmovin_api_sdk import MessageType, StartEncodingRequest
+from bitmovin_api_sdk import Status, RetryHint
+from bitmovin_api_sdk import IngestInputStreamListQueryParams, StreamListQueryParams, Fmp4MuxingListQueryParams
+
+from classify_task_errors import classify_task
+
+TEST_ITEM = "vod-h264-aac-fmp4-hls-dash-with-retry"
+
+API_KEY = '<INSERT YOUR API KEY>'
+ORG_ID = '<INSERT YOUR ORG ID>'
+
+LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_INPUT_HOST_NAME = '<INSERT_YOUR_INPUT_HOST_NAME>'
+
+INPUT_PATH = '/path/to/your/input/file.mp4'
+# e.g. 'inputs/big_buck_bunny_1080p_h264.mov'
+
+LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME = '<INSERT_YOUR_OUTPUT_HOST_NAME>'
+
+OUTPUT_BASE_PATH = f'output/{TEST_ITEM}/'
+
+# Waits (seconds) before each retry of a transient failure; the number of entries is the maximum number of retries.
+RETRY_DELAYS = [60, 300, 900]
+# Cloud region of the retry when the error suggests another region (RETRY_IN_DIFFERENT_REGION). None keeps the region.
+FALLBACK_CLOUD_REGION = CloudRegion.AKAMAI_ID_CGK
+# Messages of every failed task with their classification (to extend recorded_task_errors.jsonl).
+FAILED_TASKS_PATH = 'failed_tasks.jsonl'
+# One line per failure incident: attempts, categories and the time to recover (mean time to recover).
+RECOVERY_LOG_PATH = 'recovery_log.jsonl'
+# Page size when listing the input streams, streams and muxings of an encoding to clone it.
+PAGE_LIMIT = 100
+
+bitmovin_api = BitmovinApi(api_key=API_KEY, tenant_org_id=ORG_ID)
+
+# Example H.264 encoding profiles, including different resolutions, bitrates, and profiles.
+video_encoding_profiles = [
+    {"height": 240, "bitrate": 300000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 360, "bitrate": 800000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 480, "bitrate": 1200000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 540, "bitrate": 2000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 720, "bitrate": 4000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 1080, "bitrate": 6000000, "profile": ProfileH264.HIGH, "level": LevelH264.L4, "mode": StreamMode.STANDARD}
+]
+
+# Example AAC audio encoding profiles, each with a specified bitrate and sample rate.
+audio_encoding_profiles = [
+    {"bitrate": 128000, "rate": 48000},
+    {"bitrate": 64000, "rate": 44100}
+]
+
+
+def main():
+    """
+    Main entry point for the encoding script.
+    This demonstrates a basic Bitmovin encoding workflow using H.264 video and AAC audio, retrying transient
+    encoding failures automatically. Steps:
+      1) Create Generic S3 input/output for Linode Object Storage
+      2) Create an Encoding object
+      3) Define video/audio input streams
+      4) Create multiple H.264 streams, using advanced color/coding parameters
+      5) Create multiple AAC streams
+      6) Start the encoding (FMP4 muxing outputs); on a transient failure, retry with a fresh encoding cloned
+         from the failed one
+      7) Generate HLS and DASH manifests
+    """
+
+    # 1) Generic S3 Input/Output
+    input = bitmovin_api.encoding.inputs.generic_s3.create(
+        generic_s3_input=GenericS3Input(
+            access_key=LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_INPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Input'))
+    output = bitmovin_api.encoding.outputs.generic_s3.create(
+        generic_s3_output=GenericS3Output(
+            access_key=LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Output'))
+
+    # 2) Encoding instance
+    encoding = bitmovin_api.encoding.encodings.create(
+        encoding=Encoding(
+            name=f"[{TEST_ITEM}] {INPUT_PATH}",
+            cloud_region=CloudRegion.AKAMAI_JP_OSA,
+            encoder_version='STABLE'
+        )
+    )
+
+    # 3) Input Streams
+    video_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=INPUT_PATH,
+            selection_mode=StreamSelectionMode.VIDEO_RELATIVE,
+            position=0
+        )
+    )
+    audio_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=INPUT_PATH,
+            selection_mode=StreamSelectionMode.AUDIO_RELATIVE,
+            position=0
+        )
+    )
+    video_input_stream = StreamInput(input_stream_id=video_ingest_input_stream.id)
+    audio_input_stream = StreamInput(input_stream_id=audio_ingest_input_stream.id)
+
+    # 4) Create Video Streams + Muxings
+    for video_profile in video_encoding_profiles:
+        color_config = ColorConfig(
+            copy_color_primaries_flag=True,
+            copy_color_transfer_flag=True,
+            copy_color_space_flag=True
+        )
+
+        # Configure advanced H.264 parameters (ref: https://developer.bitmovin.com/encoding/docs/h264-presets)
+        if video_profile.get("profile") == ProfileH264.HIGH:
+            adaptive_spatial_transform = True
+            use_cabac = True
+            num_refframe = 4
+            num_bframe = 3
+            weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+        elif video_profile.get("profile") == ProfileH264.MAIN:
+            adaptive_spatial_transform = False
+            use_cabac = True
+            num_refframe = 4
+            num_bframe = 3
+            weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+        elif video_profile.get("profile") == ProfileH264.BASELINE:
+            adaptive_spatial_transform = False
+            use_cabac = False
+            num_refframe = 4
+            num_bframe = 0
+            weighted_prediction_p_frames = WeightedPredictionPFrames.DISABLED
+        else:
+            raise Exception("Unknown profile. Valid profiles: HIGH, MAIN, BASELINE.")
+
+        h264_codec = bitmovin_api.encoding.configurations.video.h264.create(
+            h264_video_configuration=H264VideoConfiguration(
+                name='Sample video codec configuration',
+                height=video_profile.get("height"),
+                bitrate=video_profile.get("bitrate"),
+                max_bitrate=int(video_profile.get("bitrate") * 1.2),
+                bufsize=int(video_profile.get("bitrate") * 1.5),
+                profile=video_profile.get("profile"),
+                level=video_profile.get("level"),
+                min_keyframe_interval=2,
+                max_keyframe_interval=2,
+                color_config=color_config,
+                ref_frames=num_refframe,
+                bframes=num_bframe,
+                cabac=use_cabac,
+                adaptive_spatial_transform=adaptive_spatial_transform,
+                weighted_prediction_p_frames=weighted_prediction_p_frames,
+                preset_configuration=PresetConfiguration.VOD_HIGH_QUALITY
+            )
+        )
+
+        h264_stream = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=h264_codec.id,
+                input_streams=[video_input_stream],
+                name=f"Stream H264 {video_profile.get('height')}p",
+                mode=video_profile.get('mode')
+            )
+        )
+
+        video_muxing_output = EncodingOutput(
+            output_id=output.id,
+            output_path=f"{OUTPUT_BASE_PATH}video/{video_profile.get('height')}p",
+            acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+        )
+
+        bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=6,
+                segment_naming='segment_%number%.m4s',
+                init_segment_name='init.mp4',
+                streams=[MuxingStream(stream_id=h264_stream.id)],
+                outputs=[video_muxing_output],
+                name=f"Video FMP4 Muxing {video_profile.get('height')}p"
+            )
+        )
+
+    # 5) Create Audio Streams + Muxings
+    for audio_profile in audio_encoding_profiles:
+        aac_codec = bitmovin_api.encoding.configurations.audio.aac.create(
+            aac_audio_configuration=AacAudioConfiguration(
+                bitrate=audio_profile.get("bitrate"),
+                rate=audio_profile.get("rate"),
+                channel_layout=AacChannelLayout.CL_STEREO
+            )
+        )
+
+        aac_stream = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=aac_codec.id,
+                input_streams=[audio_input_stream],
+                name=f"Stream AAC {audio_profile.get('bitrate') / 1000:.0f}kbps",
+                mode=StreamMode.STANDARD
+            )
+        )
+
+        audio_muxing_output = EncodingOutput(
+            output_id=output.id,
+            output_path=f"{OUTPUT_BASE_PATH}audio/{audio_profile.get('bitrate')}",
+            acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+        )
+
+        bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=6,
+                segment_naming='segment_%number%.m4s',
+                init_segment_name='init.mp4',
+                streams=[MuxingStream(stream_id=aac_stream.id)],
+                outputs=[audio_muxing_output],
+                name=f"Audio FMP4 Muxing {audio_profile.get('bitrate') / 1000:.0f}kbps"
+            )
+        )
+
+    # 6) Start Encoding (no manifest in request)
+    start_encoding_request = StartEncodingRequest()
+    encoding = _execute_encoding(encoding=encoding, start_encoding_request=start_encoding_request)
+
+    # 7) Create HLS/DASH manifests
+    hls_manifest = _create_hls_manifest(encoding_id=encoding.id, output=output, output_path=OUTPUT_BASE_PATH)
+    dash_manifest = _create_dash_manifest(encoding_id=encoding.id, output=output, output_path=OUTPUT_BASE_PATH)
+
+    # 8) Generate HLS/DASH
+    _execute_hls_manifest_generation(hls_manifest=hls_manifest)
+    _execute_dash_manifest_generation(dash_manifest=dash_manifest)
+
+
+def _execute_encoding(encoding, start_encoding_request):
+    """
+    Start the encoding process on Bitmovin and poll until it finishes or fails. Failures are classified;
+    transient ones are retried after RETRY_DELAYS with a fresh encoding that reuses the failed encoding's
+    resource graph. Returns the encoding that finished.
+    """
+    failures = []
+    while True:
+        bitmovin_api.encoding.encodings.start(encoding_id=encoding.id, start_encoding_request=start_encoding_request)
+        task = _wait_for_encoding_to_finish(encoding_id=encoding.id)
+
+        while task.status not in [Status.FINISHED, Status.ERROR]:
+            task = _wait_for_encoding_to_finish(encoding_id=encoding.id)
+
+        if task.status == Status.FINISHED:
+            break
+
+        _log_task_errors(task)
+        classification = classify_task(task)
+        failures.append({"encoding_id": encoding.id, "failed_at": time.time(), **classification})
+        _record_failed_task(encoding_id=encoding.id, classification=classification, task=task)
+        print(f"Encoding failed: {classification['category']} "
+              f"({'transient' if classification['transient'] else 'not transient'}, matched: {classification['text']})")
+
+        if not classification["transient"] or len(failures) > len(RETRY_DELAYS):
+            _record_recovery(failures=failures, recovered_at=None)
+            raise Exception(f"Encoding failed ({classification['category']})")
+
+        delay = RETRY_DELAYS[len(failures) - 1]
+        print(f"Retrying in {delay} s with a fresh encoding (attempt {len(failures) + 1} of {len(RETRY_DELAYS) + 1})")
+        time.sleep(delay)
+        other_region = classification["retry_hint"] == RetryHint.RETRY_IN_DIFFERENT_REGION.value
+        encoding = _clone_encoding(encoding_id=encoding.id, attempt=len(failures) + 1,
+                                   cloud_region=FALLBACK_CLOUD_REGION if other_region else None)
+
+    if failures:
+        _record_recovery(failures=failures, recovered_at=time.time())
+    print("Encoding finished successfully")
+    return encoding
+
+
+def _clone_encoding(encoding_id, attempt, cloud_region=None):
+    """
+    Create a fresh encoding with the resource graph of the given one: the same input streams (input and path),
+    streams (codec configurations), FMP4 muxings and outputs. Inputs, outputs and codec configurations are reused.
+    """
+    source = bitmovin_api.encoding.encodings.get(encoding_id=encoding_id)
+    name = re.sub(r' \(attempt \d+\)$', '', source.name)
+    encoding = bitmovin_api.encoding.encodings.create(
+        encoding=Encoding(
+            name=f"{name} (attempt {attempt})",
+            description=source.description,
+            cloud_region=cloud_region or source.cloud_region,
+            encoder_version=source.encoder_version,
+            labels=source.labels
+        )
+    )
+
+    input_stream_ids = {}
+    for input_stream in _list_all(bitmovin_api.encoding.encodings.input_streams.ingest, IngestInputStreamListQueryParams, encoding_id):
+        input_stream_ids[input_stream.id] = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+            encoding_id=encoding.id,
+            ingest_input_stream=IngestInputStream(
+                input_id=input_stream.input_id,
+                input_path=input_stream.input_path,
+                selection_mode=input_stream.selection_mode,
+                position=input_stream.position
+            )
+        ).id
+
+    stream_ids = {}
+    for stream in _list_all(bitmovin_api.encoding.encodings.streams, StreamListQueryParams, encoding_id):
+        stream_ids[stream.id] = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=stream.codec_config_id,
+                input_streams=[StreamInput(input_stream_id=input_stream_ids[stream_input.input_stream_id])
+                               for stream_input in stream.input_streams],
+                name=stream.name,
+                mode=stream.mode
+            )
+        ).id
+
+    for muxing in _list_all(bitmovin_api.encoding.encodings.muxings.fmp4, Fmp4MuxingListQueryParams, encoding_id):
+        bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=muxing.segment_length,
+                segment_naming=muxing.segment_naming,
+                init_segment_name=muxing.init_segment_name,
+                streams=[MuxingStream(stream_id=stream_ids[muxing_stream.stream_id]) for muxing_stream in muxing.streams],
+                outputs=muxing.outputs,
+                name=muxing.name
+            )
+        )
+
+    print(f"Encoding {encoding.id} cloned from {encoding_id} ({len(stream_ids)} streams)")
+    return encoding
+
+
+def _list_all(api, query_params_class, encoding_id):
+    """
+    All items of an encoding's sub-resource list, following offset / limit until the last page.
+    """
+    items = []
+    offset = 0
+    while True:
+        page = api.list(encoding_id=encoding_id, query_params=query_params_class(offset=offset, limit=PAGE_LIMIT))
+        items.extend(page.items)
+        if len(page.items) < PAGE_LIMIT:
+            return items
+        offset += PAGE_LIMIT
+
+
+def _record_failed_task(encoding_id, classification, task):
+    """
+    Append the failed task's error messages and their classification to FAILED_TASKS_PATH.
+    """
+    messages = [message.text for message in task.messages or [] if message.type == MessageType.ERROR]
+    if task.error is not None and task.error.text:
+        messages.append(task.error.text)
+    with open(FAILED_TASKS_PATH, 'a') as f:
+        f.write(json.dumps({
+            "encoding_id": encoding_id,
+            "failed_at": datetime.now(UTC).isoformat(timespec='seconds'),
+            "messages": messages,
+            "retry_hint": classification["retry_hint"],
+            "category": classification["category"],
+            "transient": classification["transient"]
+        }) + "\n")
+
+
+def _record_recovery(failures, recovered_at):
+    """
+    Append the failure incident to RECOVERY_LOG_PATH and print the mean time to recover of all recovered incidents.
+    """
+    incident = {
+        "encoding_ids": [failure["encoding_id"] for failure in failures],
+        "categories": [failure["category"] for failure in failures],
+        "attempts": len(failures) + (1 if recovered_at else 0),
+        "failed_at": datetime.fromtimestamp(failures[0]["failed_at"], tz=UTC).isoformat(timespec='seconds'),
+        "recovered": recovered_at is not None,
+        "time_to_recover": round(recovered_at - failures[0]["failed_at"], 1) if recovered_at else None
+    }
+    with open(RECOVERY_LOG_PATH, 'a') as f:
+        f.write(json.dumps(incident) + "\n")
+
+    with open(RECOVERY_LOG_PATH) as f:
+        incidents = [json.loads(line) for line in f if line.strip()]
+    recovered = [entry["time_to_recover"] for entry in incidents if entry["recovered"]]
+    if recovered_at:
+        print(f"Recovered after {incident['attempts']} attempts in {incident['time_to_recover']:.0f} s")
+    if recovered:
+        print(f"Mean time to recover: {sum(recovered) / len(recovered):.0f} s "
+              f"({len(recovered)} of {len(incidents)} incidents recovered automatically)")
+
+
+def _create_hls_manifest(encoding_id, output, output_path):
+    """
+    Create an HLS manifest from the generated FMP4 muxings.
+    Loop through all FMP4 muxings and add audio or video entries to the HLS manifest.
+    """
+    manifest_output = EncodingOutput(
+        output_id=output.id,
+        output_path=output_path,
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    hls_manifest = bitmovin_api.encoding.manifests.hls.create(
+        hls_manifest=HlsManifest(
+            manifest_name='stream.m3u8',
+            outputs=[manifest_output],
+            name='HLS Manifest',
+            hls_master_playlist_version=HlsVersion.HLS_V6,
+            hls_media_playlist_version=HlsVersion.HLS_V6
+        )
+    )
+
+    fmp4_muxings = bitmovin_api.encoding.encodings.muxings.fmp4.list(encoding_id=encoding_id)
+    for muxing in fmp4_muxings.items:
+        stream = bitmovin_api.encoding.encodings.streams.get(encoding_id=encoding_id, stream_id=muxing.streams[0].stream_id)
+        if 'PER_TITLE_TEMPLATE' in stream.mode.value:
+            continue
+
+        codec = bitmovin_api.encoding.configurations.type.get(configuration_id=stream.codec_config_id)
+        segment_path = _remove_output_base_path(muxing.outputs[0].output_path)
+
+        if codec.type == CodecConfigType.AAC:
+            # HLS audio
+            audio_codec = bitmovin_api.encoding.configurations.audio.aac.get(configuration_id=stream.codec_config_id)
+            bitmovin_api.encoding.manifests.hls.media.audio.create(
+                manifest_id=hls_manifest.id,
+                audio_media_info=AudioMediaInfo(
+                    name='HLS Audio Media',
+                    group_id='audio',
+                    language='en',
+                    segment_path=segment_path,
+                    encoding_id=encoding_id,
+                    stream_id=stream.id,
+                    muxing_id=muxing.id,
+                    uri=f'audio_{audio_codec.bitrate}.m3u8'
+                )
+            )
+        elif codec.type == CodecConfigType.H264:
+            # HLS video
+            video_codec = bitmovin_api.encoding.configurations.video.h264.get(configuration_id=stream.codec_config_id)
+            bitmovin_api.encoding.manifests.hls.streams.create(
+                manifest_id=hls_manifest.id,
+                stream_info=StreamInfo(
+                    audio='audio',
+                    closed_captions='NONE',
+                    segment_path=segment_path,
+                    uri=f'video_{video_codec.bitrate}.m3u8',
+                    encoding_id=encoding_id,
+                    stream_id=stream.id,
+                    muxing_id=muxing.id
+                )
+            )
+
+    return hls_manifest
+
+
+def _create_dash_manifest(encoding_id, output, output_path):
+    """
+    Create a DASH manifest by creating a Period, adding Video/Audio Adaptation Sets,
+    and attaching each FMP4 representation.
+    """
+    manifest_output = EncodingOutput(
+        output_id=output.id,
+        output_path=output_path,
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    dash_manifest = bitmovin_api.encoding.manifests.dash.create(
+        dash_manifest=DashManifest(
+            manifest_name='stream.mpd',
+            outputs=[manifest_output],
+            name='DASH Manifest'
+        )
+    )
+
+    period = bitmovin_api.encoding.manifests.dash.periods.create(
+        manifest_id=dash_manifest.id,
+        period=Period()
+    )
+
+    video_adaptation_set = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.video.create(
+        video_adaptation_set=VideoAdaptationSet(),
+        manifest_id=dash_manifest.id,
+        period_id=period.id
+    )
+    audio_adaptation_set = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.audio.create(
+        audio_adaptation_set=AudioAdaptationSet(lang='en'),
+        manifest_id=dash_manifest.id,
+        period_id=period.id
+    )
+
+    fmp4_muxings = bitmovin_api.encoding.encodings.muxings.fmp4.list(encoding_id=encoding_id)
+    for muxing in fmp4_muxings.items:
+        stream = bitmovin_api.encoding.encodings.streams.get(encoding_id=encoding_id, stream_id=muxing.streams[0].stream_id)
+        if 'PER_TITLE_TEMPLATE' in stream.mode.value:
+            continue
+
+        codec = bitmovin_api.encoding.configurations.type.get(configuration_id=stream.codec_config_id)
+        segment_path = _remove_output_base_path(muxing.outputs[0].output_path)
+
+        if codec.type == CodecConfigType.AAC:
+            bitmovin_api.encoding.manifests.dash.periods.adaptationsets.representations.fmp4.create(
+                manifest_id=dash_manifest.id,
+                period_id=period.id,
+                adaptationset_id=audio_adaptation_set.id,
+                dash_fmp4_representation=DashFmp4Representation(
+                    encoding_id=encoding_id,
+                    muxing_id=muxing.id,
+                    type_=DashRepresentationType.TEMPLATE,
+                    mode=DashRepresentationTypeMode.TEMPLATE_REPRESENTATION,
+                    segment_path=segment_path
+                )
+            )
+        elif codec.type == CodecConfigType.H264:
+            bitmovin_api.encoding.manifests.dash.periods.adaptationsets.representations.fmp4.create(
+                manifest_id=dash_manifest.id,
+                period_id=period.id,
+                adaptationset_id=video_adaptation_set.id,
+                dash_fmp4_representation=DashFmp4Representation(
+                    encoding_id=encoding_id,
+                    muxing_id=muxing.id,
+                    type_=DashRepresentationType.TEMPLATE,
+                    mode=DashRepresentationTypeMode.TEMPLATE_REPRESENTATION,
+                    segment_path=segment_path
+                )
+            )
+
+    return dash_manifest
+
+
+def _execute_hls_manifest_generation(hls_manifest):
+    """
+    Start HLS manifest generation and poll until completed or fails.
+    """
+    bitmovin_api.encoding.manifests.hls.start(manifest_id=hls_manifest.id)
+    task = _wait_for_hls_manifest_to_finish(manifest_id=hls_manifest.id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_hls_manifest_to_finish(manifest_id=hls_manifest.id)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("HLS Manifest creation failed")
+
+    print("HLS Manifest creation finished successfully")
+
+
+def _execute_dash_manifest_generation(dash_manifest):
+    """
+    Start DASH manifest generation and poll until completed or fails.
+    """
+    bitmovin_api.encoding.manifests.dash.start(manifest_id=dash_manifest.id)
+    task = _wait_for_dash_manifest_to_finish(manifest_id=dash_manifest.id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_dash_manifest_to_finish(manifest_id=dash_manifest.id)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("DASH Manifest creation failed")
+
+    print("DASH Manifest creation finished successfully")
+
+
+def _wait_for_encoding_to_finish(encoding_id):
+    """
+    Poll encoding status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.encodings.status(encoding_id=encoding_id)
+    print(f"Encoding status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _wait_for_hls_manifest_to_finish(manifest_id):
+    """
+    Poll HLS manifest creation status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.manifests.hls.status(manifest_id=manifest_id)
+    print(f"HLS manifest status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _wait_for_dash_manifest_to_finish(manifest_id):
+    """
+    Poll DASH manifest creation status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.manifests.dash.status(manifest_id=manifest_id)
+    print(f"DASH manifest status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _remove_output_base_path(text):
+    """
+    Remove the OUTPUT_BASE_PATH prefix from the given path to create a relative segment path.
+    """
+    if text.startswith(OUTPUT_BASE_PATH):
+        return text[len(OUTPUT_BASE_PATH):]
+    return text
+
+
+def _log_task_errors(task):
+    """
+    Print error messages from the given task to the console.
+    """
+    if not task:
+        return
+
+    for message in filter(lambda m: m.type == MessageType.ERROR, task.messages):
+        print(message.text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,648 @@
+import os
+import time
+
+from bitmovin_api_sdk import BitmovinApi
+from bitmovin_api_sdk import GenericS3Input, S3AccessStyle, S3SignatureVersion, GenericS3Output
+from bitmovin_api_sdk import Encoding, CloudRegion, EncodingListQueryParams
+from bitmovin_api_sdk import EncodingOutput, AclEntry, AclPermission
+from bitmovin_api_sdk import IngestInputStream, StreamSelectionMode, PresetConfiguration
+from bitmovin_api_sdk import Stream, StreamInput, MuxingStream, StreamMode, ColorConfig
+from bitmovin_api_sdk import AacAudioConfiguration, AacChannelLayout
+from bitmovin_api_sdk import H264VideoConfiguration, CodecConfigType, ProfileH264, LevelH264, WeightedPredictionPFrames
+from bitmovin_api_sdk import Fmp4Muxing
+from bitmovin_api_sdk import HlsManifest, HlsVersion, AudioMediaInfo, StreamInfo
+from bitmovin_api_sdk import DashManifest, Period, VideoAdaptationSet, AudioAdaptationSet
+from bitmovin_api_sdk import DashFmp4Representation, DashRepresentationType, DashRepresentationTypeMode
+from bitmovin_api_sdk import MessageType, StartEncodingRequest, ManifestResource, ManifestGenerator
+from bitmovin_api_sdk import Status
+
+TEST_ITEM = "vod-h264-aac-fmp4-hls-dash-scheduled"
+
+API_KEY = '<INSERT YOUR API KEY>'
+ORG_ID = '<INSERT YOUR ORG ID>'
+
+LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_INPUT_HOST_NAME = '<INSERT_YOUR_INPUT_HOST_NAME>'
+
+LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME = '<INSERT_YOUR_OUTPUT_HOST_NAME>'
+
+OUTPUT_BASE_PATH = f'output/{TEST_ITEM}/'
+
+bitmovin_api = BitmovinApi(api_key=API_KEY, tenant_org_id=ORG_ID)
+
+# Titles to encode. "priority" is one of PRIORITY_CLASSES; "deadline" (seconds after submission) defaults to the
+# class deadline; "duration" (seconds, e.g. from vod/preflight probe results) feeds the runtime estimate;
+# "submit_after" (seconds after the scheduler starts) simulates titles arriving while others are running.
+JOBS = [
+    {"name": "feature", "input_path": 'inputs/feature_4h.mov', "priority": "bulk", "duration": 4 * 3600},
+    {"name": "episode-01", "input_path": 'inputs/episode_01.mov', "priority": "standard", "duration": 45 * 60},
+    {"name": "episode-02", "input_path": 'inputs/episode_02.mov', "priority": "standard", "duration": 45 * 60},
+    {"name": "news-clip", "input_path": 'inputs/news_clip.mov', "priority": "urgent", "duration": 90,
+     "deadline": 15 * 60, "submit_after": 120}
+]
+
+# Priority classes: rank breaks ties, default_deadline applies when a job has no deadline.
+PRIORITY_CLASSES = {
+    "urgent": {"rank": 0, "default_deadline": 30 * 60},
+    "standard": {"rank": 1, "default_deadline": 4 * 3600},
+    "bulk": {"rank": 2, "default_deadline": 24 * 3600}
+}
+
+# Account concurrency limit (all encodings of the organization count, including ones started elsewhere).
+MAX_CONCURRENT_ENCODINGS = 4
+# Slots that only "urgent" jobs may take, so an urgent title never waits for a long encoding to finish.
+RESERVED_URGENT_SLOTS = 1
+# Aging: every second a job waits moves its effective latest start time AGING_RATE seconds earlier.
+AGING_RATE = 0.5
+
+# Runtime model: STARTUP_SECONDS + output pixels / encode speed (see vod/capacity for the same model).
+ENCODE_SPEED_MPIXELS = {"h264": 400}
+STARTUP_SECONDS = 120
+FRAME_RATE = 24
+
+POLL_INTERVAL = 10
+METRICS_PATH = 'scheduler_metrics.prom'
+
+# Example H.264 encoding profiles, including different resolutions, bitrates, and profiles.
+video_encoding_profiles = [
+    {"height": 240, "bitrate": 300000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 360, "bitrate": 800000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 480, "bitrate": 1200000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 540, "bitrate": 2000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 720, "bitrate": 4000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 1080, "bitrate": 6000000, "profile": ProfileH264.HIGH, "level": LevelH264.L4, "mode": StreamMode.STANDARD}
+]
+
+# Example AAC audio encoding profiles, each with a specified bitrate and sample rate.
+audio_encoding_profiles = [
+    {"bitrate": 128000, "rate": 48000},
+    {"bitrate": 64000, "rate": 44100}
+]
+
+
+def main():
+    """
+    Encode several titles through a priority / deadline-aware scheduler in front of encodings.start.
+      1) Create Generic S3 input/output for Linode Object Storage
+      2) When a title is submitted, create its encoding (H.264 + AAC fMP4, HLS/DASH manifests generated
+         with the encoding) and estimate its runtime from the ladder and the input duration
+      3) Start queued encodings while the account has free slots, in earliest-deadline-first order
+         (latest start time = deadline - estimated runtime) with aging; some slots are kept for urgent jobs
+      4) Poll running encodings, record SLA misses and expose queue / SLA metrics in METRICS_PATH
+    """
+
+    # 1) Generic S3 Input/Output
+    input = bitmovin_api.encoding.inputs.generic_s3.create(
+        generic_s3_input=GenericS3Input(
+            access_key=LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_INPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Input'))
+    output = bitmovin_api.encoding.outputs.generic_s3.create(
+        generic_s3_output=GenericS3Output(
+            access_key=LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Output'))
+
+    scheduler_started = time.time()
+    pending = sorted(JOBS, key=lambda job: job.get("submit_after", 0))
+    jobs = []
+
+    while pending or any(job["state"] in ("queued", "running") for job in jobs):
+        now = time.time()
+
+        # 2) Submissions
+        while pending and scheduler_started + pending[0].get("submit_after", 0) <= now:
+            jobs.append(_submit_job(pending.pop(0), input=input, output=output))
+
+        # 4) Running encodings
+        for job in jobs:
+            if job["state"] == "running":
+                _poll_job(job)
+
+        # 3) Dispatch
+        _dispatch(jobs)
+
+        _report_at_risk(jobs)
+        _write_metrics(jobs)
+        time.sleep(POLL_INTERVAL)
+
+    _write_metrics(jobs)
+    _print_sla_summary(jobs)
+
+
+def estimate_runtime(profiles, duration, codec="h264"):
+    """
+    Estimated wall-clock runtime (seconds) of an encoding: startup overhead plus the output pixels
+    of all renditions divided by the encode speed of the codec.
+    """
+    pixels_per_second = sum(round(profile.get("height") * 16 / 9 / 2) * 2 * profile.get("height") * FRAME_RATE
+                            for profile in profiles)
+    return STARTUP_SECONDS + duration * pixels_per_second / (ENCODE_SPEED_MPIXELS[codec] * 1e6)
+
+
+def scheduling_key(job, now):
+    """
+    Sort key of a queued job: latest start time (deadline - estimated runtime), moved earlier by aging,
+    then the priority class rank.
+    """
+    waited = now - job["submitted_at"]
+    latest_start = job["deadline_at"] - job["estimated_runtime"]
+    return latest_start - AGING_RATE * waited, PRIORITY_CLASSES[job["priority"]]["rank"]
+
+
+def _submit_job(spec, input, output):
+    """
+    Create the encoding of a title and return its scheduler record (state "queued").
+    """
+    if spec["priority"] not in PRIORITY_CLASSES:
+        raise Exception(f"Unknown priority class {spec['priority']}. Valid classes: {', '.join(PRIORITY_CLASSES)}.")
+
+    encoding, start_encoding_request = _create_encoding(spec, input=input, output=output)
+    submitted_at = time.time()
+    deadline = spec.get("deadline") or PRIORITY_CLASSES[spec["priority"]]["default_deadline"]
+    job = {
+        "name": spec["name"],
+        "priority": spec["priority"],
+        "encoding_id": encoding.id,
+        "start_encoding_request": start_encoding_request,
+        "estimated_runtime": estimate_runtime(video_encoding_profiles, spec["duration"]),
+        "submitted_at": submitted_at,
+        "deadline_at": submitted_at + deadline,
+        "started_at": None,
+        "finished_at": None,
+        "state": "queued",
+        "at_risk_reported": False
+    }
+    print(f"Submitted {job['name']} ({job['priority']}, encoding {job['encoding_id']}): "
+          f"estimated runtime {job['estimated_runtime'] / 60:.1f} min, deadline in {deadline / 60:.0f} min")
+    return job
+
+
+def _dispatch(jobs):
+    """
+    Start queued jobs in scheduling order while the account has free slots.
+    Non-urgent jobs leave RESERVED_URGENT_SLOTS slots free.
+    """
+    queued = [job for job in jobs if job["state"] == "queued"]
+    if not queued:
+        return
+
+    # Encodings that were just started may not be listed as QUEUED yet
+    running = sum(job["state"] == "running" for job in jobs)
+    free_slots = MAX_CONCURRENT_ENCODINGS - max(_active_encoding_count(), running)
+    now = time.time()
+    for job in sorted(queued, key=lambda job: scheduling_key(job, now)):
+        reserved = 0 if job["priority"] == "urgent" else RESERVED_URGENT_SLOTS
+        if free_slots <= reserved:
+            continue
+
+        bitmovin_api.encoding.encodings.start(encoding_id=job["encoding_id"],
+                                              start_encoding_request=job["start_encoding_request"])
+        job["state"] = "running"
+        job["started_at"] = time.time()
+        free_slots -= 1
+        print(f"Started {job['name']} ({job['priority']}) after {(job['started_at'] - job['submitted_at']) / 60:.1f} min in queue")
+
+
+def _active_encoding_count():
+    """
+    Number of encodings of the organization that occupy a slot (QUEUED or RUNNING).
+    """
+    count = 0
+    for status in (Status.QUEUED, Status.RUNNING):
+        encodings = bitmovin_api.encoding.encodings.list(
+            query_params=EncodingListQueryParams(status=status.value, limit=1, include_total_count=True))
+        count += encodings.total_count or 0
+    return count
+
+
+def _poll_job(job):
+    """
+    Update a running job from its encoding status. Any status other than CREATED / QUEUED / RUNNING is final;
+    everything but FINISHED (ERROR, CANCELED, TRANSFER_ERROR, ...) frees the slot as an error.
+    """
+    task = bitmovin_api.encoding.encodings.status(encoding_id=job["encoding_id"])
+    if task.status in [Status.CREATED, Status.QUEUED, Status.RUNNING]:
+        return
+
+    job["finished_at"] = time.time()
+    job["state"] = "finished" if task.status == Status.FINISHED else "error"
+    missed = job["state"] != "finished" or job["finished_at"] > job["deadline_at"]
+    if task.status != Status.FINISHED:
+        _log_task_errors(task)
+    print(f"{job['name']} {job['state']} after {(job['finished_at'] - job['started_at']) / 60:.1f} min "
+          f"(estimated {job['estimated_runtime'] / 60:.1f} min){': SLA missed' if missed else ''}")
+
+
+def _report_at_risk(jobs):
+    """
+    Warn once per job when it can no longer finish before its deadline at the estimated runtime.
+    """
+    now = time.time()
+    for job in jobs:
+        if job["state"] not in ("queued", "running") or job["at_risk_reported"]:
+            continue
+        expected_finish = (job["started_at"] or now) + job["estimated_runtime"]
+        if expected_finish > job["deadline_at"]:
+            job["at_risk_reported"] = True
+            print(f"At risk: {job['name']} ({job['priority']}) is expected to finish "
+                  f"{(expected_finish - job['deadline_at']) / 60:.1f} min after its deadline")
+
+
+def _job_metrics(jobs):
+    """
+    Per priority class SLA / queue metrics.
+    """
+    now = time.time()
+    metrics = {}
+    for priority in PRIORITY_CLASSES:
+        class_jobs = [job for job in jobs if job["priority"] == priority]
+        done = [job for job in class_jobs if job["state"] in ("finished", "error")]
+        waits = sorted((job["started_at"] or now) - job["submitted_at"] for job in class_jobs)
+        lateness = [job["finished_at"] - job["deadline_at"] for job in done]
+        metrics[priority] = {
+            "queued": sum(job["state"] == "queued" for job in class_jobs),
+            "running": sum(job["state"] == "running" for job in class_jobs),
+            "finished": sum(job["state"] == "finished" for job in class_jobs),
+            "failed": sum(job["state"] == "error" for job in class_jobs),
+            "sla_misses": sum(job["state"] == "error" or job["finished_at"] > job["deadline_at"] for job in done),
+            "at_risk": sum(job["at_risk_reported"] and job["state"] in ("queued", "running") for job in class_jobs),
+            "queue_wait_p50": _percentile(waits, 0.5),
+            "queue_wait_p95": _percentile(waits, 0.95),
+            "lateness_max": max(lateness, default=0)
+        }
+    return metrics
+
+
+def _write_metrics(jobs):
+    """
+    Write the metrics in the Prometheus text format (e.g. for the node_exporter textfile collector).
+    """
+    lines = []
+    for priority, values in _job_metrics(jobs).items():
+        lines.append(f'vod_scheduler_jobs{{class="{priority}",state="queued"}} {values["queued"]}')
+        lines.append(f'vod_scheduler_jobs{{class="{priority}",state="running"}} {values["running"]}')
+        lines.append(f'vod_scheduler_jobs_completed_total{{class="{priority}",result="finished"}} {values["finished"]}')
+        lines.append(f'vod_scheduler_jobs_completed_total{{class="{priority}",result="error"}} {values["failed"]}')
+        lines.append(f'vod_scheduler_sla_misses_total{{class="{priority}"}} {values["sla_misses"]}')
+        lines.append(f'vod_scheduler_jobs_at_risk{{class="{priority}"}} {values["at_risk"]}')
+        lines.append(f'vod_scheduler_queue_wait_seconds{{class="{priority}",quantile="0.5"}} {values["queue_wait_p50"]:.1f}')
+        lines.append(f'vod_scheduler_queue_wait_seconds{{class="{priority}",quantile="0.95"}} {values["queue_wait_p95"]:.1f}')
+        lines.append(f'vod_scheduler_lateness_seconds_max{{class="{priority}"}} {values["lateness_max"]:.1f}')
+
+    temporary_path = f"{METRICS_PATH}.tmp"
+    with open(temporary_path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(temporary_path, METRICS_PATH)
+
+
+def _print_sla_summary(jobs):
+    """
+    Print the SLA metrics per priority class.
+    """
+    for priority, values in _job_metrics(jobs).items():
+        completed = values["finished"] + values["failed"]
+        if not completed:
+            continue
+        print(f"{priority}: {completed} jobs, {values['sla_misses']} SLA misses, "
+              f"queue wait p50 {values['queue_wait_p50'] / 60:.1f} min / p95 {values['queue_wait_p95'] / 60:.1f} min, "
+              f"max lateness {max(values['lateness_max'], 0) / 60:.1f} min")
+
+
+def _percentile(sorted_values, quantile):
+    """
+    Nearest-rank percentile of an already sorted list (0 for an empty list).
+    """
+    if not sorted_values:
+        return 0
+    return sorted_values[min(int(quantile * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def _create_encoding(spec, input, output):
+    """
+    Create the encoding of one title (H.264 + AAC fMP4 renditions) and the HLS/DASH manifests generated with it.
+    Returns (encoding, start_encoding_request); the encoding is not started.
+    """
+    output_path = f"{OUTPUT_BASE_PATH}{spec['name']}/"
+    encoding = bitmovin_api.encoding.encodings.create(
+        encoding=Encoding(
+            name=f"[{TEST_ITEM}] {spec['input_path']}",
+            cloud_region=CloudRegion.AKAMAI_JP_OSA,
+            encoder_version='STABLE'
+        )
+    )
+
+    video_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=spec["input_path"],
+            selection_mode=StreamSelectionMode.VIDEO_RELATIVE,
+            position=0
+        )
+    )
+    audio_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=spec["input_path"],
+            selection_mode=StreamSelectionMode.AUDIO_RELATIVE,
+            position=0
+        )
+    )
+    video_input_stream = StreamInput(input_stream_id=video_ingest_input_stream.id)
+    audio_input_stream = StreamInput(input_stream_id=audio_ingest_input_stream.id)
+
+    for video_profile in video_encoding_profiles:
+        color_config = ColorConfig(
+            copy_color_primaries_flag=True,
+            copy_color_transfer_flag=True,
+            copy_color_space_flag=True
+        )
+
+        # Configure advanced H.264 parameters (ref: https://developer.bitmovin.com/encoding/docs/h264-presets)
+        if video_profile.get("profile") == ProfileH264.HIGH:
+            adaptive_spatial_transform = True
+            use_cabac = True
+            num_refframe = 4
+            num_bframe = 3
+            weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+        elif video_profile.get("profile") == ProfileH264.MAIN:
+            adaptive_spatial_transform = False
+            use_cabac = True
+            num_refframe = 4
+            num_bframe = 3
+            weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+        elif video_profile.get("profile") == ProfileH264.BASELINE:
+            adaptive_spatial_transform = False
+            use_cabac = False
+            num_refframe = 4
+            num_bframe = 0
+            weighted_prediction_p_frames = WeightedPredictionPFrames.DISABLED
+        else:
+            raise Exception("Unknown profile. Valid profiles: HIGH, MAIN, BASELINE.")
+
+        h264_codec = bitmovin_api.encoding.configurations.video.h264.create(
+            h264_video_configuration=H264VideoConfiguration(
+                name='Sample video codec configuration',
+                height=video_profile.get("height"),
+                bitrate=video_profile.get("bitrate"),
+                max_bitrate=int(video_profile.get("bitrate") * 1.2),
+                bufsize=int(video_profile.get("bitrate") * 1.5),
+                profile=video_profile.get("profile"),
+                level=video_profile.get("level"),
+                min_keyframe_interval=2,
+                max_keyframe_interval=2,
+                color_config=color_config,
+                ref_frames=num_refframe,
+                bframes=num_bframe,
+                cabac=use_cabac,
+                adaptive_spatial_transform=adaptive_spatial_transform,
+                weighted_prediction_p_frames=weighted_prediction_p_frames,
+                preset_configuration=PresetConfiguration.VOD_HIGH_QUALITY
+            )
+        )
+
+        h264_stream = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=h264_codec.id,
+                input_streams=[video_input_stream],
+                name=f"Stream H264 {video_profile.get('height')}p",
+                mode=video_profile.get('mode')
+            )
+        )
+
+        bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=6,
+                segment_naming='segment_%number%.m4s',
+                init_segment_name='init.mp4',
+                streams=[MuxingStream(stream_id=h264_stream.id)],
+                outputs=[EncodingOutput(
+                    output_id=output.id,
+                    output_path=f"{output_path}video/{video_profile.get('height')}p",
+                    acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+                )],
+                name=f"Video FMP4 Muxing {video_profile.get('height')}p"
+            )
+        )
+
+    for audio_profile in audio_encoding_profiles:
+        aac_codec = bitmovin_api.encoding.configurations.audio.aac.create(
+            aac_audio_configuration=AacAudioConfiguration(
+                bitrate=audio_profile.get("bitrate"),
+                rate=audio_profile.get("rate"),
+                channel_layout=AacChannelLayout.CL_STEREO
+            )
+        )
+
+        aac_stream = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=aac_codec.id,
+                input_streams=[audio_input_stream],
+                name=f"Stream AAC {audio_profile.get('bitrate') / 1000:.0f}kbps",
+                mode=StreamMode.STANDARD
+            )
+        )
+
+        bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=6,
+                segment_naming='segment_%number%.m4s',
+                init_segment_name='init.mp4',
+                streams=[MuxingStream(stream_id=aac_stream.id)],
+                outputs=[EncodingOutput(
+                    output_id=output.id,
+                    output_path=f"{output_path}audio/{audio_profile.get('bitrate')}",
+                    acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+                )],
+                name=f"Audio FMP4 Muxing {audio_profile.get('bitrate') / 1000:.0f}kbps"
+            )
+        )
+
+    # Manifests are generated by the encoding itself, so the scheduler only has to start it
+    hls_manifest = _create_hls_manifest(encoding_id=encoding.id, output=output, output_path=output_path)
+    dash_manifest = _create_dash_manifest(encoding_id=encoding.id, output=output, output_path=output_path)
+    start_encoding_request = StartEncodingRequest(
+        vod_hls_manifests=[ManifestResource(manifest_id=hls_manifest.id)],
+        vod_dash_manifests=[ManifestResource(manifest_id=dash_manifest.id)],
+        manifest_generator=ManifestGenerator.V2
+    )
+    return encoding, start_encoding_request
+
+
+def _create_hls_manifest(encoding_id, output, output_path):
+    """
+    Create an HLS manifest from the generated FMP4 muxings.
+    Loop through all FMP4 muxings and add audio or video entries to the HLS manifest.
+    """
+    manifest_output = EncodingOutput(
+        output_id=output.id,
+        output_path=output_path,
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    hls_manifest = bitmovin_api.encoding.manifests.hls.create(
+        hls_manifest=HlsManifest(
+            manifest_name='stream.m3u8',
+            outputs=[manifest_output],
+            name='HLS Manifest',
+            hls_master_playlist_version=HlsVersion.HLS_V6,
+            hls_media_playlist_version=HlsVersion.HLS_V6
+        )
+    )
+
+    fmp4_muxings = bitmovin_api.encoding.encodings.muxings.fmp4.list(encoding_id=encoding_id)
+    for muxing in fmp4_muxings.items:
+        stream = bitmovin_api.encoding.encodings.streams.get(encoding_id=encoding_id, stream_id=muxing.streams[0].stream_id)
+        if 'PER_TITLE_TEMPLATE' in stream.mode.value:
+            continue
+
+        codec = bitmovin_api.encoding.configurations.type.get(configuration_id=stream.codec_config_id)
+        segment_path = _remove_output_base_path(muxing.outputs[0].output_path, output_path)
+
+        if codec.type == CodecConfigType.AAC:
+            # HLS audio
+            audio_codec = bitmovin_api.encoding.configurations.audio.aac.get(configuration_id=stream.codec_config_id)
+            bitmovin_api.encoding.manifests.hls.media.audio.create(
+                manifest_id=hls_manifest.id,
+                audio_media_info=AudioMediaInfo(
+                    name='HLS Audio Media',
+                    group_id='audio',
+                    language='en',
+                    segment_path=segment_path,
+                    encoding_id=encoding_id,
+                    stream_id=stream.id,
+                    muxing_id=muxing.id,
+                    uri=f'audio_{audio_codec.bitrate}.m3u8'
+                )
+            )
+        elif codec.type == CodecConfigType.H264:
+            # HLS video
+            video_codec = bitmovin_api.encoding.configurations.video.h264.get(configuration_id=stream.codec_config_id)
+            bitmovin_api.encoding.manifests.hls.streams.create(
+                manifest_id=hls_manifest.id,
+                stream_info=StreamInfo(
+                    audio='audio',
+                    closed_captions='NONE',
+                    segment_path=segment_path,
+                    uri=f'video_{video_codec.bitrate}.m3u8',
+                    encoding_id=encoding_id,
+                    stream_id=stream.id,
+                    muxing_id=muxing.id
+                )
+            )
+
+    return hls_manifest
+
+
+def _create_dash_manifest(encoding_id, output, output_path):
+    """
+    Create a DASH manifest by creating a Period, adding Video/Audio Adaptation Sets,
+    and attaching each FMP4 representation.
+    """
+    manifest_output = EncodingOutput(
+        output_id=output.id,
+        output_path=output_path,
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    dash_manifest = bitmovin_api.encoding.manifests.dash.create(
+        dash_manifest=DashManifest(
+            manifest_name='stream.mpd',
+            outputs=[manifest_output],
+            name='DASH Manifest'
+        )
+    )
+
+    period = bitmovin_api.encoding.manifests.dash.periods.create(
+        manifest_id=dash_manifest.id,
+        period=Period()
+    )
+
+    video_adaptation_set = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.video.create(
+        video_adaptation_set=VideoAdaptationSet(),
+        manifest_id=dash_manifest.id,
+        period_id=period.id
+    )
+    audio_adaptation_set = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.audio.create(
+        audio_adaptation_set=AudioAdaptationSet(lang='en'),
+        manifest_id=dash_manifest.id,
+        period_id=period.id
+    )
+
+    fmp4_muxings = bitmovin_api.encoding.encodings.muxings.fmp4.list(encoding_id=encoding_id)
+    for muxing in fmp4_muxings.items:
+        stream = bitmovin_api.encoding.encodings.streams.get(encoding_id=encoding_id, stream_id=muxing.streams[0].stream_id)
+        if 'PER_TITLE_TEMPLATE' in stream.mode.value:
+            continue
+
+        codec = bitmovin_api.encoding.configurations.type.get(configuration_id=stream.codec_config_id)
+        segment_path = _remove_output_base_path(muxing.outputs[0].output_path, output_path)
+
+        if codec.type == CodecConfigType.AAC:
+            adaptation_set_id = audio_adaptation_set.id
+        elif codec.type == CodecConfigType.H264:
+            adaptation_set_id = video_adaptation_set.id
+        else:
+            continue
+
+        bitmovin_api.encoding.manifests.dash.periods.adaptationsets.representations.fmp4.create(
+            manifest_id=dash_manifest.id,
+            period_id=period.id,
+            adaptationset_id=adaptation_set_id,
+            dash_fmp4_representation=DashFmp4Representation(
+                encoding_id=encoding_id,
+                muxing_id=muxing.id,
+                type_=DashRepresentationType.TEMPLATE,
+                mode=DashRepresentationTypeMode.TEMPLATE_REPRESENTATION,
+                segment_path=segment_path
+            )
+        )
+
+    return dash_manifest
+
+
+def _remove_output_base_path(text, output_path):
+    """
+    Remove the title's output path prefix from the given path to create a relative segment path.
+    """
+    if text.startswith(output_path):
+        return text[len(output_path):]
+    return text
+
+
+def _log_task_errors(task):
+    """
+    Print error messages from the given task to the console.
+    """
+    if not task:
+        return
+
+    for message in filter(lambda m: m.type == MessageType.ERROR, task.messages):
+        print(message.text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,531 @@
+import math
+import os
+import re
+import shutil
+import struct
+import urllib.parse
+import urllib.request
+from xml.sax.saxutils import quoteattr
+
+# HLS master playlist of a segmented output (init.mp4 + segment_%number%.m4s, e.g. vod/abr): a local path (e.g. a
+# mirror made with vod/mirror) or an https:// URL. Every rendition is concatenated into one fragmented MP4 with a sidx.
+# None to only index SINGLE_FILES.
+MASTER_PLAYLIST = 'mirror/stream.m3u8'
+
+# Single-file fragmented MP4s that already have a sidx, e.g. the DASH On-Demand muxings of
+# vod/singlefile/create_vod_h264_aac_single_file_fmp4_dash.py. Only the playlists / MPD are written for them.
+SINGLE_FILES = [
+    # 'mirror/video/1080p/video_6000000.mp4',
+    # 'mirror/audio/128000/audio_128000.mp4'
+]
+
+# Repackaged files, HLS playlists (stream.m3u8 + one media playlist per rendition) and the DASH MPD (stream.mpd).
+OUTPUT_DIRECTORY = 'single_file'
+AUDIO_GROUP_ID = 'audio'
+AUDIO_LANGUAGE = 'en'
+
+# Segments are copied in chunks of COPY_BUFFER_SIZE bytes; only the moof of every segment is read before writing.
+COPY_BUFFER_SIZE = 1024 * 1024
+# Bytes read from the start of every segment / file to parse its moof or moov and sidx (extended automatically).
+HEAD_SIZE = 64 * 1024
+
+
+def main():
+    """
+    Write single-file byte-range renditions and their manifests. Steps:
+      1) Concatenate the init segment and media segments of every rendition in MASTER_PLAYLIST into one fragmented
+         MP4 (ftyp + moov + sidx + moof/mdat...), streaming the segments instead of loading them into memory
+      2) Read the init range, sidx range and subsegment byte ranges of every rendition (and of SINGLE_FILES)
+      3) Write HLS media playlists with EXT-X-MAP / EXT-X-BYTERANGE and a master playlist
+      4) Write a DASH On-Demand MPD with SegmentBase (indexRange / Initialization)
+    """
+    os.makedirs(OUTPUT_DIRECTORY, exist_ok=True)
+    files = []
+    if MASTER_PLAYLIST:
+        for uri in _rendition_playlists(_read_text(MASTER_PLAYLIST)):
+            name = os.path.splitext(os.path.basename(urllib.parse.urlparse(uri).path))[0]
+            path = os.path.join(OUTPUT_DIRECTORY, f"{name}.mp4")
+            repackage_rendition(_resolve(MASTER_PLAYLIST, uri), path)
+            files.append(path)
+    files.extend(SINGLE_FILES)
+    if not files:
+        raise Exception("Nothing to do: set MASTER_PLAYLIST or SINGLE_FILES")
+
+    renditions = []
+    for path in files:
+        rendition = index_single_file(path)
+        rendition["uri"] = os.path.relpath(path, OUTPUT_DIRECTORY).replace(os.sep, '/')
+        rendition["name"] = os.path.splitext(os.path.basename(path))[0]
+        renditions.append(rendition)
+        _print_rendition(path, rendition)
+
+    for rendition in renditions:
+        with open(os.path.join(OUTPUT_DIRECTORY, f"{rendition['name']}.m3u8"), 'w') as f:
+            f.write(hls_media_playlist(rendition))
+    with open(os.path.join(OUTPUT_DIRECTORY, 'stream.m3u8'), 'w') as f:
+        f.write(hls_master_playlist(renditions))
+    with open(os.path.join(OUTPUT_DIRECTORY, 'stream.mpd'), 'w') as f:
+        f.write(dash_mpd(renditions))
+    print(f"Playlists and MPD written to {OUTPUT_DIRECTORY}/ (stream.m3u8, stream.mpd)")
+
+
+def repackage_rendition(playlist_location, path):
+    """
+    Concatenate the init segment and the media segments of one media playlist into a single fragmented MP4 with a
+    sidx (one reference per segment) between the moov and the first moof.
+    """
+    text = _read_text(playlist_location)
+    init_uri = re.search(r'#EXT-X-MAP:URI="([^"]+)"', text)
+    if not init_uri or '#EXT-X-BYTERANGE' in text:
+        raise Exception(f"{playlist_location} is not a segmented fMP4 playlist")
+    init_location = _resolve(playlist_location, init_uri.group(1))
+    segment_locations = [_resolve(playlist_location, line.strip()) for line in text.splitlines()
+                         if line.strip() and not line.startswith('#')]
+
+    init, init_size = _read_head(init_location, HEAD_SIZE)
+    if init_size > len(init):
+        init, _ = _read_head(init_location, init_size)
+    track_id, timescale = _track(init)
+
+    references = []
+    earliest_presentation_time = None
+    for location in segment_locations:
+        base_time, duration, starts_with_sap, size = _inspect_segment(location)
+        if earliest_presentation_time is None:
+            earliest_presentation_time = base_time
+        references.append((size, duration, starts_with_sap))
+
+    sidx = build_sidx(track_id, timescale, earliest_presentation_time or 0, references)
+    with open(f"{path}.part", 'wb') as out:
+        out.write(init)
+        out.write(sidx)
+        for location in segment_locations:
+            with _open(location) as segment:
+                shutil.copyfileobj(segment, out, COPY_BUFFER_SIZE)
+    os.replace(f"{path}.part", path)
+    print(f"{playlist_location}: {len(segment_locations)} segments -> {path}")
+
+
+def build_sidx(track_id, timescale, earliest_presentation_time, references):
+    """
+    A version 1 sidx box for (referenced_size, subsegment_duration, starts_with_sap) references that directly follow
+    the sidx (first_offset 0).
+    """
+    body = struct.pack('>B3sIIQQHH', 1, b'\0\0\0', track_id, timescale, earliest_presentation_time, 0, 0,
+                       len(references))
+    for size, duration, starts_with_sap in references:
+        if size >= 1 << 31:
+            raise Exception(f"Subsegment of {size} bytes does not fit into a sidx reference")
+        sap = (1 << 31 | 1 << 28) if starts_with_sap else 0
+        body += struct.pack('>III', size, duration, sap)
+    return struct.pack('>I4s', len(body) + 8, b'sidx') + body
+
+
+def index_single_file(location):
+    """
+    Init range, sidx range, subsegment byte ranges / durations and codec attributes of a single-file fragmented MP4,
+    read from its ftyp / moov / sidx (the media data is not read).
+    """
+    head, size = _read_head(location, HEAD_SIZE)
+    boxes = {}
+    offset = 0
+    while offset + 8 <= size and b'moof' not in boxes:
+        if offset + 16 > len(head):
+            head, _ = _read_head(location, offset + HEAD_SIZE)
+        box_size, box_type = struct.unpack_from('>I4s', head, offset)
+        if box_size == 1:
+            box_size = struct.unpack_from('>Q', head, offset + 8)[0]
+        elif box_size == 0:
+            box_size = size - offset
+        if box_size < 8:
+            raise Exception(f"{location}: invalid box at offset {offset}")
+        boxes.setdefault(box_type, (offset, offset + box_size))
+        if box_type in (b'moov', b'sidx') and offset + box_size > len(head):
+            head, _ = _read_head(location, offset + box_size + HEAD_SIZE)
+        offset += box_size
+
+    if b'moov' not in boxes or b'sidx' not in boxes:
+        raise Exception(f"{location} has no moov / sidx (use a DASH On-Demand fragmented MP4 muxing)")
+    sidx_start, sidx_end = boxes[b'sidx']
+    timescale, earliest_presentation_time, first_offset, references = _parse_sidx(head, sidx_start)
+
+    segments = []
+    segment_offset = sidx_end + first_offset
+    for reference_type, referenced_size, duration in references:
+        if reference_type:
+            raise Exception(f"{location}: hierarchical sidx references are not supported")
+        segments.append({"offset": segment_offset, "size": referenced_size, "duration": duration / timescale})
+        segment_offset += referenced_size
+
+    moov_start, moov_end = boxes[b'moov']
+    init_end = max(end for box_type, (start, end) in boxes.items() if start < sidx_start and box_type != b'sidx')
+    durations = [segment["duration"] for segment in segments]
+    total_duration = sum(durations)
+    total_size = sum(segment["size"] for segment in segments)
+    return {
+        **_sample_entry(head[:moov_end], moov_start),
+        "timescale": timescale,
+        "earliest_presentation_time": earliest_presentation_time,
+        "init_range": (0, init_end),
+        "index_range": (sidx_start, sidx_end),
+        "segments": segments,
+        "duration": total_duration,
+        "bandwidth": max(math.ceil(segment["size"] * 8 / segment["duration"]) for segment in segments),
+        "average_bandwidth": math.ceil(total_size * 8 / total_duration)
+    }
+
+
+def hls_media_playlist(rendition):
+    """
+    HLS media playlist addressing the init range and subsegments of a single file with byte ranges.
+    """
+    init_start, init_end = rendition["init_range"]
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:7",
+        f"#EXT-X-TARGETDURATION:{max(round(segment['duration']) for segment in rendition['segments'])}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+        "#EXT-X-INDEPENDENT-SEGMENTS",
+        f'#EXT-X-MAP:URI="{rendition["uri"]}",BYTERANGE="{init_end - init_start}@{init_start}"'
+    ]
+    for segment in rendition["segments"]:
+        lines.append(f"#EXTINF:{segment['duration']:.6f},")
+        lines.append(f"#EXT-X-BYTERANGE:{segment['size']}@{segment['offset']}")
+        lines.append(rendition["uri"])
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+def hls_master_playlist(renditions):
+    """
+    HLS master playlist: one variant per video rendition with all audio renditions in one group.
+    """
+    videos = [rendition for rendition in renditions if rendition["type"] == 'video']
+    audios = [rendition for rendition in renditions if rendition["type"] == 'audio']
+    lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    for index, audio in enumerate(sorted(audios, key=lambda rendition: -rendition["bandwidth"])):
+        default = 'YES' if index == 0 else 'NO'
+        lines.append(f'#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="{AUDIO_GROUP_ID}",LANGUAGE="{AUDIO_LANGUAGE}",'
+                     f'NAME="{audio["name"]}",DEFAULT={default},AUTOSELECT={default},CHANNELS="{audio["channels"]}",'
+                     f'URI="{audio["name"]}.m3u8"')
+    audio_bandwidth = max((audio["bandwidth"] for audio in audios), default=0)
+    audio_average_bandwidth = max((audio["average_bandwidth"] for audio in audios), default=0)
+    audio_codecs = sorted({audio["codecs"] for audio in audios})
+    for video in sorted(videos, key=lambda rendition: rendition["bandwidth"]):
+        attributes = [
+            f"BANDWIDTH={video['bandwidth'] + audio_bandwidth}",
+            f"AVERAGE-BANDWIDTH={video['average_bandwidth'] + audio_average_bandwidth}",
+            f'CODECS="{",".join([video["codecs"], *audio_codecs])}"',
+            f"RESOLUTION={video['width']}x{video['height']}"
+        ]
+        if audios:
+            attributes.append(f'AUDIO="{AUDIO_GROUP_ID}"')
+        lines.append(f"#EXT-X-STREAM-INF:{','.join(attributes)}")
+        lines.append(f"{video['name']}.m3u8")
+    return "\n".join(lines) + "\n"
+
+
+def dash_mpd(renditions):
+    """
+    DASH On-Demand MPD with one SegmentBase representation per single file.
+    """
+    duration = max(rendition["duration"] for rendition in renditions)
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" profiles="urn:mpeg:dash:profile:isoff-on-demand:2011" '
+        f'type="static" mediaPresentationDuration="PT{duration:.3f}S" minBufferTime="PT2S">',
+        '  <Period id="0" start="PT0S">'
+    ]
+    for content_type in ('video', 'audio'):
+        members = [rendition for rendition in renditions if rendition["type"] == content_type]
+        if not members:
+            continue
+        language = f' lang="{AUDIO_LANGUAGE}"' if content_type == 'audio' else ''
+        lines.append(f'    <AdaptationSet contentType="{content_type}" mimeType="{content_type}/mp4" '
+                     f'segmentAlignment="true" subsegmentAlignment="true" subsegmentStartsWithSAP="1"{language}>')
+        for rendition in sorted(members, key=lambda member: member["bandwidth"]):
+            attributes = (f'width="{rendition["width"]}" height="{rendition["height"]}"' if content_type == 'video'
+                          else f'audioSamplingRate="{rendition["sample_rate"]}"')
+            init_start, init_end = rendition["init_range"]
+            index_start, index_end = rendition["index_range"]
+            lines.extend([
+                f'      <Representation id={quoteattr(rendition["name"])} bandwidth="{rendition["bandwidth"]}" '
+                f'codecs="{rendition["codecs"]}" {attributes}>',
+                f'        <BaseURL>{rendition["uri"]}</BaseURL>',
+                f'        <SegmentBase timescale="{rendition["timescale"]}" '
+                f'presentationTimeOffset="{rendition["earliest_presentation_time"]}" '
+                f'indexRange="{index_start}-{index_end - 1}" indexRangeExact="true">',
+                f'          <Initialization range="{init_start}-{init_end - 1}"/>',
+                '        </SegmentBase>',
+                '      </Representation>'
+            ])
+        lines.append('    </AdaptationSet>')
+    lines.extend(['  </Period>', '</MPD>'])
+    return "\n".join(lines) + "\n"
+
+
+def _rendition_playlists(text):
+    """
+    Media playlist URIs of a master playlist: the variants and the audio renditions (EXT-X-MEDIA URI), in order.
+    """
+    uris = []
+    pending = False
+    for line in text.splitlines():
+        if line.startswith('#EXT-X-MEDIA:') and 'TYPE=AUDIO' in line:
+            uri = re.search(r'URI="([^"]+)"', line)
+            if uri:
+                uris.append(uri.group(1))
+        elif line.startswith('#EXT-X-STREAM-INF:'):
+            pending = True
+        elif pending and line.strip() and not line.startswith('#'):
+            uris.append(line.strip())
+            pending = False
+    return list(dict.fromkeys(uris))
+
+
+def _inspect_segment(location):
+    """
+    (baseMediaDecodeTime, duration in timescale units, starts with a sync sample, size) of one media segment.
+    """
+    head, size = _read_head(location, HEAD_SIZE)
+    moof = _find_box(head, b'moof')
+    if moof is None:
+        raise Exception(f"{location} has no moof")
+    if moof[1] > len(head):
+        head, size = _read_head(location, moof[1])
+
+    traf_start, traf_end = next(_iter_children(head, moof[0] + 8, moof[1], b'traf'))
+    base_time = 0
+    for box_start, _ in _iter_children(head, traf_start + 8, traf_end, b'tfdt'):
+        base_time = struct.unpack_from('>Q' if head[box_start + 8] == 1 else '>I', head, box_start + 12)[0]
+    default_duration, default_flags = _tfhd_defaults(head, traf_start, traf_end)
+    duration = 0
+    first_flags = None
+    for trun_start, _ in _iter_children(head, traf_start + 8, traf_end, b'trun'):
+        durations, flags = _trun_samples(head, trun_start, default_duration, default_flags)
+        duration += sum(durations)
+        if first_flags is None and flags:
+            first_flags = flags[0]
+    # sample_is_non_sync_sample (0x10000) is clear for sync samples.
+    return base_time, duration, first_flags is not None and not first_flags & 0x10000, size
+
+
+def _tfhd_defaults(data, start, end):
+    """
+    default_sample_duration and default_sample_flags of the tfhd in a traf (0 if not present).
+    """
+    for box_start, _ in _iter_children(data, start + 8, end, b'tfhd'):
+        flags = int.from_bytes(data[box_start + 9:box_start + 12], 'big')
+        offset = box_start + 16
+        offset += 8 if flags & 0x01 else 0
+        offset += 4 if flags & 0x02 else 0
+        default_duration = struct.unpack_from('>I', data, offset)[0] if flags & 0x08 else 0
+        offset += 4 if flags & 0x08 else 0
+        offset += 4 if flags & 0x10 else 0
+        default_flags = struct.unpack_from('>I', data, offset)[0] if flags & 0x20 else 0
+        return default_duration, default_flags
+    return 0, 0
+
+
+def _trun_samples(data, start, default_duration, default_flags):
+    """
+    Sample durations (timescale units) and sample flags of a trun.
+    """
+    flags = int.from_bytes(data[start + 9:start + 12], 'big')
+    count = struct.unpack_from('>I', data, start + 12)[0]
+    offset = start + 16
+    offset += 4 if flags & 0x001 else 0
+    first_sample_flags = None
+    if flags & 0x004:
+        first_sample_flags = struct.unpack_from('>I', data, offset)[0]
+        offset += 4
+    fields = [bit for bit in (0x100, 0x200, 0x400, 0x800) if flags & bit]
+    durations, sample_flags = [], []
+    for index in range(count):
+        values = dict(zip(fields, struct.unpack_from(f'>{len(fields)}I', data, offset + index * 4 * len(fields)), strict=True))
+        durations.append(values.get(0x100, default_duration))
+        sample_flags.append(values.get(0x400, default_flags))
+    if first_sample_flags is not None and sample_flags:
+        sample_flags[0] = first_sample_flags
+    return durations, sample_flags
+
+
+def _track(data):
+    """
+    (track_ID, timescale) of the only track of an init segment.
+    """
+    moov = _find_box(data, b'moov')
+    traks = list(_iter_children(data, moov[0] + 8, moov[1], b'trak'))
+    if len(traks) != 1:
+        raise Exception(f"Expected one track per rendition, found {len(traks)}")
+    tkhd = next(_iter_children(data, traks[0][0] + 8, traks[0][1], b'tkhd'))
+    track_id = struct.unpack_from('>I', data, tkhd[0] + (28 if data[tkhd[0] + 8] == 1 else 20))[0]
+    mdia = next(_iter_children(data, traks[0][0] + 8, traks[0][1], b'mdia'))
+    mdhd = next(_iter_children(data, mdia[0] + 8, mdia[1], b'mdhd'))
+    timescale = struct.unpack_from('>I', data, mdhd[0] + (28 if data[mdhd[0] + 8] == 1 else 20))[0]
+    return track_id, timescale
+
+
+def _sample_entry(data, moov_start):
+    """
+    Type, RFC 6381 codecs string and width / height (video) or channels / sample rate (audio) of the first sample
+    entry in the moov.
+    """
+    moov_end = moov_start + struct.unpack_from('>I', data, moov_start)[0]
+    box = (moov_start, moov_end)
+    for box_type in (b'trak', b'mdia', b'minf', b'stbl', b'stsd'):
+        box = next(_iter_children(data, box[0] + 8, box[1], box_type))
+    entry_start = box[0] + 16
+    entry_end = entry_start + struct.unpack_from('>I', data, entry_start)[0]
+    entry_type = data[entry_start + 4:entry_start + 8].decode('ascii')
+
+    if entry_type in ('avc1', 'avc3', 'hvc1', 'hev1', 'av01', 'vp09'):
+        width, height = struct.unpack_from('>HH', data, entry_start + 32)
+        codecs = entry_type
+        for avcc_start, _ in _iter_children(data, entry_start + 86, entry_end, b'avcC'):
+            codecs = f"{entry_type}.{data[avcc_start + 9:avcc_start + 12].hex().upper()}"
+        return {"type": 'video', "codecs": codecs, "width": width, "height": height}
+
+    channels = struct.unpack_from('>H', data, entry_start + 24)[0]
+    sample_rate = struct.unpack_from('>I', data, entry_start + 32)[0] >> 16
+    codecs = entry_type
+    for esds_start, esds_end in _iter_children(data, entry_start + 36, entry_end, b'esds'):
+        codecs = _esds_codecs(data[esds_start + 12:esds_end]) or entry_type
+    return {"type": 'audio', "codecs": codecs, "channels": channels, "sample_rate": sample_rate}
+
+
+def _esds_codecs(descriptors):
+    """
+    mp4a.<objectTypeIndication>.<audio object type> from the descriptors of an esds box.
+    """
+    offset = 0
+    object_type = None
+    while offset + 2 <= len(descriptors):
+        tag = descriptors[offset]
+        length = 0
+        offset += 1
+        while offset < len(descriptors):
+            length = length << 7 | descriptors[offset] & 0x7f
+            offset += 1
+            if not descriptors[offset - 1] & 0x80:
+                break
+        if tag == 0x03:
+            flags = descriptors[offset + 2]
+            offset += 3 + (2 if flags & 0x80 else 0)
+            offset += 1 + descriptors[offset] if flags & 0x40 else 0
+            offset += 2 if flags & 0x20 else 0
+        elif tag == 0x04:
+            object_type = descriptors[offset]
+            offset += 13
+        elif tag == 0x05 and object_type is not None:
+            return f"mp4a.{object_type:x}.{descriptors[offset] >> 3}"
+        else:
+            offset += length
+    return f"mp4a.{object_type:x}" if object_type is not None else None
+
+
+def _parse_sidx(data, start):
+    """
+    (timescale, earliest_presentation_time, first_offset, [(reference_type, referenced_size, duration)]) of a sidx.
+    """
+    version = data[start + 8]
+    timescale = struct.unpack_from('>I', data, start + 16)[0]
+    if version == 0:
+        earliest_presentation_time, first_offset = struct.unpack_from('>II', data, start + 20)
+        offset = start + 28
+    else:
+        earliest_presentation_time, first_offset = struct.unpack_from('>QQ', data, start + 20)
+        offset = start + 36
+    count = struct.unpack_from('>H', data, offset + 2)[0]
+    references = []
+    for index in range(count):
+        reference, duration, _ = struct.unpack_from('>III', data, offset + 4 + index * 12)
+        references.append((reference >> 31, reference & 0x7fffffff, duration))
+    return timescale, earliest_presentation_time, first_offset, references
+
+
+def _find_box(data, box_type):
+    """
+    (start, end) of the first top-level box of the given type; end may exceed the data read so far.
+    """
+    offset = 0
+    while offset + 8 <= len(data):
+        size, current_type = struct.unpack_from('>I4s', data, offset)
+        if size == 1:
+            size = struct.unpack_from('>Q', data, offset + 8)[0]
+        if size < 8:
+            return None
+        if current_type == box_type:
+            return offset, offset + size
+        offset += size
+    return None
+
+
+def _iter_children(data, start, end, box_type):
+    """
+    Yield (start, end) of the child boxes of the given type between start and end.
+    """
+    offset = start
+    while offset + 8 <= min(end, len(data)):
+        size, current_type = struct.unpack_from('>I4s', data, offset)
+        if size < 8:
+            return
+        if current_type == box_type:
+            yield offset, offset + size
+        offset += size
+
+
+def _resolve(base, reference):
+    """
+    Resolve a playlist reference against a local path or URL.
+    """
+    if base.startswith(('http://', 'https://')):
+        return urllib.parse.urljoin(base, reference)
+    return os.path.normpath(os.path.join(os.path.dirname(base), urllib.parse.unquote(reference)))
+
+
+def _open(location):
+    """
+    Binary stream of a local file or an https:// object.
+    """
+    if location.startswith(('http://', 'https://')):
+        return urllib.request.urlopen(location)
+    return open(location, 'rb')
+
+
+def _read_text(location):
+    """
+    Text of a local file or an https:// object.
+    """
+    with _open(location) as f:
+        return f.read().decode('utf-8')
+
+
+def _read_head(location, length):
+    """
+    The first length bytes of a local file or an https:// object (Range request) and the total size.
+    """
+    if not location.startswith(('http://', 'https://')):
+        with open(location, 'rb') as f:
+            return f.read(length), os.fstat(f.fileno()).st_size
+    request = urllib.request.Request(location, headers={"Range": f"bytes=0-{length - 1}"})
+    with urllib.request.urlopen(request) as response:
+        data = response.read()
+        content_range = response.headers.get("Content-Range")
+    return data, int(content_range.rsplit('/', 1)[1]) if content_range else len(data)
+
+
+def _print_rendition(path, rendition):
+    """
+    Print the ranges and bandwidth of one indexed rendition.
+    """
+    init_start, init_end = rendition["init_range"]
+    index_start, index_end = rendition["index_range"]
+    print(f"{path}: {rendition['codecs']}, {len(rendition['segments'])} subsegments, "
+          f"{rendition['duration']:.3f} s, init {init_start}-{init_end - 1}, sidx {index_start}-{index_end - 1}, "
+          f"peak {rendition['bandwidth'] / 1000:.0f} kbps, average {rendition['average_bandwidth'] / 1000:.0f} kbps")
+
+
+if __name__ == '__main__':
+    main()
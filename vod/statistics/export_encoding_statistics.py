@@ -0,0 +1,271 @@
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+
+import pyarrow
+import pyarrow.parquet
+
+from bitmovin_api_sdk import BitmovinApi
+from bitmovin_api_sdk import EncodingListQueryParams
+from bitmovin_api_sdk import Status
+
+API_KEY = '<INSERT YOUR API KEY>'
+ORG_ID = '<INSERT YOUR ORG ID>'
+
+# Local Parquet dataset root. Files are partitioned as day=YYYY-MM-DD/test_item=<TEST_ITEM>/.
+EXPORT_BASE_PATH = 'encoding_statistics/'
+WATERMARK_PATH = f'{EXPORT_BASE_PATH}_watermark.json'
+
+# Optional date range (finished_at, UTC). None means "since the last watermark" / "until now".
+EXPORT_FROM = None
+# e.g. datetime(2026, 10, 1, tzinfo=UTC)
+EXPORT_TO = None
+
+MAX_WORKERS = 16
+PAGE_LIMIT = 100
+
+bitmovin_api = BitmovinApi(api_key=API_KEY, tenant_org_id=ORG_ID)
+
+encoding_schema = pyarrow.schema([
+    ("encoding_id", pyarrow.string()),
+    ("name", pyarrow.string()),
+    ("day", pyarrow.string()),
+    ("test_item", pyarrow.string()),
+    ("created_at", pyarrow.timestamp("s", tz="UTC")),
+    ("running_at", pyarrow.timestamp("s", tz="UTC")),
+    ("finished_at", pyarrow.timestamp("s", tz="UTC")),
+    ("encoder_version", pyarrow.string()),
+    ("cloud_region", pyarrow.string()),
+    ("bytes_encoded", pyarrow.int64()),
+    ("time_encoded", pyarrow.int64()),
+    ("downloaded_size", pyarrow.int64()),
+    ("billable_minutes", pyarrow.float64()),
+    ("billable_transmuxing_minutes", pyarrow.float64()),
+    ("billable_feature_minutes", pyarrow.float64()),
+    ("wall_clock_seconds", pyarrow.float64()),
+    ("encode_speed", pyarrow.float64())
+])
+
+stream_schema = pyarrow.schema([
+    ("encoding_id", pyarrow.string()),
+    ("day", pyarrow.string()),
+    ("test_item", pyarrow.string()),
+    ("stream_id", pyarrow.string()),
+    ("codec", pyarrow.string()),
+    ("preset", pyarrow.string()),
+    ("encoding_mode", pyarrow.string()),
+    ("width", pyarrow.int32()),
+    ("height", pyarrow.int32()),
+    ("rate", pyarrow.float64()),
+    ("bitrate", pyarrow.int64()),
+    ("encoded_bytes", pyarrow.int64()),
+    ("encoded_seconds", pyarrow.float64()),
+    ("billable_minutes", pyarrow.float64()),
+    ("multiplicator", pyarrow.float64())
+])
+
+
+def main():
+    """
+    Incrementally export Bitmovin encoding statistics to a local Parquet dataset.
+      1) Determine the finished_at window from EXPORT_FROM / EXPORT_TO and the last watermark
+      2) List all FINISHED encodings in the window (pages fetched concurrently)
+      3) Fetch the statistics of every encoding concurrently
+      4) Write one row per encoding and one row per stream, partitioned by day and TEST_ITEM
+      5) Advance the watermark to the newest exported finished_at
+    """
+
+    # 1) Export window
+    newer_than = _load_watermark(WATERMARK_PATH)
+    if EXPORT_FROM is not None and (newer_than is None or newer_than < EXPORT_FROM):
+        newer_than = EXPORT_FROM
+    print(f"Exporting encodings finished after {newer_than} until {EXPORT_TO or 'now'}")
+
+    # 2) Finished encodings
+    encodings = _list_finished_encodings(finished_at_newer_than=newer_than, finished_at_older_than=EXPORT_TO)
+    if not encodings:
+        print("No new encodings to export")
+        return
+    print(f"Found {len(encodings)} finished encodings")
+
+    # 3) Statistics
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        encoding_stats = list(executor.map(lambda e: bitmovin_api.encoding.statistics.encodings.get(encoding_id=e.id), encodings))
+
+    # 4) Parquet dataset
+    encoding_rows = []
+    stream_rows = []
+    for encoding, stats in zip(encodings, encoding_stats, strict=True):
+        encoding_row = _encoding_row(encoding=encoding, stats=stats)
+        encoding_rows.append(encoding_row)
+        stream_rows.extend(_stream_rows(encoding_row=encoding_row, stats=stats))
+
+    run_id = uuid.uuid4().hex
+    _write_partitioned(rows=encoding_rows, schema=encoding_schema, root_path=f"{EXPORT_BASE_PATH}encodings", run_id=run_id)
+    _write_partitioned(rows=stream_rows, schema=stream_schema, root_path=f"{EXPORT_BASE_PATH}streams", run_id=run_id)
+    print(f"Wrote {len(encoding_rows)} encoding rows and {len(stream_rows)} stream rows to {EXPORT_BASE_PATH}")
+
+    # 5) Watermark
+    _save_watermark(WATERMARK_PATH, max(encoding.finished_at for encoding in encodings))
+
+
+def _list_finished_encodings(finished_at_newer_than, finished_at_older_than):
+    """
+    List FINISHED encodings in the given finished_at window.
+    The first page reports the total count; the remaining pages are fetched concurrently.
+    """
+    def list_page(offset):
+        return bitmovin_api.encoding.encodings.list(
+            query_params=EncodingListQueryParams(
+                offset=offset,
+                limit=PAGE_LIMIT,
+                include_total_count=offset == 0,
+                sort='finishedAt:asc',
+                status=Status.FINISHED.value,
+                finished_at_newer_than=finished_at_newer_than,
+                finished_at_older_than=finished_at_older_than
+            )
+        )
+
+    first_page = list_page(0)
+    encodings = list(first_page.items)
+    total_count = first_page.total_count or len(encodings)
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for page in executor.map(list_page, range(PAGE_LIMIT, total_count, PAGE_LIMIT)):
+            encodings.extend(page.items)
+
+    return [encoding for encoding in encodings if encoding.finished_at is not None]
+
+
+def _encoding_row(encoding, stats):
+    """
+    Flatten an Encoding and its EncodingStats into one row of the encodings table.
+    """
+    wall_clock_seconds = None
+    encode_speed = None
+    if encoding.running_at and encoding.finished_at:
+        wall_clock_seconds = (encoding.finished_at - encoding.running_at).total_seconds()
+        if wall_clock_seconds > 0 and stats.time_encoded:
+            encode_speed = stats.time_encoded / wall_clock_seconds
+
+    return {
+        "encoding_id": encoding.id,
+        "name": encoding.name,
+        "day": _utc(encoding.finished_at).strftime('%Y-%m-%d'),
+        "test_item": _test_item(encoding.name),
+        "created_at": _utc(encoding.created_at),
+        "running_at": _utc(encoding.running_at),
+        "finished_at": _utc(encoding.finished_at),
+        "encoder_version": encoding.selected_encoder_version or encoding.encoder_version,
+        "cloud_region": _enum_value(encoding.selected_cloud_region or encoding.cloud_region),
+        "bytes_encoded": stats.bytes_encoded,
+        "time_encoded": stats.time_encoded,
+        "downloaded_size": stats.downloaded_size,
+        "billable_minutes": stats.billable_minutes,
+        "billable_transmuxing_minutes": stats.billable_transmuxing_minutes,
+        "billable_feature_minutes": stats.billable_feature_minutes,
+        "wall_clock_seconds": wall_clock_seconds,
+        "encode_speed": encode_speed
+    }
+
+
+def _stream_rows(encoding_row, stats):
+    """
+    Flatten the per-stream statistics (bitrate, resolution, billable minutes) of one encoding.
+    """
+    return [
+        {
+            "encoding_id": encoding_row["encoding_id"],
+            "day": encoding_row["day"],
+            "test_item": encoding_row["test_item"],
+            "stream_id": stream.stream_id,
+            "codec": _enum_value(stream.codec),
+            "preset": stream.preset,
+            "encoding_mode": _enum_value(stream.encoding_mode),
+            "width": stream.width,
+            "height": stream.height,
+            "rate": stream.rate,
+            "bitrate": stream.bitrate,
+            "encoded_bytes": stream.encoded_bytes,
+            "encoded_seconds": stream.encoded_seconds,
+            "billable_minutes": stream.billable_minutes,
+            "multiplicator": stream.multiplicator
+        }
+        for stream in stats.streams or []
+    ]
+
+
+def _write_partitioned(rows, schema, root_path, run_id):
+    """
+    Append rows to a Hive-partitioned Parquet dataset (day=.../test_item=...).
+    Each run writes new files, so existing partitions are never rewritten.
+    """
+    if not rows:
+        return
+
+    table = pyarrow.Table.from_pylist(rows, schema=schema)
+    pyarrow.parquet.write_to_dataset(
+        table,
+        root_path=root_path,
+        partition_cols=["day", "test_item"],
+        basename_template=f"part-{run_id}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore'
+    )
+
+
+def _test_item(name):
+    """
+    Extract TEST_ITEM from an encoding name of the form "[<TEST_ITEM>] <input>" used by the samples.
+    """
+    if name and name.startswith('[') and ']' in name:
+        return name[1:name.index(']')]
+    return 'unknown'
+
+
+def _load_watermark(path):
+    """
+    Return the finished_at of the newest encoding exported so far, or None on the first run.
+    """
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        return datetime.fromisoformat(json.load(f)["finished_at"])
+
+
+def _save_watermark(path, finished_at):
+    """
+    Persist the watermark atomically so an interrupted run never skips encodings.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w') as f:
+        json.dump({"finished_at": _utc(finished_at).isoformat()}, f)
+    os.replace(temporary_path, path)
+
+
+def _utc(value):
+    """
+    Normalise an API datetime to an aware UTC datetime.
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def _enum_value(value):
+    """
+    Return the string value of an SDK enum (or None).
+    """
+    if value is None:
+        return None
+    return getattr(value, 'value', value)
+
+
+if __name__ == '__main__':
+    main()
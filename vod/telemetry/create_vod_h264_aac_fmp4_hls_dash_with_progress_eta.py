@@ -0,0 +1,759 @@
+import os
+import sqlite3
+import statistics
+import time
+from datetime import UTC, datetime
+
+from bitmovin_api_sdk import BitmovinApi
+from bitmovin_api_sdk import GenericS3Input, S3AccessStyle, S3SignatureVersion, GenericS3Output
+from bitmovin_api_sdk import Encoding, CloudRegion
+from bitmovin_api_sdk import EncodingOutput, AclEntry, AclPermission
+from bitmovin_api_sdk import IngestInputStream, StreamSelectionMode, PresetConfiguration
+from bitmovin_api_sdk import Stream, StreamInput, MuxingStream, StreamMode, ColorConfig
+from bitmovin_api_sdk import AacAudioConfiguration, AacChannelLayout
+from bitmovin_api_sdk import H264VideoConfiguration, CodecConfigType, ProfileH264, LevelH264, WeightedPredictionPFrames
+from bitmovin_api_sdk import Fmp4Muxing
+from bitmovin_api_sdk import HlsManifest, HlsVersion, AudioMediaInfo, StreamInfo
+from bitmovin_api_sdk import DashManifest, Period, VideoAdaptationSet, AudioAdaptationSet
+from bitmovin_api_sdk import DashFmp4Representation, DashRepresentationType, DashRepresentationTypeMode
+from bitmovin_api_sdk import MessageType, StartEncodingRequest
+from bitmovin_api_sdk import Status
+
+TEST_ITEM = "vod-h264-aac-fmp4-hls-dash-with-progress-eta"
+
+API_KEY = '<INSERT YOUR API KEY>'
+ORG_ID = '<INSERT YOUR ORG ID>'
+
+LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_INPUT_HOST_NAME = '<INSERT_YOUR_INPUT_HOST_NAME>'
+
+INPUT_PATH = '/path/to/your/input/file.mp4'
+# e.g. 'inputs/big_buck_bunny_1080p_h264.mov'
+
+LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY = '<INSERT_YOUR_ACCESS_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY = '<INSERT_YOUR_SECRET_KEY>'
+LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME = '<INSERT_YOUR_BUCKET_NAME>'
+LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME = '<INSERT_YOUR_OUTPUT_HOST_NAME>'
+
+OUTPUT_BASE_PATH = f'output/{TEST_ITEM}/'
+
+# Local time-series store for (time, progress, status) samples and finished-job speed history.
+TELEMETRY_DB_PATH = 'encoding_telemetry.sqlite3'
+
+# Speed models are fitted per codec / preset and keyed by source height and input duration bucket.
+SPEED_MODEL_CODEC = 'H264'
+SPEED_MODEL_PRESET = PresetConfiguration.VOD_HIGH_QUALITY.value
+DURATION_BUCKETS_SECONDS = [300, 1800, 3600, 7200]
+
+# Polling interval bounds (seconds). The next check is scheduled from the predicted finish time.
+MIN_POLL_INTERVAL = 5
+MAX_POLL_INTERVAL = 60
+ETA_FIT_WINDOW = 12
+
+bitmovin_api = BitmovinApi(api_key=API_KEY, tenant_org_id=ORG_ID)
+
+# Example H.264 encoding profiles, including different resolutions, bitrates, and profiles.
+video_encoding_profiles = [
+    {"height": 240, "bitrate": 300000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 360, "bitrate": 800000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 480, "bitrate": 1200000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 540, "bitrate": 2000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 720, "bitrate": 4000000, "profile": ProfileH264.HIGH, "level": None, "mode": StreamMode.STANDARD},
+    {"height": 1080, "bitrate": 6000000, "profile": ProfileH264.HIGH, "level": LevelH264.L4, "mode": StreamMode.STANDARD}
+]
+
+# Example AAC audio encoding profiles, each with a specified bitrate and sample rate.
+audio_encoding_profiles = [
+    {"bitrate": 128000, "rate": 48000},
+    {"bitrate": 64000, "rate": 44100}
+]
+
+
+def main():
+    """
+    Main entry point for the encoding script.
+    This demonstrates a basic Bitmovin encoding workflow using H.264 video and AAC audio. Steps:
+      1) Create Generic S3 input/output for Linode Object Storage
+      2) Create an Encoding object
+      3) Define video/audio input streams
+      4) Create multiple H.264 streams, using advanced color/coding parameters
+      5) Create multiple AAC streams
+      6) Start the encoding (FMP4 muxing outputs) and poll it while recording progress telemetry
+      7) Generate HLS and DASH manifests
+
+    While the encoding runs, (time, progress, status) samples are written to TELEMETRY_DB_PATH.
+    The ETA combines the speed history of finished jobs with the same codec / preset / source
+    height / duration bucket and the progress rate observed so far, and the poller sleeps
+    until shortly before the predicted finish instead of every 5 seconds.
+    """
+
+    # 1) Generic S3 Input/Output
+    input = bitmovin_api.encoding.inputs.generic_s3.create(
+        generic_s3_input=GenericS3Input(
+            access_key=LINODE_OBJECT_STORAGE_INPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_INPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_INPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_INPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Input'))
+    output = bitmovin_api.encoding.outputs.generic_s3.create(
+        generic_s3_output=GenericS3Output(
+            access_key=LINODE_OBJECT_STORAGE_OUTPUT_ACCESS_KEY,
+            secret_key=LINODE_OBJECT_STORAGE_OUTPUT_SECRET_KEY,
+            bucket_name=LINODE_OBJECT_STORAGE_OUTPUT_BUCKET_NAME,
+            host=LINODE_OBJECT_STORAGE_OUTPUT_HOST_NAME,
+            access_style=S3AccessStyle.VIRTUAL_HOSTED,
+            ssl=True,
+            port=443,
+            signature_version=S3SignatureVersion.V4,
+            name='Test Linode Object Storage Output'))
+
+    # 2) Encoding instance
+    encoding = bitmovin_api.encoding.encodings.create(
+        encoding=Encoding(
+            name=f"[{TEST_ITEM}] {INPUT_PATH}",
+            cloud_region=CloudRegion.AKAMAI_JP_OSA,
+            encoder_version='STABLE'
+        )
+    )
+
+    # 3) Input Streams
+    video_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=INPUT_PATH,
+            selection_mode=StreamSelectionMode.VIDEO_RELATIVE,
+            position=0
+        )
+    )
+    audio_ingest_input_stream = bitmovin_api.encoding.encodings.input_streams.ingest.create(
+        encoding_id=encoding.id,
+        ingest_input_stream=IngestInputStream(
+            input_id=input.id,
+            input_path=INPUT_PATH,
+            selection_mode=StreamSelectionMode.AUDIO_RELATIVE,
+            position=0
+        )
+    )
+    video_input_stream = StreamInput(input_stream_id=video_ingest_input_stream.id)
+    audio_input_stream = StreamInput(input_stream_id=audio_ingest_input_stream.id)
+
+    # 4) Create Video Streams + Muxings
+    video_stream_ids = []
+    for video_profile in video_encoding_profiles:
+        color_config = ColorConfig(
+            copy_color_primaries_flag=True,
+            copy_color_transfer_flag=True,
+            copy_color_space_flag=True
+        )
+
+        # Configure advanced H.264 parameters (ref: https://developer.bitmovin.com/encoding/docs/h264-presets)
+        if video_profile.get("profile") == ProfileH264.HIGH:
+            adaptive_spatial_transform = True
+            use_cabac = True
+            num_refframe = 4
+            num_bframe = 3
+            weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+        elif video_profile.get("profile") == ProfileH264.MAIN:
+            adaptive_spatial_transform = False
+            use_cabac = True
+            num_refframe = 4
+            num_bframe = 3
+            weighted_prediction_p_frames = WeightedPredictionPFrames.SMART
+        elif video_profile.get("profile") == ProfileH264.BASELINE:
+            adaptive_spatial_transform = False
+            use_cabac = False
+            num_refframe = 4
+            num_bframe = 0
+            weighted_prediction_p_frames = WeightedPredictionPFrames.DISABLED
+        else:
+            raise Exception("Unknown profile. Valid profiles: HIGH, MAIN, BASELINE.")
+
+        h264_codec = bitmovin_api.encoding.configurations.video.h264.create(
+            h264_video_configuration=H264VideoConfiguration(
+                name='Sample video codec configuration',
+                height=video_profile.get("height"),
+                bitrate=video_profile.get("bitrate"),
+                max_bitrate=int(video_profile.get("bitrate") * 1.2),
+                bufsize=int(video_profile.get("bitrate") * 1.5),
+                profile=video_profile.get("profile"),
+                level=video_profile.get("level"),
+                min_keyframe_interval=2,
+                max_keyframe_interval=2,
+                color_config=color_config,
+                ref_frames=num_refframe,
+                bframes=num_bframe,
+                cabac=use_cabac,
+                adaptive_spatial_transform=adaptive_spatial_transform,
+                weighted_prediction_p_frames=weighted_prediction_p_frames,
+                preset_configuration=PresetConfiguration.VOD_HIGH_QUALITY
+            )
+        )
+
+        h264_stream = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=h264_codec.id,
+                input_streams=[video_input_stream],
+                name=f"Stream H264 {video_profile.get('height')}p",
+                mode=video_profile.get('mode')
+            )
+        )
+
+        video_stream_ids.append(h264_stream.id)
+
+        video_muxing_output = EncodingOutput(
+            output_id=output.id,
+            output_path=f"{OUTPUT_BASE_PATH}video/{video_profile.get('height')}p",
+            acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+        )
+
+        bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=6,
+                segment_naming='segment_%number%.m4s',
+                init_segment_name='init.mp4',
+                streams=[MuxingStream(stream_id=h264_stream.id)],
+                outputs=[video_muxing_output],
+                name=f"Video FMP4 Muxing {video_profile.get('height')}p"
+            )
+        )
+
+    # 5) Create Audio Streams + Muxings
+    for audio_profile in audio_encoding_profiles:
+        aac_codec = bitmovin_api.encoding.configurations.audio.aac.create(
+            aac_audio_configuration=AacAudioConfiguration(
+                bitrate=audio_profile.get("bitrate"),
+                rate=audio_profile.get("rate"),
+                channel_layout=AacChannelLayout.CL_STEREO
+            )
+        )
+
+        aac_stream = bitmovin_api.encoding.encodings.streams.create(
+            encoding_id=encoding.id,
+            stream=Stream(
+                codec_config_id=aac_codec.id,
+                input_streams=[audio_input_stream],
+                name=f"Stream AAC {audio_profile.get('bitrate') / 1000:.0f}kbps",
+                mode=StreamMode.STANDARD
+            )
+        )
+
+        audio_muxing_output = EncodingOutput(
+            output_id=output.id,
+            output_path=f"{OUTPUT_BASE_PATH}audio/{audio_profile.get('bitrate')}",
+            acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+        )
+
+        bitmovin_api.encoding.encodings.muxings.fmp4.create(
+            encoding_id=encoding.id,
+            fmp4_muxing=Fmp4Muxing(
+                segment_length=6,
+                segment_naming='segment_%number%.m4s',
+                init_segment_name='init.mp4',
+                streams=[MuxingStream(stream_id=aac_stream.id)],
+                outputs=[audio_muxing_output],
+                name=f"Audio FMP4 Muxing {audio_profile.get('bitrate') / 1000:.0f}kbps"
+            )
+        )
+
+    # 6) Start Encoding (no manifest in request)
+    start_encoding_request = StartEncodingRequest()
+    telemetry = _open_telemetry_store(TELEMETRY_DB_PATH)
+    _execute_encoding(encoding=encoding,
+                      start_encoding_request=start_encoding_request,
+                      telemetry=telemetry,
+                      probe_stream_id=video_stream_ids[-1])
+    telemetry.close()
+
+    # 7) Create HLS/DASH manifests
+    hls_manifest = _create_hls_manifest(encoding_id=encoding.id, output=output, output_path=OUTPUT_BASE_PATH)
+    dash_manifest = _create_dash_manifest(encoding_id=encoding.id, output=output, output_path=OUTPUT_BASE_PATH)
+
+    # 8) Generate HLS/DASH
+    _execute_hls_manifest_generation(hls_manifest=hls_manifest)
+    _execute_dash_manifest_generation(dash_manifest=dash_manifest)
+
+
+def _execute_encoding(encoding, start_encoding_request, telemetry, probe_stream_id):
+    """
+    Start the encoding process on Bitmovin and poll until it finishes or fails.
+    Every poll is recorded as a telemetry sample; the job is added to the speed history once it ends.
+    """
+    bitmovin_api.encoding.encodings.start(encoding_id=encoding.id, start_encoding_request=start_encoding_request)
+    job = _register_telemetry_job(telemetry=telemetry, encoding_id=encoding.id)
+    task = _wait_for_encoding_to_finish(encoding_id=encoding.id, telemetry=telemetry, job=job, probe_stream_id=probe_stream_id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_encoding_to_finish(encoding_id=encoding.id, telemetry=telemetry, job=job, probe_stream_id=probe_stream_id)
+
+    _finish_telemetry_job(telemetry=telemetry, job=job, task=task)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("Encoding failed")
+
+    print("Encoding finished successfully")
+
+
+def _create_hls_manifest(encoding_id, output, output_path):
+    """
+    Create an HLS manifest from the generated FMP4 muxings.
+    Loop through all FMP4 muxings and add audio or video entries to the HLS manifest.
+    """
+    manifest_output = EncodingOutput(
+        output_id=output.id,
+        output_path=output_path,
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    hls_manifest = bitmovin_api.encoding.manifests.hls.create(
+        hls_manifest=HlsManifest(
+            manifest_name='stream.m3u8',
+            outputs=[manifest_output],
+            name='HLS Manifest',
+            hls_master_playlist_version=HlsVersion.HLS_V6,
+            hls_media_playlist_version=HlsVersion.HLS_V6
+        )
+    )
+
+    fmp4_muxings = bitmovin_api.encoding.encodings.muxings.fmp4.list(encoding_id=encoding_id)
+    for muxing in fmp4_muxings.items:
+        stream = bitmovin_api.encoding.encodings.streams.get(encoding_id=encoding_id, stream_id=muxing.streams[0].stream_id)
+        if 'PER_TITLE_TEMPLATE' in stream.mode.value:
+            continue
+
+        codec = bitmovin_api.encoding.configurations.type.get(configuration_id=stream.codec_config_id)
+        segment_path = _remove_output_base_path(muxing.outputs[0].output_path)
+
+        if codec.type == CodecConfigType.AAC:
+            # HLS audio
+            audio_codec = bitmovin_api.encoding.configurations.audio.aac.get(configuration_id=stream.codec_config_id)
+            bitmovin_api.encoding.manifests.hls.media.audio.create(
+                manifest_id=hls_manifest.id,
+                audio_media_info=AudioMediaInfo(
+                    name='HLS Audio Media',
+                    group_id='audio',
+                    language='en',
+                    segment_path=segment_path,
+                    encoding_id=encoding_id,
+                    stream_id=stream.id,
+                    muxing_id=muxing.id,
+                    uri=f'audio_{audio_codec.bitrate}.m3u8'
+                )
+            )
+        elif codec.type == CodecConfigType.H264:
+            # HLS video
+            video_codec = bitmovin_api.encoding.configurations.video.h264.get(configuration_id=stream.codec_config_id)
+            bitmovin_api.encoding.manifests.hls.streams.create(
+                manifest_id=hls_manifest.id,
+                stream_info=StreamInfo(
+                    audio='audio',
+                    closed_captions='NONE',
+                    segment_path=segment_path,
+                    uri=f'video_{video_codec.bitrate}.m3u8',
+                    encoding_id=encoding_id,
+                    stream_id=stream.id,
+                    muxing_id=muxing.id
+                )
+            )
+
+    return hls_manifest
+
+
+def _create_dash_manifest(encoding_id, output, output_path):
+    """
+    Create a DASH manifest by creating a Period, adding Video/Audio Adaptation Sets,
+    and attaching each FMP4 representation.
+    """
+    manifest_output = EncodingOutput(
+        output_id=output.id,
+        output_path=output_path,
+        acl=[AclEntry(permission=AclPermission.PUBLIC_READ)]
+    )
+
+    dash_manifest = bitmovin_api.encoding.manifests.dash.create(
+        dash_manifest=DashManifest(
+            manifest_name='stream.mpd',
+            outputs=[manifest_output],
+            name='DASH Manifest'
+        )
+    )
+
+    period = bitmovin_api.encoding.manifests.dash.periods.create(
+        manifest_id=dash_manifest.id,
+        period=Period()
+    )
+
+    video_adaptation_set = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.video.create(
+        video_adaptation_set=VideoAdaptationSet(),
+        manifest_id=dash_manifest.id,
+        period_id=period.id
+    )
+    audio_adaptation_set = bitmovin_api.encoding.manifests.dash.periods.adaptationsets.audio.create(
+        audio_adaptation_set=AudioAdaptationSet(lang='en'),
+        manifest_id=dash_manifest.id,
+        period_id=period.id
+    )
+
+    fmp4_muxings = bitmovin_api.encoding.encodings.muxings.fmp4.list(encoding_id=encoding_id)
+    for muxing in fmp4_muxings.items:
+        stream = bitmovin_api.encoding.encodings.streams.get(encoding_id=encoding_id, stream_id=muxing.streams[0].stream_id)
+        if 'PER_TITLE_TEMPLATE' in stream.mode.value:
+            continue
+
+        codec = bitmovin_api.encoding.configurations.type.get(configuration_id=stream.codec_config_id)
+        segment_path = _remove_output_base_path(muxing.outputs[0].output_path)
+
+        if codec.type == CodecConfigType.AAC:
+            bitmovin_api.encoding.manifests.dash.periods.adaptationsets.representations.fmp4.create(
+                manifest_id=dash_manifest.id,
+                period_id=period.id,
+                adaptationset_id=audio_adaptation_set.id,
+                dash_fmp4_representation=DashFmp4Representation(
+                    encoding_id=encoding_id,
+                    muxing_id=muxing.id,
+                    type_=DashRepresentationType.TEMPLATE,
+                    mode=DashRepresentationTypeMode.TEMPLATE_REPRESENTATION,
+                    segment_path=segment_path
+                )
+            )
+        elif codec.type == CodecConfigType.H264:
+            bitmovin_api.encoding.manifests.dash.periods.adaptationsets.representations.fmp4.create(
+                manifest_id=dash_manifest.id,
+                period_id=period.id,
+                adaptationset_id=video_adaptation_set.id,
+                dash_fmp4_representation=DashFmp4Representation(
+                    encoding_id=encoding_id,
+                    muxing_id=muxing.id,
+                    type_=DashRepresentationType.TEMPLATE,
+                    mode=DashRepresentationTypeMode.TEMPLATE_REPRESENTATION,
+                    segment_path=segment_path
+                )
+            )
+
+    return dash_manifest
+
+
+def _execute_hls_manifest_generation(hls_manifest):
+    """
+    Start HLS manifest generation and poll until completed or fails.
+    """
+    bitmovin_api.encoding.manifests.hls.start(manifest_id=hls_manifest.id)
+    task = _wait_for_hls_manifest_to_finish(manifest_id=hls_manifest.id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_hls_manifest_to_finish(manifest_id=hls_manifest.id)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("HLS Manifest creation failed")
+
+    print("HLS Manifest creation finished successfully")
+
+
+def _execute_dash_manifest_generation(dash_manifest):
+    """
+    Start DASH manifest generation and poll until completed or fails.
+    """
+    bitmovin_api.encoding.manifests.dash.start(manifest_id=dash_manifest.id)
+    task = _wait_for_dash_manifest_to_finish(manifest_id=dash_manifest.id)
+
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        task = _wait_for_dash_manifest_to_finish(manifest_id=dash_manifest.id)
+
+    if task.status == Status.ERROR:
+        _log_task_errors(task)
+        raise Exception("DASH Manifest creation failed")
+
+    print("DASH Manifest creation finished successfully")
+
+
+def _wait_for_encoding_to_finish(encoding_id, telemetry, job, probe_stream_id):
+    """
+    Sleep until the next scheduled check, poll the encoding status and record a telemetry sample.
+    The next check is scheduled from the predicted finish time (bounded by MIN/MAX_POLL_INTERVAL).
+    """
+    time.sleep(job["next_poll_interval"])
+    task = bitmovin_api.encoding.encodings.status(encoding_id=encoding_id)
+    now = time.time()
+
+    _record_progress_sample(telemetry=telemetry, encoding_id=encoding_id, sampled_at=now, task=task)
+
+    if task.status == Status.RUNNING:
+        if job["running_at"] is None:
+            job["running_at"] = _task_timestamp(task.running_at, default=now)
+        if job["input_duration"] is None:
+            _update_job_source_properties(telemetry=telemetry, job=job, probe_stream_id=probe_stream_id)
+
+    finish_at = _estimate_finish_time(telemetry=telemetry, job=job, task=task, now=now)
+    if finish_at is None:
+        job["next_poll_interval"] = MIN_POLL_INTERVAL
+        print(f"Encoding status is {task.status} (progress: {task.progress} %)")
+    else:
+        remaining = max(finish_at - now, 0)
+        job["next_poll_interval"] = min(max(remaining / 2, MIN_POLL_INTERVAL), MAX_POLL_INTERVAL)
+        finish_time = datetime.fromtimestamp(finish_at, tz=UTC).isoformat(timespec='seconds')
+        print(f"Encoding status is {task.status} (progress: {task.progress} %, ETA: {finish_time}, remaining: {remaining:.0f} s)")
+
+    return task
+
+
+def _wait_for_hls_manifest_to_finish(manifest_id):
+    """
+    Poll HLS manifest creation status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.manifests.hls.status(manifest_id=manifest_id)
+    print(f"HLS manifest status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _wait_for_dash_manifest_to_finish(manifest_id):
+    """
+    Poll DASH manifest creation status every 5 seconds until finished or an error occurs.
+    """
+    time.sleep(5)
+    task = bitmovin_api.encoding.manifests.dash.status(manifest_id=manifest_id)
+    print(f"DASH manifest status is {task.status} (progress: {task.progress} %)")
+    return task
+
+
+def _remove_output_base_path(text):
+    """
+    Remove the OUTPUT_BASE_PATH prefix from the given path to create a relative segment path.
+    """
+    if text.startswith(OUTPUT_BASE_PATH):
+        return text[len(OUTPUT_BASE_PATH):]
+    return text
+
+
+def _open_telemetry_store(path):
+    """
+    Open (or create) the local SQLite time-series store used for progress samples and speed history.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    telemetry = sqlite3.connect(path)
+    telemetry.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS progress_samples (
+            encoding_id TEXT NOT NULL,
+            sampled_at REAL NOT NULL,
+            progress INTEGER,
+            status TEXT NOT NULL,
+            eta REAL,
+            estimated_finish_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_progress_samples_encoding ON progress_samples (encoding_id, sampled_at);
+        CREATE TABLE IF NOT EXISTS encoding_jobs (
+            encoding_id TEXT PRIMARY KEY,
+            test_item TEXT NOT NULL,
+            codec TEXT NOT NULL,
+            preset TEXT NOT NULL,
+            source_height INTEGER,
+            input_duration REAL,
+            duration_bucket INTEGER,
+            running_at REAL,
+            finished_at REAL,
+            status TEXT,
+            realtime_factor REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_encoding_jobs_model ON encoding_jobs (codec, preset, source_height, duration_bucket);
+        """
+    )
+    # Stores created before estimated_finish_at existed: add the column (eta keeps the API's seconds remaining)
+    columns = [row[1] for row in telemetry.execute("PRAGMA table_info(progress_samples)")]
+    if "estimated_finish_at" not in columns:
+        telemetry.execute("ALTER TABLE progress_samples ADD COLUMN estimated_finish_at REAL")
+        telemetry.commit()
+    return telemetry
+
+
+def _register_telemetry_job(telemetry, encoding_id):
+    """
+    Register the encoding in the job table and return the in-memory job state used by the poller.
+    """
+    job = {
+        "encoding_id": encoding_id,
+        "codec": SPEED_MODEL_CODEC,
+        "preset": SPEED_MODEL_PRESET,
+        "source_height": None,
+        "input_duration": None,
+        "duration_bucket": None,
+        "running_at": None,
+        "next_poll_interval": MIN_POLL_INTERVAL
+    }
+    telemetry.execute(
+        "INSERT OR REPLACE INTO encoding_jobs (encoding_id, test_item, codec, preset) VALUES (?, ?, ?, ?)",
+        (encoding_id, TEST_ITEM, job["codec"], job["preset"]))
+    telemetry.commit()
+    return job
+
+
+def _update_job_source_properties(telemetry, job, probe_stream_id):
+    """
+    Fetch the analysed input duration and resolution once the encoder has started working on the input.
+    """
+    input_details = bitmovin_api.encoding.encodings.streams.input.get(encoding_id=job["encoding_id"], stream_id=probe_stream_id)
+    if not input_details.duration:
+        return
+
+    job["input_duration"] = input_details.duration
+    job["duration_bucket"] = _duration_bucket(input_details.duration)
+    if input_details.video_streams:
+        job["source_height"] = input_details.video_streams[0].height
+
+    telemetry.execute(
+        "UPDATE encoding_jobs SET source_height = ?, input_duration = ?, duration_bucket = ? WHERE encoding_id = ?",
+        (job["source_height"], job["input_duration"], job["duration_bucket"], job["encoding_id"]))
+    telemetry.commit()
+    print(f"Input duration {job['input_duration']:.1f} s, source height {job['source_height']}p")
+
+
+def _record_progress_sample(telemetry, encoding_id, sampled_at, task):
+    """
+    Append one (time, progress, status) sample for the encoding, including the encoder-reported ETA if any.
+    """
+    telemetry.execute(
+        "INSERT INTO progress_samples (encoding_id, sampled_at, progress, status, eta) VALUES (?, ?, ?, ?, ?)",
+        (encoding_id, sampled_at, task.progress, task.status.value, task.eta))
+    telemetry.commit()
+
+
+def _finish_telemetry_job(telemetry, job, task):
+    """
+    Store the final status and, for successful jobs, the realtime factor used by future speed models.
+    """
+    finished_at = _task_timestamp(task.finished_at or task.error_at, default=time.time())
+    realtime_factor = None
+    if task.status == Status.FINISHED and job["input_duration"] and job["running_at"] and finished_at > job["running_at"]:
+        realtime_factor = job["input_duration"] / (finished_at - job["running_at"])
+        print(f"Encoded at {realtime_factor:.2f}x realtime")
+
+    telemetry.execute(
+        "UPDATE encoding_jobs SET running_at = ?, finished_at = ?, status = ?, realtime_factor = ? WHERE encoding_id = ?",
+        (job["running_at"], finished_at, task.status.value, realtime_factor, job["encoding_id"]))
+    telemetry.commit()
+
+
+def _speed_model(telemetry, job):
+    """
+    Return the median realtime factor (input seconds per wall-clock second) of finished jobs matching the job.
+    Falls back from codec/preset/height/duration bucket to codec/preset/height and then codec/preset.
+    """
+    candidates = [
+        ("source_height = ? AND duration_bucket = ?", (job["source_height"], job["duration_bucket"])),
+        ("source_height = ?", (job["source_height"],)),
+        ("1 = 1", ())
+    ]
+    for condition, params in candidates:
+        rows = telemetry.execute(
+            f"SELECT realtime_factor FROM encoding_jobs WHERE codec = ? AND preset = ? AND realtime_factor IS NOT NULL AND {condition}",
+            (job["codec"], job["preset"], *params)).fetchall()
+        if rows:
+            return statistics.median(row[0] for row in rows)
+    return None
+
+
+def _estimate_finish_time(telemetry, job, task, now):
+    """
+    Predict the finish time (epoch seconds) of a running encoding.
+    The historical speed model gives a prior; the progress rate fitted over the last ETA_FIT_WINDOW
+    samples takes over as the job advances. Returns None while no prediction is possible.
+    """
+    if task.status != Status.RUNNING or job["running_at"] is None:
+        return None
+
+    progress = task.progress or 0
+    remaining_fraction = (100 - progress) / 100
+
+    prior_remaining = None
+    realtime_factor = _speed_model(telemetry, job) if job["input_duration"] else None
+    if realtime_factor:
+        prior_remaining = remaining_fraction * job["input_duration"] / realtime_factor
+
+    observed_remaining = None
+    samples = telemetry.execute(
+        "SELECT sampled_at, progress FROM progress_samples WHERE encoding_id = ? AND status = ? ORDER BY sampled_at DESC LIMIT ?",
+        (job["encoding_id"], Status.RUNNING.value, ETA_FIT_WINDOW)).fetchall()
+    if len(samples) >= 2:
+        slope = _progress_rate(samples)
+        if slope > 0:
+            observed_remaining = (100 - progress) / slope
+
+    if prior_remaining is None and observed_remaining is None:
+        return None
+    if prior_remaining is None:
+        remaining = observed_remaining
+    elif observed_remaining is None:
+        remaining = prior_remaining
+    else:
+        weight = progress / 100
+        remaining = weight * observed_remaining + (1 - weight) * prior_remaining
+
+    finish_at = now + remaining
+    telemetry.execute(
+        "UPDATE progress_samples SET estimated_finish_at = ? WHERE encoding_id = ? AND sampled_at = ?",
+        (finish_at, job["encoding_id"], now))
+    telemetry.commit()
+    return finish_at
+
+
+def _progress_rate(samples):
+    """
+    Least-squares slope (progress percent per second) of the given (time, progress) samples.
+    """
+    times = [sample[0] for sample in samples]
+    values = [sample[1] or 0 for sample in samples]
+    mean_time = statistics.fmean(times)
+    mean_value = statistics.fmean(values)
+    variance = sum((t - mean_time) ** 2 for t in times)
+    if variance == 0:
+        return 0
+    return sum((t - mean_time) * (v - mean_value) for t, v in zip(times, values, strict=True)) / variance
+
+
+def _duration_bucket(duration):
+    """
+    Map an input duration (seconds) to the index of its DURATION_BUCKETS_SECONDS bucket.
+    """
+    for index, limit in enumerate(DURATION_BUCKETS_SECONDS):
+        if duration <= limit:
+            return index
+    return len(DURATION_BUCKETS_SECONDS)
+
+
+def _task_timestamp(value, default):
+    """
+    Convert a task datetime to epoch seconds, falling back to the given default.
+    """
+    if value is None:
+        return default
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.timestamp()
+
+
+def _log_task_errors(task):
+    """
+    Print error messages from the given task to the console.
+    """
+    if not task:
+        return
+
+    for message in filter(lambda m: m.type == MessageType.ERROR, task.messages):
+        print(message.text)
+
+
+if __name__ == '__main__':
+    main()
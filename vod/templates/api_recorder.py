@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+
+class ApiRecorder:
+    """
+    Stand-in for bitmovin_api that runs a workflow without any request. Every SDK call
+    (e.g. bitmovin_api.encoding.encodings.streams.create(...)) reaches call() with its attribute path and keyword
+    arguments and is dispatched to record_<method>(resource_path, kwargs) of the subclass; on_call() sees every call first.
+    Used by submit_encoding_template.py and vod/plan/plan_workflow.py.
+    """
+
+    def __getattr__(self, name):
+        return RecordedPath(self, (name,))
+
+    def call(self, path, kwargs):
+        self.on_call(path, kwargs)
+        # Looked up on the class: attributes missing on the instance are API paths (__getattr__)
+        handler = getattr(type(self), f"record_{path[-1]}", None)
+        if handler is None:
+            return self.record_other(path, kwargs)
+        return handler(self, path[:-1], kwargs)
+
+    def on_call(self, path, kwargs):
+        pass
+
+    def record_other(self, path, kwargs):
+        return Unknown()
+
+
+class RecordedPath:
+    """
+    Attribute path of the API (e.g. encoding.encodings.streams.create) forwarded to the recorder when called.
+    """
+
+    def __init__(self, recorder, path):
+        self._recorder = recorder
+        self._path = path
+
+    def __getattr__(self, name):
+        return RecordedPath(self._recorder, (*self._path, name))
+
+    def __call__(self, **kwargs):
+        return self._recorder.call(self._path, kwargs)
+
+
+class RecordedTask(SimpleNamespace):
+    """
+    Task status with the optional fields (eta, timestamps) left unset.
+    """
+
+    def __getattr__(self, name):
+        return None
+
+
+class Unknown:
+    """
+    Placeholder for values that are only known at run time.
+    """
+
+    def __getattr__(self, name):
+        return f"<{name}>"
@@ -0,0 +1,369 @@
+import builtins
+import contextlib
+import hashlib
+import io
+import importlib.util
+import inspect
+import json
+import os
+import re
+import time
+from types import SimpleNamespace
+
+from bitmovin_api_sdk import BitmovinApi
+from bitmovin_api_sdk import CodecConfigType, ManifestGenerator, ManifestResource
+from bitmovin_api_sdk import MessageType, Status
+
+from api_recorder import ApiRecorder, RecordedTask, Unknown
+
+API_KEY = '<INSERT YOUR API KEY>'
+ORG_ID = '<INSERT YOUR ORG ID>'
+
+# Sample workflow to convert (any create_*.py of vod/abr, vod/drm, vod/dolby, vod/pertitle, live/srt and live/rtmp).
+WORKFLOW = 'vod/abr/create_vod_h264_aac_fmp4_hls_dash.py'
+
+# Constants of the workflow that become substitution variables (${NAME}) of the template: input / output paths,
+# buckets, hosts and keys. Their values are taken from TEMPLATE_VARIABLES, or else from the workflow script.
+VARIABLE_PATTERN = r'(PATH|DIRECTORY|BUCKET_NAME|HOST|ACCESS_KEY|SECRET_KEY|USERNAME|PASSWORD|CENC_KEY|CENC_KID)'
+TEMPLATE_VARIABLES = {
+    # "INPUT_PATH": 'inputs/big_buck_bunny_1080p_h264.mov',
+    # "OUTPUT_BASE_PATH": 'output/big_buck_bunny/',
+}
+
+# Rendered templates (with the ${NAME} placeholders, never the values) are cached per ladder hash.
+TEMPLATE_CACHE_DIR = 'template_cache'
+# The template of the last run, for review.
+TEMPLATE_PATH = 'encoding_template.json'
+
+# Submit the template (one request). When False, only the template is written.
+SUBMIT = True
+# Poll the status of a submitted VOD encoding until it finishes.
+WAIT_FOR_ENCODING = True
+# Also replay the setup calls of the workflow one by one (without starting the encoding) to compare the setup latency.
+# The replayed encoding is deleted afterwards; the configurations, inputs and outputs it created remain.
+BENCHMARK_IMPERATIVE = False
+
+bitmovin_api = BitmovinApi(api_key=API_KEY, tenant_org_id=ORG_ID)
+
+
+def main():
+    """
+    Convert a sample workflow into a Bitmovin Encoding Template and submit it in one request. Steps:
+      1) Load the workflow script and replace its input / output / key constants with ${NAME} variables
+      2) Look up the template in the cache by the ladder hash (script source and ladder definitions)
+      3) On a miss, run the workflow's main() against a recording stub instead of bitmovin_api
+         and turn the recorded resources into the template document
+      4) Substitute the variables and submit the template (POST /encoding/templates/start)
+      5) Optionally replay the same setup calls imperatively and compare the setup latency
+    """
+
+    # 1) Workflow
+    module, source = _load_workflow(WORKFLOW)
+    variables = _variable_defaults(module)
+
+    # 2) Cache
+    ladder_hash = _ladder_hash(module, source, variables)
+    cache_path = os.path.join(TEMPLATE_CACHE_DIR, f"{os.path.splitext(os.path.basename(WORKFLOW))[0]}-{ladder_hash[:16]}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cached = json.load(f)
+        template, recorder = cached["template"], None
+        print(f"Template loaded from {cache_path}")
+    else:
+        # 3) Record
+        recorder = record_workflow(module, variables)
+        template = recorder.template(name=getattr(module, 'TEST_ITEM', WORKFLOW))
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        with open(cache_path + '.tmp', 'w') as f:
+            json.dump({"workflow": WORKFLOW, "ladder_hash": ladder_hash, "template": template}, f, indent=2)
+        os.replace(cache_path + '.tmp', cache_path)
+        print(f"Template rendered from {len(recorder.calls)} recorded API calls ({len(recorder.nodes)} resources), "
+              f"cached as {cache_path}")
+
+    with open(TEMPLATE_PATH, 'w') as f:
+        json.dump(template, f, indent=2)
+    print(f"Template written to {TEMPLATE_PATH} (variables: {', '.join(sorted(_placeholders(template)))})")
+    if not SUBMIT:
+        return
+
+    # 4) Submit
+    values = {**variables, **TEMPLATE_VARIABLES}
+    started = time.perf_counter()
+    response = bitmovin_api.encoding.templates.start(encoding_template_request=substitute(template, values))
+    template_seconds = time.perf_counter() - started
+    print(f"Template submitted in 1 request ({template_seconds:.2f} s): encoding {response.encoding_id}")
+
+    # 5) Benchmark
+    if BENCHMARK_IMPERATIVE:
+        if recorder is None:
+            recorder = record_workflow(module, variables)
+        calls, imperative_seconds = replay_setup(recorder, values)
+        print(f"Imperative setup: {calls} requests in {imperative_seconds:.2f} s "
+              f"({imperative_seconds / template_seconds:.1f}x the template submission)")
+
+    if WAIT_FOR_ENCODING and template["metadata"]["type"] == "VOD":
+        _wait_for_encoding(encoding_id=response.encoding_id)
+
+
+def record_workflow(module, variables):
+    """
+    Run the workflow's main() against a recording stub. Waits, prompts and output of the script are skipped.
+    """
+    recorder = _Recorder()
+    for name in variables:
+        setattr(module, name, f"${{{name}}}")
+    module.bitmovin_api = recorder
+    if hasattr(module, 'time'):
+        module.time = SimpleNamespace(sleep=lambda seconds: None)
+    if hasattr(module, 'sleep'):
+        module.sleep = lambda seconds: None
+    original_input = builtins.input
+    builtins.input = lambda prompt='': ''
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            module.main()
+    finally:
+        builtins.input = original_input
+    return recorder
+
+
+def substitute(template, values):
+    """
+    Replace the ${NAME} variables of the template with their values.
+    """
+    missing = _placeholders(template) - set(values)
+    if missing:
+        raise Exception(f"No value for the template variables {', '.join(sorted(missing))}")
+    if isinstance(template, dict):
+        return {key: substitute(value, values) for key, value in template.items()}
+    if isinstance(template, list):
+        return [substitute(value, values) for value in template]
+    if isinstance(template, str):
+        return re.sub(r'\$\{([A-Z0-9_]+)\}', lambda match: str(values[match.group(1)]), template)
+    return template
+
+
+def replay_setup(recorder, values):
+    """
+    Create the recorded resources one request at a time (the imperative path) and return (requests, seconds).
+    The encoding is not started and is deleted afterwards.
+    """
+    ids = {}
+    encoding_ids = []
+    started = time.perf_counter()
+    for node in recorder.nodes:
+        api = bitmovin_api
+        for segment in node["path"]:
+            api = getattr(api, segment)
+        arguments = {key: ids.get(value, value) for key, value in node["ids"].items()}
+        payload = _resolve_references(substitute(_properties(node["model"]), values), ids)
+        created = api.create(**arguments, **{node["argument"]: payload})
+        ids[node["reference"]] = created.id
+        if node["path"] == ("encoding", "encodings"):
+            encoding_ids.append(created.id)
+    seconds = time.perf_counter() - started
+    for encoding_id in encoding_ids:
+        bitmovin_api.encoding.encodings.delete(encoding_id=encoding_id)
+    return len(recorder.nodes), seconds
+
+
+class _Recorder(ApiRecorder):
+    """
+    Recording stub that keeps the created resources as template nodes. Created models get their
+    template reference ($/...) as ID, so references between resources end up in the template as they are.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.calls = []
+        self.starts = []
+        self.manifest_starts = []
+        self.state = Status.FINISHED
+        self._by_reference = {}
+        self._counters = {}
+
+    def on_call(self, path, kwargs):
+        self.calls.append(".".join(path))
+
+    def record_status(self, resource_path, kwargs):
+        return RecordedTask(status=self.state, progress=100, messages=[])
+
+    def record_start(self, resource_path, kwargs):
+        if resource_path[:2] == ("encoding", "manifests"):
+            self.manifest_starts.append((resource_path[2], kwargs["manifest_id"]))
+            return
+        request = next(value for key, value in kwargs.items() if not key.endswith('_id'))
+        self.starts.append((resource_path, kwargs["encoding_id"], request))
+        self.state = Status.RUNNING if resource_path[-1] == 'live' else Status.FINISHED
+
+    def record_stop(self, resource_path, kwargs):
+        self.state = Status.FINISHED
+
+    def record_other(self, path, kwargs):
+        raise Exception(f"{'.'.join(path)} cannot be expressed in an Encoding Template")
+
+    def template(self, name):
+        """
+        The Encoding Template document of the recorded resources.
+        """
+        live = any(resource_path[-1] == 'live' for resource_path, _, _ in self.starts)
+        document = {"metadata": {"type": "LIVE" if live else "VOD", "name": name}}
+        for node in self.nodes:
+            _tree(document, node["template_path"])["properties"] = _properties(node["model"])
+
+        for resource_path, encoding_id, request in self.starts:
+            start = request.to_dict()
+            if not live:
+                # Manifests generated after the encoding in the script are generated by the encoding (V2) instead
+                for manifest_type, manifest_id in self.manifest_starts:
+                    key = "vodHlsManifests" if manifest_type == 'hls' else "vodDashManifests"
+                    references = start.setdefault(key, [])
+                    if all(reference.get("manifestId") != manifest_id for reference in references):
+                        references.append(ManifestResource(manifest_id=manifest_id).to_dict())
+                if self.manifest_starts:
+                    start["manifestGenerator"] = ManifestGenerator.V2.value
+            encoding = self._by_reference[encoding_id]
+            relative = _relative_path(resource_path, encoding["path"])
+            _tree(document, (*encoding["template_path"], *relative, "start"))["properties"] = start
+        return document
+
+    def record_create(self, resource_path, kwargs):
+        ids = {key: value for key, value in kwargs.items() if key.endswith('_id')}
+        argument, model = next((key, value) for key, value in kwargs.items() if not key.endswith('_id'))
+        parents = [self._by_reference[value] for value in ids.values() if value in self._by_reference]
+        parent = max(parents, key=lambda node: len(node["template_path"]), default=None)
+
+        self._counters[resource_path[-1]] = self._counters.get(resource_path[-1], 0) + 1
+        name = f"{resource_path[-1]}_{self._counters[resource_path[-1]]}"
+        # Resources are nested below their deepest parent resource (top-level resources below the document)
+        location = (*parent["template_path"], *_relative_path(resource_path, parent["path"])) if parent else \
+            _relative_path(resource_path, ("encoding",))
+        template_path = (*location, name)
+
+        model.id = "$/" + "/".join(template_path)
+        node = {"path": resource_path, "template_path": template_path, "reference": model.id, "ids": ids,
+                "argument": argument, "model": model}
+        self.nodes.append(node)
+        self._by_reference[model.id] = node
+        return model
+
+    def record_get(self, resource_path, kwargs):
+        if resource_path[-1] == 'type':
+            node = self._by_reference[kwargs["configuration_id"]]
+            return SimpleNamespace(type=CodecConfigType[node["path"][-1].upper()])
+        for value in reversed(list(kwargs.values())):
+            if value in self._by_reference and self._by_reference[value]["path"] == resource_path:
+                return self._by_reference[value]["model"]
+        # Details that only exist once the encoding runs (e.g. the live encoder IP)
+        return Unknown()
+
+    def record_list(self, resource_path, kwargs):
+        items = [node["model"] for node in self.nodes
+                 if node["path"] == resource_path and all(node["ids"].get(key) == value for key, value in kwargs.items()
+                                                          if key.endswith('_id'))]
+        if not items and not kwargs:
+            # Existing resources of the account (e.g. the RTMP input) become variables
+            variable = f"{resource_path[-1]}_{resource_path[-2].rstrip('s')}_id".upper()
+            items = [SimpleNamespace(id=f"${{{variable}}}")]
+        return SimpleNamespace(items=items)
+
+
+def _relative_path(resource_path, parent_path):
+    """
+    Template keys of a resource below its parent resource (the API path segments after the common prefix).
+    """
+    common = 0
+    while common < min(len(resource_path), len(parent_path)) and resource_path[common] == parent_path[common]:
+        common += 1
+    return tuple(segment.replace('_', '-') for segment in resource_path[common:])
+
+
+def _tree(document, path):
+    """
+    The dict at path in the document (created as needed).
+    """
+    node = document
+    for key in path:
+        node = node.setdefault(key, {})
+    return node
+
+
+def _properties(model):
+    """
+    API representation of a recorded model without its ID.
+    """
+    properties = model.to_dict()
+    properties.pop("id", None)
+    return properties
+
+
+def _resolve_references(value, ids):
+    """
+    Replace template references ($/...) with the IDs of the replayed resources.
+    """
+    if isinstance(value, dict):
+        return {key: _resolve_references(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve_references(item, ids) for item in value]
+    return ids.get(value, value)
+
+
+def _placeholders(template):
+    """
+    Names of the ${NAME} variables used in the template.
+    """
+    return set(re.findall(r'\$\{([A-Z0-9_]+)\}', json.dumps(template)))
+
+
+def _load_workflow(path):
+    """
+    Import the workflow script as a module (its main() is not run) and return it with its source.
+    """
+    with open(path) as f:
+        source = f.read()
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module, source
+
+
+def _variable_defaults(module):
+    """
+    Values of the workflow constants that become template variables.
+    """
+    return {name: value for name, value in vars(module).items()
+            if name.isupper() and isinstance(value, str) and re.search(VARIABLE_PATTERN, name) and name != 'API_KEY'}
+
+
+def _ladder_hash(module, source, variables):
+    """
+    SHA-256 of the workflow source and its remaining module-level definitions (ladders, options).
+    Variables are excluded, so titles with the same ladder share one rendered template.
+    """
+    definitions = {name: value for name, value in sorted(vars(module).items())
+                   if not name.startswith('_') and name not in variables and name not in ('API_KEY', 'ORG_ID')
+                   and not inspect.ismodule(value) and not callable(value) and name != 'bitmovin_api'}
+    canonical = json.dumps(definitions, sort_keys=True, default=str)
+    return hashlib.sha256(source.encode() + b"\0" + canonical.encode()).hexdigest()
+
+
+def _wait_for_encoding(encoding_id):
+    """
+    Poll encoding status every 5 seconds until it finishes or fails.
+    """
+    task = bitmovin_api.encoding.encodings.status(encoding_id=encoding_id)
+    while task.status not in [Status.FINISHED, Status.ERROR]:
+        time.sleep(5)
+        task = bitmovin_api.encoding.encodings.status(encoding_id=encoding_id)
+        print(f"Encoding status is {task.status} (progress: {task.progress} %)")
+
+    if task.status == Status.ERROR:
+        for message in filter(lambda m: m.type == MessageType.ERROR, task.messages):
+            print(message.text)
+        raise Exception("Encoding failed")
+
+    print("Encoding finished successfully")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,417 @@
+import itertools
+import math
+import os
+import re
+import struct
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# HLS master playlists of the titles to index: local paths (e.g. mirrors made with vod/mirror) or https:// URLs.
+TITLES = [
+    'mirror/stream.m3u8'
+]
+
+# Number of video variants (lowest BANDWIDTH first) that get an I-frame playlist.
+IFRAME_RUNGS = 2
+
+# I-frame playlists and the master playlist with EXT-X-I-FRAME-STREAM-INF are written next to a local master playlist
+# (<name>.iframes.m3u8, the original is kept); for https:// titles they are written to OUTPUT_DIRECTORY/<host>/<path>
+# and reference the segments by absolute URL.
+OUTPUT_DIRECTORY = 'trickplay'
+IFRAMES_MASTER_SUFFIX = '.iframes.m3u8'
+
+# Titles are indexed TITLE_WORKERS at a time; their segments share one pool of SEGMENT_WORKERS. Only the moof boxes of
+# a segment are read (HEAD_SIZE bytes, more for larger moofs; never the mdat), so memory stays at about
+# SEGMENT_WORKERS x HEAD_SIZE plus a few numbers per I-frame.
+# The byte range of an I-frame runs from its moof to the end of its sample, so later I-frames of a fragment (e.g. 3 per
+# 6 s segment with a 2 s keyframe interval) include the samples before them. True lists only the first I-frame of
+# every fragment: tighter ranges and a lower I-frame BANDWIDTH, at one entry per segment.
+FIRST_SYNC_SAMPLE_ONLY = False
+
+TITLE_WORKERS = 4
+SEGMENT_WORKERS = 32
+HEAD_SIZE = 64 * 1024
+
+
+def main():
+    """
+    Build HLS I-frame playlists from existing fMP4 segments. Steps:
+      1) Pick the IFRAME_RUNGS lowest video variants of every title in TITLES
+      2) Read the moof of every segment and find the sync samples from the trun / tfhd / trex sample flags
+         (no decoding, no media data downloaded)
+      3) Write one byte-range I-frame playlist per variant (EXT-X-I-FRAMES-ONLY)
+      4) Write the master playlist with EXT-X-I-FRAME-STREAM-INF entries
+    """
+    with ThreadPoolExecutor(max_workers=SEGMENT_WORKERS) as segment_executor, \
+            ThreadPoolExecutor(max_workers=TITLE_WORKERS) as title_executor:
+        futures = {title: title_executor.submit(index_title, title, segment_executor) for title in TITLES}
+        failed = 0
+        for title, future in futures.items():
+            try:
+                print(f"{title}: {future.result()}")
+            except Exception as e:
+                failed += 1
+                print(f"{title}: FAILED ({e})")
+    if failed:
+        raise Exception(f"{failed} of {len(TITLES)} titles failed")
+
+
+def index_title(master_location, executor):
+    """
+    Write the I-frame playlists and the master playlist with EXT-X-I-FRAME-STREAM-INF of one title.
+    Returns the path of the new master playlist.
+    """
+    text = _read_text(master_location)
+    variants = [variant for variant in parse_master_playlist(text) if variant["resolution"]]
+    if not variants:
+        raise Exception("no video variants (RESOLUTION) in the master playlist")
+    directory = _output_directory(master_location)
+    os.makedirs(directory, exist_ok=True)
+
+    iframe_streams = []
+    for variant in sorted(variants, key=lambda variant: variant["bandwidth"])[:IFRAME_RUNGS]:
+        playlist_location = _resolve(master_location, variant["uri"])
+        iframes = index_rendition(playlist_location, executor)
+        if not iframes["entries"]:
+            print(f"{playlist_location}: no sync samples found, skipped")
+            continue
+        name = f"iframe_{re.sub(r'[^A-Za-z0-9_.-]+', '_', os.path.splitext(urllib.parse.urlparse(variant['uri']).path)[0])}.m3u8"
+        with open(os.path.join(directory, name), 'w') as f:
+            f.write(iframe_playlist(iframes, lambda location: _reference(location, directory)))
+        iframe_streams.append({**variant, **_bandwidth(iframes["entries"]), "iframe_uri": name})
+        print(f"{playlist_location}: {len(iframes['entries'])} I-frames -> {os.path.join(directory, name)}")
+
+    path = os.path.join(directory, os.path.splitext(os.path.basename(urllib.parse.urlparse(master_location).path))[0]
+                        + IFRAMES_MASTER_SUFFIX)
+    with open(path, 'w') as f:
+        f.write(add_iframe_streams(text, iframe_streams, master_location, directory))
+    return path
+
+
+def index_rendition(playlist_location, executor):
+    """
+    Init segment and I-frames ({"location", "offset", "size", "time"}) of one fMP4 media playlist, with the end time
+    of the rendition. The byte range of an I-frame starts at its moof and ends with its sample data.
+    """
+    text = _read_text(playlist_location)
+    init_uri = re.search(r'#EXT-X-MAP:URI="([^"]+)"', text)
+    if not init_uri:
+        raise Exception(f"{playlist_location} has no EXT-X-MAP (only fMP4 segments can be indexed)")
+    if '#EXT-X-BYTERANGE' in text:
+        raise Exception(f"{playlist_location} uses byte ranges; index the segmented output instead")
+    init_location = _resolve(playlist_location, init_uri.group(1))
+    init = _read_range(init_location, 0, HEAD_SIZE)
+    timescale, defaults = _init_track(init)
+    segment_locations = [_resolve(playlist_location, line.strip()) for line in text.splitlines()
+                         if line.strip() and not line.startswith('#')]
+
+    entries = []
+    end_time = 0
+    for location, (iframes, segment_end) in zip(segment_locations, executor.map(
+            lambda location: _inspect_segment(location, defaults), segment_locations), strict=True):
+        entries.extend({"location": location, **iframe} for iframe in iframes)
+        end_time = max(end_time, segment_end)
+    for entry in entries:
+        entry["time"] /= timescale
+    return {"init_location": init_location, "entries": entries, "end_time": end_time / timescale}
+
+
+def iframe_playlist(iframes, reference):
+    """
+    HLS I-frame playlist (EXT-X-I-FRAMES-ONLY) with one byte range per I-frame; the EXTINF of an I-frame lasts until
+    the next one.
+    """
+    entries = iframes["entries"]
+    durations = [following["time"] - entry["time"] for entry, following in itertools.pairwise(entries)]
+    durations.append(max(iframes["end_time"] - entries[-1]["time"], 0))
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:7",
+        f"#EXT-X-TARGETDURATION:{max(1, math.ceil(max(durations)))}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+        "#EXT-X-I-FRAMES-ONLY",
+        "#EXT-X-INDEPENDENT-SEGMENTS",
+        f'#EXT-X-MAP:URI="{reference(iframes["init_location"])}"'
+    ]
+    for entry, duration in zip(entries, durations, strict=True):
+        lines.append(f"#EXTINF:{duration:.6f},")
+        lines.append(f"#EXT-X-BYTERANGE:{entry['size']}@{entry['offset']}")
+        lines.append(reference(entry["location"]))
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+def add_iframe_streams(text, iframe_streams, master_location, directory):
+    """
+    The master playlist with one EXT-X-I-FRAME-STREAM-INF per I-frame playlist (variant URIs made absolute for
+    https:// titles).
+    """
+    lines = [line for line in text.splitlines() if not line.startswith('#EXT-X-I-FRAME-STREAM-INF:')]
+    if master_location.startswith(('http://', 'https://')):
+        lines = [_rewrite_uri(line, master_location, directory) for line in lines]
+    while lines and not lines[-1].strip():
+        lines.pop()
+    for stream in iframe_streams:
+        attributes = [f"BANDWIDTH={stream['iframe_bandwidth']}",
+                      f"AVERAGE-BANDWIDTH={stream['iframe_average_bandwidth']}"]
+        video_codecs = [codec for codec in stream["codecs"].split(',') if codec and not codec.startswith('mp4a')]
+        if video_codecs:
+            attributes.append(f'CODECS="{video_codecs[0]}"')
+        attributes.append(f"RESOLUTION={stream['resolution']}")
+        attributes.append(f'URI="{stream["iframe_uri"]}"')
+        lines.append(f"#EXT-X-I-FRAME-STREAM-INF:{','.join(attributes)}")
+    return "\n".join(lines) + "\n"
+
+
+def parse_master_playlist(text):
+    """
+    Variants ({"uri", "bandwidth", "codecs", "resolution"}) of a master playlist.
+    """
+    variants = []
+    pending = None
+    for line in text.splitlines():
+        if line.startswith('#EXT-X-STREAM-INF:'):
+            pending = {
+                "bandwidth": int((re.search(r'(?:^|[:,])BANDWIDTH=(\d+)', line) or [None, 0])[1]),
+                "codecs": (re.search(r'CODECS="([^"]+)"', line) or [None, ''])[1],
+                "resolution": (re.search(r'RESOLUTION=(\d+x\d+)', line) or [None, None])[1]
+            }
+        elif pending is not None and line.strip() and not line.startswith('#'):
+            variants.append({"uri": line.strip(), **pending})
+            pending = None
+    return variants
+
+
+def _inspect_segment(location, defaults):
+    """
+    I-frames ({"offset", "size", "time"} in timescale units) and end time of one fMP4 segment, from its moof boxes.
+    """
+    iframes = []
+    end_time = 0
+    head_start, head = 0, _read_range(location, 0, HEAD_SIZE)
+    offset = 0
+    while True:
+        if offset + 16 > head_start + len(head):
+            head_start, head = offset, _read_range(location, offset, HEAD_SIZE)
+            if len(head) < 8:
+                break
+        size, box_type = struct.unpack_from('>I4s', head, offset - head_start)
+        if size == 1:
+            size = struct.unpack_from('>Q', head, offset - head_start + 8)[0]
+        if size < 8:
+            break
+        if box_type == b'moof':
+            if offset + size > head_start + len(head):
+                head_start, head = offset, _read_range(location, offset, size)
+            moof_iframes, moof_end_time = _moof_iframes(head, offset - head_start, offset, size, defaults)
+            iframes.extend(moof_iframes)
+            end_time = max(end_time, moof_end_time)
+        # Media data is skipped by its size, never read.
+        offset += size
+    return iframes, end_time
+
+
+def _moof_iframes(data, start, moof_position, size, defaults):
+    """
+    Sync samples of the moof at start in data (moof_position in the file) as {"offset" (moof position), "size" (up to
+    the end of the sample), "time"}, and the end time of the fragment.
+    """
+    iframes = []
+    end_time = 0
+    for traf_start, traf_end in _iter_children(data, start + 8, start + size, b'traf'):
+        tfhd = _tfhd(data, traf_start, traf_end, defaults)
+        time = 0
+        for tfdt_start, _ in _iter_children(data, traf_start + 8, traf_end, b'tfdt'):
+            time = struct.unpack_from('>Q' if data[tfdt_start + 8] == 1 else '>I', data, tfdt_start + 12)[0]
+        base = tfhd["base_data_offset"] if tfhd["base_data_offset"] is not None else moof_position
+        data_position = base
+        for trun_start, _ in _iter_children(data, traf_start + 8, traf_end, b'trun'):
+            flags = int.from_bytes(data[trun_start + 9:trun_start + 12], 'big')
+            count = struct.unpack_from('>I', data, trun_start + 12)[0]
+            offset = trun_start + 16
+            if flags & 0x001:
+                data_position = base + struct.unpack_from('>i', data, offset)[0]
+                offset += 4
+            first_sample_flags = None
+            if flags & 0x004:
+                first_sample_flags = struct.unpack_from('>I', data, offset)[0]
+                offset += 4
+            fields = [bit for bit in (0x100, 0x200, 0x400, 0x800) if flags & bit]
+            for index in range(count):
+                values = dict(zip(fields, struct.unpack_from(f'>{len(fields)}I', data, offset), strict=True))
+                offset += 4 * len(fields)
+                duration = values.get(0x100, tfhd["duration"])
+                sample_size = values.get(0x200, tfhd["size"])
+                sample_flags = first_sample_flags if index == 0 and first_sample_flags is not None else \
+                    values.get(0x400, tfhd["flags"])
+                # sample_is_non_sync_sample (0x10000) is clear for sync samples.
+                if not sample_flags & 0x10000 and not (FIRST_SYNC_SAMPLE_ONLY and iframes):
+                    iframes.append({"offset": moof_position, "size": data_position + sample_size - moof_position, "time": time})
+                data_position += sample_size
+                time += duration
+        end_time = max(end_time, time)
+    return iframes, end_time
+
+
+def _tfhd(data, start, end, defaults):
+    """
+    base_data_offset (None if not present) and the default sample duration / size / flags of a traf, falling back
+    to the trex defaults of the init segment.
+    """
+    result = {"base_data_offset": None, **defaults}
+    for box_start, _ in _iter_children(data, start + 8, end, b'tfhd'):
+        flags = int.from_bytes(data[box_start + 9:box_start + 12], 'big')
+        offset = box_start + 16
+        if flags & 0x01:
+            result["base_data_offset"] = struct.unpack_from('>Q', data, offset)[0]
+            offset += 8
+        offset += 4 if flags & 0x02 else 0
+        for bit, name in ((0x08, "duration"), (0x10, "size"), (0x20, "flags")):
+            if flags & bit:
+                result[name] = struct.unpack_from('>I', data, offset)[0]
+                offset += 4
+    return result
+
+
+def _init_track(data):
+    """
+    Timescale (mdhd) and trex sample defaults ({"duration", "size", "flags"}) of the first track of an init segment.
+    """
+    moov = _find_box(data, b'moov')
+    if moov is None:
+        raise Exception("init segment has no moov")
+    trak = next(_iter_children(data, moov[0] + 8, moov[1], b'trak'))
+    mdia = next(_iter_children(data, trak[0] + 8, trak[1], b'mdia'))
+    mdhd = next(_iter_children(data, mdia[0] + 8, mdia[1], b'mdhd'))
+    timescale = struct.unpack_from('>I', data, mdhd[0] + (28 if data[mdhd[0] + 8] == 1 else 20))[0]
+    defaults = {"duration": 0, "size": 0, "flags": 0}
+    for mvex_start, mvex_end in _iter_children(data, moov[0] + 8, moov[1], b'mvex'):
+        for trex_start, _ in _iter_children(data, mvex_start + 8, mvex_end, b'trex'):
+            _, duration, size, flags = struct.unpack_from('>IIII', data, trex_start + 16)
+            defaults = {"duration": duration, "size": size, "flags": flags}
+    return timescale, defaults
+
+
+def _bandwidth(entries):
+    """
+    Peak and average bitrate of the I-frame byte ranges over their EXTINF durations.
+    """
+    rates, total_bits, total_duration = [], 0, 0
+    for entry, following in itertools.pairwise(entries):
+        duration = following["time"] - entry["time"]
+        if duration > 0:
+            rates.append(entry["size"] * 8 / duration)
+            total_bits += entry["size"] * 8
+            total_duration += duration
+    if not rates:
+        return {"iframe_bandwidth": entries[0]["size"] * 8, "iframe_average_bandwidth": entries[0]["size"] * 8}
+    return {"iframe_bandwidth": math.ceil(max(rates)), "iframe_average_bandwidth": math.ceil(total_bits / total_duration)}
+
+
+def _find_box(data, box_type):
+    """
+    (start, end) of the first top-level box of the given type; end may exceed the data read so far.
+    """
+    offset = 0
+    while offset + 8 <= len(data):
+        size, current_type = struct.unpack_from('>I4s', data, offset)
+        if size == 1:
+            size = struct.unpack_from('>Q', data, offset + 8)[0]
+        if size < 8:
+            return None
+        if current_type == box_type:
+            return offset, offset + size
+        offset += size
+    return None
+
+
+def _iter_children(data, start, end, box_type):
+    """
+    Yield (start, end) of the child boxes of the given type between start and end.
+    """
+    offset = start
+    while offset + 8 <= min(end, len(data)):
+        size, current_type = struct.unpack_from('>I4s', data, offset)
+        if size < 8:
+            return
+        if current_type == box_type:
+            yield offset, offset + size
+        offset += size
+
+
+def _output_directory(master_location):
+    """
+    Directory for the playlists of a title: next to a local master playlist, under OUTPUT_DIRECTORY for URLs.
+    """
+    if not master_location.startswith(('http://', 'https://')):
+        return os.path.dirname(master_location) or '.'
+    url = urllib.parse.urlparse(master_location)
+    return os.path.join(OUTPUT_DIRECTORY, url.netloc, *os.path.dirname(url.path).strip('/').split('/'))
+
+
+def _reference(location, directory):
+    """
+    URI of a segment / playlist as written into a playlist in the given directory.
+    """
+    if location.startswith(('http://', 'https://')):
+        return location
+    return urllib.parse.quote(os.path.relpath(location, directory).replace(os.sep, '/'))
+
+
+def _rewrite_uri(line, master_location, directory):
+    """
+    A master playlist line with its (variant or URI attribute) reference resolved for a playlist in directory.
+    """
+    if line.strip() and not line.startswith('#'):
+        return _reference(_resolve(master_location, line.strip()), directory)
+    return re.sub(r'URI="([^"]+)"',
+                  lambda match: f'URI="{_reference(_resolve(master_location, match.group(1)), directory)}"', line)
+
+
+def _resolve(base, reference):
+    """
+    Resolve a playlist reference against a local path or URL.
+    """
+    if base.startswith(('http://', 'https://')):
+        return urllib.parse.urljoin(base, reference)
+    return os.path.normpath(os.path.join(os.path.dirname(base), urllib.parse.unquote(reference)))
+
+
+def _read_text(location):
+    """
+    Text of a local file or an https:// object.
+    """
+    if not location.startswith(('http://', 'https://')):
+        with open(location, encoding='utf-8') as f:
+            return f.read()
+    with urllib.request.urlopen(location) as response:
+        return response.read().decode('utf-8')
+
+
+def _read_range(location, start, length):
+    """
+    Up to length bytes from start of a local file or an https:// object (Range request).
+    """
+    if not location.startswith(('http://', 'https://')):
+        with open(location, 'rb') as f:
+            f.seek(start)
+            return f.read(length)
+    request = urllib.request.Request(location, headers={"Range": f"bytes={start}-{start + length - 1}"})
+    try:
+        with urllib.request.urlopen(request) as response:
+            if response.status == 206:
+                return response.read()
+            # The server ignored the Range header: read up to the end of the range only.
+            return response.read(start + length)[start:]
+    except urllib.error.HTTPError as e:
+        # 416: the range starts at or after the end of the object.
+        if e.code == 416:
+            return b''
+        raise
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+import asyncio
+import hashlib
+import hmac
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import UTC, datetime
+
+from bitmovin_api_sdk import Webhook, WebhookHttpMethod, WebhookSignature, SignatureType, WebhookListQueryParams
+from bitmovin_api_sdk import Status
+
+# Address the receiver listens on, and the public HTTPS URL (reverse proxy or tunnel) that forwards to it.
+WEBHOOK_LISTEN_HOST = '0.0.0.0'
+WEBHOOK_LISTEN_PORT = 8080
+WEBHOOK_PUBLIC_URL = 'https://<INSERT_YOUR_WEBHOOK_HOST>/bitmovin'
+# Key of the HMAC signature (Bitmovin-Signature header: hex HMAC-SHA512 of the body).
+WEBHOOK_SECRET = '<INSERT_YOUR_WEBHOOK_SECRET>'
+
+# Event IDs remembered for deduplication / completions kept for waiters that register after the event.
+DEDUPE_CAPACITY = 100000
+MAX_BODY_SIZE = 1024 * 1024
+# Page size when listing the existing webhooks (register_webhooks reuses a webhook with the same URL).
+WEBHOOK_PAGE_LIMIT = 100
+
+# Demo (main): jobs finished by the local event emitter stand-in. DEMO_DROP_RATE of the events are never delivered
+# (the fallback poll finds those), DEMO_DUPLICATE_RATE are delivered twice, and one forged event is sent per job.
+# Times are in seconds, scaled down so that the demo finishes quickly (1 s here ~ 1 min of a real encoding).
+DEMO_JOBS = 200
+DEMO_MAX_RUNTIME = 10.0
+DEMO_DROP_RATE = 0.05
+DEMO_DUPLICATE_RATE = 0.2
+DEMO_FALLBACK_POLL_INTERVAL = 5.0
+DEMO_POLL_INTERVAL = 0.1
+
+# Webhook path (last segment) -> resource kind and final status.
+EVENTS = {
+    "encoding-finished": ("encoding", Status.FINISHED),
+    "encoding-error": ("encoding", Status.ERROR),
+    "manifest-finished": ("manifest", Status.FINISHED),
+    "manifest-error": ("manifest", Status.ERROR)
+}
+
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large"}
+
+
+def main():
+    """
+    Local demo with the event emitter stand-in instead of Bitmovin. Steps:
+      1) Build the webhook models that register_webhooks would create (checks the SDK keywords offline)
+      2) Start the receiver on a local port
+      3) Simulate DEMO_JOBS encodings finishing at random times; the emitter posts signed finished events,
+         duplicates and forged events, and drops some events
+      4) Wait for every job like the samples do (completion future, slow fallback poll of the simulated status)
+      5) Compare status requests and detection lag with polling every DEMO_POLL_INTERVAL seconds
+    """
+    secret = WEBHOOK_SECRET
+    for name in EVENTS:
+        webhook = webhook_model(f"{WEBHOOK_PUBLIC_URL.rstrip('/')}/{name}", secret)
+        if webhook.signature.type != SignatureType.HMAC:
+            raise Exception(f"Webhook model of {name} has no HMAC signature")
+    completions = CompletionFutures()
+    receiver = WebhookReceiver(completions, secret=secret, host='127.0.0.1', port=0).start()
+    url = f"http://127.0.0.1:{receiver.port}/bitmovin"
+    print(f"Receiver listening on {url}")
+
+    started = time.monotonic()
+    jobs = [{"id": str(uuid.uuid4()), "runtime": random.uniform(0, DEMO_MAX_RUNTIME)} for _ in range(DEMO_JOBS)]
+    for job in jobs:
+        job["finished_at"] = started + job["runtime"]
+
+    def deliver(job):
+        time.sleep(job["runtime"])
+        emit_event(url, "encoding-finished", job["id"], secret="forged")
+        if random.random() < DEMO_DROP_RATE:
+            return
+        event_id = str(uuid.uuid4())
+        for _ in range(2 if random.random() < DEMO_DUPLICATE_RATE else 1):
+            emit_event(url, "encoding-finished", job["id"], secret=secret, event_id=event_id)
+
+    def wait(job):
+        polls = 0
+        while True:
+            result = completions.wait("encoding", job["id"], timeout=DEMO_FALLBACK_POLL_INTERVAL)
+            if result:
+                return {"lag": result["resolved_at"] - job["finished_at"], "polls": polls, "source": result["source"]}
+            polls += 1
+            if time.monotonic() >= job["finished_at"]:
+                completions.resolve("encoding", job["id"], Status.FINISHED, source="poll")
+
+    with ThreadPoolExecutor(max_workers=2 * DEMO_JOBS) as executor:
+        waits = [executor.submit(wait, job) for job in jobs]
+        for job in jobs:
+            executor.submit(deliver, job)
+        results = [future.result() for future in waits]
+    receiver.stop()
+
+    lags = sorted(result["lag"] for result in results)
+    # Polling helpers: first status request DEMO_POLL_INTERVAL after the start, then every DEMO_POLL_INTERVAL
+    polled_lags = [-job["runtime"] % DEMO_POLL_INTERVAL for job in jobs]
+    by_poll = sum(result["source"] == "poll" for result in results)
+    print(f"Receiver: {receiver.stats}")
+    print(f"Webhooks: {sum(result['polls'] for result in results)} status requests, {by_poll} jobs found by the fallback poll, "
+          f"detection lag median {lags[len(lags) // 2] * 1000:.0f} ms / max {lags[-1]:.2f} s")
+    print(f"Polling every {DEMO_POLL_INTERVAL} s: {sum(int(job['runtime'] // DEMO_POLL_INTERVAL) + 1 for job in jobs)} status requests, "
+          f"detection lag mean {sum(polled_lags) / len(polled_lags) * 1000:.0f} ms / max {max(polled_lags) * 1000:.0f} ms")
+
+
+class CompletionFutures:
+    """
+    One future per resource (kind and ID) that resolves with the final status, from whichever source sees it
+    first: a webhook event or a status poll. Completions that arrive before anyone waits for them are kept.
+    """
+
+    def __init__(self, capacity=DEDUPE_CAPACITY):
+        self.capacity = capacity
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind, resource_id):
+        with self._lock:
+            future = self._futures.get((kind, resource_id))
+            if future is None:
+                future = self._futures[kind, resource_id] = Future()
+                while len(self._futures) > self.capacity:
+                    self._futures.popitem(last=False)
+            return future
+
+    def resolve(self, kind, resource_id, status, source):
+        """
+        Resolve the resource's future; returns False when it was already resolved.
+        """
+        future = self.get(kind, resource_id)
+        with self._lock:
+            if future.done():
+                return False
+            future.set_result({"status": status, "source": source, "resolved_at": time.monotonic()})
+            return True
+
+    def wait(self, kind, resource_id, timeout):
+        """
+        Result of the resource's future ({"status", "source", "resolved_at"}), or None if it does not resolve in time.
+        """
+        future = self.get(kind, resource_id)
+        try:
+            result = future.result(timeout=timeout)
+        except TimeoutError:
+            return None
+        with self._lock:
+            self._futures.pop((kind, resource_id), None)
+        return result
+
+
+class WebhookReceiver:
+    """
+    Asyncio HTTP receiver for Bitmovin webhook notifications, running its event loop on a background thread.
+    Verifies the HMAC signature, drops duplicate deliveries and resolves the completion futures.
+    """
+
+    def __init__(self, completions, secret=WEBHOOK_SECRET, host=WEBHOOK_LISTEN_HOST, port=WEBHOOK_LISTEN_PORT):
+        self.completions = completions
+        self.secret = secret
+        self.host = host
+        self.port = port
+        self.stats = {"received": 0, "accepted": 0, "duplicates": 0, "rejected": 0}
+        self._seen = OrderedDict()
+        self._loop = None
+        self._server = None
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, self.host, self.port), self._loop).result()
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    def stop(self):
+        async def close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def handle_event(self, path, signature, body):
+        """
+        Process one delivery and return the HTTP status code. Duplicates are acknowledged with 200 so that
+        they are not retried.
+        """
+        self.stats["received"] += 1
+        event = EVENTS.get(path.split("?")[0].rstrip("/").rsplit("/", 1)[-1])
+        if event is None:
+            return 404
+        if not verify_signature(body, signature, self.secret):
+            self.stats["rejected"] += 1
+            return 401
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return 400
+        resource_id = _resource_id(payload)
+        if not resource_id:
+            return 400
+
+        event_id = payload.get("eventId") or hashlib.sha256(body).hexdigest()
+        if event_id in self._seen:
+            self.stats["duplicates"] += 1
+            return 200
+        self._seen[event_id] = True
+        while len(self._seen) > DEDUPE_CAPACITY:
+            self._seen.popitem(last=False)
+
+        kind, status = event
+        self.completions.resolve(kind, resource_id, status, source="webhook")
+        self.stats["accepted"] += 1
+        return 200
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                status = await self._receive(reader)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                status = 400
+            writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode())
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _receive(self, reader):
+        head = await reader.readuntil(b"\r\n\r\n")
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        method, target, _ = request_line.split(" ", 2)
+        headers = {name.strip().lower(): value.strip()
+                   for name, _, value in (line.partition(":") for line in header_lines if line)}
+        if method != "POST":
+            return 405
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY_SIZE:
+            return 413
+        body = await reader.readexactly(length)
+        return self.handle_event(target, headers.get("bitmovin-signature", ""), body)
+
+
+def register_webhooks(bitmovin_api, public_url=WEBHOOK_PUBLIC_URL, secret=WEBHOOK_SECRET):
+    """
+    Create the organization-wide finished / error webhooks of encodings and manifests that point at the receiver.
+    Webhooks that already exist with the same URL are reused, so this costs a few requests once, not per job.
+    """
+    apis = {
+        "encoding-finished": bitmovin_api.notifications.webhooks.encoding.encodings.finished,
+        "encoding-error": bitmovin_api.notifications.webhooks.encoding.encodings.error,
+        "manifest-finished": bitmovin_api.notifications.webhooks.encoding.manifest.finished,
+        "manifest-error": bitmovin_api.notifications.webhooks.encoding.manifest.error
+    }
+    for name, api in apis.items():
+        url = f"{public_url.rstrip('/')}/{name}"
+        if any(webhook.url == url for webhook in _list_webhooks(api)):
+            continue
+        api.create(webhook=webhook_model(url, secret))
+        print(f"Webhook registered: {url}")
+
+
+def webhook_model(url, secret):
+    """
+    Webhook (POST, HMAC signature) sent by register_webhooks; built without any request.
+    """
+    return Webhook(url=url, method=WebhookHttpMethod.POST,
+                   signature=WebhookSignature(type_=SignatureType.HMAC, key=secret))
+
+
+def _list_webhooks(api):
+    """
+    All webhooks of one notification type, following offset / limit until the last page.
+    """
+    webhooks = []
+    offset = 0
+    while True:
+        page = api.list(query_params=WebhookListQueryParams(offset=offset, limit=WEBHOOK_PAGE_LIMIT))
+        webhooks.extend(page.items)
+        if len(page.items) < WEBHOOK_PAGE_LIMIT:
+            return webhooks
+        offset += WEBHOOK_PAGE_LIMIT
+
+
+def verify_signature(body, signature, secret):
+    """
+    Check the Bitmovin-Signature header (hex HMAC-SHA512 of the raw body).
+    """
+    expected = hmac.new(secret.encode(), body, hashlib.sha512).hexdigest().encode()
+    # Compared as bytes: compare_digest rejects str with non-ASCII characters (TypeError) instead of returning False.
+    return hmac.compare_digest(expected, signature.strip().lower().encode())
+
+
+def emit_event(url, event, resource_id, secret=WEBHOOK_SECRET, event_id=None):
+    """
+    Local stand-in for Bitmovin: post a signed notification for a resource to the receiver and return the HTTP status.
+    """
+    kind, status = EVENTS[event]
+    body = json.dumps({
+        "eventId": event_id or str(uuid.uuid4()),
+        "createdAt": datetime.now(UTC).isoformat(timespec='milliseconds'),
+        "eventType": f"{kind.upper()}_{status.value}",
+        "resourceType": kind.upper(),
+        "resourceId": resource_id
+    }).encode()
+    target = urllib.parse.urlsplit(f"{url.rstrip('/')}/{event}")
+    connection = http.client.HTTPConnection(target.hostname, target.port, timeout=10)
+    try:
+        connection.request("POST", target.path, body=body, headers={
+            "Content-Type": "application/json",
+            "Bitmovin-Signature": hmac.new(secret.encode(), body, hashlib.sha512).hexdigest()
+        })
+        return connection.getresponse().status
+    finally:
+        connection.close()
+
+
+def _resource_id(payload):
+    """
+    ID of the encoding / manifest an event refers to.
+    """
+    for key in ("encoding", "manifest"):
+        if isinstance(payload.get(key), dict) and payload[key].get("id"):
+            return payload[key]["id"]
+    return payload.get("resourceId")
+
+
+if __name__ == '__main__':
+    main()